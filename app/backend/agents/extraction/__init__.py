@@ -1,3 +1,3 @@
-from .llm_extractor import LLMExtractor, ExtractedEntity
+from .llm_extractor import LLMExtractor, ExtractedEntity, ExtractionJob, ExtractionResult
 
-__all__ = ["LLMExtractor", "ExtractedEntity"]
+__all__ = ["LLMExtractor", "ExtractedEntity", "ExtractionJob", "ExtractionResult"]
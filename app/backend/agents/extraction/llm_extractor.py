@@ -2,11 +2,28 @@
 TERA LLM Extraction Agent
 Uses local Ollama for entity extraction
 """
+import asyncio
 import json
-from typing import Optional, List, Dict, Any
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, AsyncIterator, Callable, Iterable, Union
 from pydantic import BaseModel, Field
 from loguru import logger
-import httpx
+from services.ollama_client import OllamaClient
+
+
+# Longer articles are cut before prompting (prompt size drives LLM latency)
+MAX_TEXT_CHARS = 3000
+
+
+def cap_text(text: str, max_chars: int = MAX_TEXT_CHARS) -> str:
+    """Cuts text to max_chars, at the last word boundary if there is one"""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    return cut[:space] if space > max_chars // 2 else cut
 
 
 class ExtractedEntity(BaseModel):
@@ -20,6 +37,64 @@ class ExtractedEntity(BaseModel):
     raw_text_snippet: Optional[str] = None
 
 
+@dataclass
+class ExtractionJob:
+    """One article for batch extraction"""
+    text: str
+    published: Optional[datetime] = None
+    id: Any = None
+    
+    def priority(self) -> float:
+        """Smaller = earlier: newest articles first, undated ones last"""
+        if self.published is None:
+            return float("inf")
+        published = self.published
+        if published.tzinfo is None:
+            published = published.replace(tzinfo=timezone.utc)
+        return -published.timestamp()
+
+
+@dataclass
+class ExtractionResult:
+    """Outcome of one job (entity None: nothing extracted or error)"""
+    job: ExtractionJob
+    entity: Optional[ExtractedEntity]
+    error: Optional[str] = None
+    elapsed_s: float = 0.0
+
+
+@dataclass
+class ExtractionMetrics:
+    """Progress and throughput of the running batch"""
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+    timeouts: int = 0
+    in_flight: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    finished: Optional[float] = None
+    
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else 1.0
+    
+    @property
+    def throughput_per_min(self) -> float:
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return self.done / elapsed * 60 if elapsed > 0 else 0.0
+    
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "in_flight": self.in_flight,
+            "progress": round(self.progress, 3),
+            "throughput_per_min": round(self.throughput_per_min, 1),
+        }
+
+
 class LLMExtractor:
     """Extract structured data from text using local LLM"""
     
@@ -39,67 +114,133 @@ Text to analyze:
 
 JSON Output:"""
 
-    def __init__(self, ollama_url: str = "http://localhost:11434", model: str = "llama3.1:8b"):
+    def __init__(
+        self,
+        ollama_url: str = "http://localhost:11434",
+        model: str = "llama3.1:8b",
+        concurrency: int = 4,
+        item_timeout: float = 180.0,
+        max_chars: int = MAX_TEXT_CHARS,
+        llm: Any = None,
+    ):
         self.ollama_url = ollama_url
         self.model = model
-        self.client = httpx.AsyncClient(timeout=120.0)
+        self.concurrency = concurrency
+        self.item_timeout = item_timeout
+        self.max_chars = max_chars
+        # llm: anything with OllamaClient.generate(prompt, options=...)
+        self.llm = llm or OllamaClient(base_url=ollama_url, model=model, timeout=120.0)
+        self.metrics = ExtractionMetrics()
     
-    async def extract(self, text: str) -> Optional[ExtractedEntity]:
-        """Extract entities from text using LLM"""
-        prompt = self.EXTRACTION_PROMPT.format(text=text[:3000])
+    def build_prompt(self, text: str) -> str:
+        """Prompt with the article text capped at max_chars"""
+        return self.EXTRACTION_PROMPT.replace("{text}", cap_text(text, self.max_chars))
+    
+    async def _extract(self, text: str) -> Optional[ExtractedEntity]:
+        """Like extract, but LLM/transport errors propagate"""
+        raw_output = await self.llm.generate(
+            self.build_prompt(text),
+            options={
+                "temperature": 0.1,
+                "num_predict": 500
+            }
+        )
         
+        # Parse JSON from response
         try:
-            response = await self.client.post(
-                f"{self.ollama_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.1,
-                        "num_predict": 500
-                    }
-                }
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                raw_output = result.get("response", "")
+            # Find JSON in response
+            json_start = raw_output.find('{')
+            json_end = raw_output.rfind('}') + 1
+            if json_start >= 0 and json_end > json_start:
+                json_str = raw_output[json_start:json_end]
+                data = json.loads(json_str)
                 
-                # Parse JSON from response
-                try:
-                    # Find JSON in response
-                    json_start = raw_output.find('{')
-                    json_end = raw_output.rfind('}') + 1
-                    if json_start >= 0 and json_end > json_start:
-                        json_str = raw_output[json_start:json_end]
-                        data = json.loads(json_str)
-                        
-                        return ExtractedEntity(
-                            location=data.get("location", "Unknown"),
-                            coordinates=data.get("coordinates"),
-                            event_type=data.get("event_type", "other"),
-                            severity=min(10, max(1, int(data.get("severity", 5)))),
-                            summary=data.get("summary", ""),
-                            confidence=0.8,
-                            raw_text_snippet=text[:200]
-                        )
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse LLM JSON: {e}")
-                    
+                return ExtractedEntity(
+                    location=data.get("location", "Unknown"),
+                    coordinates=data.get("coordinates"),
+                    event_type=data.get("event_type", "other"),
+                    severity=min(10, max(1, int(data.get("severity", 5)))),
+                    summary=data.get("summary", ""),
+                    confidence=0.8,
+                    raw_text_snippet=text[:200]
+                )
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse LLM JSON: {e}")
+        
+        return None
+    
+    async def extract(self, text: str) -> Optional[ExtractedEntity]:
+        """Extract entities from text using LLM"""
+        try:
+            return await self._extract(text)
         except Exception as e:
             logger.error(f"LLM extraction error: {e}")
         
         return None
     
-    async def batch_extract(self, texts: List[str]) -> List[ExtractedEntity]:
-        """Extract from multiple texts"""
+    async def extract_stream(
+        self,
+        articles: Iterable[Union[str, ExtractionJob]],
+        on_progress: Optional[Callable[[ExtractionMetrics], None]] = None,
+    ) -> AsyncIterator[ExtractionResult]:
+        """
+        Extract from many articles with `concurrency` parallel LLM calls.
+        
+        Newest articles are prompted first; results are yielded as they
+        complete. At most `concurrency` results wait for the consumer:
+        a slow consumer stops the workers from taking new jobs.
+        """
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        for seq, article in enumerate(articles):
+            job = article if isinstance(article, ExtractionJob) else ExtractionJob(text=article, id=seq)
+            queue.put_nowait((job.priority(), seq, job))
+        
+        metrics = self.metrics = ExtractionMetrics(total=queue.qsize())
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        
+        async def worker():
+            while True:
+                try:
+                    _, _, job = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                metrics.in_flight += 1
+                start = time.perf_counter()
+                entity, error = None, None
+                try:
+                    entity = await asyncio.wait_for(self._extract(job.text), self.item_timeout)
+                except asyncio.TimeoutError:
+                    error = "timeout"
+                    metrics.timeouts += 1
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                    metrics.failed += 1
+                metrics.in_flight -= 1
+                metrics.done += 1
+                if on_progress:
+                    try:
+                        on_progress(metrics)
+                    except Exception as e:
+                        logger.warning(f"Progress callback failed: {e}")
+                await results.put(ExtractionResult(job, entity, error, time.perf_counter() - start))
+        
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.concurrency, metrics.total))]
+        try:
+            for _ in range(metrics.total):
+                yield await results.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            metrics.finished = time.perf_counter()
+    
+    async def batch_extract(self, texts: List[Union[str, ExtractionJob]]) -> List[ExtractedEntity]:
+        """Extract from multiple texts (parallel, newest first; failed items are skipped)"""
         entities = []
-        for text in texts:
-            entity = await self.extract(text)
-            if entity:
-                entities.append(entity)
+        async for result in self.extract_stream(texts):
+            if result.entity:
+                entities.append(result.entity)
         return entities
     
     async def close(self):
-        await self.client.aclose()
+        """The Ollama pool is shared (closed in the app lifespan)"""
@@ -7,6 +7,8 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from datetime import datetime
 from loguru import logger
+from db.bulk_ingest import CellDeltas, ingest_pool
+from services import h3_compat
 
 
 @dataclass
@@ -107,24 +109,18 @@ class RiskCalculator:
     
     async def propagate_risk(self, center_h3: str, risk_value: float, decay: float = 0.2):
         """Propagate risk to neighboring cells"""
-        rings = h3.k_ring_distances(center_h3, 3)
+        await self.propagate_risk_many([(center_h3, risk_value)], decay)
+    
+    async def propagate_risk_many(self, centers: List[Tuple[str, float]], decay: float = 0.2):
+        """Propagate risk from several centers in one bulk write"""
+        deltas = CellDeltas()
+        for center_h3, risk_value in centers:
+            for distance in range(1, 4):  # Skip center
+                delta = risk_value * decay ** distance
+                for cell in h3_compat.grid_ring(center_h3, distance):
+                    deltas.add(cell, risk=delta)
         
-        async with self.db_pool.acquire() as conn:
-            for distance, cells in enumerate(rings):
-                if distance == 0:
-                    continue  # Skip center
-                
-                factor = decay ** distance
-                delta = risk_value * factor
-                
-                for cell in cells:
-                    await conn.execute("""
-                        INSERT INTO h3_cells (h3_index, resolution, center_lat, center_lon, risk_score)
-                        VALUES ($1, 7, $2, $3, $4)
-                        ON CONFLICT (h3_index) DO UPDATE SET
-                            risk_score = LEAST(100, h3_cells.risk_score + $4),
-                            last_updated = NOW()
-                    """, cell, *h3.h3_to_geo(cell), delta)
+        await ingest_pool(self.db_pool, deltas=deltas)
     
     async def get_high_risk_cells(self, min_risk: float = 50, limit: int = 100) -> List[Dict]:
         """Get cells with risk above threshold"""
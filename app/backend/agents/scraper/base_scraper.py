@@ -7,12 +7,13 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
-import aiohttp
 from bs4 import BeautifulSoup
 from pydantic import BaseModel, Field
 from loguru import logger
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from services.http_clients import pooled_client
+
 
 class ScrapedArticle(BaseModel):
     """Structured article data from scraping"""
@@ -56,20 +57,16 @@ class BaseScraper(ABC):
             await self._rate_limit_wait()
             
             try:
-                async with aiohttp.ClientSession() as session:
+                async with pooled_client(timeout=self.timeout, follow_redirects=True) as client:
                     headers = {
                         "User-Agent": "TERA-Research-Bot/1.0 (Academic Research)"
                     }
-                    async with session.get(
-                        url, 
-                        headers=headers, 
-                        timeout=aiohttp.ClientTimeout(total=self.timeout)
-                    ) as response:
-                        if response.status == 200:
-                            return await response.text()
-                        else:
-                            logger.warning(f"HTTP {response.status} for {url}")
-                            return None
+                    response = await client.get(url, headers=headers)
+                    if response.status_code == 200:
+                        return response.text
+                    else:
+                        logger.warning(f"HTTP {response.status_code} for {url}")
+                        return None
             except Exception as e:
                 logger.error(f"Error fetching {url}: {e}")
                 raise
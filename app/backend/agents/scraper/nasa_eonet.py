@@ -3,13 +3,14 @@ NASA EONET (Earth Observatory Natural Event Tracker) Scraper
 Real-time natural disaster events from NASA
 """
 import asyncio
-import httpx
-import h3
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from loguru import logger
 import asyncpg
+from db.bulk_ingest import CellDeltas, ingest_pool
+from services import h3_compat
+from services.http_clients import pooled_client
 
 
 EONET_API_BASE = "https://eonet.gsfc.nasa.gov/api/v3"
@@ -39,7 +40,26 @@ class NASAEvent:
     date: datetime
     source_url: str
     magnitude: Optional[float] = None
+
+
+# Risk decreases with distance: center, ring 1, ring 2
+RING_FACTORS = (1.0, 0.7, 0.4)
+
+
+def add_event_deltas(deltas: CellDeltas, event: NASAEvent, resolution: int = 7):
+    """Adds the risk contribution of an event to its cell and the 2 rings around it"""
+    center = h3_compat.latlng_to_cell(event.lat, event.lon, resolution)
+    risk_factors = EVENT_CATEGORIES.get(event.category, {"climate_risk": 0.5, "conflict_risk": 0.2})
     
+    for distance, distance_factor in enumerate(RING_FACTORS):
+        cells = [center] if distance == 0 else h3_compat.grid_ring(center, distance)
+        for cell in cells:
+            deltas.add(
+                cell,
+                climate=risk_factors["climate_risk"] * distance_factor * 20,
+                conflict=risk_factors["conflict_risk"] * distance_factor * 20,
+            )
+
 
 class NASAEONETScraper:
     def __init__(self, db_pool: asyncpg.Pool = None):
@@ -47,7 +67,7 @@ class NASAEONETScraper:
         self.client = None
     
     async def __aenter__(self):
-        self.client = httpx.AsyncClient(timeout=60.0)
+        self.client = pooled_client(timeout=60.0)
         return self
     
     async def __aexit__(self, *args):
@@ -123,53 +143,17 @@ class NASAEONETScraper:
         return all_events
     
     async def store_events(self, events: List[NASAEvent]):
-        """Store events in database and update H3 cell risks"""
+        """Store events in database and update H3 cell risks (one bulk write)"""
         if not self.db_pool:
             logger.warning("No database pool configured")
             return
         
-        async with self.db_pool.acquire() as conn:
-            for event in events:
-                # Store event
-                await conn.execute("""
-                    INSERT INTO nasa_events (
-                        event_id, title, category, lat, lon, 
-                        event_date, source_url, magnitude, geom
-                    ) VALUES (
-                        $1, $2, $3, $4, $5, $6, $7, $8,
-                        ST_SetSRID(ST_MakePoint($5, $4), 4326)
-                    )
-                    ON CONFLICT (event_id) DO UPDATE SET
-                        title = EXCLUDED.title,
-                        event_date = EXCLUDED.event_date
-                """, event.id, event.title, event.category, event.lat, event.lon,
-                    event.date, event.source_url, event.magnitude)
-                
-                # Update nearby H3 cells
-                h3_index = h3.geo_to_h3(event.lat, event.lon, 7)
-                risk_factors = EVENT_CATEGORIES.get(event.category, {"climate_risk": 0.5, "conflict_risk": 0.2})
-                
-                # Update center cell and neighbors
-                affected_cells = h3.k_ring(h3_index, 2)  # Center + 2 rings
-                
-                for i, cell in enumerate(affected_cells):
-                    # Risk decreases with distance
-                    distance_factor = 1.0 if i == 0 else 0.7 if i <= 6 else 0.4
-                    
-                    climate_delta = risk_factors["climate_risk"] * distance_factor * 20
-                    conflict_delta = risk_factors["conflict_risk"] * distance_factor * 20
-                    
-                    await conn.execute("""
-                        INSERT INTO h3_cells (h3_index, resolution, center_lat, center_lon, 
-                                            climate_risk, conflict_risk, last_updated)
-                        VALUES ($1, 7, $2, $3, $4, $5, NOW())
-                        ON CONFLICT (h3_index) DO UPDATE SET
-                            climate_risk = LEAST(100, h3_cells.climate_risk + $4),
-                            conflict_risk = LEAST(100, h3_cells.conflict_risk + $5),
-                            last_updated = NOW()
-                    """, cell, *h3.h3_to_geo(cell), climate_delta, conflict_delta)
+        deltas = CellDeltas()
+        for event in events:
+            add_event_deltas(deltas, event)
         
-        logger.info(f"Stored {len(events)} events and updated H3 cells")
+        result = await ingest_pool(self.db_pool, events, deltas)
+        logger.info(f"Stored {result['events']} events and updated {result['cells']} H3 cells")
     
     async def get_events_near_location(self, lat: float, lon: float, radius_km: float = 100) -> List[Dict]:
         """Get stored events near a location"""
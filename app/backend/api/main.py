@@ -13,6 +13,8 @@ from config.settings import settings
 from api.routes import analysis, scraping, regions, health
 from services.database import init_db, close_db
 from services.ollama_client import OllamaClient
+from services.http_clients import get_http_registry
+from services.tessellation_executor import get_tessellation_executor
 from loguru import logger
 
 
@@ -32,9 +34,19 @@ async def lifespan(app: FastAPI):
     else:
         logger.warning("⚠ Ollama not available - LLM features disabled")
     
+    # Geteilte HTTP-Pools pro Upstream-Host
+    app.state.http = get_http_registry()
+    
+    # Tessellation-Worker vorab starten
+    app.state.tessellation = get_tessellation_executor()
+    await app.state.tessellation.start()
+    logger.info(f"✓ Tessellation pool: {app.state.tessellation.workers} processes")
+    
     yield
     
     # Cleanup
+    app.state.tessellation.shutdown()
+    await app.state.http.aclose()
     await close_db()
     logger.info("👋 TERA System shutdown complete")
 
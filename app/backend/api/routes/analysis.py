@@ -3,9 +3,10 @@ TERA Analysis API - REAL DATA 2026 Edition
 Echte USGS, IPCC AR6, Firecrawl Integration
 """
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict
-import httpx
+import json
 import sys
 sys.path.insert(0, '/data/tera/backend')
 
@@ -13,6 +14,7 @@ sys.path.insert(0, '/data/tera/backend')
 from services.real_risk_engine import get_engine
 from services.firecrawl_service import FireCrawlService
 from global_land_mask import globe
+from services.coast_index import get_coast_index
 from services.realtime_intelligence import realtime_service
 from services.llm_precision_engine import precision_engine
 # Enhanced Risk Engine mit Datenfusion
@@ -118,46 +120,27 @@ class AnalyzeRequest(BaseModel):
 
 
 async def geocode_city(city_name: str) -> dict:
-    """Geokodierung mit Nominatim"""
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                'https://nominatim.openstreetmap.org/search',
-                params={'q': city_name, 'format': 'json', 'limit': 1, 'addressdetails': 1},
-                headers={'User-Agent': 'TERA-RiskIntelligence/2.3'}
-            )
-            data = response.json()
-            if data:
-                item = data[0]
-                bbox = item.get('boundingbox', [])
-                return {
-                    'lat': float(item['lat']),
-                    'lon': float(item['lon']),
-                    'country': item.get('address', {}).get('country', ''),
-                    'bbox': [float(b) for b in bbox] if len(bbox) == 4 else None
-                }
-    except Exception as e:
-        print(f"Geocoding error: {e}")
-    return None
+    """Geokodierung mit Nominatim (gemeinsamer Cache, siehe services.geocoding)"""
+    from services.geocoding import get_geocoder
+    
+    geo = await get_geocoder().geocode(city_name)
+    if not geo:
+        return None
+    return {
+        'lat': geo['lat'],
+        'lon': geo['lon'],
+        'country': geo['country'],
+        'bbox': geo['bbox'],
+    }
 
 
 def estimate_elevation_coast(lat: float, lon: float) -> tuple:
-    """Schätzt Höhe und Küstenabstand"""
+    """Schätzt Höhe und Küstenabstand (Küstendistanz-Index, max. 100 km)"""
     is_ocean = globe.is_ocean(lat, lon)
     if is_ocean:
         return 0, 0
     
-    coast_dist = 100
-    for r in [0.05, 0.1, 0.2, 0.5, 1.0]:
-        for dlat, dlon in [(r,0), (-r,0), (0,r), (0,-r)]:
-            try:
-                if globe.is_ocean(lat + dlat, lon + dlon):
-                    coast_dist = r * 111
-                    break
-            except:
-                pass
-        if coast_dist < 100:
-            break
+    coast_dist = round(abs(get_coast_index().distance_km(lat, lon)), 1)
     
     elevation = 50
     if coast_dist < 5:
@@ -222,35 +205,41 @@ def determine_risk_type(lat: float, lon: float, country: str, city: str) -> str:
     return 'temperate'
 
 
-@router.post("/analyze")
-@router.get("/analyze")
-async def analyze_location(location: Optional[str] = None, request: Optional[AnalyzeRequest] = None):
+# Fallback-Scores (risk, climate, conflict) wenn RealRiskEngine nicht antwortet
+FALLBACK_SCORES = {
+    'coastal': (0.65, 0.75, 0.15),
+    'seismic': (0.55, 0.50, 0.12),
+    'arid': (0.50, 0.65, 0.20),
+    'conflict': (0.80, 0.30, 0.90),
+    'tropical': (0.58, 0.70, 0.15),
+    'temperate': (0.32, 0.40, 0.10),
+    'cold': (0.40, 0.45, 0.08)
+}
+
+REALTIME_FALLBACK = {
+    'realtime_assessment': 'Echtzeit-Analyse nicht verfügbar',
+    'trend': 'unbekannt',
+    'risk_adjustment': 0,
+    'sources': [],
+    'llm_model': 'unavailable'
+}
+
+
+def _analyze_stages(city_name: str, geo: dict, risk_type: str) -> list:
     """
-    Analysiert JEDEN Standort weltweit mit ECHTEN Daten
+    DAG für /analyze (nach der Geokodierung):
     
-    Datenquellen:
-    - USGS Earthquake Catalog (seismisches Risiko)
-    - IPCC AR6 SSP2-4.5 (Klimaprojektionen)
-    - ERA5 Climatology (Temperatur/Niederschlag)
-    - Global Land Mask (Topografie)
-    - Firecrawl (Echtzeit-News)
-    """
-    city_name = location or (request.location if request else None)
-    if not city_name:
-        raise HTTPException(status_code=400, detail="Location required")
+        risk ──────────┐
+        realtime ──────┼──> precision
+        precision_llm ─┘
     
-    city_name = city_name.strip()
-    geo = await geocode_city(city_name)
-    if not geo:
-        raise HTTPException(status_code=404, detail=f"Location not found: {city_name}")
-    
-    risk_type = determine_risk_type(geo['lat'], geo['lon'], geo['country'], city_name)
-    elevation, coast_dist = estimate_elevation_coast(geo['lat'], geo['lon'])
+    Die drei langsamen Stufen laufen parallel; precision kombiniert nur noch.
+    """
+    from config.settings import settings
+    from services.analysis_pipeline import Stage
     
-    # ============================================================
-    # ECHTE RISIKO-BERECHNUNG MIT USGS/IPCC
-    # ============================================================
-    try:
+    async def risk(_):
+        elevation, coast_dist = estimate_elevation_coast(geo['lat'], geo['lon'])
         engine = get_engine()
         assessment = await engine.assess_location(
             location=city_name,
@@ -260,75 +249,78 @@ async def analyze_location(location: Optional[str] = None, request: Optional[Ana
             coast_dist_km=coast_dist,
             country=geo['country']
         )
-        
         # Echte Werte aus RealRiskEngine
-        risk_score = assessment.total_score
-        climate_risk = assessment.climate_score
-        conflict_risk = assessment.conflict_score
-        projection_2026 = engine._format_projection(assessment)
-        data_sources = assessment.data_sources
-        
-    except Exception as e:
-        print(f"RealRiskEngine error (fallback): {e}")
+        return {
+            'risk_score': assessment.total_score,
+            'climate_risk': assessment.climate_score,
+            'conflict_risk': assessment.conflict_score,
+            'projection_2026': engine._format_projection(assessment),
+            'data_sources': assessment.data_sources,
+        }
+    
+    def risk_fallback(_):
         # Fallback auf statische Scores
-        scores = {
-            'coastal': (0.65, 0.75, 0.15),
-            'seismic': (0.55, 0.50, 0.12),
-            'arid': (0.50, 0.65, 0.20),
-            'conflict': (0.80, 0.30, 0.90),
-            'tropical': (0.58, 0.70, 0.15),
-            'temperate': (0.32, 0.40, 0.10),
-            'cold': (0.40, 0.45, 0.08)
+        risk_score, climate_risk, conflict_risk = FALLBACK_SCORES.get(risk_type, (0.35, 0.40, 0.10))
+        return {
+            'risk_score': risk_score,
+            'climate_risk': climate_risk,
+            'conflict_risk': conflict_risk,
+            'projection_2026': PROJECTIONS_2026.get(risk_type, PROJECTIONS_2026['temperate']),
+            'data_sources': ['Fallback (statisch)'],
         }
-        risk_score, climate_risk, conflict_risk = scores.get(risk_type, (0.35, 0.40, 0.10))
-        projection_2026 = PROJECTIONS_2026.get(risk_type, PROJECTIONS_2026['temperate'])
-        data_sources = ['Fallback (statisch)']
-    
-    # ============================================================
-    # REALTIME INTELLIGENCE (Firecrawl + Ollama LLM)
-    # ============================================================
-    realtime_data = {}
-    try:
-        realtime_data = await realtime_service.get_realtime_context(
+    
+    async def realtime(_):
+        return await realtime_service.get_realtime_context(
             location=city_name,
             country=geo['country'],
             risk_type=risk_type,
             lat=geo['lat'],
             lon=geo['lon']
         )
-        # Risiko-Anpassung basierend auf Echtzeit-Daten
-        if realtime_data.get('risk_adjustment'):
-            adjustment = float(realtime_data.get('risk_adjustment', 0))
-            risk_score = min(1.0, max(0.0, risk_score + adjustment))
-    except Exception as e:
-        print(f"Realtime Intelligence error: {e}")
-        realtime_data = {
-            'realtime_assessment': 'Echtzeit-Analyse nicht verfügbar',
-            'trend': 'unbekannt',
-            'risk_adjustment': 0,
-            'sources': [],
-            'llm_model': 'unavailable'
-        }
     
-    # ============================================================
-    # LLM PRECISION FORECAST
-    # ============================================================
-    precision_forecast = {}
-    try:
-        precision_forecast = await precision_engine.generate_precision_forecast(
-            location=city_name,
-            country=geo['country'],
-            lat=geo['lat'],
-            lon=geo['lon'],
-            risk_type=risk_type,
+    async def precision_llm(_):
+        return await precision_engine.scientific_analysis(
+            city_name, geo['country'], geo['lat'], geo['lon'], risk_type
+        )
+    
+    async def precision(deps):
+        return precision_engine.compile_precision_forecast(
+            city_name, geo['lat'], geo['lon'], risk_type,
             current_data={
-                'conflict_risk': conflict_risk,
-                'realtime_risk_adjustment': realtime_data.get('risk_adjustment', 0)
-            }
+                'conflict_risk': deps['risk']['conflict_risk'],
+                'realtime_risk_adjustment': deps['realtime'].get('risk_adjustment', 0)
+            },
+            llm_analysis=deps['precision_llm']
         )
-    except Exception as e:
-        print(f"Precision Engine error: {e}")
-        precision_forecast = {'error': str(e)}
+    
+    return [
+        Stage('risk', risk, settings.analyze_risk_deadline_s, risk_fallback),
+        Stage('realtime', realtime, settings.analyze_realtime_deadline_s, lambda _: dict(REALTIME_FALLBACK)),
+        Stage(
+            'precision_llm', precision_llm, settings.analyze_precision_llm_deadline_s,
+            lambda _: precision_engine.fallback_analysis(city_name, risk_type)
+        ),
+        Stage(
+            'precision', precision, settings.analyze_precision_deadline_s,
+            lambda _: {'error': 'Precision forecast nicht verfügbar'},
+            deps=('risk', 'realtime', 'precision_llm')
+        ),
+    ]
+
+
+def _analyze_response(city_name: str, geo: dict, risk_type: str, results: dict, pipeline: dict) -> dict:
+    """Baut die /analyze-Antwort aus den Stufenergebnissen"""
+    scores = results['risk'].value
+    realtime_data = results['realtime'].value
+    
+    # Risiko-Anpassung basierend auf Echtzeit-Daten
+    risk_score = scores['risk_score']
+    if realtime_data.get('risk_adjustment'):
+        try:
+            adjustment = float(realtime_data.get('risk_adjustment', 0))
+            risk_score = min(1.0, max(0.0, risk_score + adjustment))
+        except (TypeError, ValueError) as e:
+            print(f"Realtime Intelligence error: {e}")
     
     return {
         'location': city_name,
@@ -340,17 +332,17 @@ async def analyze_location(location: Optional[str] = None, request: Optional[Ana
         
         # ECHTE Risiko-Scores
         'risk_score': round(risk_score, 3),
-        'climate_risk': round(climate_risk, 3),
-        'conflict_risk': round(conflict_risk, 3),
+        'climate_risk': round(scores['climate_risk'], 3),
+        'conflict_risk': round(scores['conflict_risk'], 3),
         
         # 2026 Projektion
-        'projection_2026': projection_2026,
+        'projection_2026': scores['projection_2026'],
         
         # Empfehlungen
         'recommendations': RECOMMENDATIONS.get(risk_type, RECOMMENDATIONS['temperate']),
         
         # Transparenz
-        'data_sources': data_sources,
+        'data_sources': scores['data_sources'],
         'methodology': 'IPCC AR6 SSP2-4.5 + USGS + ERA5',
         'forecast_year': 2026,
         
@@ -358,18 +350,100 @@ async def analyze_location(location: Optional[str] = None, request: Optional[Ana
         'realtime_intelligence': realtime_data,
         
         # LLM Precision Forecast
-        'precision_forecast': precision_forecast,
+        'precision_forecast': results['precision'].value,
         
         # Zonen (werden durch Hexagon-Daten gefüllt)
-        'zones': {}
+        'zones': {},
+        
+        # Laufzeit, Timeouts und Fallbacks pro Stufe
+        'pipeline': pipeline
     }
 
 
+@router.post("/analyze")
+@router.get("/analyze")
+async def analyze_location(
+    location: Optional[str] = None,
+    request: Optional[AnalyzeRequest] = None,
+    stream: Optional[str] = Query(None, description="'ndjson' = Teilergebnisse pro Stufe, zuletzt die komplette Antwort"),
+):
+    """
+    Analysiert JEDEN Standort weltweit mit ECHTEN Daten
+    
+    Datenquellen:
+    - USGS Earthquake Catalog (seismisches Risiko)
+    - IPCC AR6 SSP2-4.5 (Klimaprojektionen)
+    - ERA5 Climatology (Temperatur/Niederschlag)
+    - Global Land Mask (Topografie)
+    - Firecrawl (Echtzeit-News)
+    
+    Risiko-, Echtzeit- und LLM-Stufe laufen parallel mit eigenem Zeitbudget
+    (siehe services.analysis_pipeline); 'pipeline' in der Antwort zeigt Dauer,
+    Timeout und Fallback pro Stufe.
+    """
+    import time
+    from services.analysis_pipeline import iter_stages
+    from services.geojson_stream import MEDIA_TYPES
+    
+    if stream is not None and stream != 'ndjson':
+        raise HTTPException(status_code=400, detail="stream must be 'ndjson'")
+    
+    city_name = location or (request.location if request else None)
+    if not city_name:
+        raise HTTPException(status_code=400, detail="Location required")
+    
+    city_name = city_name.strip()
+    t0 = time.perf_counter()
+    geo = await geocode_city(city_name)
+    geocode_ms = (time.perf_counter() - t0) * 1000
+    if not geo:
+        raise HTTPException(status_code=404, detail=f"Location not found: {city_name}")
+    
+    risk_type = determine_risk_type(geo['lat'], geo['lon'], geo['country'], city_name)
+    stages = _analyze_stages(city_name, geo, risk_type)
+    
+    def antwort(results: dict) -> dict:
+        pipeline = {
+            'geocode': {'status': 'ok', 'duration_ms': round(geocode_ms, 1)},
+            'stages': {name: r.report() for name, r in results.items()},
+            'total_ms': round((time.perf_counter() - t0) * 1000, 1),
+        }
+        return _analyze_response(city_name, geo, risk_type, results, pipeline)
+    
+    if not stream:
+        return antwort({r.name: r async for r in iter_stages(stages)})
+    
+    def zeile(event: dict) -> bytes:
+        return json.dumps(event, ensure_ascii=False, default=str).encode('utf-8') + b'\n'
+    
+    async def ndjson():
+        yield zeile({
+            'event': 'geocode',
+            'data': {'location': city_name, 'latitude': geo['lat'], 'longitude': geo['lon'],
+                     'country': geo['country'], 'bbox': geo.get('bbox'), 'city_type': risk_type}
+        })
+        results = {}
+        async for result in iter_stages(stages):
+            results[result.name] = result
+            yield zeile({'event': 'stage', 'stage': result.name, **result.report(), 'data': result.value})
+        yield zeile({'event': 'result', 'data': antwort(results)})
+    
+    return StreamingResponse(ndjson(), media_type=MEDIA_TYPES['ndjson'])
+
+
 @router.get("/risk-map")
-async def get_risk_map(city: str = Query(...), resolution: int = 8):
+async def get_risk_map(
+    city: str = Query(...),
+    resolution: int = 8,
+    stream: Optional[str] = Query(None, description="'json' = FeatureCollection chunked, 'ndjson' = ein Feature pro Zeile"),
+):
     """Hexagon-Risikokarte für JEDE Stadt"""
     try:
         from services.real_data_tessellation import EchteDatenTessellation
+        from services.geojson_stream import STREAM_FORMATE, MEDIA_TYPES, stream_chunks
+        
+        if stream is not None and stream not in STREAM_FORMATE:
+            raise HTTPException(status_code=400, detail=f"stream must be one of {STREAM_FORMATE}")
         
         geo = await geocode_city(city)
         if not geo:
@@ -379,6 +453,17 @@ async def get_risk_map(city: str = Query(...), resolution: int = 8):
         
         # Schnelle Tessellation ohne LLM (LLM nur für /analyze)
         tessellation = EchteDatenTessellation()
+        
+        if stream:
+            teile = tessellation.iter_risikokarte(
+                lat=geo['lat'],
+                lon=geo['lon'],
+                stadt_typ=risk_type,
+                aufloesung=resolution,
+                radius_km=15.0
+            )
+            return StreamingResponse(stream_chunks(teile, stream), media_type=MEDIA_TYPES[stream])
+        
         features = await tessellation.generiere_risikokarte(
             lat=geo['lat'],
             lon=geo['lon'],
@@ -401,6 +486,13 @@ async def get_risk_map(city: str = Query(...), resolution: int = 8):
         )
 
 
+@router.get("/risk-map/cache")
+async def risk_map_cache_stats():
+    """Treffer/Fehlschläge des Risiko-Kachel-Caches"""
+    from services.risk_tile_cache import get_risk_tile_cache
+    return get_risk_tile_cache().get_stats()
+
+
 @router.get("/health")
 async def health():
     return {
@@ -10,11 +10,13 @@ Enterprise-Grade Risikoanalyse für:
 Alle Texte auf Deutsch.
 """
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict
-import httpx
 from services.forecast_2026 import calculate_2026_forecast, PROJECTIONS_2026, RECOMMENDATIONS_2026
 from services.real_data_tessellation import EchteDatenTessellation, RISIKO_KATEGORIEN
+from services.geojson_stream import STREAM_FORMATE, MEDIA_TYPES, stream_chunks
+from services import h3_columnar
 
 
 # Mapping von deutschen zu englischen Keys für Frontend-Kompatibilität
@@ -214,34 +216,19 @@ EMPFEHLUNGEN_2026_DE = {
 
 
 async def geokodiere_stadt(stadtname: str) -> Optional[dict]:
-    """Geokodiert Stadt weltweit mit Nominatim"""
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.get(
-                'https://nominatim.openstreetmap.org/search',
-                params={
-                    'q': stadtname,
-                    'format': 'json',
-                    'limit': 1,
-                    'addressdetails': 1
-                },
-                headers={'User-Agent': 'TERA-Enterprise/2.1'}
-            )
-            data = response.json()
-            if data:
-                result = data[0]
-                address = result.get('address', {})
-                bbox = result.get('boundingbox', [])
-                return {
-                    'lat': float(result['lat']),
-                    'lon': float(result['lon']),
-                    'land': address.get('country', 'Unbekannt'),
-                    'land_code': address.get('country_code', '').upper(),
-                    'bbox': [float(b) for b in bbox] if bbox else None
-                }
-    except Exception as e:
-        print(f'Geokodierung fehlgeschlagen: {e}')
-    return None
+    """Geokodiert Stadt weltweit mit Nominatim (gemeinsamer Cache, siehe services.geocoding)"""
+    from services.geocoding import get_geocoder
+    
+    geo = await get_geocoder().geocode(stadtname)
+    if not geo:
+        return None
+    return {
+        'lat': geo['lat'],
+        'lon': geo['lon'],
+        'land': geo['country'] or 'Unbekannt',
+        'land_code': geo['country_code'],
+        'bbox': geo['bbox'],
+    }
 
 
 def bestimme_risikotyp(lat: float, lon: float, land: str, stadt: str) -> str:
@@ -394,9 +381,40 @@ async def analysiere_standort(
     }
 
 
+STREAM_BESCHREIBUNG = "'json' = FeatureCollection chunked, 'ndjson' = ein Feature pro Zeile"
+
+
+def _pruefe_stream(stream: Optional[str]):
+    if stream is not None and stream not in STREAM_FORMATE:
+        raise HTTPException(status_code=400, detail=f'stream muss einer von {STREAM_FORMATE} sein')
+
+
+# Legende für das Spaltenformat (Geometrie baut der Client aus dem H3-Index)
+KATEGORIE_LABELS = {
+    name: {'farbe': k['farbe'], 'beschreibung': k['beschreibung'], 'icon': k['icon']}
+    for name, k in RISIKO_KATEGORIEN.items()
+}
+
+
+def _zonen_statistik(features: List[dict], zonen_stats: Dict = None) -> Dict:
+    """Zählt Zellen pro Zone (inkrementell nutzbar für Streaming)"""
+    zonen_stats = {} if zonen_stats is None else zonen_stats
+    for f in features:
+        zone = f['properties']['zone']
+        if zone not in zonen_stats:
+            zonen_stats[zone] = {'anzahl': 0, 'farbe': f['properties']['color']}
+        zonen_stats[zone]['anzahl'] += 1
+    return zonen_stats
+
+
 @router.get('/risk-map')
-async def generiere_risikokarte(stadt: str = Query(..., alias='city'), aufloesung: int = 8):
+async def generiere_risikokarte(
+    stadt: str = Query(..., alias='city'),
+    aufloesung: int = 8,
+    stream: Optional[str] = Query(None, description=STREAM_BESCHREIBUNG),
+):
     """Generiert Hexagon-Risikokarte mit echten Daten"""
+    _pruefe_stream(stream)
     
     # Geokodierung
     geo = await geokodiere_stadt(stadt)
@@ -405,8 +423,42 @@ async def generiere_risikokarte(stadt: str = Query(..., alias='city'), aufloesun
     
     risikotyp = bestimme_risikotyp(geo['lat'], geo['lon'], geo['land'], stadt)
     
+    def metadaten(zellen_gesamt: int, zonen_stats: Dict) -> Dict:
+        return {
+            'stadt': stadt,
+            'land': geo['land'],
+            'risikotyp': risikotyp,
+            'jahr': 2026,
+            'zellen_gesamt': zellen_gesamt,
+            'zonen': zonen_stats,
+            'aufloesung': aufloesung,
+            'datenquellen': ['IPCC AR6', 'ERA5', 'Copernicus', 'OpenStreetMap'],
+        }
+    
     # Enterprise Tessellation
     tessellation = EchteDatenTessellation()
+    
+    if stream:
+        zonen_stats = {}
+        zaehler = {'zellen': 0}
+        
+        async def teile():
+            async for teil in tessellation.iter_risikokarte(
+                lat=geo['lat'],
+                lon=geo['lon'],
+                stadt_typ=risikotyp,
+                aufloesung=aufloesung,
+                radius_km=15.0,
+            ):
+                _zonen_statistik(teil, zonen_stats)
+                zaehler['zellen'] += len(teil)
+                yield teil
+        
+        return StreamingResponse(
+            stream_chunks(teile(), stream, lambda: metadaten(zaehler['zellen'], zonen_stats)),
+            media_type=MEDIA_TYPES[stream],
+        )
+    
     features = await tessellation.generiere_risikokarte(
         lat=geo['lat'],
         lon=geo['lon'],
@@ -416,26 +468,12 @@ async def generiere_risikokarte(stadt: str = Query(..., alias='city'), aufloesun
     )
     
     # Statistiken berechnen
-    zonen_stats = {}
-    for f in features:
-        zone = f['properties']['zone']
-        if zone not in zonen_stats:
-            zonen_stats[zone] = {'anzahl': 0, 'farbe': f['properties']['color']}
-        zonen_stats[zone]['anzahl'] += 1
+    zonen_stats = _zonen_statistik(features)
     
     return {
         'type': 'FeatureCollection',
         'features': features,
-        'metadaten': {
-            'stadt': stadt,
-            'land': geo['land'],
-            'risikotyp': risikotyp,
-            'jahr': 2026,
-            'zellen_gesamt': len(features),
-            'zonen': zonen_stats,
-            'aufloesung': aufloesung,
-            'datenquellen': ['IPCC AR6', 'ERA5', 'Copernicus', 'OpenStreetMap'],
-        }
+        'metadaten': metadaten(len(features), zonen_stats),
     }
 
 
@@ -449,8 +487,13 @@ async def generiere_risikokarte_viewport(
     zoom: int = 12,
     city_type: str = 'temperate',
     max_cells: int = 3000,
+    stream: Optional[str] = Query(None, description=STREAM_BESCHREIBUNG),
+    ausgabe: str = Query('geojson', alias='format', description="'geojson' oder 'columnar' (h3 uint64 + Kategorie uint8 + Intensität float16)"),
 ):
     """Viewport-basierte Risikokarte (zoom-adaptiv + capped), für stabile Visualisierung."""
+    _pruefe_stream(stream)
+    if ausgabe not in h3_columnar.AUSGABE_FORMATE:
+        raise HTTPException(status_code=400, detail=f'format muss einer von {h3_columnar.AUSGABE_FORMATE} sein')
 
     # Sanity
     if max_cells < 500:
@@ -458,8 +501,17 @@ async def generiere_risikokarte_viewport(
     if max_cells > 8000:
         max_cells = 8000
 
+    def metadaten(zellen_gesamt: int) -> Dict:
+        return {
+            'jahr': 2026,
+            'city_type': city_type,
+            'zoom': zoom,
+            'max_cells': max_cells,
+            'zellen_gesamt': zellen_gesamt,
+        }
+
     tessellation = EchteDatenTessellation()
-    features = await tessellation.generiere_viewport_karte(
+    viewport = dict(
         min_lat=min_lat,
         min_lon=min_lon,
         max_lat=max_lat,
@@ -470,14 +522,32 @@ async def generiere_risikokarte_viewport(
         refine_top_k=min(400, max(50, max_cells // 10)),
     )
 
+    if ausgabe == 'columnar':
+        features = await tessellation.generiere_viewport_karte(**viewport)
+        return Response(
+            content=h3_columnar.features_to_columnar(
+                features, labels=KATEGORIE_LABELS, meta=metadaten(len(features))
+            ),
+            media_type=h3_columnar.MEDIA_TYPE,
+        )
+
+    if stream:
+        zaehler = {'zellen': 0}
+
+        async def teile():
+            async for teil in tessellation.iter_viewport_karte(**viewport):
+                zaehler['zellen'] += len(teil)
+                yield teil
+
+        return StreamingResponse(
+            stream_chunks(teile(), stream, lambda: metadaten(zaehler['zellen'])),
+            media_type=MEDIA_TYPES[stream],
+        )
+
+    features = await tessellation.generiere_viewport_karte(**viewport)
+
     return {
         'type': 'FeatureCollection',
         'features': features,
-        'metadaten': {
-            'jahr': 2026,
-            'city_type': city_type,
-            'zoom': zoom,
-            'max_cells': max_cells,
-            'zellen_gesamt': len(features),
-        }
+        'metadaten': metadaten(len(features)),
     }
@@ -6,7 +6,6 @@ Transparente, wissenschaftlich fundierte Risikobewertung
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
 from typing import Optional
-import httpx
 
 # Import Real Risk Engine
 import sys
@@ -22,24 +21,19 @@ class AnalyzeRequest(BaseModel):
 
 
 async def geocode(city: str) -> dict:
-    """Geokodierung mit Nominatim"""
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(
-            'https://nominatim.openstreetmap.org/search',
-            params={'q': city, 'format': 'json', 'limit': 1},
-            headers={'User-Agent': 'TERA-RiskIntelligence/2.0'}
-        )
-        if resp.status_code == 200:
-            data = resp.json()
-            if data:
-                return {
-                    'lat': float(data[0]['lat']),
-                    'lon': float(data[0]['lon']),
-                    'name': data[0].get('display_name', city),
-                    'country': data[0].get('display_name', '').split(',')[-1].strip(),
-                    'bbox': [float(x) for x in data[0].get('boundingbox', [])]
-                }
-    return None
+    """Geokodierung mit Nominatim (gemeinsamer Cache, siehe services.geocoding)"""
+    from services.geocoding import get_geocoder
+    
+    geo = await get_geocoder().geocode(city)
+    if not geo:
+        return None
+    return {
+        'lat': geo['lat'],
+        'lon': geo['lon'],
+        'name': geo['name'],
+        'country': geo['country'],
+        'bbox': geo['bbox'] or []
+    }
 
 
 def estimate_elevation_and_coast(lat: float, lon: float) -> tuple:
@@ -53,15 +47,9 @@ def estimate_elevation_and_coast(lat: float, lon: float) -> tuple:
     if is_ocean:
         return 0, 0  # Im Wasser
     
-    # Küstenabstand schätzen (prüfe Nachbarpunkte)
-    coast_dist = 100  # Default: weit von Küste
-    for r in [0.05, 0.1, 0.2, 0.5, 1.0]:
-        for dlat, dlon in [(r,0), (-r,0), (0,r), (0,-r)]:
-            if globe.is_ocean(lat + dlat, lon + dlon):
-                coast_dist = r * 111  # ~111 km pro Grad
-                break
-        if coast_dist < 100:
-            break
+    # Küstenabstand aus vorberechnetem Index (max. 100 km)
+    from services.coast_index import get_coast_index
+    coast_dist = round(abs(get_coast_index().distance_km(lat, lon)), 1)
     
     # Höhe schätzen (sehr grob basierend auf Breitengrad)
     # TODO: Echte DEM-Daten
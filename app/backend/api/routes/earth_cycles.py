@@ -2,14 +2,18 @@
 TERA Earth Cycles API v2.0
 Physikalisches Erdmodell + Adaptive Tessellation für Frontend
 """
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import Response
 from typing import List, Optional
 from datetime import datetime
-import h3
-import math
+
+from services import h3_columnar, h3_compat
 
 router = APIRouter()
 
+# Obergrenze Zellen pro Anfrage (vektorisiertes Erdmodell im Prozess-Pool)
+MAX_CELLS = 10000
+
 
 def get_resolution_for_zoom(zoom: int) -> int:
     """Map zoom level to H3 resolution - HIGHER resolution for more cells"""
@@ -25,27 +29,23 @@ def get_resolution_for_zoom(zoom: int) -> int:
 
 
 def generate_grid_cells(min_lat, min_lon, max_lat, max_lon, resolution):
-    """Generate H3 cells using grid sampling"""
-    cells = set()
-    
-    # Calculate step size based on resolution
-    # H3 resolution → approximate cell diameter
-    cell_sizes = {
-        2: 1.5, 3: 0.6, 4: 0.2, 5: 0.08, 
-        6: 0.03, 7: 0.012, 8: 0.005, 9: 0.002
-    }
-    step = cell_sizes.get(resolution, 0.05) * 0.7  # Overlap for coverage
-    
-    lat = min_lat
-    while lat <= max_lat:
-        lon = min_lon
-        while lon <= max_lon:
-            cell = h3.geo_to_h3(lat, lon, resolution)
-            cells.add(cell)
-            lon += step
-        lat += step
-    
-    return list(cells)
+    """Generate H3 cells covering the bbox (native polyfill, sorted)"""
+    from services.h3_cover import bbox_cells
+    return bbox_cells(min_lat, min_lon, max_lat, max_lon, resolution)
+
+
+def fit_grid_resolution(min_lat, min_lon, max_lat, max_lon, zoom, max_cells=MAX_CELLS):
+    """
+    Auflösung für den Zoom, vergröbert bis die geschätzte Zellanzahl
+    <= max_cells ist (analytisch, ohne die Zellliste zu bauen)
+    """
+    from services.h3_cover import estimate_bbox_cells, fit_resolution
+    resolution = fit_resolution(
+        min_lat, min_lon, max_lat, max_lon, max_cells, get_resolution_for_zoom(zoom)
+    )
+    if estimate_bbox_cells(min_lat, min_lon, max_lat, max_lon, resolution) > max_cells:
+        raise HTTPException(status_code=400, detail=f"Bounding box too large (> {max_cells} cells)")
+    return resolution
 
 
 @router.get("/cells")
@@ -54,56 +54,45 @@ async def get_earth_cycle_cells(
     min_lon: float = Query(...),
     max_lat: float = Query(...),
     max_lon: float = Query(...),
-    zoom: int = Query(default=10, ge=0, le=20)
+    zoom: int = Query(default=10, ge=0, le=20),
+    ausgabe: str = Query(default='geojson', alias='format', description="'geojson' oder 'columnar' (h3 uint64 + Klasse uint8 + Risiko float16)")
 ):
     """
     Gibt H3-Zellen mit Erdzyklen-Daten für Bounding Box zurück
     Adaptive Resolution basierend auf Zoom
     """
-    from services.physical_earth_model import (
-        PhysicalEarthModel, 
-        FrontendFormatter
-    )
+    if ausgabe not in h3_columnar.AUSGABE_FORMATE:
+        raise HTTPException(status_code=400, detail=f"format must be one of {h3_columnar.AUSGABE_FORMATE}")
     
-    model = PhysicalEarthModel()
-    resolution = get_resolution_for_zoom(zoom)
+    from services.physical_earth_model import FrontendFormatter
+    from services.tessellation_executor import get_tessellation_executor
+    
+    executor = get_tessellation_executor()
+    # Limit für Performance: gröbere Auflösung statt abgeschnittener Zellliste
+    resolution = fit_grid_resolution(min_lat, min_lon, max_lat, max_lon, zoom)
     
     # Generate cells for bbox
     cells = generate_grid_cells(min_lat, min_lon, max_lat, max_lon, resolution)
     
-    # Limit für Performance
-    max_cells = 1000
-    if len(cells) > max_cells:
-        cells = cells[:max_cells]
-    
-    # Für jede Zelle Erdzyklen berechnen
-    states = []
-    for cell in cells:
-        try:
-            # Vary parameters slightly for realism
-            lat, lon = h3.h3_to_geo(cell)
-            precip = max(0, 2 + math.sin(lat * 0.1) * 3)
-            ndvi = 0.3 + abs(math.cos(lon * 0.1)) * 0.4
-            soil = 40 + abs(math.sin(lat * 0.05 + lon * 0.03)) * 40
-            
-            state = model.calculate_cell_state(
-                cell,
-                precipitation_mm=precip,
-                ndvi=ndvi,
-                soil_moisture_pct=soil
-            )
-            states.append(state)
-        except Exception as e:
-            continue
+    # Erdzyklen pro Zelle im Prozess-Pool berechnen (Event-Loop bleibt frei)
+    if ausgabe == 'columnar':
+        states = await executor.earth_cycle_states(cells)
+        return Response(
+            content=FrontendFormatter.states_to_columnar(
+                states, meta={"zoom": zoom, "resolution": resolution}
+            ),
+            media_type=h3_columnar.MEDIA_TYPE,
+        )
     
-    # Zu GeoJSON konvertieren
-    geojson = FrontendFormatter.cells_to_feature_collection(states)
+    # GeoJSON-Features entstehen direkt in den Workern
+    features = await executor.earth_cycle_features(cells)
+    geojson = {"type": "FeatureCollection", "features": features}
     
     return {
         "status": "ok",
         "zoom": zoom,
         "resolution": resolution,
-        "cell_count": len(states),
+        "cell_count": len(features),
         "geojson": geojson
     }
 
@@ -166,7 +155,7 @@ async def get_cycles_for_location(
     resolution: int = Query(default=7, ge=4, le=10)
 ):
     """Gibt Erdzyklen für einen Punkt zurück"""
-    h3_index = h3.geo_to_h3(lat, lon, resolution)
+    h3_index = h3_compat.latlng_to_cell(lat, lon, resolution)
     return await get_cell_cycles(h3_index)
 
 
@@ -2,8 +2,8 @@
 TERA Health Check API
 """
 from fastapi import APIRouter
-import httpx
 from config.settings import settings
+from services.http_clients import pooled_client
 
 router = APIRouter()
 
@@ -20,7 +20,7 @@ async def health_check():
     
     # Check Ollama
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
+        async with pooled_client(timeout=5.0) as client:
             r = await client.get(f"{settings.ollama_url}/api/tags")
             status["ollama"] = "healthy" if r.status_code == 200 else "unhealthy"
     except:
@@ -10,7 +10,8 @@ from fastapi.responses import JSONResponse
 from typing import Optional, List, Dict
 from datetime import datetime
 import asyncio
-import aiohttp
+
+from services.http_clients import pooled_client
 
 router = APIRouter(prefix="/api/v2", tags=["TERA V2 - Causal Intelligence"])
 
@@ -125,24 +126,24 @@ async def fetch_usgs_earthquakes() -> List[Dict]:
     """Hole aktuelle Erdbeben von USGS."""
     url = "https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/4.5_day.geojson"
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, timeout=15) as resp:
-                if resp.status == 200:
-                    data = await resp.json()
-                    earthquakes = []
-                    for f in data.get("features", [])[:20]:
-                        props = f.get("properties", {})
-                        coords = f.get("geometry", {}).get("coordinates", [0, 0])
-                        eq = {
-                            "id": f.get("id"),
-                            "magnitude": props.get("mag"),
-                            "location": props.get("place"),
-                            "time": datetime.fromtimestamp(props.get("time", 0)/1000).isoformat(),
-                            "coordinates": {"lon": coords[0], "lat": coords[1], "depth": coords[2] if len(coords) > 2 else 0},
-                            "severity": "critical" if props.get("mag", 0) >= 7 else "warning" if props.get("mag", 0) >= 6 else "info"
-                        }
-                        earthquakes.append(eq)
-                    return earthquakes
+        async with pooled_client(timeout=15) as client:
+            resp = await client.get(url)
+            if resp.status_code == 200:
+                data = resp.json()
+                earthquakes = []
+                for f in data.get("features", [])[:20]:
+                    props = f.get("properties", {})
+                    coords = f.get("geometry", {}).get("coordinates", [0, 0])
+                    eq = {
+                        "id": f.get("id"),
+                        "magnitude": props.get("mag"),
+                        "location": props.get("place"),
+                        "time": datetime.fromtimestamp(props.get("time", 0)/1000).isoformat(),
+                        "coordinates": {"lon": coords[0], "lat": coords[1], "depth": coords[2] if len(coords) > 2 else 0},
+                        "severity": "critical" if props.get("mag", 0) >= 7 else "warning" if props.get("mag", 0) >= 6 else "info"
+                    }
+                    earthquakes.append(eq)
+                return earthquakes
     except Exception as e:
         return [{"error": str(e)}]
     return []
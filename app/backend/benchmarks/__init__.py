@@ -0,0 +1 @@
+# TERA Benchmarks
@@ -0,0 +1,62 @@
+"""Benchmark: Einzelzell- vs. Batch-Analyse in EchteDatenTessellation
+
+Aufruf (aus app/backend):
+    python -m benchmarks.bench_batch_tessellation
+"""
+import asyncio
+import math
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from services.real_data_tessellation import EchteDatenTessellation
+
+STAEDTE = [
+    ('Miami', 25.77, -80.19, 'coastal'),
+    ('Kairo', 30.04, 31.24, 'arid'),
+    ('Berlin', 52.52, 13.40, 'temperate'),
+]
+RADIUS_KM = {8: 15.0, 9: 8.0, 10: 4.0}
+
+
+async def einzelzellen(t: EchteDatenTessellation, hexagons, lat, lon, typ):
+    features = []
+    for h in hexagons:
+        z = await t._analysiere_zelle(h, lat, lon, typ)
+        if z is not None:
+            features.append(t._zelle_zu_feature(z))
+    return features
+
+
+async def main():
+    t = EchteDatenTessellation()
+    t._llm_forecast = {}
+    print(f"{'Stadt':<8} {'Res':>3} {'Zellen':>7} {'einzeln c/s':>12} {'batch c/s':>10} {'Faktor':>7}  gleich")
+    for aufloesung, radius in RADIUS_KM.items():
+        for name, lat, lon, typ in STAEDTE:
+            lat_delta = radius / 111.0
+            lon_delta = radius / (111.0 * math.cos(math.radians(lat)))
+            hexagons = t._fulle_bbox(
+                lat - lat_delta, lon - lon_delta, lat + lat_delta, lon + lon_delta, aufloesung
+            )
+
+            start = time.perf_counter()
+            referenz = await einzelzellen(t, hexagons, lat, lon, typ)
+            dauer_einzeln = time.perf_counter() - start
+
+            start = time.perf_counter()
+            batch = t.batch.analysiere(hexagons, lat, lon, typ, t._llm_forecast)
+            features = [t._zelle_zu_feature(z) for z in t._batch_zu_zellen(batch)]
+            dauer_batch = time.perf_counter() - start
+
+            n = len(hexagons)
+            print(
+                f"{name:<8} {aufloesung:>3} {n:>7} {n / dauer_einzeln:>12.0f} "
+                f"{n / dauer_batch:>10.0f} {dauer_einzeln / dauer_batch:>6.1f}x  "
+                f"{features == referenz}"
+            )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
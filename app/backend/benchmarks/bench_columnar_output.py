@@ -0,0 +1,73 @@
+"""Benchmark: GeoJSON vs. H3-Spaltenformat (Payload-Größe und Encode-Zeit)
+
+Aufruf (aus app/backend):
+    python -m benchmarks.bench_columnar_output
+"""
+import asyncio
+import gzip
+import json
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+from api.routes.analysis_2026 import KATEGORIE_LABELS
+from api.routes.earth_cycles import generate_grid_cells, get_resolution_for_zoom
+from services import h3_columnar
+from services.physical_earth_model import FrontendFormatter, PhysicalEarthModel
+from services.real_data_tessellation import EchteDatenTessellation
+from services.risk_tile_cache import RiskTileCache
+
+WIEDERHOLUNGEN = 5
+
+
+def zeit_ms(fn) -> tuple:
+    ergebnis = fn()
+    start = time.perf_counter()
+    for _ in range(WIEDERHOLUNGEN):
+        fn()
+    return ergebnis, (time.perf_counter() - start) / WIEDERHOLUNGEN * 1000
+
+
+def zeile(name: str, fmt: str, payload: bytes, ms: float):
+    print(
+        f"{name:<22} {fmt:<9} {len(payload) / 1024:>10.1f} "
+        f"{len(gzip.compress(payload, 6)) / 1024:>10.1f} {ms:>9.1f}"
+    )
+
+
+async def viewport_features() -> list:
+    t = EchteDatenTessellation(tile_cache=RiskTileCache(db_path=tempfile.mktemp(suffix='.sqlite')))
+    return await t.generiere_viewport_karte(
+        min_lat=51.0, min_lon=6.3, max_lat=51.9, max_lon=7.9,
+        zoom=11, stadt_typ='coastal', max_cells=8000, refine_top_k=400,
+    )
+
+
+def earth_cycle_states() -> list:
+    model = PhysicalEarthModel()
+    cells = generate_grid_cells(45.0, 0.0, 55.0, 20.0, get_resolution_for_zoom(8))[:1000]
+    return [model.calculate_cell_state(c) for c in cells]
+
+
+def main():
+    print(f"{'Endpunkt':<22} {'Format':<9} {'KiB':>10} {'KiB gzip':>10} {'Encode ms':>9}")
+
+    features = asyncio.run(viewport_features())
+    name = f"risk-map/viewport {len(features)}"
+    body, ms = zeit_ms(lambda: json.dumps({'type': 'FeatureCollection', 'features': features}).encode('utf-8'))
+    zeile(name, 'geojson', body, ms)
+    body, ms = zeit_ms(lambda: h3_columnar.features_to_columnar(features, labels=KATEGORIE_LABELS))
+    zeile(name, 'columnar', body, ms)
+
+    states = earth_cycle_states()
+    name = f"earth-cycles/cells {len(states)}"
+    body, ms = zeit_ms(lambda: json.dumps(FrontendFormatter.cells_to_feature_collection(states)).encode('utf-8'))
+    zeile(name, 'geojson', body, ms)
+    body, ms = zeit_ms(lambda: FrontendFormatter.cells_to_columnar(states))
+    zeile(name, 'columnar', body, ms)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""Benchmark: Terrarium-Höhen per PIL getpixel vs. DemTileStore
+
+Synthetische Terrarium-PNG-Kacheln (Rhein-Ruhr, Zoom 10) werden in einen
+temporären Cache geschrieben; gemessen werden
+- die alte Einzelpunkt-Abfrage (PNG öffnen, getpixel, FIFO mit 64 Kacheln)
+- DemTileStore.elevations_m: kalt (PNG -> .npy), Disk (mmap), Speicher
+- die Viewport-Tessellation mit Höhenschätzung vs. echten DEM-Höhen
+
+Aufruf (aus app/backend):
+    python -m benchmarks.bench_dem_tiles
+"""
+import asyncio
+import math
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, '.')
+
+from services.batch_tessellation import DEM_ZOOM
+from services.cell_state_cache import ZellZustandCache
+from services.dem_tile_store import DemTileStore, tile_pixel_indices
+from services.real_data_tessellation import EchteDatenTessellation
+from services.risk_tile_cache import RiskTileCache
+from services.topography_service import TopographyService
+
+VIEWPORT = dict(min_lat=51.0, min_lon=6.3, max_lat=51.9, max_lon=7.9)
+PUNKTE = 20_000
+
+
+def schreibe_kacheln(cache_dir: Path) -> int:
+    """Synthetisches Höhenfeld als Terrarium-PNGs für den Viewport"""
+    x0, y0, _, _ = tile_pixel_indices([VIEWPORT['max_lat']], [VIEWPORT['min_lon']], DEM_ZOOM)
+    x1, y1, _, _ = tile_pixel_indices([VIEWPORT['min_lat']], [VIEWPORT['max_lon']], DEM_ZOOM)
+    gitter = np.mgrid[0:256, 0:256].astype(np.float64)
+    anzahl = 0
+    for x in range(int(x0[0]), int(x1[0]) + 1):
+        for y in range(int(y0[0]), int(y1[0]) + 1):
+            hoehe = 60 + 40 * np.sin((gitter[0] + y * 256) / 90) * np.cos((gitter[1] + x * 256) / 70)
+            v = hoehe + 32768.0
+            rgb = np.stack([v // 256, np.floor(v % 256), np.floor((v % 1) * 256)], axis=-1).astype(np.uint8)
+            Image.fromarray(rgb, 'RGB').save(cache_dir / f"terrarium_z{DEM_ZOOM}_x{x}_y{y}.png")
+            anzahl += 1
+    return anzahl
+
+
+def alte_abfrage(cache_dir: Path, lats, lons, zoom: int) -> list:
+    """Vorheriges TopographyService.elevation_m ohne Netzwerkzweig"""
+    mem = {}
+    werte = []
+    for lat, lon in zip(lats, lons):
+        n = 2.0 ** zoom
+        x = (lon + 180.0) / 360.0 * n
+        y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+        xt, yt = int(x), int(y)
+        px, py = max(0, min(255, int((x - xt) * 256))), max(0, min(255, int((y - yt) * 256)))
+        key = f"z{zoom}_x{xt}_y{yt}"
+        img = mem.get(key)
+        if img is None:
+            img = Image.open(cache_dir / f"terrarium_{key}.png").convert("RGB")
+            if len(mem) >= 64:
+                mem.pop(next(iter(mem)))
+            mem[key] = img
+        r, g, b = img.getpixel((px, py))
+        werte.append((r * 256.0 + g + b / 256.0) - 32768.0)
+    return werte
+
+
+async def viewport_ms(topo: TopographyService) -> tuple:
+    t = EchteDatenTessellation(
+        tile_cache=RiskTileCache(db_path=tempfile.mktemp(suffix='.sqlite')),
+        zell_cache=ZellZustandCache(),
+        use_processes=False,
+    )
+    t.topo = topo
+    t.batch.topo = topo
+    start = time.perf_counter()
+    features = await t.generiere_viewport_karte(
+        **VIEWPORT, zoom=11, stadt_typ='coastal', max_cells=8000, refine_top_k=400,
+    )
+    return (time.perf_counter() - start) * 1000, len(features)
+
+
+class OhneDem(TopographyService):
+    """Verhalten vor dem Kachelspeicher: nur Höhenschätzung"""
+
+    async def elevations_m(self, lats, lons, zoom: int = 12):
+        return np.full(np.shape(lats), np.nan)
+
+
+async def main():
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(VIEWPORT['min_lat'], VIEWPORT['max_lat'], PUNKTE)
+    lons = rng.uniform(VIEWPORT['min_lon'], VIEWPORT['max_lon'], PUNKTE)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = Path(tmp)
+        kacheln = schreibe_kacheln(cache_dir)
+        print(f"{kacheln} Kacheln (Zoom {DEM_ZOOM}), {PUNKTE} Punkte")
+        print(f"{'Variante':<34} {'ms':>9} {'Punkte/s':>12}")
+
+        def zeile(name, ms):
+            print(f"{name:<34} {ms:>9.1f} {PUNKTE / ms * 1000:>12,.0f}")
+
+        start = time.perf_counter()
+        alt = alte_abfrage(cache_dir, lats, lons, DEM_ZOOM)
+        zeile('PIL getpixel (alt)', (time.perf_counter() - start) * 1000)
+
+        store = DemTileStore(tmp)
+        for name in ('elevations_m kalt (PNG -> .npy)', 'elevations_m Speicher'):
+            start = time.perf_counter()
+            neu = await store.elevations_m(lats, lons, DEM_ZOOM)
+            zeile(name, (time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        neu = await DemTileStore(tmp).elevations_m(lats, lons, DEM_ZOOM)
+        zeile('elevations_m Disk (mmap .npy)', (time.perf_counter() - start) * 1000)
+        print(f"max. Abweichung alt/neu: {np.max(np.abs(np.array(alt) - neu)):.4f} m")
+
+        print()
+        print(f"{'Viewport-Tessellation':<34} {'ms':>9} {'Features':>12}")
+        await viewport_ms(OhneDem(cache_dir=tmp))  # Küsten-Index aufwärmen
+        for name, topo in (('Höhenschätzung (alt)', OhneDem(cache_dir=tmp)),
+                           ('DEM-Höhen (Kacheln auf Disk)', TopographyService(cache_dir=tmp))):
+            ms, n = await viewport_ms(topo)
+            print(f"{name:<34} {ms:>9.1f} {n:>12}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,83 @@
+"""Benchmark: Erdzyklen-Endpunkt, Einzelzell-Schleife vs. vektorisiertes Modell
+
+Für Viewports wachsender Größe (Zellen aus /api/earth-cycles/cells) wird
+verglichen
+- Schleife: calculate_cell_state pro Zelle + FrontendFormatter.cell_to_feature
+  bzw. cells_to_columnar (bisheriger Pfad)
+- vektorisiert: viewport_states (CellStates, ein Array pro Größe) +
+  states_to_features bzw. states_to_columnar
+
+Beide Pfade liefern identische Features und Bytes (wird geprüft).
+
+Aufruf (aus app/backend):
+    python -m benchmarks.bench_earth_cycles
+"""
+import math
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, '.')
+
+from api.routes.earth_cycles import MAX_CELLS, generate_grid_cells
+from services import h3_compat
+from services.physical_earth_model import FrontendFormatter, PhysicalEarthModel, viewport_states
+
+NOW = datetime(2026, 7, 1, 12, tzinfo=timezone.utc)
+# (Name, bbox, Auflösung) ~2k Zellen, knapp unter und auf MAX_CELLS über Florida
+VIEWPORTS = [
+    ('klein', (25.0, -81.0, 25.9, -80.1), 7),
+    ('mittel', (25.0, -81.5, 27.0, -79.5), 7),
+    ('max', (24.5, -82.5, 28.5, -79.0), 7),
+]
+
+
+def schleife(cells, als_feature: bool):
+    """Bisheriger Pfad (viewport_cell_states): ein CellState-Objekt pro Zelle"""
+    model = PhysicalEarthModel(now=NOW)
+    states = []
+    for cell in cells:
+        try:
+            lat, lon = h3_compat.cell_to_latlng(cell)
+            states.append(model.calculate_cell_state(
+                cell,
+                precipitation_mm=max(0, 2 + math.sin(lat * 0.1) * 3),
+                ndvi=0.3 + abs(math.cos(lon * 0.1)) * 0.4,
+                soil_moisture_pct=40 + abs(math.sin(lat * 0.05 + lon * 0.03)) * 40,
+            ))
+        except Exception:
+            continue
+    if als_feature:
+        return [FrontendFormatter.cell_to_feature(s) for s in states]
+    return FrontendFormatter.cells_to_columnar(states, meta={})
+
+
+def vektorisiert(cells, als_feature: bool):
+    states = viewport_states(cells, NOW)
+    if als_feature:
+        return FrontendFormatter.states_to_features(states)
+    return FrontendFormatter.states_to_columnar(states, meta={})
+
+
+def messe(fn, *args, wiederholungen: int = 3):
+    beste = float('inf')
+    for _ in range(wiederholungen):
+        start = time.perf_counter()
+        ergebnis = fn(*args)
+        beste = min(beste, time.perf_counter() - start)
+    return ergebnis, beste * 1000
+
+
+def main():
+    print(f"{'Viewport':<9} {'Zellen':>7} {'Ausgabe':<9} | {'Schleife ms':>11} {'vektor. ms':>10} {'Speedup':>8}")
+    for name, bbox, res in VIEWPORTS:
+        cells = generate_grid_cells(*bbox, res)[:MAX_CELLS]
+        for ausgabe, als_feature in (('geojson', True), ('columnar', False)):
+            alt, ms_alt = messe(schleife, cells, als_feature)
+            neu, ms_neu = messe(vektorisiert, cells, als_feature)
+            assert alt == neu
+            print(f"{name:<9} {len(cells):>7} {ausgabe:<9} | {ms_alt:>11.1f} {ms_neu:>10.1f} {ms_alt / ms_neu:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
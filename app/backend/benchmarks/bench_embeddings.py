@@ -0,0 +1,139 @@
+"""Benchmark: Embeddings, ein Request pro Text vs. VectorStore.embed_texts (Docs/s)
+
+Korpus mit Dubletten (~30 %, wie bei Agenturmeldungen), eingebettet
+- einzeln: bisheriger generate_embedding-Pfad, ein /api/embeddings-Request
+  pro Text, nacheinander
+- batch kalt: embed_texts mit leerem Cache (Dedupe, /api/embed-Batches,
+  mehrere Requests parallel)
+- batch warm: embed_texts erneut, alles aus dem SQLite-Cache
+
+Ohne --ollama läuft ein lokaler Stub mit fester Latenz pro Request und
+pro Text (Modellzeit), der bis zu 4 Requests parallel bedient.
+
+Aufruf (aus app/backend):
+    python -m benchmarks.bench_embeddings [anzahl] [--ollama http://localhost:11434 --model nomic-embed-text]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, '.')
+
+import httpx
+
+from services.embedding_cache import EmbeddingCache
+from services.vector_store import VectorStore
+
+ANZAHL = 1_000
+DIM = 768
+LATENZ_REQUEST_S = 0.01
+LATENZ_TEXT_S = 0.002
+SERVER_PARALLEL = 4
+
+
+class StubServer:
+    """Ollama-Stub für /api/embed und /api/embeddings"""
+
+    def __init__(self):
+        parallel = threading.Semaphore(SERVER_PARALLEL)
+
+        def vektor(text):
+            rnd = random.Random(hashlib.sha256(text.encode()).digest())
+            return [rnd.uniform(-1, 1) for _ in range(DIM)]
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                texte = body["input"] if self.path == "/api/embed" else [body["prompt"]]
+                with parallel:
+                    time.sleep(LATENZ_REQUEST_S + LATENZ_TEXT_S * len(texte))
+                if self.path == "/api/embed":
+                    antwort = {"embeddings": [vektor(t) for t in texte]}
+                else:
+                    antwort = {"embedding": vektor(texte[0])}
+                payload = json.dumps(antwort).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def korpus(n: int, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    orte = ["Jakarta", "Lagos", "Dhaka", "Manila", "Karachi", "Lima", "Kairo", "Mumbai"]
+    ereignisse = ["Überschwemmung", "Dürre", "Hitzewelle", "Unruhen", "Erdrutsch", "Sturm"]
+    texte = [
+        f"{rnd.choice(ereignisse)} in {rnd.choice(orte)}: Bericht {i} " + "lorem ipsum " * rnd.randint(20, 80)
+        for i in range(int(n * 0.7))
+    ]
+    return texte + [rnd.choice(texte) for _ in range(n - len(texte))]
+
+
+async def einzeln(url: str, model: str, texte: list) -> None:
+    """Bisheriger generate_embedding-Pfad"""
+    async with httpx.AsyncClient(timeout=120.0) as client:
+        for text in texte:
+            response = await client.post(f"{url}/api/embeddings", json={"model": model, "prompt": text})
+            response.raise_for_status()
+
+
+def messe(coro) -> float:
+    start = time.perf_counter()
+    asyncio.run(coro)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("anzahl", nargs="?", type=int, default=ANZAHL)
+    parser.add_argument("--ollama", help="echter Ollama-Server statt Stub")
+    parser.add_argument("--model", default="llama3.1:8b")
+    args = parser.parse_args()
+
+    stub = None if args.ollama else StubServer()
+    url = args.ollama or stub.url
+    texte = korpus(args.anzahl)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache(str(Path(tmp) / "embeddings.sqlite"))
+        store = VectorStore(ollama_url=url, embedding_model=args.model, embedding_cache=cache)
+        zeiten = [
+            ("einzeln", messe(einzeln(url, args.model, texte))),
+            ("batch kalt", messe(store.embed_texts(texte))),
+            ("batch warm", messe(store.embed_texts(texte))),
+        ]
+
+    if stub:
+        stub.close()
+    print(f"{len(texte)} Texte, {len(set(texte))} eindeutig, Server: {'Stub' if stub else url}")
+    print(f"{'Pfad':<11} | {'Sekunden':>9} {'Docs/s':>9} {'Speedup':>8}")
+    for name, sekunden in zeiten:
+        print(f"{name:<11} | {sekunden:>9.2f} {len(texte) / sekunden:>9.0f} {zeiten[0][1] / sekunden:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
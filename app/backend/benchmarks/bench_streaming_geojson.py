@@ -0,0 +1,102 @@
+"""Benchmark: komplette FeatureCollection vs. Streaming (json / ndjson)
+
+Misst Time-to-first-feature (TTFF), Gesamtdauer und Peak-RSS. Jeder Modus
+läuft in einem eigenen Prozess mit kaltem Risiko-Kachel-Cache, damit sich
+Speicherspitzen nicht gegenseitig verdecken.
+
+Aufruf (aus app/backend):
+    python -m benchmarks.bench_streaming_geojson
+"""
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+from services.geojson_stream import stream_chunks
+from services.real_data_tessellation import EchteDatenTessellation
+from services.risk_tile_cache import RiskTileCache
+
+MODI = ('liste', 'json', 'ndjson')
+
+# (Name, Viewport, Zoom, max_cells)
+SZENARIEN = [
+    ('Rhein-Ruhr', (51.0, 6.3, 51.9, 7.9), 11, 8000),
+    ('Jakarta', (-6.6, 106.4, -5.9, 107.3), 12, 8000),
+]
+
+
+def _rss_kb() -> int:
+    with open('/proc/self/status') as f:
+        for zeile in f:
+            if zeile.startswith('VmRSS:'):
+                return int(zeile.split()[1])
+    return 0
+
+
+async def messe(modus: str, szenario: int) -> dict:
+    name, (min_lat, min_lon, max_lat, max_lon), zoom, max_cells = SZENARIEN[szenario]
+    viewport = dict(
+        min_lat=min_lat, min_lon=min_lon, max_lat=max_lat, max_lon=max_lon,
+        zoom=zoom, stadt_typ='coastal', max_cells=max_cells,
+        refine_top_k=min(400, max(50, max_cells // 10)),
+    )
+
+    # Küsten-Index-Kacheln vorab laden (gleiche Basis für alle Modi)
+    await EchteDatenTessellation(tile_cache=RiskTileCache(
+        db_path=tempfile.mktemp(suffix='.sqlite'))).generiere_viewport_karte(**viewport)
+
+    t = EchteDatenTessellation(tile_cache=RiskTileCache(db_path=tempfile.mktemp(suffix='.sqlite')))
+    rss_vorher = _rss_kb()
+    groesse = 0
+    ttff = None
+    start = time.perf_counter()
+
+    if modus == 'liste':
+        features = await t.generiere_viewport_karte(**viewport)
+        body = json.dumps({'type': 'FeatureCollection', 'features': features}).encode('utf-8')
+        ttff = time.perf_counter() - start
+        groesse = len(body)
+    else:
+        async for chunk in stream_chunks(t.iter_viewport_karte(**viewport), modus):
+            # Erster Chunk mit Feature-Inhalt (FeatureCollection-Kopf zählt nicht)
+            if ttff is None and b'"Feature"' in chunk:
+                ttff = time.perf_counter() - start
+            groesse += len(chunk)
+
+    dauer = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        'szenario': name,
+        'modus': modus,
+        'ttff_ms': ttff * 1000,
+        'gesamt_ms': dauer * 1000,
+        'bytes': groesse,
+        'peak_delta_mb': max(0, peak_kb - rss_vorher) / 1024,
+    }
+
+
+def main():
+    print(f"{'Szenario':<11} {'Modus':<7} {'TTFF ms':>8} {'gesamt ms':>10} {'MB':>7} {'Peak-RSS +MB':>13}")
+    for i in range(len(SZENARIEN)):
+        for modus in MODI:
+            out = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_streaming_geojson', modus, str(i)],
+                capture_output=True, text=True, check=True,
+            ).stdout.strip().splitlines()[-1]
+            r = json.loads(out)
+            print(
+                f"{r['szenario']:<11} {r['modus']:<7} {r['ttff_ms']:>8.0f} {r['gesamt_ms']:>10.0f} "
+                f"{r['bytes'] / 1e6:>7.1f} {r['peak_delta_mb']:>13.1f}"
+            )
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 3:
+        print(json.dumps(asyncio.run(messe(sys.argv[1], int(sys.argv[2])))))
+    else:
+        main()
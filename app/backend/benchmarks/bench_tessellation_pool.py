@@ -0,0 +1,106 @@
+"""Benchmark: Viewport-Tessellation im Event-Loop vs. TessellationExecutor
+
+Mehrere große Viewports (max_cells=8000) werden gleichzeitig angefragt
+(generiere_viewport_karte, je eigener leerer Risiko-Kachel-Cache), einmal
+im API-Prozess (executor=None, blockiert den Event-Loop) und mit 1..N
+Worker-Prozessen. Gemessen werden Durchsatz (Zellen/s), Speedup und die
+größte Verspätung eines 10-ms-Ticks auf dem Event-Loop.
+
+DEM-Höhen sind hier NaN (kein Netzwerk), die Zellanalyse ist dieselbe.
+Der Speedup skaliert mit den Kernen; auf 1 Kern bleibt nur der Overhead.
+
+Aufruf (aus app/backend):
+    python -m benchmarks.bench_tessellation_pool
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, '.')
+
+from services.cell_state_cache import ZellZustandCache
+from services.real_data_tessellation import EchteDatenTessellation
+from services.risk_tile_cache import RiskTileCache
+from services.tessellation_executor import TessellationExecutor
+from services.topography_service import TopographyService
+
+VIEWPORTS = [
+    ('Miami', 25.40, -80.60, 26.10, -80.00, 'coastal'),
+    ('Kairo', 29.70, 30.90, 30.40, 31.60, 'arid'),
+    ('Berlin', 52.20, 13.00, 52.80, 13.80, 'temperate'),
+    ('Jakarta', -6.50, 106.50, -5.90, 107.10, 'tropical'),
+]
+TICK_S = 0.01
+
+
+class OhneDem(TopographyService):
+    async def elevations_m(self, lats, lons, zoom: int = 12):
+        return np.full(np.shape(lats), np.nan)
+
+
+async def viewports(executor, tmp: str):
+    """Alle Viewports gleichzeitig, jeweils mit frischem Kachel-Cache"""
+    async def einer(i, vp):
+        _, min_lat, min_lon, max_lat, max_lon, typ = vp
+        t = EchteDatenTessellation(
+            tile_cache=RiskTileCache(db_path=os.path.join(tmp, f"{time.perf_counter_ns()}_{i}.sqlite")),
+            zell_cache=ZellZustandCache(),
+            executor=executor,
+            use_processes=executor is not None,
+        )
+        t.topo = t.batch.topo = OhneDem()
+        return await t.generiere_viewport_karte(
+            min_lat, min_lon, max_lat, max_lon, zoom=13, stadt_typ=typ,
+            max_cells=8000, refine_top_k=400,
+        )
+    return await asyncio.gather(*(einer(i, vp) for i, vp in enumerate(VIEWPORTS)))
+
+
+async def mit_ticks(coro):
+    """Führt coro aus und misst die größte Tick-Verspätung auf dem Event-Loop"""
+    lag = 0.0
+    fertig = False
+
+    async def ticker():
+        nonlocal lag
+        while not fertig:
+            soll = time.perf_counter() + TICK_S
+            await asyncio.sleep(TICK_S)
+            lag = max(lag, time.perf_counter() - soll)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    ergebnis = await coro
+    dauer = time.perf_counter() - start
+    fertig = True
+    await tick
+    return ergebnis, dauer, lag * 1000
+
+
+async def main():
+    kerne = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        await viewports(None, tmp)  # Küsten-Index aufwärmen
+        referenz, basis, lag = await mit_ticks(viewports(None, tmp))
+        zellen = sum(len(f) for f in referenz)
+        print(f"{len(VIEWPORTS)} Viewports, {zellen} Features, {kerne} CPU-Kerne")
+        print(f"{'Variante':<22} {'s':>7} {'Zellen/s':>10} {'Speedup':>8} {'Loop-Lag ms':>12}")
+        print(f"{'Event-Loop (inline)':<22} {basis:>7.2f} {zellen / basis:>10,.0f} {1.0:>8.2f} {lag:>12.1f}")
+
+        for n in sorted({1, 2, 4, kerne}):
+            executor = TessellationExecutor(workers=n)
+            await executor.start()
+            await viewports(executor, tmp)  # Worker aufwärmen
+            ergebnis, dauer, lag = await mit_ticks(viewports(executor, tmp))
+            executor.shutdown()
+            assert ergebnis == referenz
+            print(f"{f'Prozess-Pool {n}':<22} {dauer:>7.2f} {zellen / dauer:>10,.0f} {basis / dauer:>8.2f} {lag:>12.1f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+"""Benchmark: Pan/Zoom-Sitzung auf der Viewport-Karte
+
+Simuliert eine Kartensitzung (Start, Pans, Zoom rein/raus) über Miami und
+vergleicht pro Schritt
+- ohne Wiederverwendung: leere Caches (so verhielt sich jeder Pan/Zoom
+  bisher)
+- Sitzung: Kachel-Cache + Zellzustands-Cache über alle Schritte (ortsfeste
+  Eingaben nur für neu sichtbare Zellen, neue Auflösungen aus
+  Eltern-/Kindzellen abgeleitet; bewertet wird immer gegen das exakte
+  Viewport-Zentrum)
+
+Gerechnet wird im API-Prozess ohne DEM (kein Netzwerk).
+
+Aufruf (aus app/backend):
+    python -m benchmarks.bench_viewport_session
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, '.')
+
+from services.cell_state_cache import ZellZustandCache
+from services.real_data_tessellation import EchteDatenTessellation
+from services.risk_tile_cache import RiskTileCache
+from services.topography_service import TopographyService
+
+START = (25.70, -80.30, 25.90, -80.05)  # min_lat, min_lon, max_lat, max_lon
+START_ZOOM = 12
+
+
+class OhneDem(TopographyService):
+    async def elevations_m(self, lats, lons, zoom: int = 12):
+        return np.full(np.shape(lats), np.nan)
+
+
+def sitzung():
+    """(Name, bbox, zoom) pro Schritt"""
+    min_lat, min_lon, max_lat, max_lon = START
+    zoom = START_ZOOM
+    schritte = [('Start', START, zoom)]
+
+    def pan(d_lat, d_lon):
+        nonlocal min_lat, min_lon, max_lat, max_lon
+        h, b = max_lat - min_lat, max_lon - min_lon
+        min_lat, max_lat = min_lat + d_lat * h, max_lat + d_lat * h
+        min_lon, max_lon = min_lon + d_lon * b, max_lon + d_lon * b
+
+    def skaliere(faktor):
+        nonlocal min_lat, min_lon, max_lat, max_lon
+        c_lat, c_lon = (min_lat + max_lat) / 2, (min_lon + max_lon) / 2
+        h, b = (max_lat - min_lat) * faktor / 2, (max_lon - min_lon) * faktor / 2
+        min_lat, max_lat, min_lon, max_lon = c_lat - h, c_lat + h, c_lon - b, c_lon + b
+
+    for name, aktion, dz in [
+        ('Pan Ost', lambda: pan(0, 0.2), 0),
+        ('Pan Ost', lambda: pan(0, 0.2), 0),
+        ('Pan Nord', lambda: pan(0.2, 0), 0),
+        ('Zoom rein', lambda: skaliere(0.5), 1),
+        ('Zoom rein', lambda: skaliere(0.5), 1),
+        ('Pan West', lambda: pan(0, -0.3), 0),
+        ('Zoom raus', lambda: skaliere(2.0), -1),
+        ('Zoom raus', lambda: skaliere(2.0), -1),
+        ('Pan Süd', lambda: pan(-0.2, 0), 0),
+    ]:
+        aktion()
+        zoom += dz
+        schritte.append((name, (min_lat, min_lon, max_lat, max_lon), zoom))
+    return schritte
+
+
+def tessellation(tmp: str) -> EchteDatenTessellation:
+    t = EchteDatenTessellation(
+        tile_cache=RiskTileCache(db_path=os.path.join(tmp, f"{time.perf_counter_ns()}.sqlite")),
+        zell_cache=ZellZustandCache(),
+    )
+    t.executor = None
+    t.topo = t.batch.topo = OhneDem()
+    return t
+
+
+async def schritt(t: EchteDatenTessellation, bbox, zoom):
+    vorher = t.tile_cache.get_stats()['misses']
+    start = time.perf_counter()
+    features = await t.generiere_viewport_karte(
+        *bbox, zoom=zoom, stadt_typ='coastal', max_cells=6000, refine_top_k=300,
+    )
+    ms = (time.perf_counter() - start) * 1000
+    return ms, len(features), t.tile_cache.get_stats()['misses'] - vorher
+
+
+async def main():
+    schritte = sitzung()
+    with tempfile.TemporaryDirectory() as tmp:
+        await schritt(tessellation(tmp), *schritte[0][1:])  # Küsten-Index aufwärmen
+
+        session = tessellation(tmp)
+        print(f"{'Schritt':<11} {'Zoom':>4} {'Features':>8} | {'ohne ms':>8} {'berechnet':>9} | "
+              f"{'Sitzung ms':>10} {'berechnet':>9}")
+        summe_alt = summe_neu = 0.0
+        for name, bbox, zoom in schritte:
+            ms_alt, n, neu_alt = await schritt(tessellation(tmp), bbox, zoom)
+            ms_neu, n_neu, neu = await schritt(session, bbox, zoom)
+            summe_alt += ms_alt
+            summe_neu += ms_neu
+            print(f"{name:<11} {zoom:>4} {n_neu:>8} | {ms_alt:>8.0f} {neu_alt:>9} | {ms_neu:>10.0f} {neu:>9}")
+        print(f"{'Summe':<11} {'':>4} {'':>8} | {summe_alt:>8.0f} {'':>9} | {summe_neu:>10.0f}")
+        print(f"Zellzustands-Cache: {session.zell_cache.get_stats()}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -21,10 +21,22 @@ class Settings(BaseSettings):
     # Ollama
     ollama_url: str = "http://127.0.0.1:11434"
     ollama_model: str = "llama3.1:8b"
+    ollama_timeout: float = 120.0
+    # Gleichzeitige Generierungen pro Ollama-Server (= OLLAMA_NUM_PARALLEL)
+    ollama_num_parallel: int = 4
     
     # ChromaDB
     chroma_url: str = "http://localhost:8000"
     
+    # /analyze Pipeline: Zeitbudget pro Stufe (Sekunden)
+    analyze_risk_deadline_s: float = 20.0
+    analyze_realtime_deadline_s: float = 45.0
+    analyze_precision_llm_deadline_s: float = 60.0
+    analyze_precision_deadline_s: float = 5.0
+    
+    # Tessellation im Prozess-Pool (0 = Anzahl CPU-Kerne)
+    tessellation_workers: int = 0
+    
     class Config:
         env_file = ".env"
         extra = "ignore"  # Ignore extra fields
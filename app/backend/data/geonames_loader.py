@@ -4,7 +4,6 @@ Downloads and imports global city/country data into PostGIS
 """
 import asyncio
 import asyncpg
-import httpx
 import zipfile
 import io
 import csv
@@ -12,6 +11,7 @@ from pathlib import Path
 from typing import List, Dict, Any
 from loguru import logger
 from dataclasses import dataclass
+from services.http_clients import pooled_client
 
 DATA_DIR = Path("/data/tera/data/geo")
 
@@ -30,6 +30,7 @@ class City:
     country_code: str
     population: int
     timezone: str
+    ascii_name: str = ''
 
 
 @dataclass  
@@ -49,7 +50,7 @@ async def download_file(url: str, filename: str) -> Path:
         return filepath
     
     logger.info(f"Downloading {url}...")
-    async with httpx.AsyncClient(timeout=300) as client:
+    async with pooled_client(timeout=300) as client:
         response = await client.get(url)
         response.raise_for_status()
         
@@ -75,7 +76,8 @@ async def load_cities() -> List[City]:
                         lon=float(row[5]),
                         country_code=row[8],
                         population=int(row[14]) if row[14] else 0,
-                        timezone=row[17]
+                        timezone=row[17],
+                        ascii_name=row[2]
                     ))
                 except (IndexError, ValueError) as e:
                     continue
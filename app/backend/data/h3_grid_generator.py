@@ -4,10 +4,10 @@ Creates H3 cells for any region on Earth
 """
 import h3
 import asyncpg
-import json
 from typing import List, Tuple, Dict, Any
 from dataclasses import dataclass
 from loguru import logger
+from db.bulk_ingest import CellDeltas, ingest_pool, polygon_wkt
 
 
 @dataclass
@@ -97,16 +97,11 @@ def h3_boundary_to_geojson(boundary: List[Tuple[float, float]]) -> Dict:
 
 
 async def store_h3_cells(pool: asyncpg.Pool, cells: List[H3Cell], country_code: str = None):
-    """Store H3 cells in PostGIS"""
-    async with pool.acquire() as conn:
-        for cell in cells:
-            geojson = json.dumps(h3_boundary_to_geojson(cell.boundary))
-            await conn.execute("""
-                INSERT INTO h3_cells (h3_index, resolution, center_lat, center_lon, country_code, geom)
-                VALUES ($1, $2, $3, $4, $5, ST_SetSRID(ST_GeomFromGeoJSON($6), 4326))
-                ON CONFLICT (h3_index) DO UPDATE SET
-                    country_code = COALESCE(EXCLUDED.country_code, h3_cells.country_code)
-            """, cell.h3_index, cell.resolution, cell.center_lat, cell.center_lon, country_code, geojson)
+    """Store H3 cells in PostGIS (one COPY + merge per batch)"""
+    deltas = CellDeltas()
+    for cell in cells:
+        deltas.add(cell.h3_index, country_code=country_code, geom_wkt=polygon_wkt(cell.boundary))
+    await ingest_pool(pool, deltas=deltas)
     
     logger.info(f"Stored {len(cells)} H3 cells")
 
@@ -0,0 +1,209 @@
+"""
+TERA Bulk-Ingestion (PostGIS)
+=============================
+Gemeinsamer Schreibpfad für NASA-Events und H3-Zell-Updates (EONET-Scraper,
+RiskCalculator, Grid-Generator) statt eines INSERT/Upserts pro Zeile:
+
+1. Zell-Beiträge werden im Speicher pro h3_index summiert (CellDeltas)
+2. Events und Zellen gehen per COPY (binär) in temporäre Staging-Tabellen
+3. ein mengenbasiertes INSERT ... SELECT ... ON CONFLICT führt zusammen
+
+Alles läuft in einer Transaktion; die Staging-Tabellen verschwinden mit
+dem Commit. Risiko-Beiträge sind nicht negativ, daher ist
+LEAST(100, alt + Summe) gleich den bisherigen Einzel-Upserts
+LEAST(100, LEAST(100, alt + d1) + d2) ...
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import asyncpg
+
+from services import h3_compat
+
+
+@dataclass
+class CellDelta:
+    """Summierte Beiträge für eine Zelle"""
+    climate: float = 0.0
+    conflict: float = 0.0
+    risk: float = 0.0
+    country_code: Optional[str] = None
+    geom_wkt: Optional[str] = None
+
+
+class CellDeltas:
+    """Sammelt Zell-Beiträge vor dem Schreiben (ein Eintrag pro h3_index)"""
+
+    def __init__(self):
+        self._zellen: Dict[str, CellDelta] = {}
+
+    def add(
+        self,
+        h3_index: str,
+        climate: float = 0.0,
+        conflict: float = 0.0,
+        risk: float = 0.0,
+        country_code: Optional[str] = None,
+        geom_wkt: Optional[str] = None,
+    ) -> None:
+        delta = self._zellen.get(h3_index)
+        if delta is None:
+            delta = self._zellen[h3_index] = CellDelta()
+        delta.climate += climate
+        delta.conflict += conflict
+        delta.risk += risk
+        if country_code is not None:
+            delta.country_code = country_code
+        if geom_wkt is not None:
+            delta.geom_wkt = geom_wkt
+
+    def __len__(self) -> int:
+        return len(self._zellen)
+
+    def __contains__(self, h3_index: str) -> bool:
+        return h3_index in self._zellen
+
+    def __getitem__(self, h3_index: str) -> CellDelta:
+        return self._zellen[h3_index]
+
+    def records(self) -> List[Tuple]:
+        """Zeilen für die Staging-Tabelle, nach h3_index sortiert (gleiche
+        Sperrreihenfolge bei parallelen Schreibern)"""
+        zeilen = []
+        for h3_index in sorted(self._zellen):
+            d = self._zellen[h3_index]
+            lat, lon = h3_compat.cell_to_latlng(h3_index)
+            zeilen.append((
+                h3_index, h3_compat.get_resolution(h3_index), lat, lon,
+                d.climate, d.conflict, d.risk, d.country_code, d.geom_wkt,
+            ))
+        return zeilen
+
+
+def polygon_wkt(boundary: Sequence[Tuple[float, float]]) -> str:
+    """WKT-Polygon aus einem H3-Rand [(lat, lon), ...]"""
+    punkte = [f"{lon} {lat}" for lat, lon in boundary]
+    punkte.append(punkte[0])
+    return f"POLYGON(({', '.join(punkte)}))"
+
+
+EVENT_COLUMNS = ('event_id', 'title', 'category', 'lat', 'lon', 'event_date', 'source_url', 'magnitude')
+CELL_COLUMNS = (
+    'h3_index', 'resolution', 'center_lat', 'center_lon',
+    'climate_delta', 'conflict_delta', 'risk_delta', 'country_code', 'geom_wkt',
+)
+
+_STAGE_EVENTS = """
+    CREATE TEMP TABLE IF NOT EXISTS stage_nasa_events (
+        event_id TEXT,
+        title TEXT,
+        category TEXT,
+        lat DOUBLE PRECISION,
+        lon DOUBLE PRECISION,
+        event_date TIMESTAMPTZ,
+        source_url TEXT,
+        magnitude DOUBLE PRECISION
+    ) ON COMMIT DROP
+"""
+
+_MERGE_EVENTS = """
+    INSERT INTO nasa_events (
+        event_id, title, category, lat, lon,
+        event_date, source_url, magnitude, geom
+    )
+    SELECT event_id, title, category, lat, lon, event_date, source_url, magnitude,
+           ST_SetSRID(ST_MakePoint(lon, lat), 4326)
+    FROM stage_nasa_events
+    ORDER BY event_id
+    ON CONFLICT (event_id) DO UPDATE SET
+        title = EXCLUDED.title,
+        event_date = EXCLUDED.event_date
+"""
+
+_STAGE_CELLS = """
+    CREATE TEMP TABLE IF NOT EXISTS stage_h3_cells (
+        h3_index VARCHAR(20),
+        resolution INTEGER,
+        center_lat DOUBLE PRECISION,
+        center_lon DOUBLE PRECISION,
+        climate_delta DOUBLE PRECISION,
+        conflict_delta DOUBLE PRECISION,
+        risk_delta DOUBLE PRECISION,
+        country_code VARCHAR(3),
+        geom_wkt TEXT
+    ) ON COMMIT DROP
+"""
+
+# Neue Zellen bekommen die (gedeckelte) Summe, bestehende addieren sie;
+# last_updated nur bei echten Risiko-Änderungen (reine Grid-Zeilen nicht)
+_MERGE_CELLS = """
+    INSERT INTO h3_cells (
+        h3_index, resolution, center_lat, center_lon, country_code,
+        climate_risk, conflict_risk, risk_score, geom, last_updated
+    )
+    SELECT h3_index, resolution, center_lat, center_lon, country_code,
+           LEAST(100, climate_delta), LEAST(100, conflict_delta), LEAST(100, risk_delta),
+           ST_GeomFromText(geom_wkt, 4326), NOW()
+    FROM stage_h3_cells
+    ORDER BY h3_index
+    ON CONFLICT (h3_index) DO UPDATE SET
+        climate_risk = LEAST(100, h3_cells.climate_risk + EXCLUDED.climate_risk),
+        conflict_risk = LEAST(100, h3_cells.conflict_risk + EXCLUDED.conflict_risk),
+        risk_score = LEAST(100, h3_cells.risk_score + EXCLUDED.risk_score),
+        country_code = COALESCE(EXCLUDED.country_code, h3_cells.country_code),
+        geom = COALESCE(h3_cells.geom, EXCLUDED.geom),
+        last_updated = CASE
+            WHEN EXCLUDED.climate_risk <> 0 OR EXCLUDED.conflict_risk <> 0 OR EXCLUDED.risk_score <> 0
+            THEN NOW() ELSE h3_cells.last_updated
+        END
+"""
+
+
+def _event_records(events: Iterable) -> List[Tuple]:
+    """Eine Zeile pro event_id (die letzte gewinnt, wie bei Einzel-Upserts)"""
+    zeilen: Dict[str, Tuple] = {}
+    for e in events:
+        zeilen[e.id] = (e.id, e.title, e.category, e.lat, e.lon, e.date, e.source_url, e.magnitude)
+    return list(zeilen.values())
+
+
+async def ingest(
+    conn: asyncpg.Connection,
+    events: Iterable = (),
+    deltas: Optional[CellDeltas] = None,
+) -> Dict[str, int]:
+    """
+    Schreibt Events (NASAEvent) und Zell-Beiträge in einer Transaktion
+
+    Returns:
+        Anzahl geschriebener Events und Zellen
+    """
+    event_zeilen = _event_records(events)
+    zell_zeilen = deltas.records() if deltas else []
+
+    async with conn.transaction():
+        if event_zeilen:
+            await conn.execute(_STAGE_EVENTS)
+            await conn.copy_records_to_table(
+                'stage_nasa_events', records=event_zeilen, columns=EVENT_COLUMNS,
+            )
+            await conn.execute(_MERGE_EVENTS)
+        if zell_zeilen:
+            await conn.execute(_STAGE_CELLS)
+            await conn.copy_records_to_table(
+                'stage_h3_cells', records=zell_zeilen, columns=CELL_COLUMNS,
+            )
+            await conn.execute(_MERGE_CELLS)
+
+    return {'events': len(event_zeilen), 'cells': len(zell_zeilen)}
+
+
+async def ingest_pool(
+    pool: asyncpg.Pool,
+    events: Iterable = (),
+    deltas: Optional[CellDeltas] = None,
+) -> Dict[str, int]:
+    """Wie ingest, mit einer Verbindung aus dem Pool"""
+    async with pool.acquire() as conn:
+        return await ingest(conn, events, deltas)
@@ -12,7 +12,16 @@ async def lifespan(app: FastAPI):
     logger.info('🚀 TERA API Server - 2026 Edition')
     logger.info('📊 Datenquellen: IPCC AR6, ERA5, Copernicus DEM')
     logger.info('✅ Endpunkte: /analyze, /risk-map, /risk-map/viewport')
+    from services.http_clients import HTTP2_AVAILABLE, get_http_registry
+    app.state.http = get_http_registry()
+    logger.info(f"🔌 HTTP-Pools pro Host (HTTP/2: {'ja' if HTTP2_AVAILABLE else 'nein, h2 fehlt'})")
+    from services.tessellation_executor import get_tessellation_executor
+    app.state.tessellation = get_tessellation_executor()
+    await app.state.tessellation.start()
+    logger.info(f"🧮 Tessellation-Pool: {app.state.tessellation.workers} Prozesse")
     yield
+    app.state.tessellation.shutdown()
+    await app.state.http.aclose()
     logger.info('👋 TERA API Server shutdown')
 
 
@@ -32,11 +41,12 @@ app.add_middleware(
 )
 
 # Import routes - analysis hat /risk-map und /risk-map/viewport
-from api.routes import analysis
+from api.routes import analysis, earth_cycles
 from api.routes.extended import router as extended_router
 from api.routes.v2_router import router as v2_router
 
 app.include_router(analysis.router, prefix="/api/analysis", tags=["Analysis"])
+app.include_router(earth_cycles.router, prefix="/api/earth-cycles", tags=["Earth Cycles"])
 app.include_router(extended_router)
 app.include_router(v2_router)
 
@@ -49,6 +59,15 @@ async def root():
         "endpoints": {
             "analyze": "/api/analysis/analyze (GET/POST)",
             "risk_map": "/api/analysis/risk-map?city=Miami",
-            "risk_map_viewport": "/api/analysis/risk-map/viewport"
+            "risk_map_viewport": "/api/analysis/risk-map/viewport",
+            "earth_cycles": "/api/earth-cycles/cells?format=geojson|columnar",
+            "http_clients": "/api/http-clients"
         }
     }
+
+
+@app.get("/api/http-clients")
+async def http_client_stats():
+    """Requests, Statuscodes, Retries und Latenz pro Upstream (scheme://host:port)"""
+    from services.http_clients import get_http_registry
+    return get_http_registry().get_stats()
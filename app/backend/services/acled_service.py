@@ -5,11 +5,11 @@ Docs: https://acleddata.com/api-documentation/
 """
 
 import os
-import httpx
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from loguru import logger
+from services.http_clients import pooled_client
 
 # ACLED Credentials - via Environment oder hier setzen
 ACLED_EMAIL = os.environ.get('ACLED_EMAIL', '')
@@ -46,7 +46,7 @@ class ACLEDService:
         self.password = password or ACLED_PASSWORD
         self.access_token = None
         self.token_expires = None
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = pooled_client(timeout=30.0)
     
     async def _get_token(self) -> Optional[str]:
         """OAuth Token von ACLED holen"""
@@ -10,6 +10,8 @@ import random
 from typing import List, Dict, Tuple
 from dataclasses import dataclass
 
+from services import h3_cover
+
 
 # Risk zone definitions with 2026 projections
 RISK_ZONES_2026 = {
@@ -269,34 +271,7 @@ class AdaptiveTessellation:
         resolution: int
     ) -> List[str]:
         """Fill bounding box with H3 hexagons"""
-        # Create polygon for bbox
-        geojson = {
-            'type': 'Polygon',
-            'coordinates': [[
-                [min_lon, min_lat],
-                [max_lon, min_lat],
-                [max_lon, max_lat],
-                [min_lon, max_lat],
-                [min_lon, min_lat],
-            ]]
-        }
-        
-        try:
-            hexagons = list(h3.polyfill_geojson(geojson, resolution))
-        except Exception:
-            # Fallback: grid approach
-            hexagons = []
-            lat_step = (max_lat - min_lat) / 50
-            lon_step = (max_lon - min_lon) / 50
-            for i in range(50):
-                for j in range(50):
-                    cell_lat = min_lat + i * lat_step
-                    cell_lon = min_lon + j * lon_step
-                    h3_index = h3.geo_to_h3(cell_lat, cell_lon, resolution)
-                    if h3_index not in hexagons:
-                        hexagons.append(h3_index)
-        
-        return hexagons
+        return h3_cover.bbox_cells(min_lat, min_lon, max_lat, max_lon, resolution)
     
     def _assign_zone(
         self, 
@@ -0,0 +1,141 @@
+"""
+TERA Analyse-Pipeline
+=====================
+Kleine DAG-Ausführung für /analyze: jede Stufe startet, sobald ihre
+Abhängigkeiten fertig sind, und hat ein eigenes Zeitbudget. Läuft eine
+Stufe in den Timeout oder wirft, liefert ihr Fallback den Wert und die
+abhängigen Stufen laufen normal weiter. Wirft auch der Fallback, ist der
+Wert None (Status error).
+
+Die Gesamtlatenz wird damit vom langsamsten Pfad bestimmt, nicht von der
+Summe aller Stufen. Ergebnisse kommen in Fertigstellungsreihenfolge
+(iter_stages), so dass Teilergebnisse gestreamt werden können.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+
+STATUS_OK = 'ok'
+STATUS_TIMEOUT = 'timeout'
+STATUS_ERROR = 'error'
+
+
+@dataclass
+class Stage:
+    """Eine Pipeline-Stufe.
+
+    run bekommt die Werte der Abhängigkeiten als Dict (Name -> Wert);
+    fallback bekommt dieselben Werte und liefert den Ersatzwert.
+    """
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]
+    deadline_s: float
+    fallback: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+
+
+@dataclass
+class StageResult:
+    """Ergebnis einer Stufe inkl. Zeitmessung (ms relativ zum Pipeline-Start)"""
+    name: str
+    status: str
+    value: Any
+    started_ms: float
+    duration_ms: float
+    deadline_s: Optional[float] = None
+    error: Optional[str] = None
+    fallback: bool = field(default=False)
+
+    def report(self) -> Dict[str, Any]:
+        bericht = {
+            'status': self.status,
+            'fallback': self.fallback,
+            'started_ms': round(self.started_ms, 1),
+            'duration_ms': round(self.duration_ms, 1),
+            'deadline_s': self.deadline_s,
+        }
+        if self.error:
+            bericht['error'] = self.error
+        return bericht
+
+
+def _pruefe_dag(stages: List[Stage]) -> None:
+    namen = [s.name for s in stages]
+    if len(set(namen)) != len(namen):
+        raise ValueError(f"Doppelte Stufennamen: {namen}")
+    bekannt = set()
+    for stage in stages:
+        fehlend = [d for d in stage.deps if d not in bekannt]
+        if fehlend:
+            # Reihenfolge = topologische Ordnung, damit sind Zyklen ausgeschlossen
+            raise ValueError(f"Stufe {stage.name}: Abhängigkeit {fehlend} fehlt oder steht später")
+        bekannt.add(stage.name)
+
+
+async def iter_stages(stages: Iterable[Stage]) -> AsyncIterator[StageResult]:
+    """Führt die Stufen als DAG aus und liefert Ergebnisse sobald sie fertig sind.
+
+    stages muss topologisch sortiert sein (Abhängigkeiten zuerst).
+    Bricht der Konsument ab (z.B. Client trennt den Stream), werden laufende
+    Stufen abgebrochen.
+    """
+    stages = list(stages)
+    _pruefe_dag(stages)
+
+    loop = asyncio.get_running_loop()
+    t0 = time.perf_counter()
+    werte: Dict[str, asyncio.Future] = {s.name: loop.create_future() for s in stages}
+
+    async def ausfuehren(stage: Stage) -> StageResult:
+        eingaben = {d: await werte[d] for d in stage.deps}
+        start = time.perf_counter()
+        status, fehler, ist_fallback = STATUS_OK, None, False
+        try:
+            wert = await asyncio.wait_for(stage.run(eingaben), timeout=stage.deadline_s)
+        except asyncio.TimeoutError:
+            status, fehler = STATUS_TIMEOUT, f"Deadline {stage.deadline_s:g}s überschritten"
+        except Exception as e:
+            status, fehler = STATUS_ERROR, str(e) or type(e).__name__
+        if status != STATUS_OK:
+            logger.warning(f"Pipeline-Stufe {stage.name}: {fehler} (Fallback)")
+            ist_fallback = True
+            try:
+                wert = stage.fallback(eingaben)
+            except Exception as e:
+                # Auch ohne Ersatzwert: Stufe auflösen, Geschwister laufen weiter
+                status, wert = STATUS_ERROR, None
+                fehler = f"{fehler}; Fallback: {str(e) or type(e).__name__}"
+                logger.error(f"Pipeline-Stufe {stage.name}: Fallback fehlgeschlagen: {e}")
+        ende = time.perf_counter()
+
+        werte[stage.name].set_result(wert)
+        return StageResult(
+            name=stage.name,
+            status=status,
+            value=wert,
+            started_ms=(start - t0) * 1000,
+            duration_ms=(ende - start) * 1000,
+            deadline_s=stage.deadline_s,
+            error=fehler,
+            fallback=ist_fallback,
+        )
+
+    tasks = [loop.create_task(ausfuehren(s)) for s in stages]
+    try:
+        for fertig in asyncio.as_completed(tasks):
+            yield await fertig
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Abbruch abwarten, damit keine Stufe den Request überlebt
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def run_stages(stages: Iterable[Stage]) -> Dict[str, StageResult]:
+    """Wie iter_stages, sammelt alle Ergebnisse (Name -> StageResult)."""
+    return {r.name: r async for r in iter_stages(stages)}
@@ -0,0 +1,306 @@
+"""
+TERA Batch-Zellanalyse
+======================
+Vektorisierte Variante von EchteDatenTessellation._analysiere_zelle:
+statt jede H3-Zelle einzeln (Zentrum, Haversine, Land/Meer, Küstendistanz,
+Risiko) zu berechnen, wird der komplette Hexagon-Satz als NumPy-Arrays
+verarbeitet.
+
+Die Ergebnisse sind identisch zur Einzelzell-Analyse:
+- Zentren über h3 (einmal pro Zelle)
+- Land/Meer über einen einzigen global_land_mask-Aufruf
+- Küstendistanz als Array-Lookup im Küstendistanz-Index
+- Höhe + Risikokategorie per np.select über dieselben Regeln
+
+Die ortsfesten Eingaben (Zentrum, Land/Meer, Küstendistanz, DEM-Höhe)
+stecken in ZellGeografie und können vom Aufrufer kommen (cell_state_cache,
+mit echten DEM-Höhen aus dem dem_tile_store); die Höhenschätzung greift
+dann nur noch für Wasser und für Zellen ohne verfügbare Kachel.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services import h3_compat
+from services.topography_service import TopographyService
+
+
+ERDRADIUS_KM = 6371.0
+
+# Offshore-Grenze wie in _analysiere_zelle (keine riesige blaue Platte)
+MAX_OFFSHORE_KM = 3.0
+
+# Terrarium-Zoom für Zellhöhen: ~150 m Pixel, ~39 km Kachel (Stadt = wenige Kacheln)
+DEM_ZOOM = 10
+
+
+@dataclass(frozen=True)
+class RisikoRegel:
+    """Ein Zweig aus EchteDatenTessellation._berechne_risiko"""
+    kategorie: str
+    wert: float
+    gruende: Callable[[float], List[str]]
+
+
+@dataclass
+class ZellGeografie:
+    """Ortsfeste Eingaben pro Zelle (unabhängig von Stadtzentrum und Stadttyp)"""
+    lat: np.ndarray
+    lon: np.ndarray
+    ist_wasser: np.ndarray
+    kuestenentfernung_km: np.ndarray  # vorzeichenbehaftet: + inland, - offshore
+    hoehe_dem: np.ndarray             # NaN = keine DEM-Höhe -> Schätzung
+
+    def __len__(self) -> int:
+        return len(self.lat)
+
+    def teil(self, s: slice) -> 'ZellGeografie':
+        return ZellGeografie(
+            self.lat[s], self.lon[s], self.ist_wasser[s],
+            self.kuestenentfernung_km[s], self.hoehe_dem[s],
+        )
+
+
+@dataclass
+class ZellenBatch:
+    """Struct-of-Arrays für einen Hexagon-Satz (gleiche Reihenfolge wie Eingabe)"""
+    h3_index: List[str]
+    lat: np.ndarray
+    lon: np.ndarray
+    entfernung_km: np.ndarray
+    ist_wasser: np.ndarray
+    kuestenentfernung_km: np.ndarray  # vorzeichenbehaftet: + inland, - offshore
+    hoehe_meter: np.ndarray
+    ist_urban: np.ndarray
+    regel: np.ndarray                 # Index in regeln
+    risiko_wert: np.ndarray
+    behalten: np.ndarray              # False = offshore verworfen
+    regeln: List[RisikoRegel]
+
+    def __len__(self) -> int:
+        return len(self.h3_index)
+
+    def risiko_kategorie(self, i: int) -> str:
+        return self.regeln[self.regel[i]].kategorie
+
+    def risiko_gruende(self, i: int) -> List[str]:
+        return self.regeln[self.regel[i]].gruende(float(self.hoehe_meter[i]))
+
+
+def haversine_km(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: float, lon2: float
+) -> np.ndarray:
+    """Haversine-Formel (vektorisiert) in km"""
+    dlat = np.radians(lat2 - lat1)
+    dlon = np.radians(lon2 - lon1)
+    a = (np.sin(dlat / 2) ** 2 +
+         np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) *
+         np.sin(dlon / 2) ** 2)
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return ERDRADIUS_KM * c
+
+
+def schnelle_hoehe_schaetzung(
+    lat: np.ndarray, kuestenentfernung: np.ndarray, ist_wasser: np.ndarray
+) -> np.ndarray:
+    """Vektorisierte Variante von _schnelle_hoehe_schaetzung"""
+    return np.select(
+        [
+            ist_wasser,
+            kuestenentfernung < 1,
+            kuestenentfernung < 5,
+            kuestenentfernung < 20,
+        ],
+        [
+            0.0,
+            2.0,
+            5.0 + kuestenentfernung,
+            10.0 + kuestenentfernung * 2,
+        ],
+        default=50.0 + np.abs(lat) * 0.5,
+    )
+
+
+def _konstant(*gruende: str) -> Callable[[float], List[str]]:
+    return lambda hoehe: list(gruende)
+
+
+def risiko_regeln(
+    stadt_typ: str,
+    llm_forecast: Dict,
+    hoehe: np.ndarray,
+    ist_urban: np.ndarray,
+    entfernung_km: np.ndarray,
+) -> Tuple[List[np.ndarray], List[RisikoRegel]]:
+    """Bedingungen + Regeln analog zu _berechne_risiko (ohne Wasser-Zweig)"""
+    llm = llm_forecast or {}
+    temp_change = llm.get('temperature_change', {}).get('expected', 1.0)
+    sea_level = llm.get('sea_level_rise', {})
+    sea_level_mm = sea_level.get('expected', 3.0) if sea_level else 3.0
+    trend = llm.get('trend_2024_2026', 'stabil')
+    risk_mult = 1.15 if trend == 'steigend' else (0.9 if trend == 'fallend' else 1.0)
+
+    if stadt_typ == 'coastal':
+        def kritisch(h: float) -> List[str]:
+            gruende = [
+                f'Höhe nur {h:.1f}m über Meeresspiegel',
+                f'🌊 Meeresspiegel +{sea_level_mm:.1f}mm/Jahr (IPCC)',
+            ]
+            if temp_change > 1.0:
+                gruende.append(f'🌡️ Erwärmung +{temp_change:.1f}°C bis 2026')
+            return gruende
+
+        return (
+            [hoehe < 2, hoehe < 5, hoehe < 15],
+            [
+                RisikoRegel('KRITISCH_KUESTENFLUT', min(0.98, 0.92 * risk_mult), kritisch),
+                RisikoRegel('HOCH_UEBERSCHWEMMUNG', 0.72, lambda h: [
+                    f'Niedrige Höhe: {h:.1f}m',
+                    'Überschwemmungsgefahr bei Starkregen',
+                ]),
+                RisikoRegel('MITTEL_RISIKO', 0.45, _konstant('Moderate Höhenlage')),
+                RisikoRegel('NIEDRIG_RISIKO', 0.25, _konstant('Erhöhte Lage - geringeres Küstenrisiko')),
+            ],
+        )
+
+    if stadt_typ == 'arid':
+        return (
+            [entfernung_km < 3, entfernung_km < 10],
+            [
+                RisikoRegel('HITZE_EXTREM', 0.85, _konstant(
+                    'Urbane Wärmeinsel', 'Extreme Hitzebelastung im Sommer')),
+                RisikoRegel('DUERRE', 0.65, _konstant('Hoher Wasserstress')),
+                RisikoRegel('MITTEL_RISIKO', 0.40, _konstant('Randgebiet mit moderatem Stress')),
+            ],
+        )
+
+    if stadt_typ == 'conflict':
+        return (
+            [entfernung_km < 5, entfernung_km < 15],
+            [
+                RisikoRegel('KONFLIKT', 0.95, _konstant(
+                    'Aktive Kampfhandlungen', 'Kritische Infrastrukturschäden')),
+                RisikoRegel('KONFLIKT', 0.80, _konstant('Hohe Instabilität')),
+                RisikoRegel('MITTEL_RISIKO', 0.55, _konstant('Pufferzone')),
+            ],
+        )
+
+    if stadt_typ == 'seismic':
+        return (
+            [entfernung_km < 5],
+            [
+                RisikoRegel('SEISMISCH', 0.70, _konstant('Nähe zu tektonischer Aktivität')),
+                RisikoRegel('MITTEL_RISIKO', 0.45, _konstant('Moderate seismische Gefährdung')),
+            ],
+        )
+
+    if stadt_typ == 'tropical':
+        return (
+            [hoehe < 5],
+            [
+                RisikoRegel('HOCH_UEBERSCHWEMMUNG', 0.68, _konstant('Überschwemmungsgefahr (Monsun)')),
+                RisikoRegel('MITTEL_RISIKO', 0.42, _konstant('Moderate tropische Risiken')),
+            ],
+        )
+
+    # Gemäßigt (default)
+    return (
+        [ist_urban & (entfernung_km < 5)],
+        [
+            RisikoRegel('MITTEL_RISIKO', 0.38, _konstant('Urbane Wärmeinsel')),
+            RisikoRegel('NIEDRIG_RISIKO', 0.22, _konstant('Gemäßigtes Klima - gute Resilienz')),
+        ],
+    )
+
+
+WASSER_REGEL = RisikoRegel('WASSER', 0.0, _konstant('Wasserfläche'))
+
+
+class BatchZellenAnalyse:
+    """Analysiert komplette Hexagon-Sätze in einem Durchlauf"""
+
+    def __init__(self, topo: TopographyService = None):
+        self.topo = topo or TopographyService()
+
+    def zentren(self, hexagons: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Zellzentren als (lat, lon)-Arrays"""
+        if not hexagons:
+            return np.empty(0), np.empty(0)
+        coords = np.array([h3_compat.cell_to_latlng(h) for h in hexagons], dtype=np.float64)
+        return coords[:, 0], coords[:, 1]
+
+    def kuestendistanz(
+        self, lat: np.ndarray, lon: np.ndarray, ist_wasser: np.ndarray
+    ) -> np.ndarray:
+        """Vorzeichenbehaftete Küstendistanz in km (Array-Lookup im Küsten-Index).
+
+        Das Vorzeichen folgt ist_wasser wie in _approx_coast_distance_km.
+        """
+        dist = np.abs(self.topo.coast_distance_many(lat, lon)).astype(np.float64)
+        return np.where(ist_wasser, -dist, dist)
+
+    def geografie(self, hexagons: List[str]) -> ZellGeografie:
+        """Ortsfeste Eingaben ohne Cache und ohne DEM (nur Höhenschätzung)"""
+        lat, lon = self.zentren(hexagons)
+        ist_wasser = self.topo.is_ocean_many(lat, lon)
+        return ZellGeografie(
+            lat, lon, ist_wasser,
+            self.kuestendistanz(lat, lon, ist_wasser),
+            np.full(len(lat), np.nan),
+        )
+
+    def analysiere(
+        self,
+        hexagons: List[str],
+        stadt_lat: float,
+        stadt_lon: float,
+        stadt_typ: str,
+        llm_forecast: Dict = None,
+        geografie: Optional[ZellGeografie] = None,
+    ) -> ZellenBatch:
+        """Analysiert alle Zellen auf einmal (gleiche Semantik wie _analysiere_zelle).
+
+        geografie: bereits bekannte ortsfeste Eingaben (sonst self.geografie)
+        """
+        hexagons = list(hexagons)
+        geo = geografie if geografie is not None else self.geografie(hexagons)
+        lat, lon = geo.lat, geo.lon
+        ist_wasser = geo.ist_wasser
+        kuestenentfernung = geo.kuestenentfernung_km
+
+        entfernung_km = haversine_km(lat, lon, stadt_lat, stadt_lon)
+
+        behalten = ~(ist_wasser & (np.abs(kuestenentfernung) > MAX_OFFSHORE_KM))
+
+        hoehe = schnelle_hoehe_schaetzung(lat, kuestenentfernung, ist_wasser)
+        hoehe = np.where(np.isfinite(geo.hoehe_dem) & ~ist_wasser, geo.hoehe_dem, hoehe)
+        ist_urban = (entfernung_km < 8) & ~ist_wasser
+
+        bedingungen, regeln = risiko_regeln(
+            stadt_typ, llm_forecast, hoehe, ist_urban, entfernung_km
+        )
+        # Regel 0 = Wasser, danach die stadt_typ-Zweige in Prüfreihenfolge
+        regeln = [WASSER_REGEL] + regeln
+        regel = np.select(
+            [ist_wasser] + bedingungen,
+            list(range(len(bedingungen) + 1)),
+            default=len(regeln) - 1,
+        )
+        werte = np.array([r.wert for r in regeln])
+
+        return ZellenBatch(
+            h3_index=hexagons,
+            lat=lat,
+            lon=lon,
+            entfernung_km=entfernung_km,
+            ist_wasser=ist_wasser,
+            kuestenentfernung_km=kuestenentfernung,
+            hoehe_meter=hoehe,
+            ist_urban=ist_urban,
+            regel=regel,
+            risiko_wert=werte[regel],
+            behalten=behalten,
+            regeln=regeln,
+        )
@@ -0,0 +1,172 @@
+"""
+TERA Zellzustands-Cache (hierarchisch)
+======================================
+Merkt sich die ortsfesten Eingaben jeder bewerteten H3-Zelle (Zentrum,
+Land/Meer, Küstendistanz, DEM-Höhe). Sie hängen weder vom Stadtzentrum
+noch vom Stadttyp ab und gelten damit über Pans, Zooms und Anfragen hinweg;
+nur die (billige) Risikobewertung wird pro Anfrage neu gerechnet.
+
+Fehlende Zellen werden aus ihren Nachbarn in der Hierarchie abgeleitet:
+- Zentrums-Kind und Elternzelle teilen denselben Mittelpunkt -> alle Werte
+  werden übernommen (Zoom rein und raus)
+- liegt der Elternmittelpunkt weiter von der Küste entfernt als die
+  Zelle groß ist, haben alle Kinder dieselbe Land/Meer-Klasse; weit
+  draußen auf See genügt die Schranke |d_eltern| - r auch für den
+  Offshore-Schnitt (keine Küsten- und DEM-Abfrage)
+- DEM-Höhen werden nur für Landzellen abgefragt; fehlt die Kachel (z.B.
+  offline), wird die Höhe bei der nächsten Anfrage erneut versucht
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from services import h3_compat
+from services.batch_tessellation import MAX_OFFSHORE_KM, BatchZellenAnalyse, ZellGeografie
+
+
+# ~250 B pro Zelle
+MAX_ZELLEN = 250_000
+
+# Zuschlag auf die Zellgröße: Formverzerrung der H3-Zellen + Rasterfehler
+# des Küsten-Index (~1 km Pixel)
+RADIUS_FAKTOR = 1.5
+RASTER_TOLERANZ_KM = 2.0
+
+# (lat, lon, ist_wasser, kuestenentfernung_km, hoehe_dem)
+Zustand = Tuple[float, float, bool, float, float]
+
+
+def eltern_radius_km(res: int) -> float:
+    """Obere Schranke für den Abstand eines Kind-Mittelpunkts vom Eltern-Mittelpunkt"""
+    return RADIUS_FAKTOR * h3_compat.edge_length_km(res) + RASTER_TOLERANZ_KM
+
+
+class ZellZustandCache:
+    """LRU der ortsfesten Zelleingaben mit Ableitung aus Eltern- und Kindzellen"""
+
+    def __init__(self, max_zellen: int = MAX_ZELLEN):
+        self.max_zellen = max_zellen
+        self._zellen: "OrderedDict[str, Zustand]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'treffer': 0, 'zentrum_kopiert': 0, 'klasse_geerbt': 0,
+            'offshore_geerbt': 0, 'berechnet': 0,
+        }
+
+    def _get(self, h3_index: str) -> Optional[Zustand]:
+        zustand = self._zellen.get(h3_index)
+        if zustand is not None:
+            self._zellen.move_to_end(h3_index)
+        return zustand
+
+    def _put_many(self, eintraege: Dict[str, Zustand]) -> None:
+        with self._lock:
+            self._zellen.update(eintraege)
+            for h3_index in eintraege:
+                self._zellen.move_to_end(h3_index)
+            while len(self._zellen) > self.max_zellen:
+                self._zellen.popitem(last=False)
+
+    async def geografie(
+        self, hexagons: List[str], analyse: BatchZellenAnalyse, dem_zoom: int
+    ) -> ZellGeografie:
+        """Ortsfeste Eingaben für hexagons; berechnet nur, was nicht ableitbar ist."""
+        n = len(hexagons)
+        lat = np.empty(n)
+        lon = np.empty(n)
+        wasser = np.zeros(n, dtype=bool)
+        kueste = np.full(n, np.nan)
+        dem = np.full(n, np.nan)
+
+        offen: List[int] = []
+        with self._lock:
+            for i, h in enumerate(hexagons):
+                zustand = self._get(h)
+                if zustand is None:
+                    offen.append(i)
+                else:
+                    lat[i], lon[i], wasser[i], kueste[i], dem[i] = zustand
+            self.stats['treffer'] += n - len(offen)
+
+        idx = np.array(offen, dtype=np.int64)
+        lat[idx], lon[idx] = analyse.zentren([hexagons[i] for i in offen])
+
+        # Ableitung aus der Hierarchie
+        klasse_bekannt = np.zeros(n, dtype=bool)
+        kueste_bekannt = np.zeros(n, dtype=bool)
+        with self._lock:
+            for i in offen:
+                h = hexagons[i]
+                res = h3_compat.get_resolution(h)
+                eltern = h3_compat.cell_to_parent(h, res - 1) if res > 0 else None
+                zentrum = None
+                if eltern is not None and h3_compat.cell_to_center_child(eltern, res) == h:
+                    zentrum = self._get(eltern)
+                if zentrum is None and res < 15:
+                    zentrum = self._get(h3_compat.cell_to_center_child(h, res + 1))
+                if zentrum is not None:
+                    # Gleicher Mittelpunkt: Land/Meer, Küstendistanz und DEM-Pixel identisch
+                    _, _, wasser[i], kueste[i], dem[i] = zentrum
+                    klasse_bekannt[i] = kueste_bekannt[i] = True
+                    self.stats['zentrum_kopiert'] += 1
+                    continue
+
+                zustand = self._get(eltern) if eltern is not None else None
+                if zustand is None:
+                    continue
+                schranke = abs(zustand[3]) - eltern_radius_km(res - 1)
+                if schranke <= 0:
+                    continue
+                # Keine Küste im Umkreis des Elternteils -> gleiche Klasse für alle Kinder
+                wasser[i] = zustand[2]
+                klasse_bekannt[i] = True
+                self.stats['klasse_geerbt'] += 1
+                if wasser[i] and schranke > MAX_OFFSHORE_KM:
+                    # Sicher jenseits des Offshore-Schnitts: die Schranke reicht
+                    kueste[i] = -schranke
+                    kueste_bekannt[i] = True
+                    self.stats['offshore_geerbt'] += 1
+
+        rest = idx[~klasse_bekannt[idx]]
+        if len(rest):
+            wasser[rest] = analyse.topo.is_ocean_many(lat[rest], lon[rest])
+        rest = idx[~kueste_bekannt[idx]]
+        if len(rest):
+            kueste[rest] = analyse.kuestendistanz(lat[rest], lon[rest], wasser[rest])
+        self.stats['berechnet'] += len(offen)
+
+        # DEM nur für Land (auf Wasser gilt ohnehin die Schätzung 0 m), auch für
+        # gecachte Landzellen, deren Kachel zuletzt nicht verfügbar war
+        rest = np.flatnonzero(~wasser & np.isnan(dem))
+        if len(rest):
+            dem[rest] = await analyse.topo.elevations_m(lat[rest], lon[rest], zoom=dem_zoom)
+
+        neu = set(offen).union(rest[np.isfinite(dem[rest])].tolist())
+        if neu:
+            self._put_many({
+                hexagons[i]: (float(lat[i]), float(lon[i]), bool(wasser[i]), float(kueste[i]), float(dem[i]))
+                for i in neu
+            })
+        return ZellGeografie(lat, lon, wasser, kueste, dem)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, 'zellen': len(self._zellen)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._zellen.clear()
+
+
+_cache: Optional[ZellZustandCache] = None
+
+
+def get_zell_zustand_cache() -> ZellZustandCache:
+    """Prozessweit geteilte Instanz."""
+    global _cache
+    if _cache is None:
+        _cache = ZellZustandCache()
+    return _cache
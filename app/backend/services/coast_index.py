@@ -0,0 +1,155 @@
+"""TERA Küstendistanz-Index
+
+Vorberechneter, vorzeichenbehafteter Abstand zur Küstenlinie auf dem
+Raster von global_land_mask (1/120°, ~1 km):
+- positiv = Land -> km bis Meer
+- negativ = Meer -> -km bis Land
+
+Das globale Raster wird kachelweise (1° x 1°) beim ersten Zugriff per
+Euklidischer Distanztransformation aufgebaut, als .npy auf Disk abgelegt
+und danach memory-mapped wiederverwendet. Danach ist jede Abfrage (Punkt
+oder Batch) ein reiner Array-Zugriff statt einer Ring-Suche mit
+hunderten is_ocean-Aufrufen.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from global_land_mask import globe
+from scipy.ndimage import distance_transform_edt
+
+
+# Maximal gespeicherte Distanz (km); weiter entfernte Punkte werden gekappt
+MAX_DISTANCE_KM = 100.0
+
+# Kachelgröße in Pixeln (120 px = 1° auf dem global_land_mask-Raster)
+TILE_PX = 120
+
+# Obergrenze für den Längen-Halo nahe der Pole (Pixel)
+MAX_LON_HALO_PX = 1080
+
+_MASK = globe._mask  # True = Meer
+_ROWS, _COLS = _MASK.shape
+_PX_DEG = abs(float(globe._lat[1] - globe._lat[0]))
+_PX_KM = _PX_DEG * 111.32
+_TILES_X = math.ceil(_COLS / TILE_PX)
+
+
+class CoastDistanceIndex:
+    """Kachelbasierter, memory-mapped Küstendistanz-Index"""
+
+    def __init__(self, cache_dir: Optional[str] = None, mem_tiles_max: int = 2048):
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser("~"), ".tera_cache", "coast_index")
+        self.cache_dir = Path(cache_dir)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except Exception:
+            import tempfile
+            self.cache_dir = Path(tempfile.gettempdir()) / "tera_coast_index"
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._mem_tiles_max = mem_tiles_max
+        self._tiles: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def distance_km(self, lat: float, lon: float) -> float:
+        return float(self.distance_many(np.array([lat]), np.array([lon]))[0])
+
+    def distance_many(self, lats, lons) -> np.ndarray:
+        """Vorzeichenbehaftete Küstendistanz (km) für viele Punkte."""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        out = np.empty(lats.shape, dtype=np.float32)
+        if lats.size == 0:
+            return out
+
+        rows = globe.lat_to_index(lats).ravel()
+        cols = globe.lon_to_index(lons).ravel()
+        keys = (rows // TILE_PX) * _TILES_X + cols // TILE_PX
+
+        flat = out.ravel()
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+        for start, end in zip(starts, ends):
+            sel = order[start:end]
+            tile = self._tile(int(sorted_keys[start]))
+            flat[sel] = tile[rows[sel] % TILE_PX, cols[sel] % TILE_PX]
+        return out
+
+    def _tile(self, key: int) -> np.ndarray:
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+                return tile
+
+        path = self.cache_dir / f"coast_{key}.npy"
+        tile = None
+        if path.exists():
+            try:
+                tile = np.load(path, mmap_mode="r")
+            except Exception:
+                path.unlink(missing_ok=True)
+        if tile is None:
+            tile = self._build_tile(key)
+            try:
+                tmp = path.with_suffix(".tmp.npy")
+                np.save(tmp, tile)
+                os.replace(tmp, path)
+            except Exception:
+                pass
+
+        with self._lock:
+            self._tiles[key] = tile
+            if len(self._tiles) > self._mem_tiles_max:
+                self._tiles.popitem(last=False)
+        return tile
+
+    def _build_tile(self, key: int) -> np.ndarray:
+        ty, tx = divmod(key, _TILES_X)
+        r0, c0 = ty * TILE_PX, tx * TILE_PX
+
+        # Halo, damit Küsten außerhalb der Kachel mitzählen
+        halo_y = math.ceil(MAX_DISTANCE_KM / _PX_KM)
+        lat_edge = min(89.0, max(abs(90.0 - r0 * _PX_DEG), abs(90.0 - (r0 + TILE_PX) * _PX_DEG)))
+        cos_lat = math.cos(math.radians(lat_edge))
+        halo_x = min(MAX_LON_HALO_PX, math.ceil(halo_y / max(cos_lat, 1e-6)))
+
+        r_lo, r_hi = max(0, r0 - halo_y), min(_ROWS, r0 + TILE_PX + halo_y)
+        cols = np.arange(c0 - halo_x, c0 + TILE_PX + halo_x) % _COLS  # Datumsgrenze
+        ocean = np.take(_MASK[r_lo:r_hi], cols, axis=1)
+
+        if ocean.all():
+            signed = np.full(ocean.shape, -MAX_DISTANCE_KM)
+        elif not ocean.any():
+            signed = np.full(ocean.shape, MAX_DISTANCE_KM)
+        else:
+            tile_lat = 90.0 - (r0 + TILE_PX / 2) * _PX_DEG
+            sampling = (_PX_KM, _PX_KM * max(math.cos(math.radians(tile_lat)), 1e-3))
+            land_dist = distance_transform_edt(~ocean, sampling=sampling)
+            ocean_dist = distance_transform_edt(ocean, sampling=sampling)
+            signed = np.where(ocean, -ocean_dist, land_dist)
+            np.clip(signed, -MAX_DISTANCE_KM, MAX_DISTANCE_KM, out=signed)
+
+        y0, x0 = r0 - r_lo, halo_x
+        return signed[y0:y0 + TILE_PX, x0:x0 + TILE_PX].astype(np.float32)
+
+
+_index: Optional[CoastDistanceIndex] = None
+
+
+def get_coast_index() -> CoastDistanceIndex:
+    """Prozessweit geteilter Index (alle TopographyService-Instanzen)."""
+    global _index
+    if _index is None:
+        _index = CoastDistanceIndex()
+    return _index
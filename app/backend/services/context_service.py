@@ -2,7 +2,6 @@
 Context Service - RAG-based LLM Inference for Risk Analysis
 """
 import asyncio
-import httpx
 import h3
 import json
 import re
@@ -10,6 +9,7 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 from loguru import logger
+from services.ollama_client import OllamaClient
 
 
 @dataclass
@@ -41,6 +41,7 @@ class ContextService:
         self.ollama_url = ollama_url
         self.model = model
         self.vector_store = vector_store
+        self.llm = OllamaClient(base_url=ollama_url, model=model)
     
     async def analyze_location(
         self,
@@ -107,33 +108,26 @@ Return JSON:
 Output ONLY valid JSON, no markdown."""
 
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
-                response = await client.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={"model": self.model, "prompt": prompt, "stream": False}
-                )
-                response.raise_for_status()
-                result = response.json()
+            # No options: model defaults as before
+            llm_text = await self.llm.generate(prompt, options={}, timeout=120.0)
+            
+            # Clean and parse JSON
+            llm_text = llm_text.strip()
+            if llm_text.startswith("```"):
+                llm_text = re.sub(r'^```\w*\n?', '', llm_text)
+                llm_text = re.sub(r'\n?```$', '', llm_text)
+            
+            try:
+                return json.loads(llm_text)
+            except json.JSONDecodeError:
+                match = re.search(r'\{[^{}]*\}', llm_text, re.DOTALL)
+                if match:
+                    try:
+                        return json.loads(match.group())
+                    except:
+                        pass
+                return {"summary": llm_text[:500], "climate_score": 50, "conflict_score": 30, "drivers": ["Analysis in progress"]}
                 
-                llm_text = result.get("response", "{}")
-                
-                # Clean and parse JSON
-                llm_text = llm_text.strip()
-                if llm_text.startswith("```"):
-                    llm_text = re.sub(r'^```\w*\n?', '', llm_text)
-                    llm_text = re.sub(r'\n?```$', '', llm_text)
-                
-                try:
-                    return json.loads(llm_text)
-                except json.JSONDecodeError:
-                    match = re.search(r'\{[^{}]*\}', llm_text, re.DOTALL)
-                    if match:
-                        try:
-                            return json.loads(match.group())
-                        except:
-                            pass
-                    return {"summary": llm_text[:500], "climate_score": 50, "conflict_score": 30, "drivers": ["Analysis in progress"]}
-                    
         except Exception as e:
             logger.error(f"LLM error: {e}")
             return {
@@ -4,7 +4,6 @@ Ocean currents, waves, and marine data from CMEMS.
 Requires API key for full access.
 """
 
-import httpx
 import asyncio
 import os
 from datetime import datetime, timedelta
@@ -7,9 +7,11 @@ import asyncio
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
-import httpx
 from loguru import logger
 
+from services.seismic_catalog import CatalogNotReady, get_seismic_catalog
+from services.http_clients import pooled_client
+
 # API Keys & Tokens
 ACLED_EMAIL = "jworlds1@example.com"  # Placeholder - needs real credentials
 ACLED_PASSWORD = ""  # Will be set via env
@@ -57,7 +59,7 @@ class DataFusionHub:
     
     def __init__(self):
         self.cache = {}
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = pooled_client(timeout=30.0)
         
     async def fuse_for_location(self, lat: float, lon: float, city: str = "") -> FusedDataPoint:
         """Fusioniert alle verfügbaren Daten für eine Koordinate"""
@@ -146,8 +148,31 @@ class DataFusionHub:
             logger.warning(f"NOAA SST fetch error: {e}")
             return {'sst': None}
     
+    @staticmethod
+    def _seismic_risk_from_magnitudes(magnitudes) -> float:
+        """Risiko aus den jüngsten 20 Beben (Magnitude quadratisch gewichtet)"""
+        total_risk = 0
+        for mag in list(magnitudes)[:20]:
+            # Exponentielles Risiko mit Magnitude
+            total_risk += (float(mag or 0) ** 2) / 100
+        return min(1.0, total_risk)
+    
     async def _fetch_usgs_seismic(self, lat: float, lon: float) -> Dict:
-        """USGS Erdbebendaten abrufen"""
+        """USGS Erdbebendaten abrufen (lokaler Katalog, sonst direkte Abfrage)"""
+        try:
+            # Letzte 30 Tage, 300km Radius, jüngste 50 Beben (wie FDSN-Default)
+            stats = await get_seismic_catalog().query(lat, lon, 300, days=30, limit=50)
+            if not stats.count:
+                return {'risk': 0.05, 'count': 0}
+            return {
+                'risk': self._seismic_risk_from_magnitudes(stats.magnitudes),
+                'count': stats.count,
+            }
+        except CatalogNotReady:
+            pass
+        except Exception as e:
+            logger.warning(f"Seismic catalog error: {e}")
+        
         try:
             # USGS Earthquake API - letzte 30 Tage, 300km Radius
             url = (
@@ -165,13 +190,9 @@ class DataFusionHub:
                     return {'risk': 0.05, 'count': 0}
                 
                 # Berechne Risiko basierend auf Magnitude und Entfernung
-                total_risk = 0
-                for eq in features[:20]:
-                    mag = eq['properties'].get('mag', 0) or 0
-                    # Exponentielles Risiko mit Magnitude
-                    total_risk += (mag ** 2) / 100
-                
-                risk = min(1.0, total_risk)
+                risk = self._seismic_risk_from_magnitudes(
+                    eq['properties'].get('mag', 0) for eq in features
+                )
                 return {'risk': risk, 'count': len(features)}
             
             return {'risk': 0.05, 'count': 0}
@@ -0,0 +1,279 @@
+"""TERA DEM-Kachelspeicher (Terrarium)
+
+Höhenkacheln (AWS Terrain Tiles, Terrarium-Kodierung) werden genau einmal
+dekodiert: PNG -> float32-Höhenraster (256 x 256, Meter), als .npy auf Disk
+abgelegt und danach memory-mapped wiederverwendet.
+
+- LRU im Speicher mit Byte-Budget (statt fester Kachelanzahl)
+- elevations_m(lats, lons): Punkte werden nach Kachel gruppiert, fehlende
+  Kacheln parallel geladen; gleichzeitige Anfragen derselben Kachel teilen
+  sich einen Download
+- nicht ladbare Kacheln werden kurz gemerkt (kein Timeout pro Zelle)
+- vorhandene terrarium_*.png aus dem alten Cache werden übernommen
+"""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import io
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from loguru import logger
+from PIL import Image
+
+from services.http_clients import pooled_client
+
+
+TERRARIUM_URL = "https://s3.amazonaws.com/elevation-tiles-prod/terrarium/{z}/{x}/{y}.png"
+
+TILE_PX = 256
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".tera_cache", "elevation_cache")
+
+# Speicherbudget für dekodierte Kacheln (float32: 256 KiB pro Kachel)
+MEM_BUDGET_BYTES = 128 * 1024 * 1024
+
+# Gleichzeitige Kachel-Downloads pro elevations_m-Aufruf
+MAX_PARALLEL_DOWNLOADS = 8
+
+# Fehlgeschlagene Kacheln so lange nicht erneut anfragen
+FEHLER_TTL_S = 300.0
+
+TileKey = Tuple[int, int, int]  # (zoom, x, y)
+
+
+def decode_terrarium_array(rgb: np.ndarray) -> np.ndarray:
+    """RGB-Raster (H, W, 3, uint8) -> Höhe in m: (R*256 + G + B/256) - 32768"""
+    rgb = rgb.astype(np.float32)
+    return rgb[..., 0] * 256.0 + rgb[..., 1] + rgb[..., 2] / 256.0 - 32768.0
+
+
+def tile_pixel_indices(lats, lons, zoom: int):
+    """Kachel- und Pixelindizes (Web-Mercator) für viele Punkte"""
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    n = 2 ** zoom
+    x = (lons + 180.0) / 360.0 * n
+    y = (1.0 - np.arcsinh(np.tan(np.radians(lats))) / math.pi) / 2.0 * n
+    xtile = np.clip(np.floor(x), 0, n - 1).astype(np.int64)
+    ytile = np.clip(np.floor(y), 0, n - 1).astype(np.int64)
+    px = np.clip(((x - xtile) * TILE_PX).astype(np.int64), 0, TILE_PX - 1)
+    py = np.clip(((y - ytile) * TILE_PX).astype(np.int64), 0, TILE_PX - 1)
+    return xtile, ytile, px, py
+
+
+class DemTileStore:
+    """Dekodierte Terrarium-Kacheln: Byte-LRU + .npy auf Disk + deduplizierte Downloads"""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        mem_budget_bytes: int = MEM_BUDGET_BYTES,
+        http_timeout_s: float = 8.0,
+    ):
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        except Exception:
+            import tempfile
+            self.cache_dir = Path(tempfile.gettempdir()) / "tera_elevation_cache"
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.mem_budget_bytes = mem_budget_bytes
+        self.timeout = http_timeout_s
+
+        self._tiles: "OrderedDict[TileKey, np.ndarray]" = OrderedDict()
+        self._mem_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[TileKey, asyncio.Task] = {}
+        self._fehler: Dict[TileKey, float] = {}
+        self.stats = {'mem_hits': 0, 'disk_hits': 0, 'downloads': 0, 'failures': 0}
+
+    # ------------------------------------------------------------------
+    # Speicher
+    # ------------------------------------------------------------------
+
+    def _name(self, key: TileKey) -> str:
+        z, x, y = key
+        return f"terrarium_z{z}_x{x}_y{y}"
+
+    def _mem_get(self, key: TileKey) -> Optional[np.ndarray]:
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is not None:
+                self._tiles.move_to_end(key)
+            return tile
+
+    def _mem_put(self, key: TileKey, tile: np.ndarray) -> None:
+        with self._lock:
+            alt = self._tiles.pop(key, None)
+            if alt is not None:
+                self._mem_bytes -= alt.nbytes
+            self._tiles[key] = tile
+            self._mem_bytes += tile.nbytes
+            while self._mem_bytes > self.mem_budget_bytes and len(self._tiles) > 1:
+                _, verdraengt = self._tiles.popitem(last=False)
+                self._mem_bytes -= verdraengt.nbytes
+
+    def _speichere(self, key: TileKey, tile: np.ndarray) -> np.ndarray:
+        path = self.cache_dir / f"{self._name(key)}.npy"
+        try:
+            tmp = path.with_suffix(".tmp.npy")
+            np.save(tmp, tile)
+            os.replace(tmp, path)
+            return np.load(path, mmap_mode="r")
+        except Exception:
+            return tile
+
+    def _von_disk(self, key: TileKey) -> Optional[np.ndarray]:
+        npy = self.cache_dir / f"{self._name(key)}.npy"
+        if npy.exists():
+            try:
+                return np.load(npy, mmap_mode="r")
+            except Exception:
+                npy.unlink(missing_ok=True)
+
+        # Alter PNG-Cache von TopographyService: einmalig dekodieren
+        png = self.cache_dir / f"{self._name(key)}.png"
+        if png.exists():
+            try:
+                return self._speichere(key, self._dekodiere(png.read_bytes()))
+            except Exception:
+                png.unlink(missing_ok=True)
+        return None
+
+    @staticmethod
+    def _dekodiere(png_bytes: bytes) -> np.ndarray:
+        with Image.open(io.BytesIO(png_bytes)) as img:
+            return decode_terrarium_array(np.asarray(img.convert("RGB")))
+
+    def tile_cached(self, key: TileKey) -> Optional[np.ndarray]:
+        """Kachel aus Speicher oder Disk (ohne Netzwerk)"""
+        tile = self._mem_get(key)
+        if tile is not None:
+            self.stats['mem_hits'] += 1
+            return tile
+        tile = self._von_disk(key)
+        if tile is not None:
+            self.stats['disk_hits'] += 1
+            self._mem_put(key, tile)
+        return tile
+
+    # ------------------------------------------------------------------
+    # Laden
+    # ------------------------------------------------------------------
+
+    async def tile(self, key: TileKey) -> Optional[np.ndarray]:
+        """Höhenraster einer Kachel; None wenn nicht ladbar."""
+        tile = self.tile_cached(key)
+        if tile is not None:
+            return tile
+
+        fehler_seit = self._fehler.get(key)
+        if fehler_seit is not None and time.monotonic() - fehler_seit < FEHLER_TTL_S:
+            return None
+
+        # Single-flight: gleichzeitige Anfragen derselben Kachel teilen den Download
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._lade(key))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: TileKey, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _lade(self, key: TileKey) -> Optional[np.ndarray]:
+        z, x, y = key
+        try:
+            async with pooled_client(timeout=self.timeout) as client:
+                r = await client.get(TERRARIUM_URL.format(z=z, x=x, y=y))
+                r.raise_for_status()
+            tile = self._speichere(key, self._dekodiere(r.content))
+        except Exception as e:
+            self.stats['failures'] += 1
+            self._fehler[key] = time.monotonic()
+            logger.debug(f"DEM-Kachel {self._name(key)} nicht verfügbar: {e}")
+            return None
+        self.stats['downloads'] += 1
+        self._fehler.pop(key, None)
+        self._mem_put(key, tile)
+        return tile
+
+    # ------------------------------------------------------------------
+    # Abfragen
+    # ------------------------------------------------------------------
+
+    async def elevations_m(self, lats, lons, zoom: int = 12) -> np.ndarray:
+        """Höhe (m) für viele Punkte; NaN wo keine Kachel verfügbar ist."""
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        out = np.full(lats.shape, np.nan, dtype=np.float64)
+        if lats.size == 0:
+            return out
+
+        xtile, ytile, px, py = tile_pixel_indices(lats.ravel(), lons.ravel(), zoom)
+        keys = xtile * (2 ** zoom) + ytile
+
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        ends = np.r_[starts[1:], len(order)]
+        gruppen = [
+            ((zoom, int(xtile[order[s]]), int(ytile[order[s]])), order[s:e])
+            for s, e in zip(starts, ends)
+        ]
+
+        kacheln: Dict[TileKey, Optional[np.ndarray]] = {}
+        fehlend = []
+        for key, _ in gruppen:
+            tile = self.tile_cached(key)
+            if tile is None:
+                fehlend.append(key)
+            kacheln[key] = tile
+
+        if fehlend:
+            sem = asyncio.Semaphore(MAX_PARALLEL_DOWNLOADS)
+
+            async def begrenzt(key: TileKey):
+                async with sem:
+                    return await self.tile(key)
+
+            for key, tile in zip(fehlend, await asyncio.gather(*(begrenzt(k) for k in fehlend))):
+                kacheln[key] = tile
+
+        flat = out.ravel()
+        for key, sel in gruppen:
+            tile = kacheln[key]
+            if tile is not None:
+                flat[sel] = tile[py[sel], px[sel]]
+        return out
+
+    async def elevation_m(self, lat: float, lon: float, zoom: int = 12) -> Optional[float]:
+        wert = float((await self.elevations_m(np.array([lat]), np.array([lon]), zoom))[0])
+        return None if math.isnan(wert) else wert
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.stats, 'mem_tiles': len(self._tiles), 'mem_bytes': self._mem_bytes}
+
+
+_stores: Dict[str, DemTileStore] = {}
+
+
+def get_dem_tile_store(cache_dir: Optional[str] = None) -> DemTileStore:
+    """Prozessweit geteilter Speicher pro Cache-Verzeichnis."""
+    key = str(cache_dir or DEFAULT_CACHE_DIR)
+    if key not in _stores:
+        _stores[key] = DemTileStore(key)
+    return _stores[key]
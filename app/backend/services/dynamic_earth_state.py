@@ -4,7 +4,11 @@ Echtzeit-Erddaten mit minimalem Storage
 
 Prinzip:
 - Daten werden ON-DEMAND von APIs abgerufen
-- Redis cached kurzfristig (1-6h TTL)
+- Redis cached kurzfristig (TTL pro Provider, 10min-6h), davor ein
+  begrenzter LRU im Prozess; veraltete Einträge werden sofort geliefert und
+  im Hintergrund erneuert (stale-while-revalidate), gleichzeitige Abrufe
+  derselben Zelle teilen sich einen Upstream-Abruf (Single-Flight, über
+  Worker hinweg per Redis-Lock)
 - PostgreSQL speichert nur Tages-Aggregate
 - H3 als universeller Spatial Index
 
@@ -15,15 +19,21 @@ Quellen:
 - FIRMS: Feuer (NRT)
 """
 import asyncio
-import httpx
+import csv
+import io
 import h3
 import json
-import hashlib
+import time
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, Callable, Awaitable
 from dataclasses import dataclass, asdict, field
 from abc import ABC, abstractmethod
+import msgpack
+import numpy as np
 from loguru import logger
+from services.http_clients import pooled_client
 
 
 # =====================================================
@@ -33,10 +43,14 @@ from loguru import logger
 @dataclass
 class CacheConfig:
     """Cache-Konfiguration"""
-    redis_url: str = "redis://localhost:6379/0"
+    redis_url: Optional[str] = "redis://localhost:6379/0"  # None = nur LRU im Prozess
     default_ttl_seconds: int = 3600  # 1 Stunde
     weather_ttl_seconds: int = 600   # 10 Minuten
     satellite_ttl_seconds: int = 21600  # 6 Stunden
+    stale_seconds: int = 600         # So lange nach Ablauf noch ausliefern + erneuern
+    lru_max_entries: int = 10_000    # LRU im Prozess
+    lock_ttl_seconds: int = 30       # Single-Flight-Lock (> längster Provider-Timeout)
+    lock_wait_seconds: float = 35.0  # Warten auf den Abruf eines anderen Workers
 
 
 @dataclass
@@ -75,61 +89,426 @@ class EarthState:
     data_sources: List[str] = field(default_factory=list)
     quality_score: float = 1.0
 
+    def to_msgpack(self) -> bytes:
+        daten = asdict(self)
+        daten["timestamp"] = self.timestamp.isoformat()
+        return msgpack.packb(daten)
+
+    @classmethod
+    def from_msgpack(cls, wert: bytes) -> 'EarthState':
+        daten = msgpack.unpackb(wert)
+        daten["timestamp"] = datetime.fromisoformat(daten["timestamp"])
+        return cls(**daten)
+
 
 # =====================================================
-# CACHE LAYER (Redis-ähnlich, in-memory für Demo)
+# CACHE LAYER (LRU im Prozess -> Redis)
 # =====================================================
 
-class InMemoryCache:
-    """Einfacher In-Memory Cache mit TTL"""
+# Abfrageintervall beim Warten auf den Abruf eines anderen Workers
+LOCK_POLL_SECONDS = 0.05
+
+
+@dataclass
+class CacheEintrag:
+    """Serialisierter Wert mit Frische- und Ablaufgrenze (Epoch-Sekunden)"""
+    wert: bytes
+    frisch_bis: float
+    ablauf: float
+
+    @property
+    def frisch(self) -> bool:
+        return time.time() < self.frisch_bis
+
+    def packen(self) -> bytes:
+        return msgpack.packb((self.frisch_bis, self.ablauf, self.wert))
+
+    @classmethod
+    def entpacken(cls, daten: bytes) -> 'CacheEintrag':
+        frisch_bis, ablauf, wert = msgpack.unpackb(daten)
+        return cls(wert, frisch_bis, ablauf)
+
+    @classmethod
+    def neu(cls, wert: bytes, ttl_seconds: float, stale_seconds: float = 0) -> 'CacheEintrag':
+        jetzt = time.time()
+        return cls(wert, jetzt + ttl_seconds, jetzt + ttl_seconds + stale_seconds)
+
+
+class CacheBackend(ABC):
+    """
+    Cache-Stufe für serialisierte Werte
+
+    Einträge sind ttl Sekunden frisch und werden danach noch stale Sekunden
+    ausgeliefert (der Aufrufer erneuert sie). Locks sind Single-Flight-Locks
+    mit Ablaufzeit; acquire_lock liefert ein Token oder None (belegt).
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CacheEintrag]:
+        pass
+
+    @abstractmethod
+    async def put(self, key: str, eintrag: CacheEintrag):
+        pass
+
+    @abstractmethod
+    async def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    async def acquire_lock(self, key: str, ttl_seconds: float) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    async def release_lock(self, key: str, token: str):
+        pass
+
+    async def set(self, key: str, wert: bytes, ttl_seconds: float, stale_seconds: float = 0):
+        """Setzt Wert mit TTL (+ Zeitfenster für veraltete Auslieferung)"""
+        await self.put(key, CacheEintrag.neu(wert, ttl_seconds, stale_seconds))
+
+    # Batch-Varianten (Redis: ein Roundtrip statt einem pro Key)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[CacheEintrag]]:
+        return [await self.get(key) for key in keys]
+
+    async def put_many(self, eintraege: Dict[str, CacheEintrag]):
+        for key, eintrag in eintraege.items():
+            await self.put(key, eintrag)
+
+    async def set_many(self, werte: Dict[str, bytes], ttl_seconds: float, stale_seconds: float = 0):
+        await self.put_many({
+            key: CacheEintrag.neu(wert, ttl_seconds, stale_seconds) for key, wert in werte.items()
+        })
+
+    async def acquire_locks(self, keys: List[str], ttl_seconds: float) -> List[Optional[str]]:
+        return [await self.acquire_lock(key, ttl_seconds) for key in keys]
+
+    async def release_locks(self, tokens: Dict[str, str]):
+        for key, token in tokens.items():
+            await self.release_lock(key, token)
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+    async def aclose(self):
+        pass
+
+
+class InMemoryCache(CacheBackend):
+    """Begrenzter LRU-Cache im Prozess mit TTL"""
     
-    def __init__(self):
-        self._cache: Dict[str, Tuple[Any, datetime]] = {}
-        self._default_ttl = 3600
-    
-    def _make_key(self, prefix: str, *args) -> str:
-        """Generiert Cache-Key"""
-        key_data = f"{prefix}:{':'.join(str(a) for a in args)}"
-        return hashlib.md5(key_data.encode()).hexdigest()[:16]
-    
-    async def get(self, key: str) -> Optional[Any]:
-        """Holt Wert aus Cache wenn nicht abgelaufen"""
-        if key in self._cache:
-            value, expires = self._cache[key]
-            if datetime.utcnow() < expires:
-                return value
-            else:
-                del self._cache[key]
-        return None
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, CacheEintrag]" = OrderedDict()
+        self._locks: Dict[str, Tuple[str, float]] = {}
+        self.evictions = 0
     
-    async def set(self, key: str, value: Any, ttl_seconds: int = None):
-        """Setzt Wert mit TTL"""
-        ttl = ttl_seconds or self._default_ttl
-        expires = datetime.utcnow() + timedelta(seconds=ttl)
-        self._cache[key] = (value, expires)
+    async def get(self, key: str) -> Optional[CacheEintrag]:
+        """Holt Eintrag aus Cache wenn nicht abgelaufen"""
+        eintrag = self._cache.get(key)
+        if eintrag is None:
+            return None
+        if time.time() >= eintrag.ablauf:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return eintrag
+    
+    async def put(self, key: str, eintrag: CacheEintrag):
+        self._cache[key] = eintrag
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+            self.evictions += 1
     
     async def delete(self, key: str):
         """Löscht Key"""
-        if key in self._cache:
-            del self._cache[key]
+        self._cache.pop(key, None)
+
+    async def acquire_lock(self, key: str, ttl_seconds: float) -> Optional[str]:
+        jetzt = time.time()
+        belegt = self._locks.get(key)
+        if belegt is not None and belegt[1] > jetzt:
+            return None
+        token = uuid.uuid4().hex
+        self._locks[key] = (token, jetzt + ttl_seconds)
+        return token
+
+    async def release_lock(self, key: str, token: str):
+        if self._locks.get(key, (None,))[0] == token:
+            del self._locks[key]
     
-    def stats(self) -> Dict[str, int]:
+    def stats(self) -> Dict[str, Any]:
         """Cache-Statistiken"""
-        now = datetime.utcnow()
-        valid = sum(1 for _, (_, exp) in self._cache.items() if exp > now)
+        now = time.time()
+        valid = sum(1 for e in self._cache.values() if e.ablauf > now)
+        fresh = sum(1 for e in self._cache.values() if e.frisch_bis > now)
         return {
             "total_keys": len(self._cache),
             "valid_keys": valid,
-            "expired_keys": len(self._cache) - valid
+            "fresh_keys": fresh,
+            "expired_keys": len(self._cache) - valid,
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
         }
 
 
+class RedisCache(CacheBackend):
+    """
+    Redis als gemeinsamer Cache aller Worker (redis.asyncio-Client)
+
+    Fällt Redis aus, werden Fehler gezählt und Redis für
+    error_pause_seconds übersprungen: get liefert dann nichts, Locks gelten
+    als erhalten (jeder Worker ruft selbst ab).
+    """
+
+    LOKALES_TOKEN = "lokal"
+
+    def __init__(self, client: Any, prefix: str = "tera:", error_pause_seconds: float = 30.0):
+        self.client = client
+        self.prefix = prefix
+        self.error_pause_seconds = error_pause_seconds
+        self._pause_bis = 0.0
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> 'RedisCache':
+        import redis.asyncio as aioredis
+        client = aioredis.from_url(url, socket_connect_timeout=0.5, socket_timeout=1.0)
+        return cls(client, **kwargs)
+
+    async def _sicher(self, operation: Callable[[], Awaitable[Any]], ersatz: Any = None) -> Any:
+        from redis.exceptions import RedisError
+
+        if time.monotonic() < self._pause_bis:
+            return ersatz
+        try:
+            return await operation()
+        except (RedisError, OSError) as e:
+            self.errors += 1
+            self._pause_bis = time.monotonic() + self.error_pause_seconds
+            logger.warning(f"Redis nicht erreichbar ({e}), nur lokaler Cache für {self.error_pause_seconds:.0f}s")
+            return ersatz
+
+    async def get(self, key: str) -> Optional[CacheEintrag]:
+        daten = await self._sicher(lambda: self.client.get(self.prefix + key))
+        return CacheEintrag.entpacken(daten) if daten else None
+
+    async def put(self, key: str, eintrag: CacheEintrag):
+        ms = int((eintrag.ablauf - time.time()) * 1000)
+        if ms > 0:
+            await self._sicher(lambda: self.client.set(self.prefix + key, eintrag.packen(), px=ms))
+
+    async def delete(self, key: str):
+        await self._sicher(lambda: self.client.delete(self.prefix + key))
+
+    async def get_many(self, keys: List[str]) -> List[Optional[CacheEintrag]]:
+        if not keys:
+            return []
+        daten = await self._sicher(lambda: self.client.mget([self.prefix + k for k in keys]))
+        if daten is None:
+            return [None] * len(keys)
+        return [CacheEintrag.entpacken(d) if d else None for d in daten]
+
+    async def put_many(self, eintraege: Dict[str, CacheEintrag]):
+        jetzt = time.time()
+
+        async def schreiben():
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, eintrag in eintraege.items():
+                    ms = int((eintrag.ablauf - jetzt) * 1000)
+                    if ms > 0:
+                        pipe.set(self.prefix + key, eintrag.packen(), px=ms)
+                await pipe.execute()
+
+        if eintraege:
+            await self._sicher(schreiben)
+
+    async def acquire_locks(self, keys: List[str], ttl_seconds: float) -> List[Optional[str]]:
+        tokens = [uuid.uuid4().hex for _ in keys]
+
+        async def sperren():
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key, token in zip(keys, tokens):
+                    pipe.set(f"{self.prefix}lock:{key}", token, nx=True, px=int(ttl_seconds * 1000))
+                return await pipe.execute()
+
+        if not keys:
+            return []
+        ok = await self._sicher(sperren)
+        if ok is None:
+            return [self.LOKALES_TOKEN] * len(keys)
+        return [token if erhalten else None for token, erhalten in zip(tokens, ok)]
+
+    async def release_locks(self, tokens: Dict[str, str]):
+        tokens = {k: t for k, t in tokens.items() if t != self.LOKALES_TOKEN}
+        if not tokens:
+            return
+        from redis.exceptions import WatchError
+
+        lock_keys = {f"{self.prefix}lock:{k}": t.encode() for k, t in tokens.items()}
+
+        async def freigeben():
+            async with self.client.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(*lock_keys)
+                    aktuell = await pipe.mget(list(lock_keys))
+                    eigene = [k for k, wert in zip(lock_keys, aktuell) if wert == lock_keys[k]]
+                    if eigene:
+                        pipe.multi()
+                        pipe.delete(*eigene)
+                        await pipe.execute()
+                except WatchError:
+                    # Ein Lock ist inzwischen abgelaufen/neu vergeben: einzeln freigeben
+                    for key, token in tokens.items():
+                        await self.release_lock(key, token)
+
+        await self._sicher(freigeben)
+
+    async def acquire_lock(self, key: str, ttl_seconds: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        ok = await self._sicher(
+            lambda: self.client.set(f"{self.prefix}lock:{key}", token, nx=True, px=int(ttl_seconds * 1000)),
+            ersatz=self.LOKALES_TOKEN,
+        )
+        if ok == self.LOKALES_TOKEN:
+            return ok
+        return token if ok else None
+
+    async def release_lock(self, key: str, token: str):
+        if token == self.LOKALES_TOKEN:
+            return
+        from redis.exceptions import WatchError
+
+        lock_key = f"{self.prefix}lock:{key}"
+
+        async def freigeben():
+            # Nur den eigenen Lock löschen (nach Ablauf kann ihn ein anderer halten)
+            async with self.client.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(lock_key)
+                    if await pipe.get(lock_key) == token.encode():
+                        pipe.multi()
+                        pipe.delete(lock_key)
+                        await pipe.execute()
+                except WatchError:
+                    pass
+
+        await self._sicher(freigeben)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"errors": self.errors, "available": time.monotonic() >= self._pause_bis}
+
+    async def aclose(self):
+        schliessen = getattr(self.client, "aclose", None) or self.client.close
+        await schliessen()
+
+
+class TieredCache(CacheBackend):
+    """LRU im Prozess vor Redis; Locks liegen in Redis (gelten für alle Worker)"""
+
+    def __init__(self, lokal: InMemoryCache, remote: RedisCache):
+        self.lokal = lokal
+        self.remote = remote
+
+    async def get(self, key: str) -> Optional[CacheEintrag]:
+        eintrag = await self.lokal.get(key)
+        if eintrag is not None and eintrag.frisch:
+            return eintrag
+        # Lokal veraltet: ein anderer Worker hat ihn evtl. schon erneuert
+        remote = await self.remote.get(key)
+        if remote is not None:
+            await self.lokal.put(key, remote)
+            return remote
+        return eintrag
+
+    async def put(self, key: str, eintrag: CacheEintrag):
+        await self.lokal.put(key, eintrag)
+        await self.remote.put(key, eintrag)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[CacheEintrag]]:
+        eintraege = await self.lokal.get_many(keys)
+        offen = [i for i, e in enumerate(eintraege) if e is None or not e.frisch]
+        if offen:
+            remote = await self.remote.get_many([keys[i] for i in offen])
+            neu = {}
+            for i, eintrag in zip(offen, remote):
+                if eintrag is not None:
+                    eintraege[i] = neu[keys[i]] = eintrag
+            await self.lokal.put_many(neu)
+        return eintraege
+
+    async def put_many(self, eintraege: Dict[str, CacheEintrag]):
+        await self.lokal.put_many(eintraege)
+        await self.remote.put_many(eintraege)
+
+    async def acquire_locks(self, keys: List[str], ttl_seconds: float) -> List[Optional[str]]:
+        return await self.remote.acquire_locks(keys, ttl_seconds)
+
+    async def release_locks(self, tokens: Dict[str, str]):
+        await self.remote.release_locks(tokens)
+
+    async def delete(self, key: str):
+        await self.lokal.delete(key)
+        await self.remote.delete(key)
+
+    async def acquire_lock(self, key: str, ttl_seconds: float) -> Optional[str]:
+        return await self.remote.acquire_lock(key, ttl_seconds)
+
+    async def release_lock(self, key: str, token: str):
+        await self.remote.release_lock(key, token)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.lokal.stats(), "redis": self.remote.stats()}
+
+    async def aclose(self):
+        await self.remote.aclose()
+
+
+def create_cache_backend(config: CacheConfig) -> CacheBackend:
+    """LRU im Prozess, mit redis_url zusätzlich Redis dahinter"""
+    lokal = InMemoryCache(max_entries=config.lru_max_entries)
+    if not config.redis_url:
+        return lokal
+    return TieredCache(lokal, RedisCache.from_url(config.redis_url))
+
+
 # =====================================================
 # DATA PROVIDERS (Abstrakte Basis)
 # =====================================================
 
+def group_cells(h3_indices: List[str], resolution: int) -> Dict[str, List[str]]:
+    """Gruppiert Zellen nach ihrer Elternzelle der gegebenen Auflösung
+    (gröbere Zellen bilden eine eigene Gruppe)"""
+    gruppen: Dict[str, List[str]] = {}
+    for h3_index in h3_indices:
+        res = h3.get_resolution(h3_index)
+        eltern = h3.cell_to_parent(h3_index, resolution) if res > resolution else h3_index
+        gruppen.setdefault(eltern, []).append(h3_index)
+    return gruppen
+
+
+def _bbox(punkte: List[Tuple[float, float]], rand_deg: float = 0.0) -> Tuple[float, float, float, float]:
+    """(west, süd, ost, nord) um (lat, lon)-Punkte"""
+    lats = [p[0] for p in punkte]
+    lons = [p[1] for p in punkte]
+    return min(lons) - rand_deg, min(lats) - rand_deg, max(lons) + rand_deg, max(lats) + rand_deg
+
+
 class DataProvider(ABC):
-    """Basis-Klasse für Datenquellen"""
+    """
+    Basis-Klasse für Datenquellen
+
+    fetch holt eine Zelle, fetch_many viele auf einmal. Die Standard-
+    Implementierung ruft fetch pro Zelle auf; Provider mit räumlichen
+    Upstream-Abfragen überschreiben fetch_many und fragen einmal pro
+    Gruppe (Elternzelle der Auflösung group_resolution) ab. Höchstens
+    max_concurrency Upstream-Abfragen eines Providers laufen gleichzeitig.
+    """
+
+    max_concurrency: int = 8
+    group_resolution: int = 5
     
     @property
     @abstractmethod
@@ -147,6 +526,29 @@ class DataProvider(ABC):
         """Holt Daten für H3-Zelle und Zeitpunkt"""
         pass
 
+    def _limit(self) -> asyncio.Semaphore:
+        """Semaphore für max_concurrency (pro Event-Loop, wie die HTTP-Pools)"""
+        loop = asyncio.get_running_loop()
+        eintrag = getattr(self, "_semaphore", None)
+        if eintrag is None or eintrag[1] is not loop:
+            eintrag = self._semaphore = (asyncio.Semaphore(self.max_concurrency), loop)
+        return eintrag[0]
+
+    async def fetch_many(self, h3_indices: List[str], timestamp: datetime) -> Dict[str, Dict[str, Any]]:
+        """Daten für viele Zellen; fehlt eine Zelle im Ergebnis, ist ihr Abruf fehlgeschlagen"""
+        async def einzeln(h3_index: str):
+            async with self._limit():
+                return await self.fetch(h3_index, timestamp)
+
+        results = await asyncio.gather(*(einzeln(h) for h in h3_indices), return_exceptions=True)
+        daten = {}
+        for h3_index, result in zip(h3_indices, results):
+            if isinstance(result, Exception):
+                logger.warning(f"{self.name} fetch for {h3_index} failed: {result}")
+            else:
+                daten[h3_index] = result
+        return daten
+
 
 # =====================================================
 # KNMI PROVIDER
@@ -180,13 +582,17 @@ class KNMIProvider(DataProvider):
     
     async def fetch(self, h3_index: str, timestamp: datetime) -> Dict[str, Any]:
         """Holt KNMI-Daten für H3-Zelle"""
-        lat, lon = h3.cell_to_latlng(h3_index)
-        
-        if not self._is_in_netherlands(lat, lon):
-            return {}  # Außerhalb NL
+        return (await self.fetch_many([h3_index], timestamp))[h3_index]
+
+    async def fetch_many(self, h3_indices: List[str], timestamp: datetime) -> Dict[str, Dict[str, Any]]:
+        """Eine Radar-Abfrage für alle Zellen in NL (das neueste Komposit gilt landesweit)"""
+        in_nl = [h for h in h3_indices if self._is_in_netherlands(*h3.cell_to_latlng(h))]
+        daten: Dict[str, Dict[str, Any]] = {h: {} for h in h3_indices}  # Außerhalb NL
+        if not in_nl:
+            return daten
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with self._limit(), pooled_client(timeout=30.0) as client:
                 # Hole neueste Radar-Daten
                 response = await client.get(
                     f"{self.BASE_URL}/datasets/radar_reflectivity_composites/versions/2.0/files",
@@ -197,16 +603,17 @@ class KNMIProvider(DataProvider):
                 if response.status_code == 200:
                     files = response.json().get("files", [])
                     if files:
-                        return {
+                        result = {
                             "source": "KNMI",
                             "radar_available": True,
                             "latest_file": files[0].get("filename"),
                             "coverage": "Netherlands"
                         }
+                        daten.update({h: dict(result) for h in in_nl})
         except Exception as e:
             logger.warning(f"KNMI fetch error: {e}")
         
-        return {}
+        return daten
 
 
 # =====================================================
@@ -283,6 +690,10 @@ class PlanetaryComputerProvider(DataProvider):
     """
     
     STAC_URL = "https://planetarycomputer.microsoft.com/api/stac/v1"
+    SCENES_PER_SEARCH = 100
+    
+    max_concurrency = 4
+    group_resolution = 4  # ~1800 km², deutlich kleiner als eine Sentinel-2-Kachel
     
     @property
     def name(self) -> str:
@@ -294,47 +705,68 @@ class PlanetaryComputerProvider(DataProvider):
     
     async def fetch(self, h3_index: str, timestamp: datetime) -> Dict[str, Any]:
         """Sucht nach Sentinel-2 Szenen für die Zelle"""
-        lat, lon = h3.cell_to_latlng(h3_index)
-        
-        # Bounding Box für H3-Zelle
-        boundary = h3.cell_to_boundary(h3_index)
-        lats = [p[0] for p in boundary]
-        lons = [p[1] for p in boundary]
-        bbox = [min(lons), min(lats), max(lons), max(lats)]
+        return (await self.fetch_many([h3_index], timestamp))[h3_index]
+
+    async def fetch_many(self, h3_indices: List[str], timestamp: datetime) -> Dict[str, Dict[str, Any]]:
+        """Eine STAC-Suche pro Footprint (Elternzelle), Szenen werden den
+        Zellen über ihre Bounding Box zugeordnet"""
+        # Bounding Box pro H3-Zelle
+        zell_bbox = {h: _bbox(h3.cell_to_boundary(h)) for h in h3_indices}
+        daten: Dict[str, Dict[str, Any]] = {}
         
         # Zeitfenster: letzte 30 Tage
         end_date = timestamp.strftime("%Y-%m-%d")
         start_date = (timestamp - timedelta(days=30)).strftime("%Y-%m-%d")
         
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    f"{self.STAC_URL}/search",
-                    json={
-                        "collections": ["sentinel-2-l2a"],
-                        "bbox": bbox,
-                        "datetime": f"{start_date}/{end_date}",
-                        "limit": 1,
-                        "query": {"eo:cloud_cover": {"lt": 30}}
-                    }
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    features = data.get("features", [])
-                    
-                    if features:
-                        props = features[0].get("properties", {})
-                        return {
-                            "source": "Sentinel-2",
-                            "scene_date": props.get("datetime", ""),
-                            "cloud_cover": props.get("eo:cloud_cover"),
-                            "scenes_available": len(features)
+        async def footprint(zellen: List[str]):
+            west = min(zell_bbox[h][0] for h in zellen)
+            south = min(zell_bbox[h][1] for h in zellen)
+            east = max(zell_bbox[h][2] for h in zellen)
+            north = max(zell_bbox[h][3] for h in zellen)
+            features = []
+            try:
+                async with self._limit(), pooled_client(timeout=30.0) as client:
+                    response = await client.post(
+                        f"{self.STAC_URL}/search",
+                        json={
+                            "collections": ["sentinel-2-l2a"],
+                            "bbox": [west, south, east, north],
+                            "datetime": f"{start_date}/{end_date}",
+                            "limit": 1 if len(zellen) == 1 else self.SCENES_PER_SEARCH,
+                            "query": {"eo:cloud_cover": {"lt": 30}}
                         }
-        except Exception as e:
-            logger.warning(f"Planetary Computer error: {e}")
+                    )
+                    
+                    if response.status_code == 200:
+                        features = response.json().get("features", [])
+            except Exception as e:
+                logger.warning(f"Planetary Computer error: {e}")
+            
+            for h in zellen:
+                szenen = [f for f in features if self._ueberlappt(f.get("bbox"), zell_bbox[h])]
+                if szenen:
+                    props = szenen[0].get("properties", {})
+                    daten[h] = {
+                        "source": "Sentinel-2",
+                        "scene_date": props.get("datetime", ""),
+                        "cloud_cover": props.get("eo:cloud_cover"),
+                        "scenes_available": len(szenen)
+                    }
+                else:
+                    daten[h] = {}
         
-        return {}
+        await asyncio.gather(*(
+            footprint(zellen) for zellen in group_cells(h3_indices, self.group_resolution).values()
+        ))
+        return daten
+
+    @staticmethod
+    def _ueberlappt(szene_bbox: Optional[List[float]], zelle: Tuple[float, float, float, float]) -> bool:
+        """Szene (STAC-bbox) schneidet Zell-Bounding-Box; ohne bbox gilt die Suche"""
+        if not szene_bbox or len(szene_bbox) < 4:
+            return True
+        west, south, east, north = szene_bbox[:4]
+        return west <= zelle[2] and east >= zelle[0] and south <= zelle[3] and north >= zelle[1]
 
 
 # =====================================================
@@ -349,6 +781,10 @@ class FIRMSProvider(DataProvider):
     """
     
     BASE_URL = "https://firms.modaps.eosdis.nasa.gov/api"
+    SEARCH_RADIUS_DEG = 0.5
+    
+    max_concurrency = 2
+    group_resolution = 3  # ~12.000 km², eine Abfrage deckt Nachbarzellen mit ab
     
     def __init__(self, api_key: str = "DEMO_KEY"):
         self.api_key = api_key
@@ -363,30 +799,62 @@ class FIRMSProvider(DataProvider):
     
     async def fetch(self, h3_index: str, timestamp: datetime) -> Dict[str, Any]:
         """Prüft auf aktive Feuer in der Nähe"""
-        lat, lon = h3.cell_to_latlng(h3_index)
-        
-        # Suche in 50km Radius
-        bbox = f"{lon-0.5},{lat-0.5},{lon+0.5},{lat+0.5}"
+        return (await self.fetch_many([h3_index], timestamp))[h3_index]
+
+    async def fetch_many(self, h3_indices: List[str], timestamp: datetime) -> Dict[str, Dict[str, Any]]:
+        """Eine Bbox-Abfrage pro Gruppe, die Feuerpunkte werden lokal auf
+        die Suchfenster der Zellen (±0.5° um das Zentrum) verteilt"""
+        zentren = {h: h3.cell_to_latlng(h) for h in h3_indices}
+        daten: Dict[str, Dict[str, Any]] = {}
         
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(
-                    f"{self.BASE_URL}/area/csv/{self.api_key}/VIIRS_NOAA20_NRT/{bbox}/1"
-                )
-                
-                if response.status_code == 200:
-                    lines = response.text.strip().split('\n')
-                    fire_count = max(0, len(lines) - 1)  # Minus Header
+        async def gruppe(zellen: List[str]):
+            # Suche in 50km Radius um jede Zelle
+            west, south, east, north = _bbox([zentren[h] for h in zellen], self.SEARCH_RADIUS_DEG)
+            bbox = f"{west},{south},{east},{north}"
+            
+            feuer = None
+            try:
+                async with self._limit(), pooled_client(timeout=30.0) as client:
+                    response = await client.get(
+                        f"{self.BASE_URL}/area/csv/{self.api_key}/VIIRS_NOAA20_NRT/{bbox}/1"
+                    )
                     
-                    return {
-                        "source": "NASA_FIRMS",
-                        "active_fires_nearby": fire_count,
-                        "fire_risk": min(1.0, fire_count / 10)
-                    }
-        except Exception as e:
-            logger.warning(f"FIRMS error: {e}")
+                    if response.status_code == 200:
+                        feuer = self._feuerpunkte(response.text)
+            except Exception as e:
+                logger.warning(f"FIRMS error: {e}")
+            
+            for h in zellen:
+                if feuer is None:
+                    daten[h] = {}
+                    continue
+                lat, lon = zentren[h]
+                fire_count = int(np.count_nonzero(
+                    (np.abs(feuer[:, 0] - lat) <= self.SEARCH_RADIUS_DEG)
+                    & (np.abs(feuer[:, 1] - lon) <= self.SEARCH_RADIUS_DEG)
+                ))
+                daten[h] = {
+                    "source": "NASA_FIRMS",
+                    "active_fires_nearby": fire_count,
+                    "fire_risk": min(1.0, fire_count / 10)
+                }
         
-        return {}
+        await asyncio.gather(*(
+            gruppe(zellen) for zellen in group_cells(h3_indices, self.group_resolution).values()
+        ))
+        return daten
+
+    @staticmethod
+    def _feuerpunkte(csv_text: str) -> np.ndarray:
+        """(n, 2) lat/lon der Feuer aus der FIRMS-CSV"""
+        zeilen = csv.DictReader(io.StringIO(csv_text.strip()))
+        punkte = []
+        for zeile in zeilen:
+            try:
+                punkte.append((float(zeile["latitude"]), float(zeile["longitude"])))
+            except (KeyError, TypeError, ValueError):
+                continue
+        return np.array(punkte, dtype=np.float64).reshape(len(punkte), 2)
 
 
 # =====================================================
@@ -399,19 +867,29 @@ class DynamicEarthStateService:
     
     Workflow:
     1. Anfrage kommt rein (H3-Index + optionale Zeit)
-    2. Cache prüfen
-    3. Wenn nicht im Cache: Parallele API-Abfragen
+    2. Cache prüfen (veraltet: sofort zurückgeben, im Hintergrund erneuern)
+    3. Wenn nicht im Cache: ein Abruf pro Zelle (Single-Flight), Provider
+       parallel, jeder Provider mit eigenem Cache-Eintrag (cache_ttl)
     4. Ergebnisse mergen
-    5. In Cache speichern
+    5. In Cache speichern (TTL des kurzlebigsten Providers)
     6. Zurückgeben
     """
     
     def __init__(
         self,
         knmi_key: str = None,
-        firms_key: str = None
+        firms_key: str = None,
+        cache_config: Optional[CacheConfig] = None,
+        cache: Optional[CacheBackend] = None,
     ):
-        self.cache = InMemoryCache()
+        self.cache_config = cache_config or CacheConfig()
+        self.cache = cache or create_cache_backend(self.cache_config)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._hintergrund: set = set()
+        self.stats = {
+            "hits": 0, "stale_hits": 0, "misses": 0,
+            "deduplicated": 0, "lock_waits": 0, "upstream_fetches": 0,
+        }
         
         # Provider initialisieren
         self.providers: List[DataProvider] = [
@@ -447,79 +925,228 @@ class DynamicEarthStateService:
         Returns:
             EarthState mit allen verfügbaren Daten
         """
+        return (await self.get_states_batch([h3_index], timestamp))[h3_index]
+
+    async def get_states_batch(
+        self,
+        h3_indices: List[str],
+        timestamp: datetime = None
+    ) -> Dict[str, EarthState]:
+        """Holt Erdzustand für mehrere Zellen; fehlende Zellen werden
+        gemeinsam abgerufen (ein fetch_many pro Provider)"""
         timestamp = timestamp or datetime.utcnow()
-        cache_key = self._cache_key(h3_index, timestamp)
+        zellen = list(dict.fromkeys(h3_indices))
         
         # 1. Cache prüfen
-        cached = await self.cache.get(cache_key)
-        if cached:
-            logger.debug(f"Cache hit for {h3_index}")
-            return EarthState(**cached)
+        eintraege = await self.cache.get_many([self._cache_key(h, timestamp) for h in zellen])
+        werte: Dict[str, bytes] = {}
+        veraltet, fehlend = [], []
+        for h3_index, eintrag in zip(zellen, eintraege):
+            if eintrag is None:
+                fehlend.append(h3_index)
+                continue
+            werte[h3_index] = eintrag.wert
+            if eintrag.frisch:
+                self.stats["hits"] += 1
+            else:
+                self.stats["stale_hits"] += 1
+                veraltet.append(h3_index)
+        
+        if veraltet:
+            self._im_hintergrund_erneuern(veraltet, timestamp)
+        if fehlend:
+            self.stats["misses"] += len(fehlend)
+            werte.update(await self._single_flight(fehlend, timestamp))
+        
+        return {h: EarthState.from_msgpack(werte[h]) for h in zellen}
+
+    async def _single_flight(self, zellen: List[str], timestamp: datetime) -> Dict[str, bytes]:
+        """Ein Abruf pro Zelle: im Prozess über geteilte Futures, zwischen
+        Workern über die Locks des Cache-Backends."""
+        loop = asyncio.get_running_loop()
+        laufend: Dict[str, asyncio.Future] = {}
+        eigene: List[str] = []
+        for h3_index in zellen:
+            future = self._in_flight.get(self._cache_key(h3_index, timestamp))
+            if future is not None:
+                laufend[h3_index] = future
+            else:
+                eigene.append(h3_index)
+        self.stats["deduplicated"] += len(laufend)
+        
+        if eigene:
+            futures = {}
+            for h3_index in eigene:
+                key = self._cache_key(h3_index, timestamp)
+                futures[h3_index] = self._in_flight[key] = loop.create_future()
+                # Fehler gelten als abgerufen, auch wenn niemand mehr wartet
+                futures[h3_index].add_done_callback(lambda f: f.cancelled() or f.exception())
+            
+            def verteilen(task: asyncio.Task):
+                for h3_index, future in futures.items():
+                    self._in_flight.pop(self._cache_key(h3_index, timestamp), None)
+                    if task.cancelled():
+                        future.cancel()
+                    elif task.exception() is not None:
+                        future.set_exception(task.exception())
+                    else:
+                        future.set_result(task.result()[h3_index])
+            
+            task = asyncio.ensure_future(self._mit_locks(eigene, timestamp))
+            task.add_done_callback(verteilen)
+            laufend.update(futures)
+        
+        # shield: bricht ein Aufrufer ab, läuft der Abruf für die anderen weiter
+        werte = await asyncio.gather(*(asyncio.shield(f) for f in laufend.values()))
+        return dict(zip(laufend, werte))
+
+    async def _mit_locks(self, zellen: List[str], timestamp: datetime) -> Dict[str, bytes]:
+        """Ruft die Zellen ab, deren Lock dieser Worker erhält; auf die übrigen
+        (ein anderer Worker ruft sie gerade ab) wird gewartet."""
+        cfg = self.cache_config
+        keys = {h: self._cache_key(h, timestamp) for h in zellen}
+        werte: Dict[str, bytes] = {}
+        frist = time.monotonic() + cfg.lock_wait_seconds
+        offen = list(zellen)
+        erster_versuch = True
+        while offen:
+            if not erster_versuch:
+                await asyncio.sleep(LOCK_POLL_SECONDS)
+                eintraege = await self.cache.get_many([keys[h] for h in offen])
+                noch_offen = []
+                for h3_index, eintrag in zip(offen, eintraege):
+                    if eintrag is not None and eintrag.frisch:
+                        werte[h3_index] = eintrag.wert
+                    else:
+                        noch_offen.append(h3_index)
+                offen = noch_offen
+                if not offen:
+                    break
+                if time.monotonic() >= frist:
+                    logger.warning(f"Locks für {len(offen)} Zellen nicht freigegeben, rufe selbst ab")
+                    werte.update(await self._fetch_states(offen, timestamp))
+                    break
+            
+            tokens = await self.cache.acquire_locks([keys[h] for h in offen], cfg.lock_ttl_seconds)
+            meine = {h: t for h, t in zip(offen, tokens) if t is not None}
+            if erster_versuch and len(meine) < len(offen):
+                self.stats["lock_waits"] += len(offen) - len(meine)
+            erster_versuch = False
+            if meine:
+                try:
+                    werte.update(await self._fetch_states(list(meine), timestamp))
+                finally:
+                    await self.cache.release_locks({keys[h]: t for h, t in meine.items()})
+                offen = [h for h in offen if h not in meine]
+        return werte
+
+    def _im_hintergrund_erneuern(self, zellen: List[str], timestamp: datetime):
+        """Veraltete Einträge erneuern, ohne den Aufrufer warten zu lassen"""
+        zellen = [h for h in zellen if self._cache_key(h, timestamp) not in self._in_flight]
+        if not zellen:
+            return
+        
+        async def erneuern():
+            try:
+                await self._single_flight(zellen, timestamp)
+            except Exception as e:
+                logger.warning(f"Revalidation of {len(zellen)} cells failed: {e}")
+        
+        task = asyncio.ensure_future(erneuern())
+        self._hintergrund.add(task)
+        task.add_done_callback(self._hintergrund.discard)
+
+    async def _fetch_provider(self, provider: DataProvider, zellen: List[str], timestamp: datetime) -> Dict[str, Dict[str, Any]]:
+        """Provider-Daten aus dem Cache (frisch) oder per fetch_many (TTL = provider.cache_ttl)"""
+        keys = {h: f"{self._cache_key(h, timestamp)}:{provider.name}" for h in zellen}
+        eintraege = await self.cache.get_many(list(keys.values()))
+        daten: Dict[str, Dict[str, Any]] = {}
+        offen = []
+        for h3_index, eintrag in zip(zellen, eintraege):
+            if eintrag is not None and eintrag.frisch:
+                daten[h3_index] = msgpack.unpackb(eintrag.wert)
+            else:
+                offen.append(h3_index)
         
-        logger.info(f"Fetching fresh data for {h3_index}")
+        if offen:
+            self.stats["upstream_fetches"] += 1
+            neu = await provider.fetch_many(offen, timestamp)
+            await self.cache.set_many(
+                {keys[h]: msgpack.packb(result) for h, result in neu.items()},
+                provider.cache_ttl, self.cache_config.stale_seconds,
+            )
+            daten.update(neu)
+        return daten
+
+    async def _fetch_states(self, zellen: List[str], timestamp: datetime) -> Dict[str, bytes]:
+        """Provider parallel abfragen, pro Zelle mergen und als msgpack cachen"""
+        logger.info(f"Fetching fresh data for {len(zellen)} cells")
         
-        # 2. Parallele API-Abfragen
+        # 2. Parallele API-Abfragen (ein fetch_many pro Provider)
         tasks = [
-            provider.fetch(h3_index, timestamp)
+            self._fetch_provider(provider, zellen, timestamp)
             for provider in self.providers
         ]
         
         results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # 3. Ergebnisse mergen
-        merged_data = {
-            "h3_index": h3_index,
-            "timestamp": timestamp,
-            "data_sources": []
-        }
-        
         for provider, result in zip(self.providers, results):
             if isinstance(result, Exception):
                 logger.warning(f"{provider.name} failed: {result}")
-                continue
+        
+        werte: Dict[str, bytes] = {}
+        for h3_index in zellen:
+            # 3. Ergebnisse mergen
+            merged_data = {
+                "h3_index": h3_index,
+                "timestamp": timestamp,
+                "data_sources": []
+            }
             
-            if result:
-                merged_data["data_sources"].append(provider.name)
+            for provider, provider_results in zip(self.providers, results):
+                if isinstance(provider_results, Exception):
+                    continue
+                result = provider_results.get(h3_index)
                 
-                # Daten übernehmen
-                if "temperature_c" in result:
-                    merged_data["temperature_c"] = result["temperature_c"]
-                if "precipitation_mm" in result:
-                    merged_data["precipitation_mm"] = result["precipitation_mm"]
-                if "humidity_pct" in result:
-                    merged_data["humidity_pct"] = result["humidity_pct"]
-                if "fire_risk" in result:
-                    merged_data["fire_risk"] = result["fire_risk"]
-                if "active_fires_nearby" in result:
-                    merged_data["fire_risk"] = min(1.0, result["active_fires_nearby"] / 5)
-        
-        # 4. EarthState erstellen
-        lat, lon = h3.cell_to_latlng(h3_index)
-        state = EarthState(
-            h3_index=h3_index,
-            timestamp=timestamp,
-            temperature_c=merged_data.get("temperature_c"),
-            humidity_pct=merged_data.get("humidity_pct"),
-            precipitation_mm=merged_data.get("precipitation_mm"),
-            fire_risk=merged_data.get("fire_risk"),
-            data_sources=merged_data.get("data_sources", []),
-            quality_score=len(merged_data.get("data_sources", [])) / len(self.providers)
-        )
+                if result:
+                    merged_data["data_sources"].append(provider.name)
+                    
+                    # Daten übernehmen
+                    if "temperature_c" in result:
+                        merged_data["temperature_c"] = result["temperature_c"]
+                    if "precipitation_mm" in result:
+                        merged_data["precipitation_mm"] = result["precipitation_mm"]
+                    if "humidity_pct" in result:
+                        merged_data["humidity_pct"] = result["humidity_pct"]
+                    if "fire_risk" in result:
+                        merged_data["fire_risk"] = result["fire_risk"]
+                    if "active_fires_nearby" in result:
+                        merged_data["fire_risk"] = min(1.0, result["active_fires_nearby"] / 5)
+            
+            # 4. EarthState erstellen
+            state = EarthState(
+                h3_index=h3_index,
+                timestamp=timestamp,
+                temperature_c=merged_data.get("temperature_c"),
+                humidity_pct=merged_data.get("humidity_pct"),
+                precipitation_mm=merged_data.get("precipitation_mm"),
+                fire_risk=merged_data.get("fire_risk"),
+                data_sources=merged_data.get("data_sources", []),
+                quality_score=len(merged_data.get("data_sources", [])) / len(self.providers)
+            )
+            werte[h3_index] = state.to_msgpack()
         
-        # 5. In Cache speichern
-        await self.cache.set(cache_key, asdict(state), ttl_seconds=3600)
+        # 5. In Cache speichern: veraltet, sobald der kurzlebigste Provider
+        # veraltet ist (die übrigen kommen dann aus ihren eigenen Einträgen)
+        ttl = min(
+            (p.cache_ttl for p in self.providers),
+            default=self.cache_config.default_ttl_seconds,
+        )
+        await self.cache.set_many(
+            {self._cache_key(h, timestamp): wert for h, wert in werte.items()},
+            ttl, self.cache_config.stale_seconds,
+        )
         
-        return state
-    
-    async def get_states_batch(
-        self,
-        h3_indices: List[str],
-        timestamp: datetime = None
-    ) -> Dict[str, EarthState]:
-        """Holt Erdzustand für mehrere Zellen parallel"""
-        tasks = [self.get_state(idx, timestamp) for idx in h3_indices]
-        results = await asyncio.gather(*tasks)
-        return {idx: state for idx, state in zip(h3_indices, results)}
+        return werte
     
     async def get_state_for_location(
         self,
@@ -533,7 +1160,13 @@ class DynamicEarthStateService:
     
     def cache_stats(self) -> Dict[str, Any]:
         """Cache-Statistiken"""
-        return self.cache.stats()
+        return {**self.cache.stats(), **self.stats}
+
+    async def aclose(self):
+        """Wartet auf laufende Erneuerungen und schließt den Cache"""
+        if self._hintergrund:
+            await asyncio.gather(*self._hintergrund, return_exceptions=True)
+        await self.cache.aclose()
 
 
 # =====================================================
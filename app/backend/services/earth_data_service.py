@@ -10,13 +10,13 @@ Data Sources:
 - GFS/ECMWF (Weather forecasts)
 """
 import asyncio
-import httpx
 import h3
 import json
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict
 from loguru import logger
+from services.http_clients import pooled_client
 
 # =====================================================
 # DATA CLASSES
@@ -93,7 +93,7 @@ class NASAFIRMSService:
             params = {"bbox": "-180,-90,180,90", "days": days}
         
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with pooled_client(timeout=60.0) as client:
                 response = await client.get(endpoint, params=params)
                 response.raise_for_status()
                 
@@ -187,7 +187,7 @@ class PlanetaryComputerService:
                 "eo:cloud_cover": {"lt": cloud_cover}
             }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with pooled_client(timeout=30.0) as client:
             response = await client.post(
                 f"{self.STAC_URL}/search",
                 json=payload
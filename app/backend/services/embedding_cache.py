@@ -0,0 +1,114 @@
+"""
+TERA Embedding-Cache
+====================
+Persistente Embeddings pro (Modell, Text), damit Neu-Indexierungen und
+Neustarts identische Texte nicht erneut durch das Modell schicken:
+
+- Schlüssel: sha256(Modell + Text), inhaltsadressiert
+- Vektoren als float16-BLOB in SQLite (halber Platz, für Kosinus-Suche
+  genau genug), Rückgabe als float32
+- Batch-Zugriffe (get_many/put_many) in einer Abfrage bzw. Transaktion
+
+Standardpfad: ~/.tera_cache/embeddings.sqlite
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+
+
+# SQLite-Limit für gebundene Parameter pro Abfrage (ältere Builds: 999)
+_MAX_PARAMS = 900
+_F16_MAX = float(np.finfo(np.float16).max)
+
+
+def text_key(model: str, text: str) -> str:
+    """Inhaltsadresse eines Embeddings"""
+    return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).hexdigest()
+
+
+def to_float16(vec) -> np.ndarray:
+    """Speicherformat; in den float16-Wertebereich geklemmt"""
+    return np.clip(np.asarray(vec, dtype=np.float32), -_F16_MAX, _F16_MAX).astype(np.float16)
+
+
+class EmbeddingCache:
+    """SQLite-Store für Embeddings (float16)"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        if db_path is None:
+            db_path = os.path.join(os.path.expanduser("~"), ".tera_cache", "embeddings.sqlite")
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS embedding (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vec BLOB NOT NULL,
+                created_at REAL NOT NULL
+            );
+        """)
+        conn.commit()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Gefundene Embeddings (float32) pro Schlüssel"""
+        gefunden: Dict[str, np.ndarray] = {}
+        conn = self._conn()
+        for start in range(0, len(keys), _MAX_PARAMS):
+            teil = keys[start:start + _MAX_PARAMS]
+            zeilen = conn.execute(
+                f"SELECT key, vec FROM embedding WHERE key IN ({','.join('?' * len(teil))})", teil
+            ).fetchall()
+            for key, vec in zeilen:
+                gefunden[key] = np.frombuffer(vec, dtype=np.float16).astype(np.float32)
+        self.stats["hits"] += len(gefunden)
+        self.stats["misses"] += len(keys) - len(gefunden)
+        return gefunden
+
+    def put_many(self, model: str, eintraege: Iterable[tuple]) -> None:
+        """eintraege: (Schlüssel, Vektor)"""
+        jetzt = time.time()
+        zeilen = []
+        for key, vec in eintraege:
+            f16 = to_float16(vec)
+            zeilen.append((key, model, f16.size, f16.tobytes(), jetzt))
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding (key, model, dim, vec, created_at) VALUES (?, ?, ?, ?, ?)",
+                zeilen,
+            )
+        self.stats["writes"] += len(zeilen)
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM embedding").fetchone()[0]
+
+
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Prozessweiter Cache (wird beim ersten Zugriff geöffnet)"""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache()
+    return _cache
@@ -5,11 +5,11 @@ Docs: https://docs.firecrawl.dev/features/agent
 """
 
 import os
-import httpx
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 from datetime import datetime
 from loguru import logger
+from services.http_clients import pooled_client
 
 # Firecrawl API - User muss Key setzen
 FIRECRAWL_API_KEY = os.environ.get('FIRECRAWL_API_KEY', 'fc-a0b3b8aa31244c10b0f15b4f2d570ac7')
@@ -38,7 +38,7 @@ class FirecrawlAgent:
     
     def __init__(self, api_key: str = None):
         self.api_key = api_key or FIRECRAWL_API_KEY
-        self.client = httpx.AsyncClient(timeout=120.0)  # Agent kann länger dauern
+        self.client = pooled_client(timeout=120.0)  # Agent kann länger dauern
         
     async def research_location_risks(self, location: str, risk_type: str = "climate") -> FirecrawlResult:
         """
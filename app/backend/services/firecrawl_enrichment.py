@@ -10,13 +10,15 @@ Workflow:
 5. Enrichment → Risikobewertung anreichern
 """
 import asyncio
-import httpx
 import h3
 import re
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 from dataclasses import dataclass, field
+from functools import lru_cache
 from loguru import logger
+from services.http_clients import pooled_client
+from services.keyword_matcher import KeywordAutomaton
 
 
 # =====================================================
@@ -81,11 +83,11 @@ class TopicExtractor:
     # Risiko-relevante Themen
     RISK_TOPICS = {
         "drought": {
-            "keywords": ["drought", "dürre", "dry", "trocken", "water shortage", "wassermangel"],
+            "keywords": ["drought", "droughts", "dürre", "dry", "trocken", "water shortage", "wassermangel"],
             "risk_weight": 0.8
         },
         "flood": {
-            "keywords": ["flood", "überschwemmung", "hochwasser", "flooding", "deluge"],
+            "keywords": ["flood", "floods", "überschwemmung", "überschwemmungen", "hochwasser", "flooding", "deluge"],
             "risk_weight": 0.9
         },
         "heatwave": {
@@ -93,11 +95,11 @@ class TopicExtractor:
             "risk_weight": 0.7
         },
         "wildfire": {
-            "keywords": ["wildfire", "waldbrand", "forest fire", "bushfire", "feuer"],
+            "keywords": ["wildfire", "wildfires", "waldbrand", "waldbrände", "forest fire", "bushfire", "feuer"],
             "risk_weight": 0.85
         },
         "storm": {
-            "keywords": ["storm", "sturm", "hurricane", "cyclone", "typhoon", "orkan"],
+            "keywords": ["storm", "storms", "sturm", "hurricane", "cyclone", "typhoon", "orkan"],
             "risk_weight": 0.8
         },
         "crop_failure": {
@@ -105,11 +107,11 @@ class TopicExtractor:
             "risk_weight": 0.7
         },
         "conflict": {
-            "keywords": ["conflict", "konflikt", "war", "krieg", "violence", "attack", "angriff"],
+            "keywords": ["conflict", "conflicts", "konflikt", "war", "krieg", "violence", "attack", "attacks", "angriff", "angriffe"],
             "risk_weight": 0.9
         },
         "displacement": {
-            "keywords": ["refugee", "flüchtling", "displacement", "vertreibung", "migration", "exodus"],
+            "keywords": ["refugee", "refugees", "flüchtling", "flüchtlinge", "displacement", "vertreibung", "migration", "exodus"],
             "risk_weight": 0.75
         },
         "food_crisis": {
@@ -125,20 +127,33 @@ class TopicExtractor:
         "evacuate", "evakuierung", "death toll", "todesopfer"
     ]
     
-    def extract_topics(self, text: str) -> Tuple[List[str], float]:
-        """Extrahiert Themen und berechnet Risiko-Gewicht"""
-        text_lower = text.lower()
+    # Sentiment-Wörter
+    NEGATIVE_WORDS = [
+        "crisis", "disaster", "death", "killed", "destroyed", "failed",
+        "worst", "catastrophe", "emergency", "threat", "danger", "risk",
+        "krise", "katastrophe", "tod", "zerstört", "gefahr"
+    ]
+    
+    POSITIVE_WORDS = [
+        "recovery", "improvement", "success", "relief", "aid", "help",
+        "solution", "progress", "safe", "stable", "erholung", "hilfe"
+    ]
+    
+    def extract_topics(self, text: str, found: Optional[Set[str]] = None) -> Tuple[List[str], float]:
+        """Extrahiert Themen und berechnet Risiko-Gewicht
+        
+        found: Keywords aus find_signal_keywords(text), sonst wird gesucht
+        """
+        if found is None:
+            found = find_signal_keywords(text)
         
         found_topics = []
         total_weight = 0.0
         
         for topic, config in self.RISK_TOPICS.items():
-            for keyword in config["keywords"]:
-                if keyword in text_lower:
-                    if topic not in found_topics:
-                        found_topics.append(topic)
-                        total_weight += config["risk_weight"]
-                    break
+            if any(keyword in found for keyword in config["keywords"]):
+                found_topics.append(topic)
+                total_weight += config["risk_weight"]
         
         # Normalisieren
         if found_topics:
@@ -148,32 +163,23 @@ class TopicExtractor:
         
         return found_topics, avg_weight
     
-    def calculate_urgency(self, text: str) -> float:
+    def calculate_urgency(self, text: str, found: Optional[Set[str]] = None) -> float:
         """Berechnet Dringlichkeit basierend auf Keywords"""
-        text_lower = text.lower()
+        if found is None:
+            found = find_signal_keywords(text)
         
-        urgency_count = sum(1 for kw in self.URGENCY_KEYWORDS if kw in text_lower)
+        urgency_count = sum(1 for kw in self.URGENCY_KEYWORDS if kw in found)
         
         # Normalisieren auf 0-1
         return min(1.0, urgency_count / 5)
     
-    def analyze_sentiment(self, text: str) -> float:
+    def analyze_sentiment(self, text: str, found: Optional[Set[str]] = None) -> float:
         """Einfache Sentiment-Analyse (-1 bis +1)"""
-        text_lower = text.lower()
+        if found is None:
+            found = find_signal_keywords(text)
         
-        negative_words = [
-            "crisis", "disaster", "death", "killed", "destroyed", "failed",
-            "worst", "catastrophe", "emergency", "threat", "danger", "risk",
-            "krise", "katastrophe", "tod", "zerstört", "gefahr"
-        ]
-        
-        positive_words = [
-            "recovery", "improvement", "success", "relief", "aid", "help",
-            "solution", "progress", "safe", "stable", "erholung", "hilfe"
-        ]
-        
-        neg_count = sum(1 for w in negative_words if w in text_lower)
-        pos_count = sum(1 for w in positive_words if w in text_lower)
+        neg_count = sum(1 for w in self.NEGATIVE_WORDS if w in found)
+        pos_count = sum(1 for w in self.POSITIVE_WORDS if w in found)
         
         total = neg_count + pos_count
         if total == 0:
@@ -228,14 +234,15 @@ class LocationExtractor:
         "cairo": (30.04, 31.24),
     }
     
-    def extract_locations(self, text: str) -> List[Dict[str, Any]]:
+    def extract_locations(self, text: str, found: Optional[Set[str]] = None) -> List[Dict[str, Any]]:
         """Extrahiert Orte aus Text und gibt H3-Indices zurück"""
-        text_lower = text.lower()
+        if found is None:
+            found = find_signal_keywords(text)
         
         found_locations = []
         
         for name, (lat, lon) in self.KNOWN_LOCATIONS.items():
-            if name in text_lower:
+            if name in found:
                 h3_index = h3.latlng_to_cell(lat, lon, 7)
                 found_locations.append({
                     "name": name.title(),
@@ -247,6 +254,22 @@ class LocationExtractor:
         return found_locations
 
 
+@lru_cache(maxsize=1)
+def _signal_automaton() -> KeywordAutomaton:
+    """Ein Automat für Themen, Urgenz, Sentiment und Ortsnamen"""
+    keywords = [kw for config in TopicExtractor.RISK_TOPICS.values() for kw in config["keywords"]]
+    keywords += TopicExtractor.URGENCY_KEYWORDS
+    keywords += TopicExtractor.NEGATIVE_WORDS + TopicExtractor.POSITIVE_WORDS
+    keywords += list(LocationExtractor.KNOWN_LOCATIONS)
+    return KeywordAutomaton(keywords)
+
+
+def find_signal_keywords(text: str) -> Set[str]:
+    """Alle Themen-, Urgenz-, Sentiment- und Orts-Keywords, die als ganzes
+    Wort im Text vorkommen (ein Durchlauf)"""
+    return _signal_automaton().find(text)
+
+
 # =====================================================
 # FIRECRAWL SERVICE
 # =====================================================
@@ -293,7 +316,7 @@ class FireCrawlEnrichmentService:
         """Crawlt eine URL und extrahiert Informationen"""
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with pooled_client(timeout=30.0) as client:
                 # Wenn FireCrawl API verfügbar
                 if self.api_key:
                     response = await client.post(
@@ -324,17 +347,20 @@ class FireCrawlEnrichmentService:
                     content = re.sub(r'<[^>]+>', ' ', content)
                     content = re.sub(r'\s+', ' ', content).strip()
             
+            # Alle Keywords in einem Durchlauf
+            found = find_signal_keywords(content)
+            
             # Themen extrahieren
-            topics, risk_weight = self.topic_extractor.extract_topics(content)
+            topics, risk_weight = self.topic_extractor.extract_topics(content, found)
             
             # Orte extrahieren
-            locations = self.location_extractor.extract_locations(content)
+            locations = self.location_extractor.extract_locations(content, found)
             
             # Urgenz berechnen
-            urgency = self.topic_extractor.calculate_urgency(content)
+            urgency = self.topic_extractor.calculate_urgency(content, found)
             
             # Sentiment analysieren
-            sentiment = self.topic_extractor.analyze_sentiment(content)
+            sentiment = self.topic_extractor.analyze_sentiment(content, found)
             
             # H3 Indices aus Locations
             h3_indices = [loc["h3_index"] for loc in locations]
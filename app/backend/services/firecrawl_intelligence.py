@@ -5,10 +5,10 @@ Nutzt Scrape + Search für Web-Intelligence
 """
 
 import os
-import httpx
 from typing import Dict, List, Optional
 from datetime import datetime
 from loguru import logger
+from services.http_clients import pooled_client
 
 FIRECRAWL_API_KEY = os.environ.get("FIRECRAWL_API_KEY", "fc-a0b3b8aa31244c10b0f15b4f2d570ac7")
 FIRECRAWL_BASE_URL = "https://api.firecrawl.dev/v1"
@@ -19,7 +19,7 @@ class FirecrawlIntelligence:
     
     def __init__(self):
         self.api_key = FIRECRAWL_API_KEY
-        self.client = httpx.AsyncClient(timeout=60.0)
+        self.client = pooled_client(timeout=60.0)
     
     async def research_city_risks(self, city: str, country: str) -> Dict:
         """Recherchiert Risiken für eine Stadt"""
@@ -3,13 +3,13 @@ FireCrawl Service for Dynamic Web Crawling
 Real-time news and report ingestion with geographic extraction
 """
 import asyncio
-import httpx
 import h3
 import re
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, asdict
 from loguru import logger
+from services.http_clients import pooled_client
 
 FIRECRAWL_API = "https://api.firecrawl.dev/v1"
 
@@ -109,7 +109,7 @@ class FireCrawlService:
             # Fallback to simple HTTP fetch
             return await self._simple_crawl(url)
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        async with pooled_client(timeout=60.0) as client:
             response = await client.post(
                 f"{FIRECRAWL_API}/scrape",
                 headers=self.headers,
@@ -140,7 +140,7 @@ class FireCrawlService:
     
     async def _simple_crawl(self, url: str) -> CrawlResult:
         """Simple crawl without FireCrawl API"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with pooled_client(timeout=30.0) as client:
             response = await client.get(url, follow_redirects=True)
             html = response.text
         
@@ -4,7 +4,6 @@ Real-time conflict data from GDELT Project (Global Database of Events, Language,
 Free API, no registration required.
 """
 
-import httpx
 import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
@@ -12,6 +11,7 @@ from dataclasses import dataclass
 from loguru import logger
 import pandas as pd
 from io import StringIO
+from services.http_clients import pooled_client
 
 @dataclass
 class GDELTEvent:
@@ -62,7 +62,7 @@ class GDELTService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
+            async with pooled_client(timeout=30) as client:
                 response = await client.get(self.api_url, params=params)
                 
                 if response.status_code != 200:
@@ -155,7 +155,7 @@ class GDELTService:
         }
         
         try:
-            async with httpx.AsyncClient(timeout=15) as client:
+            async with pooled_client(timeout=15) as client:
                 response = await client.get(self.api_url, params=params)
                 if response.status_code == 200:
                     data = response.json()
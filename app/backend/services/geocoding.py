@@ -1,98 +1,269 @@
 """
 Geocoding Service
 Convert location names to coordinates
+
+One shared layer for all entry points (analysis, analysis_2026, extended):
+- persistent SQLite cache (~/.tera_cache/geocoding.sqlite), including
+  negative results ("not found") with a shorter TTL
+- GeoNames cities15000 preload: exact city names resolve without network
+- single-flight: concurrent identical queries share one Nominatim request
+- global token bucket: at most 1 Nominatim request per second per process
+
+Preload GeoNames:
+    python -m services.geocoding --preload-geonames
 """
-import httpx
-from typing import Optional, Dict, Any
-from functools import lru_cache
+import asyncio
+import functools
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
 
 from loguru import logger
 
+from services.http_clients import pooled_client
+
+
+NOMINATIM_URL = "https://nominatim.openstreetmap.org"
+USER_AGENT = "TERA-RiskIntelligence/2.3"
+
+POSITIVE_TTL_S = 90 * 24 * 3600
+NEGATIVE_TTL_S = 24 * 3600
+
+
+def normalize_query(query: str) -> str:
+    """Cache key: lowercase, collapsed whitespace"""
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+
+class TokenBucket:
+    """Async token bucket (rate tokens/s, burst = capacity)"""
+
+    def __init__(self, rate: float = 1.0, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._guard = threading.Lock()
+
+    def _take(self) -> float:
+        """Takes a token if available, else returns the wait time in seconds"""
+        with self._guard:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+# Nominatim usage policy: max. 1 request/s - shared by all GeocodingService instances
+nominatim_bucket = TokenBucket(rate=1.0, capacity=1.0)
+
+
+class GeoCache:
+    """SQLite store for geocoding results and the GeoNames city table"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        if db_path is None:
+            db_path = os.path.join(os.path.expanduser("~"), ".tera_cache", "geocoding.sqlite")
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS geocode (
+                query TEXT PRIMARY KEY,
+                result TEXT,
+                source TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS geonames_city (
+                name TEXT PRIMARY KEY,
+                display_name TEXT NOT NULL,
+                lat REAL NOT NULL,
+                lon REAL NOT NULL,
+                country TEXT,
+                country_code TEXT,
+                population INTEGER
+            );
+        """)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str):
+        """Returns (hit, result); result None = cached negative result"""
+        row = self._conn().execute(
+            "SELECT result, created_at FROM geocode WHERE query = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return False, None
+        result, created_at = row
+        ttl = POSITIVE_TTL_S if result is not None else NEGATIVE_TTL_S
+        if time.time() - created_at > ttl:
+            return False, None
+        return True, (json.loads(result) if result is not None else None)
+
+    def put(self, key: str, result: Optional[Dict[str, Any]], source: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocode (query, result, source, created_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(result) if result is not None else None, source, time.time()),
+            )
+
+    def city(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT display_name, lat, lon, country, country_code FROM geonames_city WHERE name = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        display_name, lat, lon, country, country_code = row
+        return {
+            "lat": lat,
+            "lon": lon,
+            "name": f"{display_name}, {country}" if country else display_name,
+            "country": country or "",
+            "country_code": country_code or "",
+            "bbox": None,
+        }
+
+    def load_cities(self, rows) -> int:
+        """rows: (name_key, display_name, lat, lon, country, country_code, population);
+        the most populous city wins per name"""
+        conn = self._conn()
+        with conn:
+            conn.executemany("""
+                INSERT INTO geonames_city (name, display_name, lat, lon, country, country_code, population)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET
+                    display_name = excluded.display_name, lat = excluded.lat,
+                    lon = excluded.lon, country = excluded.country,
+                    country_code = excluded.country_code, population = excluded.population
+                WHERE excluded.population > geonames_city.population
+            """, rows)
+        return conn.execute("SELECT COUNT(*) FROM geonames_city").fetchone()[0]
+
 
 class GeocodingService:
     """
     Geocoding using Nominatim (OpenStreetMap).
     Free, no API key required, respects rate limits.
     """
-    
-    BASE_URL = "https://nominatim.openstreetmap.org"
-    USER_AGENT = "TERA-EnvironmentalResearch/1.0"
-    
-    # Cache common locations
-    KNOWN_LOCATIONS = {
-        "jakarta": {"lat": -6.2088, "lon": 106.8456, "name": "Jakarta, Indonesia"},
-        "tokyo": {"lat": 35.6762, "lon": 139.6503, "name": "Tokyo, Japan"},
-        "new york": {"lat": 40.7128, "lon": -74.0060, "name": "New York, USA"},
-        "london": {"lat": 51.5074, "lon": -0.1278, "name": "London, UK"},
-        "lagos": {"lat": 6.5244, "lon": 3.3792, "name": "Lagos, Nigeria"},
-        "mumbai": {"lat": 19.0760, "lon": 72.8777, "name": "Mumbai, India"},
-        "rotterdam": {"lat": 51.9244, "lon": 4.4777, "name": "Rotterdam, Netherlands"},
-        "phoenix": {"lat": 33.4484, "lon": -112.0740, "name": "Phoenix, USA"},
-        "miami": {"lat": 25.7617, "lon": -80.1918, "name": "Miami, USA"},
-        "dhaka": {"lat": 23.8103, "lon": 90.4125, "name": "Dhaka, Bangladesh"},
-        "cairo": {"lat": 30.0444, "lon": 31.2357, "name": "Cairo, Egypt"},
-        "nairobi": {"lat": -1.2921, "lon": 36.8219, "name": "Nairobi, Kenya"},
-        "darfur": {"lat": 13.5000, "lon": 25.0000, "name": "Darfur, Sudan"},
-        "bangladesh": {"lat": 23.6850, "lon": 90.3563, "name": "Bangladesh"},
-        "somalia": {"lat": 5.1521, "lon": 46.1996, "name": "Somalia"},
-        "yemen": {"lat": 15.5527, "lon": 48.5164, "name": "Yemen"},
-    }
-    
+
+    BASE_URL = NOMINATIM_URL
+    USER_AGENT = USER_AGENT
+
+    def __init__(self, cache: Optional[GeoCache] = None, bucket: TokenBucket = nominatim_bucket):
+        self.cache = cache or GeoCache()
+        self.bucket = bucket
+        self._inflight: Dict[str, asyncio.Task] = {}
+
     async def geocode(self, location: str) -> Optional[Dict[str, Any]]:
         """
         Convert location name to coordinates.
-        Returns dict with lat, lon, name or None if not found.
+        Returns dict with lat, lon, name, country, country_code, bbox
+        or None if not found.
         """
-        # Check cache first
-        location_lower = location.lower().strip()
-        if location_lower in self.KNOWN_LOCATIONS:
-            logger.debug(f"Cache hit for: {location}")
-            return self.KNOWN_LOCATIONS[location_lower]
-        
-        # Query Nominatim
+        key = normalize_query(location)
+        if not key:
+            return None
+
+        hit, result = self.cache.get(key)
+        if hit and result is not None:
+            return result
+
+        # GeoNames before cached "not found": a negative result from before
+        # the preload must not shadow a city the preload knows
+        city = self.cache.city(key)
+        if city is not None:
+            return city
+        if hit:
+            return None
+
+        # Single-flight: identical concurrent queries await the same request
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._lookup(key, location))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    async def _lookup(self, key: str, location: str) -> Optional[Dict[str, Any]]:
+        await self.bucket.acquire()
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
+            async with pooled_client(timeout=10) as client:
                 response = await client.get(
                     f"{self.BASE_URL}/search",
                     params={
                         "q": location,
                         "format": "json",
-                        "limit": 1
+                        "limit": 1,
+                        "addressdetails": 1,
                     },
                     headers={"User-Agent": self.USER_AGENT}
                 )
-                
-                if response.status_code != 200:
-                    logger.warning(f"Geocoding failed for {location}: {response.status_code}")
-                    return None
-                
-                data = response.json()
-                
-                if not data:
-                    logger.warning(f"No results for: {location}")
-                    return None
-                
-                result = data[0]
-                geocoded = {
-                    "lat": float(result["lat"]),
-                    "lon": float(result["lon"]),
-                    "name": result.get("display_name", location)
-                }
-                
-                # Cache for future use
-                self.KNOWN_LOCATIONS[location_lower] = geocoded
-                logger.info(f"Geocoded: {location} -> {geocoded['lat']}, {geocoded['lon']}")
-                
-                return geocoded
-                
         except Exception as e:
+            # Transient errors are not cached
             logger.error(f"Geocoding error for {location}: {e}")
             return None
-    
+
+        if response.status_code != 200:
+            logger.warning(f"Geocoding failed for {location}: {response.status_code}")
+            return None
+
+        data = response.json()
+        if not data:
+            logger.warning(f"No results for: {location}")
+            self.cache.put(key, None, "nominatim")
+            return None
+
+        item = data[0]
+        address = item.get("address", {})
+        bbox = item.get("boundingbox", [])
+        geocoded = {
+            "lat": float(item["lat"]),
+            "lon": float(item["lon"]),
+            "name": item.get("display_name", location),
+            "country": address.get("country", ""),
+            "country_code": address.get("country_code", "").upper(),
+            "bbox": [float(b) for b in bbox] if len(bbox) == 4 else None,
+        }
+        self.cache.put(key, geocoded, "nominatim")
+        logger.info(f"Geocoded: {location} -> {geocoded['lat']}, {geocoded['lon']}")
+        return geocoded
+
     async def reverse_geocode(self, lat: float, lon: float) -> Optional[str]:
         """Convert coordinates to location name"""
+        await self.bucket.acquire()
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
+            async with pooled_client(timeout=10) as client:
                 response = await client.get(
                     f"{self.BASE_URL}/reverse",
                     params={
@@ -102,22 +273,55 @@ class GeocodingService:
                     },
                     headers={"User-Agent": self.USER_AGENT}
                 )
-                
+
                 if response.status_code != 200:
                     return None
-                
+
                 data = response.json()
                 return data.get("display_name")
-                
+
         except Exception as e:
             logger.error(f"Reverse geocoding error: {e}")
             return None
 
+    async def preload_geonames(self) -> int:
+        """Imports GeoNames cities15000 (name + ASCII name) into the city table"""
+        from data.geonames_loader import load_cities, load_countries
+
+        countries = {c.iso_code: c.name for c in await load_countries()}
+        rows = []
+        for c in await load_cities():
+            for name in {normalize_query(c.name), normalize_query(c.ascii_name or c.name)}:
+                rows.append((
+                    name, c.name, c.lat, c.lon,
+                    countries.get(c.country_code, ""), c.country_code, c.population,
+                ))
+        return self.cache.load_cities(rows)
+
 
-# Convenience function for routes expecting geocode_city
-_geo_service = GeocodingService()
+_geo_service: Optional[GeocodingService] = None
+
+
+def get_geocoder() -> GeocodingService:
+    """Process-wide geocoder (shared cache, single-flight table)"""
+    global _geo_service
+    if _geo_service is None:
+        _geo_service = GeocodingService()
+    return _geo_service
 
 
 async def geocode_city(location: str) -> Optional[Dict[str, Any]]:
     """Geocode a city/location name to coordinates."""
-    return await _geo_service.geocode(location)
+    return await get_geocoder().geocode(location)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="TERA geocoding cache")
+    parser.add_argument("--preload-geonames", action="store_true", help="Import GeoNames cities15000")
+    args = parser.parse_args()
+
+    if args.preload_geonames:
+        count = asyncio.run(get_geocoder().preload_geonames())
+        logger.info(f"GeoNames: {count} city names cached")
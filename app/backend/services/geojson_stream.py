@@ -0,0 +1,64 @@
+"""
+TERA GeoJSON Streaming
+======================
+Serialisiert Features teilstückweise, sobald die Tessellation sie liefert,
+statt die komplette FeatureCollection im Speicher aufzubauen.
+
+- feature_collection_stream: eine gültige FeatureCollection als Byte-Chunks
+  ("metadaten" folgt nach den Features, weil Zähler erst am Ende feststehen)
+- ndjson_stream: ein GeoJSON-Feature pro Zeile
+"""
+
+import json
+from typing import AsyncIterator, Callable, List, Optional
+
+
+STREAM_FORMATE = ('json', 'ndjson')
+
+MEDIA_TYPES = {
+    'json': 'application/geo+json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+async def feature_collection_stream(
+    teile: AsyncIterator[List[dict]],
+    metadaten: Optional[Callable[[], dict]] = None,
+) -> AsyncIterator[bytes]:
+    """FeatureCollection als Chunks; metadaten() wird nach dem letzten Feature aufgerufen."""
+    yield b'{"type":"FeatureCollection","features":['
+    erstes = True
+    async for teil in teile:
+        if not teil:
+            continue
+        chunk = ','.join(_dumps(f) for f in teil)
+        if not erstes:
+            chunk = ',' + chunk
+        erstes = False
+        yield chunk.encode('utf-8')
+    ende = ']'
+    if metadaten is not None:
+        ende += ',"metadaten":' + _dumps(metadaten())
+    yield (ende + '}').encode('utf-8')
+
+
+async def ndjson_stream(teile: AsyncIterator[List[dict]]) -> AsyncIterator[bytes]:
+    """Newline-delimited GeoJSON: ein Feature pro Zeile."""
+    async for teil in teile:
+        if teil:
+            yield (''.join(_dumps(f) + '\n' for f in teil)).encode('utf-8')
+
+
+def stream_chunks(
+    teile: AsyncIterator[List[dict]],
+    format: str,
+    metadaten: Optional[Callable[[], dict]] = None,
+) -> AsyncIterator[bytes]:
+    """Wählt den Encoder für 'json' oder 'ndjson'."""
+    if format == 'ndjson':
+        return ndjson_stream(teile)
+    return feature_collection_stream(teile, metadaten)
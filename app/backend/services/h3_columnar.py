@@ -0,0 +1,114 @@
+"""
+TERA Spaltenformat für H3-Karten
+================================
+Kompakte Binärkodierung statt GeoJSON-Polygonen: das Frontend braucht nur
+H3-Index, Kategorie und Intensität und baut die Geometrie aus dem H3-Index
+selbst (h3-js cellToBoundary).
+
+Layout (little endian):
+
+    b'TRH3'                      Magic
+    uint32   header_len
+    header   UTF-8 JSON          {"v", "n", "kategorien", "labels", "meta"}
+    padding  auf 8 Byte
+    uint64[n] h3                 H3-Index
+    float16[n] intensitaet
+    uint8[n]  kategorie          Index in header["kategorien"]
+
+Die Spalten liegen so, dass sie im Browser direkt als BigUint64Array /
+Uint16Array / Uint8Array über denselben ArrayBuffer gelesen werden können.
+"""
+
+import json
+import struct
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+MAGIC = b'TRH3'
+VERSION = 1
+MEDIA_TYPE = 'application/vnd.tera.h3-columnar'
+
+AUSGABE_FORMATE = ('geojson', 'columnar')
+
+
+def encode(
+    h3_ids: Sequence[str],
+    kategorien: Sequence[str],
+    intensitaet: Sequence[float],
+    labels: Optional[Dict[str, dict]] = None,
+    meta: Optional[dict] = None,
+) -> bytes:
+    """Kodiert parallele Spalten; labels liefert die Legende pro Kategorie."""
+    n = len(h3_ids)
+    namen: List[str] = list(dict.fromkeys(kategorien))
+    if len(namen) > 256:
+        raise ValueError(f"Zu viele Kategorien für uint8: {len(namen)}")
+    code = {name: i for i, name in enumerate(namen)}
+
+    header = json.dumps({
+        'v': VERSION,
+        'n': n,
+        'kategorien': namen,
+        'labels': {k: labels[k] for k in namen if k in labels} if labels else {},
+        'meta': meta or {},
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    kopf = MAGIC + struct.pack('<I', len(header)) + header
+    kopf += b'\0' * (-len(kopf) % 8)
+
+    h3_arr = np.fromiter((int(h, 16) for h in h3_ids), dtype='<u8', count=n)
+    wert_arr = np.asarray(intensitaet, dtype='<f2')
+    kat_arr = np.fromiter((code[k] for k in kategorien), dtype=np.uint8, count=n)
+    return b''.join((kopf, h3_arr.tobytes(), wert_arr.tobytes(), kat_arr.tobytes()))
+
+
+def decode(data: bytes) -> dict:
+    """Gegenstück zu encode (für Python-Clients, Tests und Benchmarks)."""
+    if data[:4] != MAGIC:
+        raise ValueError("Kein TERA-H3-Spaltenformat")
+    (header_len,) = struct.unpack_from('<I', data, 4)
+    header = json.loads(data[8:8 + header_len].decode('utf-8'))
+    n = header['n']
+    offset = 8 + header_len
+    offset += -offset % 8
+
+    h3_arr = np.frombuffer(data, dtype='<u8', count=n, offset=offset)
+    offset += 8 * n
+    wert_arr = np.frombuffer(data, dtype='<f2', count=n, offset=offset)
+    offset += 2 * n
+    kat_arr = np.frombuffer(data, dtype=np.uint8, count=n, offset=offset)
+
+    return {
+        'h3': h3_arr,
+        'intensitaet': wert_arr,
+        'kategorie': kat_arr,
+        'kategorien': header['kategorien'],
+        'labels': header['labels'],
+        'meta': header['meta'],
+    }
+
+
+def h3_strings(h3_arr: np.ndarray) -> List[str]:
+    """uint64-Spalte zurück in H3-Strings."""
+    return [format(int(h), 'x') for h in h3_arr]
+
+
+def features_to_columnar(
+    features: Sequence[dict],
+    labels: Optional[Dict[str, dict]] = None,
+    meta: Optional[dict] = None,
+    h3_key: str = 'h3',
+    kategorie_key: str = 'zone',
+    intensitaet_key: str = 'intensity',
+) -> bytes:
+    """Kodiert bereits gebaute GeoJSON-Features (Properties-Spalten)."""
+    props = [f['properties'] for f in features]
+    return encode(
+        [p[h3_key] for p in props],
+        [p[kategorie_key] for p in props],
+        [p[intensitaet_key] for p in props],
+        labels=labels,
+        meta=meta,
+    )
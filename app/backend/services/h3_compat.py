@@ -0,0 +1,97 @@
+"""
+H3 Versions-Kompatibilität (v3 / v4)
+====================================
+Die Services nutzen teils die h3 v3.x API (geo_to_h3, k_ring, ...),
+teils die v4 API (latlng_to_cell, grid_disk, ...). Diese Shims kapseln
+beide Varianten an einer Stelle.
+"""
+
+from functools import lru_cache
+from typing import List, Tuple
+
+import h3
+
+
+IS_V4 = hasattr(h3, 'latlng_to_cell')
+
+
+def latlng_to_cell(lat: float, lon: float, res: int) -> str:
+    if IS_V4:
+        return h3.latlng_to_cell(lat, lon, res)
+    return h3.geo_to_h3(lat, lon, res)
+
+
+def cell_to_latlng(h3_index: str) -> Tuple[float, float]:
+    if IS_V4:
+        latlng = h3.cell_to_latlng(h3_index)
+        if isinstance(latlng, (tuple, list)):
+            return latlng[0], latlng[1]
+        return latlng.lat, latlng.lng
+    return h3.h3_to_geo(h3_index)
+
+
+def cell_to_boundary_lnglat(h3_index: str) -> List[List[float]]:
+    """Zellrand als [[lng, lat], ...] (GeoJSON-Reihenfolge)."""
+    if IS_V4:
+        coords = h3.cell_to_boundary(h3_index)
+        if coords and isinstance(coords[0], (tuple, list)):
+            return [[lng, lat] for lat, lng in coords]
+        return [[c.lng, c.lat] for c in coords]
+    return h3.h3_to_geo_boundary(h3_index, geo_json=True)
+
+
+def get_resolution(h3_index: str) -> int:
+    if IS_V4:
+        return h3.get_resolution(h3_index)
+    return h3.h3_get_resolution(h3_index)
+
+
+def grid_disk(h3_index: str, k: int) -> List[str]:
+    """Alle Zellen mit Gitterdistanz <= k (inkl. Zentrum)."""
+    if IS_V4:
+        return list(h3.grid_disk(h3_index, k))
+    return list(h3.k_ring(h3_index, k))
+
+
+def grid_ring(h3_index: str, k: int) -> List[str]:
+    """Alle Zellen mit Gitterdistanz == k (pentagon-sicher)."""
+    try:
+        if IS_V4:
+            return list(h3.grid_ring(h3_index, k))
+        return list(h3.hex_ring(h3_index, k))
+    except Exception:
+        # Pentagon-Verzerrung: Ring als Differenz zweier Disks
+        inner = set(grid_disk(h3_index, k - 1)) if k > 0 else set()
+        return [c for c in grid_disk(h3_index, k) if c not in inner]
+
+
+def cell_to_children(h3_index: str, res: int) -> List[str]:
+    if IS_V4:
+        return list(h3.cell_to_children(h3_index, res))
+    return list(h3.h3_to_children(h3_index, res))
+
+
+def cell_to_parent(h3_index: str, res: int) -> str:
+    if IS_V4:
+        return h3.cell_to_parent(h3_index, res)
+    return h3.h3_to_parent(h3_index, res)
+
+
+def cell_to_center_child(h3_index: str, res: int) -> str:
+    """Kindzelle mit demselben Mittelpunkt wie h3_index."""
+    if IS_V4:
+        return h3.cell_to_center_child(h3_index, res)
+    return h3.h3_to_center_child(h3_index, res)
+
+
+@lru_cache(maxsize=None)
+def edge_length_km(res: int) -> float:
+    """Mittlere Hexagon-Kantenlänge in km."""
+    if IS_V4:
+        return float(h3.average_hexagon_edge_length(res, unit='km'))
+    return float(h3.edge_length(res, unit='km'))
+
+
+def cell_area_km2(h3_index: str) -> float:
+    """Exakte Fläche einer Zelle in km²."""
+    return float(h3.cell_area(h3_index, unit='km^2'))
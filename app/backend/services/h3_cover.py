@@ -0,0 +1,125 @@
+"""
+H3 Bounding-Box / Polygon Abdeckung
+===================================
+Native H3-Polyfill (Zellzentrum im Polygon) mit Shims für h3 v3 und v4,
+statt Gitter-Sampling mit Listen-Deduplizierung.
+
+- bbox_cells / polygon_cells: sortierte, duplikatfreie Zelllisten
+- estimate_bbox_cells: analytische Zellanzahl ohne die Liste zu bauen
+- fit_resolution: größte Auflösung mit höchstens max_cells Zellen
+"""
+
+import math
+from typing import List, Sequence, Tuple
+
+import h3
+import numpy as np
+
+from services import h3_compat
+
+
+ERDRADIUS_KM = 6371.0088
+
+# Breitere Polygone werden in Längenbänder zerlegt (H3 interpretiert
+# Polygonkanten kartesisch in lat/lng; > 180° Breite ist mehrdeutig)
+MAX_LON_SPAN_DEG = 90.0
+
+
+def _polyfill(ring_latlng: Sequence[Tuple[float, float]], res: int) -> List[str]:
+    """H3-Polyfill für einen äußeren Ring [(lat, lng), ...]."""
+    if h3_compat.IS_V4:
+        poly = h3.LatLngPoly(list(ring_latlng))
+        if hasattr(h3, 'h3shape_to_cells'):
+            return list(h3.h3shape_to_cells(poly, res))
+        return list(h3.polygon_to_cells(poly, res))
+    geojson = {
+        'type': 'Polygon',
+        'coordinates': [[[lng, lat] for lat, lng in ring_latlng] + [[ring_latlng[0][1], ring_latlng[0][0]]]],
+    }
+    return list(h3.polyfill_geojson(geojson, res))
+
+
+def polygon_cells(ring_lnglat: Sequence[Sequence[float]], res: int) -> List[str]:
+    """Zellen eines Polygons (GeoJSON-Ring [[lng, lat], ...]), sortiert."""
+    ring = [(lat, lng) for lng, lat in ring_lnglat]
+    if len(ring) > 1 and ring[0] == ring[-1]:
+        ring = ring[:-1]
+    return sorted(set(_polyfill(ring, res)))
+
+
+def bbox_cells(
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    res: int,
+) -> List[str]:
+    """Alle Zellen, deren Zentrum in der Bounding Box liegt (sortiert).
+
+    Ist die Box kleiner als eine Zelle, wird die Zelle am Box-Zentrum geliefert.
+    """
+    min_lat, max_lat = max(-90.0, min_lat), min(90.0, max_lat)
+    min_lon, max_lon = max(-180.0, min_lon), min(180.0, max_lon)
+    if min_lat >= max_lat or min_lon >= max_lon:
+        return []
+
+    cells = set()
+    n_bands = max(1, math.ceil((max_lon - min_lon) / MAX_LON_SPAN_DEG))
+    band = (max_lon - min_lon) / n_bands
+    for i in range(n_bands):
+        lo = min_lon + i * band
+        hi = max_lon if i == n_bands - 1 else lo + band
+        cells.update(_polyfill(
+            [(min_lat, lo), (min_lat, hi), (max_lat, hi), (max_lat, lo)], res
+        ))
+
+    if not cells:
+        cells.add(h3_compat.latlng_to_cell(
+            (min_lat + max_lat) / 2, (min_lon + max_lon) / 2, res
+        ))
+    return sorted(cells)
+
+
+def estimate_bbox_cells(
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    res: int,
+) -> int:
+    """Analytische Zellanzahl: sphärische Box-Fläche / lokale Zellfläche."""
+    min_lat, max_lat = max(-90.0, min_lat), min(90.0, max_lat)
+    if min_lat >= max_lat or min_lon >= max_lon:
+        return 0
+    flaeche_km2 = (
+        ERDRADIUS_KM ** 2
+        * math.radians(max_lon - min_lon)
+        * abs(math.sin(math.radians(max_lat)) - math.sin(math.radians(min_lat)))
+    )
+    zentrum = h3_compat.latlng_to_cell(
+        (min_lat + max_lat) / 2, (min_lon + max_lon) / 2, res
+    )
+    return max(1, round(flaeche_km2 / h3_compat.cell_area_km2(zentrum)))
+
+
+def fit_resolution(
+    min_lat: float,
+    min_lon: float,
+    max_lat: float,
+    max_lon: float,
+    max_cells: int,
+    start_res: int,
+    min_res: int = 0,
+) -> int:
+    """Größte Auflösung <= start_res, deren geschätzte Zellanzahl <= max_cells ist."""
+    res = start_res
+    while res > min_res:
+        if estimate_bbox_cells(min_lat, min_lon, max_lat, max_lon, res) <= max_cells:
+            return res
+        res -= 1
+    return min_res
+
+
+def cells_to_uint64(cells: Sequence[str]) -> np.ndarray:
+    """Kompakte Darstellung: H3-Indizes als uint64-Array."""
+    return np.fromiter((int(c, 16) for c in cells), dtype=np.uint64, count=len(cells))
@@ -0,0 +1,303 @@
+"""
+TERA HTTP-Client-Registry
+=========================
+Ein geteilter httpx-Pool pro Upstream (scheme, host, port) statt eines neuen AsyncClient
+(TCP/TLS-Handshake) pro Aufruf:
+
+- Verbindungslimits und Keep-Alive pro Upstream (HOST_POLICIES, "host:port"
+  vor "host"), damit z.B. Ollama (localhost:11434) und ChromaDB
+  (localhost:8000) nicht denselben Pool teilen
+- HTTP/2 für HTTPS-Hosts, wenn das optionale Paket `h2` installiert ist
+- gemeinsame Retry-Policy: Verbindungsfehler immer, 429/502/503/504 nur bei
+  idempotenten Methoden; exponentieller Backoff, Retry-After wird beachtet
+- Metriken pro Upstream (Requests, Statuscodes, Fehler, Retries, Latenz)
+
+Services nutzen `pooled_client(...)` wie bisher `httpx.AsyncClient(...)`;
+der zurückgegebene Client schließt beim Verlassen von `async with` nichts,
+die Pools werden im FastAPI-lifespan (main.py) geschlossen.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+from loguru import logger
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+RETRY_STATUS = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+BACKOFF_BASIS_S = 0.5
+BACKOFF_MAX_S = 8.0
+RETRY_AFTER_MAX_S = 30.0
+
+
+@dataclass(frozen=True)
+class HostPolicy:
+    """Pool- und Retry-Einstellungen für einen Host"""
+    max_connections: int = 20
+    max_keepalive: int = 10
+    keepalive_expiry_s: float = 30.0
+    http2: bool = True
+    max_retries: int = 2
+
+
+DEFAULT_POLICY = HostPolicy()
+
+# Hosts bzw. "host:port" mit eigenen Limits (Rate-Limits der Anbieter bzw. lokale LLMs)
+HOST_POLICIES: Dict[str, HostPolicy] = {
+    'nominatim.openstreetmap.org': HostPolicy(max_connections=2, max_keepalive=2),
+    'earthquake.usgs.gov': HostPolicy(max_connections=4, max_keepalive=4),
+    'api.gdeltproject.org': HostPolicy(max_connections=4, max_keepalive=4),
+    'api.firecrawl.dev': HostPolicy(max_connections=5, max_keepalive=5),
+    # DEM-Kacheln (dem_tile_store): viele parallele Downloads, fehlende Kacheln werden ohnehin gemerkt
+    's3.amazonaws.com': HostPolicy(max_connections=16, max_keepalive=16, max_retries=1),
+    # Ollama: ein Modell rechnet ohnehin seriell, Retries würden nur stauen
+    'localhost:11434': HostPolicy(max_connections=8, max_keepalive=8, http2=False, max_retries=0),
+    '127.0.0.1:11434': HostPolicy(max_connections=8, max_keepalive=8, http2=False, max_retries=0),
+    # Übrige lokale Dienste (ChromaDB, ...)
+    'localhost': HostPolicy(http2=False),
+    '127.0.0.1': HostPolicy(http2=False),
+}
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+PoolKey = Tuple[str, str, int]
+
+
+def pool_key(url: Any) -> PoolKey:
+    """(scheme, host, port) einer URL; Standard-Ports werden ausgeschrieben."""
+    url = httpx.URL(url)
+    port = url.port or DEFAULT_PORTS.get(url.scheme, 0)
+    return url.scheme, url.host, port
+
+
+def pool_label(key: PoolKey) -> str:
+    """Anzeigeform eines PoolKey für Metriken ("http://localhost:11434")."""
+    scheme, host, port = key
+    return f"{scheme}://{host}:{port}"
+
+
+@dataclass
+class HostStats:
+    """Zähler pro Upstream (über Neuanlagen des Clients hinweg)"""
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    in_flight: int = 0
+    latency_total_ms: float = 0.0
+    latency_max_ms: float = 0.0
+    status: Dict[str, int] = field(default_factory=dict)
+
+    def record(self, status_code: int, latency_ms: float) -> None:
+        klasse = f"{status_code // 100}xx"
+        self.status[klasse] = self.status.get(klasse, 0) + 1
+        self.latency_total_ms += latency_ms
+        self.latency_max_ms = max(self.latency_max_ms, latency_ms)
+
+    def as_dict(self) -> Dict[str, Any]:
+        antworten = sum(self.status.values())
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'in_flight': self.in_flight,
+            'status': dict(self.status),
+            'latency_avg_ms': round(self.latency_total_ms / antworten, 1) if antworten else 0.0,
+            'latency_max_ms': round(self.latency_max_ms, 1),
+        }
+
+
+def _backoff_s(versuch: int, response: Optional[httpx.Response] = None) -> float:
+    if response is not None:
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            return min(float(retry_after), RETRY_AFTER_MAX_S)
+    return min(BACKOFF_BASIS_S * 2 ** versuch, BACKOFF_MAX_S)
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Transport mit Retry/Backoff und Metriken um einen httpx-Pool"""
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, policy: HostPolicy, stats: HostStats):
+        self._inner = inner
+        self.policy = policy
+        self.stats = stats
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        versuch = 0
+        while True:
+            self.stats.requests += 1
+            self.stats.in_flight += 1
+            start = time.perf_counter()
+            try:
+                response = await self._inner.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                # Request wurde nicht gesendet -> für jede Methode wiederholbar
+                self.stats.errors += 1
+                if versuch >= self.policy.max_retries:
+                    raise
+                self.stats.retries += 1
+                await asyncio.sleep(_backoff_s(versuch))
+                versuch += 1
+                continue
+            except httpx.TransportError:
+                self.stats.errors += 1
+                raise
+            finally:
+                self.stats.in_flight -= 1
+
+            self.stats.record(response.status_code, (time.perf_counter() - start) * 1000)
+            if (
+                response.status_code in RETRY_STATUS
+                and request.method in IDEMPOTENT_METHODS
+                and versuch < self.policy.max_retries
+            ):
+                pause = _backoff_s(versuch, response)
+                await response.aclose()
+                self.stats.retries += 1
+                logger.debug(f"{request.url.host}: {response.status_code}, Retry in {pause:.1f}s")
+                await asyncio.sleep(pause)
+                versuch += 1
+                continue
+            return response
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+
+
+class HttpClientRegistry:
+    """Hält einen AsyncClient pro (scheme, host, port); Clients entstehen beim ersten Zugriff."""
+
+    def __init__(self, policies: Optional[Dict[str, HostPolicy]] = None, default: HostPolicy = DEFAULT_POLICY):
+        self.policies = dict(HOST_POLICIES if policies is None else policies)
+        self.default = default
+        self._clients: Dict[PoolKey, Tuple[httpx.AsyncClient, asyncio.AbstractEventLoop]] = {}
+        self._stats: Dict[PoolKey, HostStats] = {}
+
+    def policy_for(self, key: PoolKey) -> HostPolicy:
+        """Policy für "host:port", sonst für "host", sonst die Default-Policy."""
+        _, host, port = key
+        policy = self.policies.get(f"{host}:{port}")
+        if policy is None:
+            policy = self.policies.get(host, self.default)
+        return policy
+
+    def client_for(self, url: Any) -> httpx.AsyncClient:
+        """Gepoolter Client für (scheme, host, port) der URL (innerhalb eines laufenden Event-Loops)."""
+        key = pool_key(url)
+        loop = asyncio.get_running_loop()
+        eintrag = self._clients.get(key)
+        # Pools sind an ihren Event-Loop gebunden (CLI-Skripte rufen asyncio.run mehrfach)
+        if eintrag is not None and eintrag[1] is loop and not eintrag[0].is_closed:
+            return eintrag[0]
+
+        policy = self.policy_for(key)
+        stats = self._stats.setdefault(key, HostStats())
+        http2 = policy.http2 and HTTP2_AVAILABLE and key[0] == 'https'
+        limits = httpx.Limits(
+            max_connections=policy.max_connections,
+            max_keepalive_connections=policy.max_keepalive,
+            keepalive_expiry=policy.keepalive_expiry_s,
+        )
+        transport = RetryTransport(httpx.AsyncHTTPTransport(limits=limits, http2=http2), policy, stats)
+        client = httpx.AsyncClient(transport=transport)
+        self._clients[key] = (client, loop)
+        return client
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'http2_available': HTTP2_AVAILABLE,
+            'hosts': {pool_label(key): stats.as_dict() for key, stats in sorted(self._stats.items())},
+        }
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for client, loop in clients.values():
+            if loop is asyncio.get_running_loop():
+                await client.aclose()
+
+
+class PooledClient:
+    """
+    Schlanke Sicht auf die Registry mit der Schnittstelle eines AsyncClient
+    (get/post/.../stream). Standard-Timeout und -Header gelten pro Request;
+    aclose()/async with schließen nichts.
+    """
+
+    def __init__(
+        self,
+        registry: HttpClientRegistry,
+        timeout: Any = httpx.USE_CLIENT_DEFAULT,
+        headers: Optional[Dict[str, str]] = None,
+        follow_redirects: bool = False,
+    ):
+        self.registry = registry
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.follow_redirects = follow_redirects
+
+    def _kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        kwargs.setdefault('timeout', self.timeout)
+        kwargs.setdefault('follow_redirects', self.follow_redirects)
+        if self.headers:
+            kwargs['headers'] = {**self.headers, **(kwargs.get('headers') or {})}
+        return kwargs
+
+    async def request(self, method: str, url: Any, **kwargs) -> httpx.Response:
+        return await self.registry.client_for(url).request(method, url, **self._kwargs(kwargs))
+
+    async def get(self, url: Any, **kwargs) -> httpx.Response:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: Any, **kwargs) -> httpx.Response:
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url: Any, **kwargs) -> httpx.Response:
+        return await self.request('PUT', url, **kwargs)
+
+    async def delete(self, url: Any, **kwargs) -> httpx.Response:
+        return await self.request('DELETE', url, **kwargs)
+
+    async def head(self, url: Any, **kwargs) -> httpx.Response:
+        return await self.request('HEAD', url, **kwargs)
+
+    def stream(self, method: str, url: Any, **kwargs):
+        return self.registry.client_for(url).stream(method, url, **self._kwargs(kwargs))
+
+    async def aclose(self) -> None:
+        """Pools gehören der Registry"""
+
+    async def __aenter__(self) -> 'PooledClient':
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+
+_registry: Optional[HttpClientRegistry] = None
+
+
+def get_http_registry() -> HttpClientRegistry:
+    """Prozessweite Registry (Start/Stop im FastAPI-lifespan)."""
+    global _registry
+    if _registry is None:
+        _registry = HttpClientRegistry()
+    return _registry
+
+
+def pooled_client(
+    timeout: Any = httpx.USE_CLIENT_DEFAULT,
+    headers: Optional[Dict[str, str]] = None,
+    follow_redirects: bool = False,
+) -> PooledClient:
+    """Ersatz für httpx.AsyncClient(timeout=..., headers=...) auf den geteilten Pools."""
+    return PooledClient(get_http_registry(), timeout=timeout, headers=headers, follow_redirects=follow_redirects)
@@ -0,0 +1,104 @@
+"""
+TERA Keyword-Automat
+====================
+Aho-Corasick über Keyword-Listen (Themen, Urgenz, Sentiment, Ortsnamen):
+alle Treffer in einem Durchlauf pro Text statt einer Suche pro Keyword.
+Gleicher Automat wie mining/keyword_matcher.py: das Backend-Image enthält
+nur app/backend/, daher die Kopie. tests/test_keyword_matcher.py prüft,
+dass beide Dateien identischen Code enthalten.
+"""
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Set, Tuple
+
+
+def _wortzeichen(ch: str) -> bool:
+    """Wie \\w in re (Unicode): Buchstaben, Ziffern, Unterstrich"""
+    return ch.isalnum() or ch == '_'
+
+
+class Treffer(NamedTuple):
+    """Vorkommen eines Keywords: alle (Teilstring) und davon als ganzes Wort"""
+    vorkommen: int
+    ganze_woerter: int
+
+
+class KeywordAutomaton:
+    """
+    Findet alle Keywords einer Liste in einem Durchlauf über den Text.
+
+    Der Automat wird einmal gebaut (Trie + Fehlerlinks, als vollständige
+    Übergangstabelle); ein Text kostet dann einen Dict-Zugriff pro Zeichen,
+    unabhängig von der Anzahl Keywords. Ganze Wörter entsprechen
+    r'\\b' + re.escape(keyword) + r'\\b'. Groß-/Kleinschreibung wird ignoriert.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = sorted({k.lower() for k in keywords if k})
+
+        goto: List[Dict[str, int]] = [{}]
+        ausgabe: List[List[str]] = [[]]
+        for keyword in self.keywords:
+            zustand = 0
+            for ch in keyword:
+                naechster = goto[zustand].get(ch)
+                if naechster is None:
+                    naechster = len(goto)
+                    goto[zustand][ch] = naechster
+                    goto.append({})
+                    ausgabe.append([])
+                zustand = naechster
+            ausgabe[zustand].append(keyword)
+
+        # Breitensuche: Fehlerlinks und vollständige Übergänge (DFA)
+        fehler = [0] * len(goto)
+        uebergaenge: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        warteschlange = deque(goto[0].values())
+        while warteschlange:
+            zustand = warteschlange.popleft()
+            f = fehler[zustand]
+            uebergaenge[zustand] = {**uebergaenge[f], **goto[zustand]}
+            ausgabe[zustand] = ausgabe[zustand] + ausgabe[f]
+            for ch, kind in goto[zustand].items():
+                fehler[kind] = uebergaenge[f].get(ch, 0)
+                warteschlange.append(kind)
+
+        self._uebergaenge = uebergaenge
+        # Nur Zustände mit Ausgabe: (Keyword, Länge, Wortzeichen vorn, hinten)
+        self._ausgabe = {
+            zustand: tuple((k, len(k), _wortzeichen(k[0]), _wortzeichen(k[-1])) for k in treffer)
+            for zustand, treffer in enumerate(ausgabe) if treffer
+        }
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, str, bool]]:
+        """(Startposition, Keyword, ganzes Wort) für jedes Vorkommen im
+        kleingeschriebenen Text, sortiert nach Endposition"""
+        text = text.lower()
+        n = len(text)
+        uebergaenge = self._uebergaenge
+        ausgabe = self._ausgabe
+        zustand = 0
+        for i, ch in enumerate(text):
+            zustand = uebergaenge[zustand].get(ch, 0)
+            if zustand in ausgabe:
+                rechts = i + 1 < n and _wortzeichen(text[i + 1])
+                for keyword, laenge, wort_vorn, wort_hinten in ausgabe[zustand]:
+                    start = i - laenge + 1
+                    links = start > 0 and _wortzeichen(text[start - 1])
+                    yield start, keyword, links != wort_vorn and rechts != wort_hinten
+
+    def scan(self, text: str) -> Dict[str, Treffer]:
+        """Treffer pro gefundenem Keyword"""
+        vorkommen: Dict[str, int] = {}
+        ganze: Dict[str, int] = {}
+        for _, keyword, ganzes_wort in self.iter_matches(text):
+            vorkommen[keyword] = vorkommen.get(keyword, 0) + 1
+            if ganzes_wort:
+                ganze[keyword] = ganze.get(keyword, 0) + 1
+        return {k: Treffer(v, ganze.get(k, 0)) for k, v in vorkommen.items()}
+
+    def find(self, text: str) -> Set[str]:
+        """Keywords, die als ganzes Wort im Text vorkommen"""
+        return {keyword for _, keyword, ganzes_wort in self.iter_matches(text) if ganzes_wort}
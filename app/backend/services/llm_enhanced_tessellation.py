@@ -4,15 +4,17 @@ LLM-Enhanced Tessellation Engine
 Kombiniert echte Topographie-Daten mit LLM-Prognosen
 für präzise Risikozellen-Berechnung
 """
-import h3
 import math
-import httpx
 import asyncio
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 from loguru import logger
 
+import numpy as np
+
+from services import h3_compat, h3_cover
+from services.batch_tessellation import DEM_ZOOM
 from services.topography_service import TopographyService
 
 
@@ -102,13 +104,16 @@ class LLMEnhancedTessellation:
         # 2. LLM-Faktoren aus Forecast extrahieren
         llm_factors = self._extract_llm_factors(llm_forecast, city_type)
         
-        # 3. Jede Zelle analysieren
+        # 3. DEM-Höhen für alle Zellen in einem Batch (NaN = keine Kachel)
+        dem_elevations = await self._dem_elevations(hexagons)
+        
+        # 4. Jede Zelle analysieren
         features = []
         water_count = 0
         land_count = 0
         
-        for h3_idx in hexagons:
-            cell = await self._analyze_cell(h3_idx, lat, lon, city_type, llm_factors)
+        for h3_idx, dem_elevation in zip(hexagons, dem_elevations):
+            cell = await self._analyze_cell(h3_idx, lat, lon, city_type, llm_factors, dem_elevation)
             if cell is None:
                 continue
             
@@ -123,6 +128,13 @@ class LLMEnhancedTessellation:
         logger.info(f"✅ {len(features)} Features (Land: {land_count}, Wasser: {water_count})")
         return features
     
+    async def _dem_elevations(self, hexagons: List[str]) -> np.ndarray:
+        """DEM-Höhe pro Zellzentrum (Kacheln gruppiert, fehlende parallel geladen)"""
+        if not hexagons:
+            return np.empty(0)
+        coords = np.array([h3_compat.cell_to_latlng(h) for h in hexagons], dtype=np.float64)
+        return await self.topo.elevations_m(coords[:, 0], coords[:, 1], zoom=DEM_ZOOM)
+    
     def _generate_hexagons(self, lat: float, lon: float, radius_km: float, resolution: int) -> List[str]:
         """Generiert H3 Hexagone in Bounding Box"""
         lat_delta = radius_km / 111.0
@@ -131,19 +143,7 @@ class LLMEnhancedTessellation:
         min_lat, max_lat = lat - lat_delta, lat + lat_delta
         min_lon, max_lon = lon - lon_delta, lon + lon_delta
         
-        hexagons = set()
-        step = 0.005 if resolution >= 9 else 0.01
-        
-        curr_lat = min_lat
-        while curr_lat <= max_lat:
-            curr_lon = min_lon
-            while curr_lon <= max_lon:
-                h3_idx = h3.geo_to_h3(curr_lat, curr_lon, resolution)
-                hexagons.add(h3_idx)
-                curr_lon += step
-            curr_lat += step
-        
-        return list(hexagons)
+        return h3_cover.bbox_cells(min_lat, min_lon, max_lat, max_lon, resolution)
     
     def _extract_llm_factors(self, llm_forecast: Dict, city_type: str) -> Dict:
         """Extrahiert Risikofaktoren aus LLM Forecast"""
@@ -180,11 +180,12 @@ class LLMEnhancedTessellation:
         center_lat: float,
         center_lon: float,
         city_type: str,
-        llm_factors: Dict
+        llm_factors: Dict,
+        dem_elevation: float = float('nan')
     ) -> Optional[LLMCellData]:
         """Analysiert eine Zelle mit echten + LLM Daten"""
         
-        cell_lat, cell_lon = h3.h3_to_geo(h3_idx)
+        cell_lat, cell_lon = h3_compat.cell_to_latlng(h3_idx)
         
         # Entfernung zum Zentrum
         dist_km = self._haversine(cell_lat, cell_lon, center_lat, center_lon)
@@ -197,8 +198,11 @@ class LLMEnhancedTessellation:
         if is_ocean and abs(coast_dist) > 5.0:
             return None
         
-        # Höhenschätzung
-        elevation = self._estimate_elevation(cell_lat, coast_dist, is_ocean)
+        # Höhe aus DEM, Schätzung für Wasser und fehlende Kacheln
+        if is_ocean or math.isnan(dem_elevation):
+            elevation = self._estimate_elevation(cell_lat, coast_dist, is_ocean)
+        else:
+            elevation = float(dem_elevation)
         
         # === LLM-ENHANCED RISIKO ===
         risk_type, risk_score, reasons = self._calculate_risk(
@@ -316,22 +320,10 @@ class LLMEnhancedTessellation:
         return self._ocean_cache[key]
     
     def _calc_coast_distance(self, h3_idx: str, is_ocean: bool) -> float:
-        """Berechnet ungefähre Küstendistanz über H3-Ringe"""
-        edge_km = 0.5  # Ungefähr für Resolution 8
-        
-        for k in range(1, 8):
-            try:
-                ring = h3.k_ring(h3_idx, k)
-                for neighbor in ring:
-                    nlat, nlon = h3.h3_to_geo(neighbor)
-                    neighbor_ocean = self._is_ocean_cached(nlat, nlon)
-                    if neighbor_ocean != is_ocean:
-                        dist = k * edge_km
-                        return -dist if is_ocean else dist
-            except:
-                continue
-        
-        return 10.0 if not is_ocean else -10.0
+        """Küstendistanz in km aus dem vorberechneten Küsten-Index"""
+        lat, lon = h3_compat.cell_to_latlng(h3_idx)
+        dist = abs(self.topo.coast_distance_km(lat, lon))
+        return -dist if is_ocean else dist
     
     def _estimate_elevation(self, lat: float, coast_dist: float, is_ocean: bool) -> float:
         """Schnelle Höhenschätzung ohne externe API"""
@@ -355,7 +347,7 @@ class LLMEnhancedTessellation:
     
     def _cell_to_feature(self, cell: LLMCellData) -> Dict:
         """Konvertiert Zelle zu GeoJSON Feature"""
-        boundary = h3.h3_to_geo_boundary(cell.h3_index, geo_json=True)
+        boundary = h3_compat.cell_to_boundary_lnglat(cell.h3_index)
         
         return {
             'type': 'Feature',
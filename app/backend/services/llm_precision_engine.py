@@ -2,12 +2,12 @@
 LLM Precision Engine - Präzise Prognosen auf Basis echter Daten
 Verwendet Ollama (llama3.1:8b) für wissenschaftlich fundierte Analysen
 """
-import httpx
 import asyncio
 from datetime import datetime
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
 from loguru import logger
+from services.ollama_client import OllamaClient
 
 
 @dataclass
@@ -71,6 +71,7 @@ class LLMPrecisionEngine:
     def __init__(self, ollama_url: str = "http://localhost:11434"):
         self.ollama_url = ollama_url
         self.ollama_model = "llama3.1:8b"
+        self.llm = OllamaClient(base_url=ollama_url, model=self.ollama_model)
     
     async def generate_precision_forecast(
         self,
@@ -86,23 +87,48 @@ class LLMPrecisionEngine:
         """
         logger.info(f"🎯 Precision Forecast für {location} ({risk_type})")
         
+        llm_analysis = await self.scientific_analysis(location, country, lat, lon, risk_type)
+        return self.compile_precision_forecast(location, lat, lon, risk_type, current_data, llm_analysis)
+    
+    async def scientific_analysis(
+        self,
+        location: str,
+        country: str,
+        lat: float,
+        lon: float,
+        risk_type: str
+    ) -> Dict[str, Any]:
+        """
+        LLM-Teil der Prognose. Der Prompt nutzt nur die IPCC-Basisprojektionen,
+        daher kann er parallel zu Risiko- und Echtzeit-Analyse laufen.
+        """
         # 1. Echte Basisdaten berechnen
         base_data = self._calculate_base_projections(lat, lon, risk_type)
         
-        # 2. Aktuelle Bedingungen einbeziehen
-        enhanced_data = self._enhance_with_current_data(base_data, current_data)
+        # 2. LLM für wissenschaftliche Interpretation
+        return await self._llm_scientific_analysis(location, country, risk_type, base_data)
+    
+    def compile_precision_forecast(
+        self,
+        location: str,
+        lat: float,
+        lon: float,
+        risk_type: str,
+        current_data: Dict[str, Any],
+        llm_analysis: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Kombiniert LLM-Analyse mit aktuellen Risikodaten zur finalen Prognose"""
+        base_data = self._calculate_base_projections(lat, lon, risk_type)
         
-        # 3. LLM für wissenschaftliche Interpretation
-        llm_analysis = await self._llm_scientific_analysis(
-            location, country, risk_type, enhanced_data
-        )
+        # 3. Aktuelle Bedingungen einbeziehen
+        enhanced_data = self._enhance_with_current_data(base_data, current_data)
         
         # 4. Strukturierte Prognose erstellen
-        forecast = self._compile_forecast(
-            location, risk_type, enhanced_data, llm_analysis
-        )
-        
-        return forecast
+        return self._compile_forecast(location, risk_type, enhanced_data, llm_analysis)
+    
+    def fallback_analysis(self, location: str, risk_type: str) -> Dict[str, Any]:
+        """Regelbasierte Analyse ohne LLM (z.B. bei Timeout)"""
+        return self._fallback_analysis(location, risk_type)
     
     def _calculate_base_projections(
         self, lat: float, lon: float, risk_type: str
@@ -201,20 +227,12 @@ Erstelle eine präzise wissenschaftliche Einschätzung:
 Antworte sachlich und quantitativ."""
         
         try:
-            async with httpx.AsyncClient(timeout=60) as client:
-                resp = await client.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={
-                        'model': self.ollama_model,
-                        'prompt': prompt,
-                        'stream': False,
-                        'options': {'temperature': 0.2}  # Niedrig für Konsistenz
-                    }
-                )
-                
-                if resp.status_code == 200:
-                    response_text = resp.json().get('response', '')
-                    return self._parse_llm_response(response_text)
+            response_text = await self.llm.generate(
+                prompt,
+                options={'temperature': 0.2},  # Niedrig für Konsistenz
+                timeout=60,
+            )
+            return self._parse_llm_response(response_text)
                     
         except Exception as e:
             logger.error(f"LLM Analysis error: {e}")
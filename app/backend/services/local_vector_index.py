@@ -0,0 +1,290 @@
+"""
+TERA Lokaler Vektorindex
+========================
+In-Process-Ersatz für eine ChromaDB-Collection (gleiche Methoden und
+Ergebnisformate wie add/upsert/get/query/count), damit VectorStore ohne
+ChromaDB-Server suchen kann:
+
+- Vektoren normiert in einer zusammenhängenden float32-Matrix, Kosinus-
+  Suche brute-force als eine Matrixmultiplikation über die Kandidaten
+- Invertierter Index h3_index -> Zeilen: Zell- und k-Ring-Filter wählen
+  Kandidaten ohne Scan über alle Metadaten
+- where-Filter ($eq/$ne/$gt/$gte/$lt/$lte/$in/$nin/$and/$or) vektorisiert
+  über Metadaten-Spalten
+- Persistenz als vectors.npy + records.json; beim Öffnen wird die Matrix
+  per Memory-Mapping geladen und erst beim ersten Schreiben kopiert
+
+Standardpfad: ~/.tera_cache/vector_index/<name>/
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+_VECTORS_FILE = "vectors.npy"
+_RECORDS_FILE = "records.json"
+# Ab Anteil 1/_GATHER_RATIO gefilterter Zeilen wird nicht mehr gesammelt
+_GATHER_RATIO = 8
+
+_VERGLEICHE = {
+    "$gt": np.greater,
+    "$gte": np.greater_equal,
+    "$lt": np.less,
+    "$lte": np.less_equal,
+}
+
+
+def default_index_dir() -> Path:
+    return Path(os.path.expanduser("~")) / ".tera_cache" / "vector_index"
+
+
+class LocalVectorIndex:
+    """Collection-kompatibler Vektorindex im Prozess"""
+
+    def __init__(self, name: str = "tera_contexts", path: Optional[str] = None):
+        self.name = name
+        self.path = Path(path) if path else default_index_dir() / name
+        self.dim: Optional[int] = None
+        self._vectors: Optional[np.ndarray] = None  # Kapazität >= Anzahl Zeilen
+        self._n = 0
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._row_of: Dict[str, int] = {}
+        self._h3_rows: Dict[str, List[int]] = {}
+        self._columns: Dict[str, np.ndarray] = {}
+        self._dirty = False
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Collection-Schnittstelle
+    # ------------------------------------------------------------------
+
+    def count(self) -> int:
+        return self._n
+
+    def add(self, ids: Sequence[str], embeddings=None, documents=None, metadatas=None) -> None:
+        doppelt = [i for i in ids if i in self._row_of]
+        if doppelt:
+            raise ValueError(f"IDs already in index: {doppelt[:5]}")
+        self.upsert(ids, embeddings=embeddings, documents=documents, metadatas=metadatas)
+
+    def upsert(self, ids: Sequence[str], embeddings=None, documents=None, metadatas=None) -> None:
+        if embeddings is None:
+            raise ValueError("LocalVectorIndex needs embeddings (see VectorStore.index_contexts)")
+        vektoren = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        if vektoren.ndim != 2 or len(vektoren) != len(ids):
+            raise ValueError("embeddings must have one row per id")
+        if self.dim is None:
+            self.dim = vektoren.shape[1]
+        elif vektoren.shape[1] != self.dim:
+            raise ValueError(f"embedding dimension {vektoren.shape[1]} != index dimension {self.dim}")
+
+        documents = documents if documents is not None else [""] * len(ids)
+        metadatas = metadatas if metadatas is not None else [{}] * len(ids)
+        neu = sum(1 for i in dict.fromkeys(ids) if i not in self._row_of)
+        self._reserve(self._n + neu)
+
+        zeilen = np.empty(len(ids), dtype=np.int64)
+        for pos, (id, doc, meta) in enumerate(zip(ids, documents, metadatas)):
+            meta = dict(meta or {})
+            zeile = self._row_of.get(id)
+            if zeile is None:
+                zeile = self._n
+                self._n += 1
+                self._row_of[id] = zeile
+                self._ids.append(id)
+                self._documents.append(doc)
+                self._metadatas.append(meta)
+            else:
+                alt = self._metadatas[zeile].get("h3_index")
+                if alt is not None:
+                    self._h3_rows[alt].remove(zeile)
+                self._documents[zeile] = doc
+                self._metadatas[zeile] = meta
+            h3_index = meta.get("h3_index")
+            if h3_index is not None:
+                self._h3_rows.setdefault(h3_index, []).append(zeile)
+            zeilen[pos] = zeile
+        # Bei doppelten IDs im selben Aufruf gewinnt (wie in ChromaDB) der letzte Eintrag
+        self._vectors[zeilen] = vektoren
+        self._columns.clear()
+        self._dirty = True
+
+    def get(self, ids: Optional[Sequence[str]] = None, where: Optional[Dict] = None,
+            limit: Optional[int] = None, **kwargs) -> Dict[str, List]:
+        zeilen = self._filter(where)
+        if ids is not None:
+            gesucht = np.array([self._row_of[i] for i in ids if i in self._row_of], dtype=np.int64)
+            zeilen = gesucht if zeilen is None else gesucht[np.isin(gesucht, zeilen)]
+        elif zeilen is None:
+            zeilen = np.arange(self._n)
+        if limit is not None:
+            zeilen = zeilen[:limit]
+        return {
+            "ids": [self._ids[z] for z in zeilen],
+            "documents": [self._documents[z] for z in zeilen],
+            "metadatas": [self._metadatas[z] for z in zeilen],
+        }
+
+    def query(self, query_embeddings=None, n_results: int = 10, where: Optional[Dict] = None,
+              query_texts=None, **kwargs) -> Dict[str, List[List]]:
+        if query_embeddings is None:
+            raise ValueError("LocalVectorIndex needs query_embeddings, it has no embedding function")
+        anfragen = self._normalize(np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32)))
+        ergebnis = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        zeilen = self._filter(where)
+        if self._n == 0 or (zeilen is not None and len(zeilen) == 0):
+            for key in ergebnis:
+                ergebnis[key] = [[] for _ in anfragen]
+            return ergebnis
+
+        if zeilen is None:
+            scores = anfragen @ self._vectors[:self._n].T  # (Anfragen, Kandidaten)
+        elif len(zeilen) * _GATHER_RATIO < self._n:
+            scores = anfragen @ self._vectors[zeilen].T
+        else:
+            # Viele Kandidaten: alle Zeilen rechnen statt die Matrix umzukopieren
+            scores = (anfragen @ self._vectors[:self._n].T)[:, zeilen]
+        k = min(n_results, scores.shape[1])
+        for zeile_scores in scores:
+            if k < len(zeile_scores):
+                top = np.argpartition(-zeile_scores, k - 1)[:k]
+            else:
+                top = np.arange(len(zeile_scores))
+            top = top[np.argsort(-zeile_scores[top], kind="stable")]
+            treffer = top if zeilen is None else zeilen[top]
+            ergebnis["ids"].append([self._ids[z] for z in treffer])
+            ergebnis["documents"].append([self._documents[z] for z in treffer])
+            ergebnis["metadatas"].append([self._metadatas[z] for z in treffer])
+            ergebnis["distances"].append((1.0 - zeile_scores[top]).tolist())
+        return ergebnis
+
+    # ------------------------------------------------------------------
+    # Persistenz
+    # ------------------------------------------------------------------
+
+    def persist(self) -> None:
+        """Schreibt Matrix und Records (atomar per Umbenennen)"""
+        if not self._dirty:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_vektoren = self.path / (_VECTORS_FILE + ".tmp")
+        with open(tmp_vektoren, "wb") as f:
+            np.save(f, self._vectors[:self._n] if self._vectors is not None else np.zeros((0, 0), np.float32))
+        tmp_records = self.path / (_RECORDS_FILE + ".tmp")
+        with open(tmp_records, "w", encoding="utf-8") as f:
+            json.dump({
+                "name": self.name,
+                "dim": self.dim,
+                "ids": self._ids,
+                "documents": self._documents,
+                "metadatas": self._metadatas,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_vektoren, self.path / _VECTORS_FILE)
+        os.replace(tmp_records, self.path / _RECORDS_FILE)
+        self._dirty = False
+
+    def _load(self) -> None:
+        records_pfad = self.path / _RECORDS_FILE
+        if not records_pfad.exists():
+            return
+        with open(records_pfad, encoding="utf-8") as f:
+            records = json.load(f)
+        self.dim = records["dim"]
+        self._ids = records["ids"]
+        self._documents = records["documents"]
+        self._metadatas = records["metadatas"]
+        self._n = len(self._ids)
+        # Nur lesend gemappt; _reserve kopiert vor dem ersten Schreiben
+        self._vectors = np.load(self.path / _VECTORS_FILE, mmap_mode="r") if self._n else None
+        self._row_of = {id: zeile for zeile, id in enumerate(self._ids)}
+        for zeile, meta in enumerate(self._metadatas):
+            h3_index = meta.get("h3_index")
+            if h3_index is not None:
+                self._h3_rows.setdefault(h3_index, []).append(zeile)
+
+    # ------------------------------------------------------------------
+    # Intern
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _normalize(vektoren: np.ndarray) -> np.ndarray:
+        normen = np.linalg.norm(vektoren, axis=-1, keepdims=True)
+        return vektoren / np.where(normen == 0, 1, normen)
+
+    def _reserve(self, anzahl: int) -> None:
+        """Kapazität um 50 % erweitern; ersetzt auch eine gemappte Matrix durch eine Kopie"""
+        if isinstance(self._vectors, np.memmap) or self._vectors is None or anzahl > len(self._vectors):
+            kapazitaet = max(anzahl, self._n + self._n // 2, 1024)
+            matrix = np.empty((kapazitaet, self.dim), dtype=np.float32)
+            if self._n:
+                matrix[:self._n] = self._vectors[:self._n]
+            self._vectors = matrix
+
+    def _column(self, key: str) -> np.ndarray:
+        spalte = self._columns.get(key)
+        if spalte is None:
+            spalte = np.empty(self._n, dtype=object)
+            spalte[:] = [meta.get(key) for meta in self._metadatas]
+            self._columns[key] = spalte
+        return spalte
+
+    def _numeric_column(self, key: str) -> np.ndarray:
+        spalte = self._columns.get("#" + key)
+        if spalte is None:
+            spalte = np.array([
+                v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan
+                for v in self._column(key)
+            ], dtype=np.float64)
+            self._columns["#" + key] = spalte
+        return spalte
+
+    def _filter(self, where: Optional[Dict]) -> Optional[np.ndarray]:
+        """Sortierte Zeilennummern, die where erfüllen (None: alle)"""
+        if not where:
+            return None
+        teile = []
+        for key, bedingung in where.items():
+            if key == "$and":
+                teile.extend(self._filter(w) for w in bedingung)
+            elif key == "$or":
+                oder = [self._filter(w) for w in bedingung]
+                teile.append(None if any(z is None for z in oder) else np.unique(np.concatenate(oder)))
+            else:
+                teile.append(self._condition(key, bedingung))
+        zeilen = None
+        for teil in teile:
+            if teil is not None:
+                zeilen = teil if zeilen is None else np.intersect1d(zeilen, teil, assume_unique=True)
+        return zeilen
+
+    def _condition(self, key: str, bedingung: Any) -> np.ndarray:
+        if not isinstance(bedingung, dict):
+            bedingung = {"$eq": bedingung}
+        (op, wert), = bedingung.items()
+        if key == "h3_index" and op in ("$eq", "$in"):
+            zellen = [wert] if op == "$eq" else wert
+            zeilen = [z for zelle in zellen for z in self._h3_rows.get(zelle, ())]
+            return np.unique(np.array(zeilen, dtype=np.int64))
+        if op in _VERGLEICHE:
+            with np.errstate(invalid="ignore"):
+                return np.flatnonzero(_VERGLEICHE[op](self._numeric_column(key), wert))
+        spalte = self._column(key)
+        if op == "$eq":
+            maske = spalte == wert
+        elif op == "$ne":
+            maske = spalte != wert
+        elif op in ("$in", "$nin"):
+            maske = np.zeros(self._n, dtype=bool)
+            for w in wert:
+                maske |= spalte == w
+            if op == "$nin":
+                maske = ~maske
+        else:
+            raise ValueError(f"Unsupported where operator: {op}")
+        return np.flatnonzero(maske)
@@ -4,10 +4,10 @@ NASA AppEEARS API für Vegetationsdaten
 """
 
 import os
-import httpx
 from typing import Dict, Optional
 from datetime import datetime, timedelta
 from loguru import logger
+from services.http_clients import pooled_client
 
 # NASA Earthdata Token
 NASA_TOKEN = os.environ.get('NASA_EARTHDATA_TOKEN', 
@@ -27,7 +27,7 @@ class MODISVegetationService:
     
     def __init__(self, token: str = None):
         self.token = token or NASA_TOKEN
-        self.client = httpx.AsyncClient(timeout=60.0)
+        self.client = pooled_client(timeout=60.0)
     
     async def get_ndvi_for_location(self, lat: float, lon: float) -> Dict:
         """
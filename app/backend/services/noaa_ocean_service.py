@@ -4,12 +4,12 @@ Sea Surface Temperature (SST) and Ocean Heat data from NOAA ERDDAP.
 Free API, no registration required.
 """
 
-import httpx
 import asyncio
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from loguru import logger
+from services.http_clients import pooled_client
 
 @dataclass
 class OceanData:
@@ -47,7 +47,7 @@ class NOAAOceanService:
         query = f"?analysed_sst[({yesterday}T09:00:00Z)][({lat}):1:({lat})][({lon}):1:({lon})]"
         
         try:
-            async with httpx.AsyncClient(timeout=30) as client:
+            async with pooled_client(timeout=30) as client:
                 response = await client.get(self.mur_sst_url + query)
                 
                 if response.status_code != 200:
@@ -1,15 +1,136 @@
 """
 Ollama LLM Client
-Local LLM for entity extraction
+Local LLM for entity extraction and analysis texts
+
+One client for all Ollama callers (precision engine, context service,
+realtime intelligence, extraction):
+- requests go through the shared keep-alive pool (services.http_clients)
+- tokens are streamed (`stream()` yields text chunks, `generate()` joins them)
+- completed generations are cached in SQLite, content-addressed by
+  sha256(model, prompt, options) (~/.tera_cache/ollama.sqlite)
+- identical concurrent prompts share one generation (single-flight)
+- at most `settings.ollama_num_parallel` generations per server are in
+  flight (match OLLAMA_NUM_PARALLEL of the server); further calls wait
 """
-import httpx
+import asyncio
+import functools
+import hashlib
 import json
-from typing import Optional, Dict, Any, List
-from tenacity import retry, stop_after_attempt, wait_exponential
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any, List, AsyncIterator, Tuple
 
-from config.settings import settings
 from models.schemas import ExtractedEntity, EventType
 from loguru import logger
+from services.http_clients import pooled_client
+
+
+RESPONSE_TTL_S = 30 * 24 * 3600
+
+DEFAULT_OPTIONS = {
+    "temperature": 0.1,  # Low for extraction
+    "num_predict": 2000
+}
+
+
+def cache_key(model: str, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+    """Content address of a generation: sha256 over (model, prompt, options)"""
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "options": options or {}},
+        sort_keys=True, ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """SQLite store for completed generations"""
+
+    def __init__(self, db_path: Optional[str] = None, ttl_s: float = RESPONSE_TTL_S):
+        if db_path is None:
+            db_path = os.path.join(os.path.expanduser("~"), ".tera_cache", "ollama.sqlite")
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_s
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS generation (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+        """)
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT response, created_at FROM generation WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_s:
+            return None
+        return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO generation (key, model, response, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, response, time.time()),
+            )
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM generation").fetchone()[0]
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache (opened on first use)"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
+
+
+class OllamaError(Exception):
+    """Ollama answered with an error status"""
+
+
+class _ServerState:
+    """Per Ollama server: in-flight limit, running generations and counters"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphore: Optional[Tuple[asyncio.Semaphore, asyncio.AbstractEventLoop]] = None
+        self.pending: Dict[str, asyncio.Task] = {}
+        self.stats = {
+            "hits": 0, "misses": 0, "deduplicated": 0, "generations": 0, "errors": 0,
+            "waiting": 0, "in_flight": 0, "ttft_ms_total": 0.0, "ttft_ms_max": 0.0,
+        }
+
+    def semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to their event loop (CLI scripts call asyncio.run repeatedly)
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[1] is not loop:
+            self._semaphore = (asyncio.Semaphore(self.limit), loop)
+        return self._semaphore[0]
+
+
+_servers: Dict[str, _ServerState] = {}
 
 
 EXTRACTION_PROMPT = """You are an expert at extracting geospatial entities from news articles.
@@ -44,15 +165,40 @@ JSON OUTPUT:"""
 class OllamaClient:
     """Client for local Ollama LLM"""
     
-    def __init__(self):
-        self.base_url = settings.OLLAMA_URL
-        self.model = settings.OLLAMA_MODEL
-        self.timeout = settings.OLLAMA_TIMEOUT
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+        cache: Optional[ResponseCache] = None,
+    ):
+        if None in (base_url, model, timeout, max_in_flight):
+            from config.settings import settings
+            base_url = base_url or settings.ollama_url
+            model = model or settings.ollama_model
+            timeout = timeout or settings.ollama_timeout
+            max_in_flight = max_in_flight or settings.ollama_num_parallel
+        
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.timeout = timeout
+        self._cache = cache
+        server = _servers.get(self.base_url)
+        if server is None:
+            server = _servers[self.base_url] = _ServerState(max_in_flight)
+        self._server = server
+    
+    @property
+    def cache(self) -> ResponseCache:
+        if self._cache is None:
+            self._cache = get_response_cache()
+        return self._cache
     
     async def health_check(self) -> bool:
         """Check if Ollama is running"""
         try:
-            async with httpx.AsyncClient(timeout=5) as client:
+            async with pooled_client(timeout=5) as client:
                 response = await client.get(f"{self.base_url}/api/tags")
                 return response.status_code == 200
         except Exception as e:
@@ -62,7 +208,7 @@ class OllamaClient:
     async def list_models(self) -> List[str]:
         """List available models"""
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
+            async with pooled_client(timeout=10) as client:
                 response = await client.get(f"{self.base_url}/api/tags")
                 data = response.json()
                 return [m["name"] for m in data.get("models", [])]
@@ -70,28 +216,152 @@ class OllamaClient:
             logger.error(f"Failed to list models: {e}")
             return []
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
-    async def generate(self, prompt: str, stream: bool = False) -> str:
-        """Generate text from prompt"""
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(
-                f"{self.base_url}/api/generate",
-                json={
-                    "model": self.model,
-                    "prompt": prompt,
-                    "stream": stream,
-                    "options": {
-                        "temperature": 0.1,  # Low for extraction
-                        "num_predict": 2000
-                    }
-                }
-            )
-            
-            if response.status_code != 200:
-                raise Exception(f"Ollama error: {response.text}")
-            
-            data = response.json()
-            return data.get("response", "")
+    async def stream(
+        self,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+    ) -> AsyncIterator[str]:
+        """Yields the completion in text chunks as the model produces them.
+        
+        Cached prompts yield the stored text as one chunk; while generate()
+        is running for the same prompt, its result is awaited instead.
+        """
+        if options is None:
+            options = DEFAULT_OPTIONS
+        model = model or self.model
+        key = cache_key(model, prompt, options)
+        stats = self._server.stats
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                stats["hits"] += 1
+                yield cached
+                return
+            task = self._server.pending.get(key)
+            if task is not None and task.get_loop() is asyncio.get_running_loop():
+                stats["deduplicated"] += 1
+                yield await asyncio.shield(task)
+                return
+        stats["misses"] += 1
+        
+        parts: List[str] = []
+        async for chunk in self._stream_upstream(prompt, options, model, timeout):
+            parts.append(chunk)
+            yield chunk
+        # Only complete generations are cached (not streams the caller stopped early)
+        if use_cache:
+            self.cache.put(key, model, "".join(parts))
+    
+    async def _stream_upstream(
+        self,
+        prompt: str,
+        options: Optional[Dict[str, Any]],
+        model: str,
+        timeout: Optional[float],
+    ) -> AsyncIterator[str]:
+        stats = self._server.stats
+        stats["waiting"] += 1
+        async with self._server.semaphore():
+            stats["waiting"] -= 1
+            stats["in_flight"] += 1
+            start = time.perf_counter()
+            first = True
+            try:
+                async with pooled_client(timeout=timeout or self.timeout) as client:
+                    async with client.stream(
+                        "POST",
+                        f"{self.base_url}/api/generate",
+                        json={"model": model, "prompt": prompt, "stream": True, "options": options},
+                    ) as response:
+                        if response.status_code != 200:
+                            await response.aread()
+                            raise OllamaError(f"Ollama error {response.status_code}: {response.text}")
+                        async for line in response.aiter_lines():
+                            if not line:
+                                continue
+                            data = json.loads(line)
+                            if data.get("error"):
+                                raise OllamaError(f"Ollama error: {data['error']}")
+                            chunk = data.get("response", "")
+                            if chunk:
+                                if first:
+                                    ttft_ms = (time.perf_counter() - start) * 1000
+                                    stats["ttft_ms_total"] += ttft_ms
+                                    stats["ttft_ms_max"] = max(stats["ttft_ms_max"], ttft_ms)
+                                    first = False
+                                yield chunk
+                            if data.get("done"):
+                                break
+                stats["generations"] += 1
+            except Exception:
+                stats["errors"] += 1
+                raise
+            finally:
+                stats["in_flight"] -= 1
+    
+    async def generate(
+        self,
+        prompt: str,
+        options: Optional[Dict[str, Any]] = None,
+        model: Optional[str] = None,
+        timeout: Optional[float] = None,
+        use_cache: bool = True,
+    ) -> str:
+        """Generate text from prompt (cached, single-flight per prompt)"""
+        if options is None:
+            options = DEFAULT_OPTIONS
+        if not use_cache:
+            return "".join([c async for c in self.stream(prompt, options, model, timeout, use_cache=False)])
+        
+        key = cache_key(model or self.model, prompt, options)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._server.stats["hits"] += 1
+            return cached
+        
+        # Single-flight: identical concurrent prompts await the same generation
+        loop = asyncio.get_running_loop()
+        task = self._server.pending.get(key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._generate_into_cache(key, prompt, options, model, timeout))
+            self._server.pending[key] = task
+            task.add_done_callback(functools.partial(self._forget, key))
+        else:
+            self._server.stats["deduplicated"] += 1
+        return await asyncio.shield(task)
+    
+    async def _generate_into_cache(
+        self,
+        key: str,
+        prompt: str,
+        options: Dict[str, Any],
+        model: Optional[str],
+        timeout: Optional[float],
+    ) -> str:
+        model = model or self.model
+        self._server.stats["misses"] += 1
+        text = "".join([c async for c in self._stream_upstream(prompt, options, model, timeout)])
+        self.cache.put(key, model, text)
+        return text
+    
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._server.pending.get(key) is task:
+            del self._server.pending[key]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._server.stats)
+        ttft_total = stats.pop("ttft_ms_total")
+        lookups = stats["hits"] + stats["deduplicated"] + stats["misses"]
+        return {
+            **stats,
+            "max_in_flight": self._server.limit,
+            "hit_rate": round((stats["hits"] + stats["deduplicated"]) / lookups, 3) if lookups else 0.0,
+            "ttft_ms_avg": round(ttft_total / stats["generations"], 1) if stats["generations"] else 0.0,
+            "ttft_ms_max": round(stats["ttft_ms_max"], 1),
+        }
     
     async def extract_entities(self, text: str) -> List[ExtractedEntity]:
         """Extract geospatial entities from text using LLM"""
@@ -167,3 +437,14 @@ SUMMARY:"""
             logger.error(f"Summarization failed: {e}")
             return ""
 
+
+
+_client: Optional[OllamaClient] = None
+
+
+def get_ollama_client() -> OllamaClient:
+    """Process-wide client for settings.ollama_url"""
+    global _client
+    if _client is None:
+        _client = OllamaClient()
+    return _client
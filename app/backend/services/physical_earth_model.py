@@ -7,6 +7,10 @@ Physik-basiertes Modell für:
 - Wasser-Zyklus (Penman-Monteith ET)
 - Carbon-Zyklus (Light Use Efficiency GPP)
 
+calculate_cell_state rechnet eine Zelle (verschachtelte Dataclasses),
+calculate_states dieselben Gleichungen als NumPy-Arrays für einen ganzen
+Zellsatz (CellStates, Struct-of-Arrays).
+
 Compatible with h3 v3.7.x
 """
 
@@ -15,6 +19,9 @@ from typing import List, Dict, Tuple, Optional
 from datetime import datetime, timezone
 import math
 import h3
+import numpy as np
+
+from services import h3_compat, h3_cover
 
 
 # =====================================================
@@ -95,6 +102,116 @@ class CellState:
     risk_drivers: List[str] = field(default_factory=list)
 
 
+def _runde(x: np.ndarray, stellen: int) -> np.ndarray:
+    """round() elementweise: np.round skaliert vor dem Runden und kippt
+    dabei Grenzfälle (0.595 -> 0.6), die werden einzeln mit round() gerundet."""
+    skaliert = x * 10.0 ** stellen
+    ergebnis = np.round(x, stellen)
+    grenzfall = np.abs(np.abs(skaliert) % 1 - 0.5) < 1e-6
+    if grenzfall.any():
+        ergebnis[grenzfall] = [round(v, stellen) for v in x[grenzfall].tolist()]
+    return ergebnis
+
+
+# Risiko-Treiber in Prüfreihenfolge (Spalten von CellStates.risk_driver_mask)
+RISK_DRIVERS = ('extreme_heat', 'drought_stress', 'flood_risk', 'carbon_loss')
+
+
+@dataclass
+class CellStates:
+    """Struct-of-Arrays für viele Zellen (gleiche Werte wie CellState je Zelle)"""
+    h3_index: List[str]
+    lat: np.ndarray
+    lon: np.ndarray
+    timestamp: datetime
+    temperature_c: np.ndarray
+    humidity_pct: np.ndarray
+    cloud_cover_pct: np.ndarray
+    # Energy
+    sw_incoming: np.ndarray
+    sw_absorbed: np.ndarray
+    lw_outgoing: np.ndarray
+    lw_incoming: np.ndarray
+    net_radiation: np.ndarray
+    sensible_heat: np.ndarray
+    latent_heat: np.ndarray
+    ground_heat: np.ndarray
+    bowen_ratio: np.ndarray
+    # Water
+    precipitation: np.ndarray
+    evapotranspiration: np.ndarray
+    runoff: np.ndarray
+    infiltration: np.ndarray
+    soil_moisture: np.ndarray
+    water_balance: np.ndarray
+    # Carbon
+    gpp: np.ndarray
+    npp: np.ndarray
+    ra: np.ndarray
+    rh: np.ndarray
+    nee: np.ndarray
+    ndvi: np.ndarray
+    lai: np.ndarray
+    fpar: np.ndarray
+    # Risk
+    risk_score: np.ndarray
+    risk_driver_mask: np.ndarray  # (n, len(RISK_DRIVERS)) bool
+
+    def __len__(self) -> int:
+        return len(self.h3_index)
+
+    def risk_drivers(self, i: int) -> List[str]:
+        return [d for d, aktiv in zip(RISK_DRIVERS, self.risk_driver_mask[i]) if aktiv]
+
+    def state(self, i: int) -> CellState:
+        """Einzelne Zelle als CellState"""
+        f = lambda a: float(a[i])
+        return CellState(
+            h3_index=self.h3_index[i],
+            lat=f(self.lat),
+            lon=f(self.lon),
+            timestamp=self.timestamp,
+            temperature_c=f(self.temperature_c),
+            humidity_pct=f(self.humidity_pct),
+            cloud_cover_pct=f(self.cloud_cover_pct),
+            energy=EnergyBudget(
+                sw_incoming=f(self.sw_incoming), sw_absorbed=f(self.sw_absorbed),
+                lw_outgoing=f(self.lw_outgoing), lw_incoming=f(self.lw_incoming),
+                net_radiation=f(self.net_radiation), sensible_heat=f(self.sensible_heat),
+                latent_heat=f(self.latent_heat), ground_heat=f(self.ground_heat),
+                bowen_ratio=f(self.bowen_ratio),
+            ),
+            water=WaterCycle(
+                precipitation=f(self.precipitation), evapotranspiration=f(self.evapotranspiration),
+                runoff=f(self.runoff), infiltration=f(self.infiltration),
+                soil_moisture=f(self.soil_moisture), water_balance=f(self.water_balance),
+            ),
+            carbon=CarbonCycle(
+                gpp=f(self.gpp), npp=f(self.npp), ra=f(self.ra), rh=f(self.rh), nee=f(self.nee),
+                ndvi=f(self.ndvi), lai=f(self.lai), fpar=f(self.fpar),
+            ),
+            risk_score=f(self.risk_score),
+            risk_drivers=self.risk_drivers(i),
+        )
+
+    def states(self) -> List[CellState]:
+        return [self.state(i) for i in range(len(self))]
+
+    @staticmethod
+    def concat(teile: List['CellStates']) -> 'CellStates':
+        """Fügt Teilergebnisse (z.B. Shards) in Reihenfolge zusammen"""
+        erstes = teile[0]
+        werte = {}
+        for name in erstes.__dataclass_fields__:
+            if name == 'timestamp':
+                werte[name] = erstes.timestamp
+            elif name == 'h3_index':
+                werte[name] = [h for t in teile for h in t.h3_index]
+            else:
+                werte[name] = np.concatenate([getattr(t, name) for t in teile])
+        return CellStates(**werte)
+
+
 # =====================================================
 # PHYSICAL MODEL
 # =====================================================
@@ -107,8 +224,9 @@ class PhysicalEarthModel:
     using fundamental physical equations.
     """
     
-    def __init__(self):
-        self.now = datetime.now(timezone.utc)
+    def __init__(self, now: Optional[datetime] = None):
+        # now fest vorgebbar: alle Shards einer Anfrage rechnen mit demselben Zeitpunkt
+        self.now = now or datetime.now(timezone.utc)
     
     def calculate_cell_state(
         self,
@@ -120,8 +238,8 @@ class PhysicalEarthModel:
     ) -> CellState:
         """Calculate complete Earth state for H3 cell"""
         
-        # Get center coordinates (h3 v3.x API)
-        lat, lon = h3.h3_to_geo(h3_index)
+        # Get center coordinates
+        lat, lon = h3_compat.cell_to_latlng(h3_index)
         
         # Calculate solar geometry
         day_of_year = self.now.timetuple().tm_yday
@@ -172,6 +290,147 @@ class PhysicalEarthModel:
             risk_drivers=risk_drivers,
         )
     
+    def calculate_states(
+        self,
+        h3_indices: List[str],
+        precipitation_mm=0.0,
+        ndvi=0.5,
+        cloud_cover=50.0,
+        soil_moisture_pct=50.0,
+        lat: Optional[np.ndarray] = None,
+        lon: Optional[np.ndarray] = None,
+    ) -> CellStates:
+        """Wie calculate_cell_state für alle Zellen auf einmal.
+
+        Parameter sind Skalare oder Arrays (eine Zeile pro Zelle); lat/lon
+        können mitgegeben werden, wenn die Zentren schon bekannt sind.
+        Zwischenwerte werden an denselben Stellen gerundet wie im
+        Einzelzell-Pfad.
+        """
+        h3_indices = list(h3_indices)
+        n = len(h3_indices)
+        if lat is None or lon is None:
+            coords = np.array([h3_compat.cell_to_latlng(h) for h in h3_indices], dtype=np.float64).reshape(n, 2)
+            lat, lon = coords[:, 0], coords[:, 1]
+        voll = lambda x: np.broadcast_to(np.asarray(x, dtype=np.float64), (n,))
+        precip = voll(precipitation_mm)
+        ndvi = voll(ndvi)
+        cloud = voll(cloud_cover)
+        soil_in = voll(soil_moisture_pct)
+
+        doy = self.now.timetuple().tm_yday
+        hour = self.now.hour + self.now.minute / 60.0
+        abs_lat = np.abs(lat)
+
+        # Temperatur (Klimatologie + Breite + Jahreszeit)
+        amplitude = 15 * (1 - abs_lat / 90) + 5
+        phase = np.where(lat >= 0, 172, 355)
+        temp = _runde(30 - abs_lat * 0.7 + amplitude * np.cos(2 * np.pi * (doy - phase) / 365), 1)
+
+        # Feuchte nach Klimazone + Niederschlag
+        base = np.select([abs_lat < 15, abs_lat < 35, abs_lat < 55], [75, 50, 65], default=70)
+        humidity = np.clip(base + np.minimum(20, precip * 2), 10, 100)
+
+        # --- Energie-Budget ---
+        decl_rad = math.radians(23.45 * math.sin(2 * math.pi * (doy - 81) / 365))
+        lat_rad = np.radians(lat)
+        hour_angle = math.radians((hour - 12) * 15)
+        cos_z = np.maximum(0, np.sin(lat_rad) * math.sin(decl_rad) +
+                           np.cos(lat_rad) * math.cos(decl_rad) * math.cos(hour_angle))
+        sw_incoming = SOLAR_CONSTANT * cos_z * (0.75 - cloud / 100 * 0.45)
+        albedo = np.clip(0.3 - ndvi * 0.15, 0.05, 0.9)
+        sw_absorbed = sw_incoming * (1 - albedo)
+        temp_k = temp + 273.15
+        lw_outgoing = 0.95 * STEFAN_BOLTZMANN * temp_k ** 4
+        lw_incoming = (0.7 + cloud / 100 * 0.25) * STEFAN_BOLTZMANN * (temp_k - 15) ** 4
+        net_radiation = sw_absorbed + lw_incoming - lw_outgoing
+        ground_heat = net_radiation * 0.1
+        available = net_radiation - ground_heat
+        bowen = 1.0 / (0.5 + ndvi)
+        latent_heat = np.where(1 + bowen > 0, available / (1 + bowen), 0.0)
+        sensible_heat = available - latent_heat
+        net_radiation_r = _runde(net_radiation, 1)
+        sw_absorbed_r = _runde(sw_absorbed, 1)
+
+        # --- Wasser-Zyklus (Penman-Monteith, vereinfacht) ---
+        es = 0.6108 * np.exp(17.27 * temp / (temp + 237.3))
+        vpd = es - es * humidity / 100
+        delta = 4098 * es / ((temp + 237.3) ** 2)
+        u2 = 2.0
+        numerator = (0.408 * delta * net_radiation_r +
+                     PSYCHROMETRIC_CONST * 900 / (temp + 273) * u2 * vpd)
+        denominator = delta + PSYCHROMETRIC_CONST * (1 + 0.34 * u2)
+        et0 = np.maximum(0, numerator / denominator)
+        et_actual = et0 * (0.2 + ndvi * 1.0) * np.minimum(1.0, soil_in / 50)
+
+        s = 254 * (100 / (70 - ndvi * 20) - 1)
+        ia = 0.2 * s
+        ueber = (precip > 0) & (precip > ia)
+        runoff = np.where(ueber, (precip - ia) ** 2 / np.where(ueber, precip - ia + s, 1.0), 0.0)
+        infiltration = np.maximum(0, precip - runoff)
+        water_balance = precip - et_actual - runoff
+        soil = _runde(np.clip(soil_in + water_balance, 0, 100), 1)
+
+        # --- Carbon-Zyklus (Light Use Efficiency) ---
+        fpar = np.clip(1.1 * ndvi - 0.1, 0, 1)
+        lai = np.minimum(8, np.maximum(0, (ndvi - 0.1) / 0.1))
+        apar = sw_absorbed_r * 0.45 * fpar
+        t_stress = np.maximum(0, 1 - ((temp - 25) / 20) ** 2)
+        w_stress = np.minimum(1, soil / 40)
+        gpp = np.maximum(0, apar * 0.0864 * (2.5 * t_stress * w_stress))
+        ra = gpp * 0.5
+        npp = gpp - ra
+        rh = 1.5 * (2.0 ** ((temp - 10) / 10)) * (soil / 50)
+        nee_r = _runde(ra + rh - gpp, 2)
+
+        # --- Risiko ---
+        komponenten = np.stack([
+            np.where(temp > 35, np.minimum(1, (temp - 35) / 10), np.nan),
+            np.where(soil < 30, 1 - soil / 30, np.nan),
+            np.where(precip > 50, np.minimum(1, (precip - 50) / 100), np.nan),
+            np.where(nee_r > 2, np.minimum(1, (nee_r - 2) / 5), np.nan),
+        ], axis=1)
+        aktiv = ~np.isnan(komponenten)
+        anzahl = aktiv.sum(axis=1)
+        summe = np.where(aktiv, komponenten, 0.0).sum(axis=1)
+        maximum = np.where(aktiv, komponenten, 0.0).max(axis=1)
+        risk = np.where(anzahl > 0, summe / np.maximum(anzahl, 1) * maximum, 0.0)
+
+        return CellStates(
+            h3_index=h3_indices,
+            lat=lat,
+            lon=lon,
+            timestamp=self.now,
+            temperature_c=temp,
+            humidity_pct=humidity.astype(np.float64),
+            cloud_cover_pct=cloud,
+            sw_incoming=_runde(sw_incoming, 1),
+            sw_absorbed=sw_absorbed_r,
+            lw_outgoing=_runde(lw_outgoing, 1),
+            lw_incoming=_runde(lw_incoming, 1),
+            net_radiation=net_radiation_r,
+            sensible_heat=_runde(sensible_heat, 1),
+            latent_heat=_runde(latent_heat, 1),
+            ground_heat=_runde(ground_heat, 1),
+            bowen_ratio=_runde(bowen, 2),
+            precipitation=_runde(precip, 2),
+            evapotranspiration=_runde(et_actual, 2),
+            runoff=_runde(runoff, 2),
+            infiltration=_runde(infiltration, 2),
+            soil_moisture=soil,
+            water_balance=_runde(water_balance, 2),
+            gpp=_runde(gpp, 2),
+            npp=_runde(npp, 2),
+            ra=_runde(ra, 2),
+            rh=_runde(rh, 2),
+            nee=nee_r,
+            ndvi=_runde(ndvi, 2),
+            lai=_runde(lai, 1),
+            fpar=_runde(fpar, 3),
+            risk_score=_runde(np.minimum(1, risk), 2),
+            risk_driver_mask=aktiv & (np.nan_to_num(komponenten) > 0.3),
+        )
+    
     def _estimate_temperature(self, lat: float, doy: int) -> float:
         """Estimate temperature from latitude and day of year"""
         # Base temperature from latitude
@@ -488,44 +747,33 @@ class AdaptiveTessellation:
     ) -> List[str]:
         """Get H3 cells covering a bounding box"""
         resolution = AdaptiveTessellation.get_resolution_for_zoom(zoom)
-        
-        # Create polygon for bbox
-        polygon = [
-            (min_lat, min_lon),
-            (min_lat, max_lon),
-            (max_lat, max_lon),
-            (max_lat, min_lon),
-            (min_lat, min_lon),  # Close polygon
-        ]
-        
-        # Use h3 v3.x polyfill (expects GeoJSON format)
-        geojson = {
-            "type": "Polygon",
-            "coordinates": [[
-                [min_lon, min_lat],
-                [max_lon, min_lat],
-                [max_lon, max_lat],
-                [min_lon, max_lat],
-                [min_lon, min_lat],
-            ]]
-        }
-        
+        return h3_cover.bbox_cells(min_lat, min_lon, max_lat, max_lon, resolution)
+
+
+def viewport_states(cells: List[str], now: Optional[datetime] = None) -> CellStates:
+    """Zustände für Viewport-Zellen (/api/earth-cycles/cells)
+
+    Niederschlag, NDVI und Bodenfeuchte variieren leicht mit der Position;
+    ungültige Zellindizes werden übersprungen.
+    """
+    gueltig, coords = [], []
+    for cell in cells:
         try:
-            cells = list(h3.polyfill_geojson(geojson, resolution))
+            coords.append(h3_compat.cell_to_latlng(cell))
         except Exception:
-            # Fallback: generate grid
-            cells = []
-            lat_step = (max_lat - min_lat) / 20
-            lon_step = (max_lon - min_lon) / 20
-            for i in range(20):
-                for j in range(20):
-                    lat = min_lat + i * lat_step
-                    lon = min_lon + j * lon_step
-                    cell = h3.geo_to_h3(lat, lon, resolution)
-                    if cell not in cells:
-                        cells.append(cell)
-        
-        return cells
+            continue
+        gueltig.append(cell)
+    coords = np.array(coords, dtype=np.float64).reshape(len(gueltig), 2)
+    lat, lon = coords[:, 0], coords[:, 1]
+
+    return PhysicalEarthModel(now).calculate_states(
+        gueltig,
+        precipitation_mm=np.maximum(0, 2 + np.sin(lat * 0.1) * 3),
+        ndvi=0.3 + np.abs(np.cos(lon * 0.1)) * 0.4,
+        soil_moisture_pct=40 + np.abs(np.sin(lat * 0.05 + lon * 0.03)) * 40,
+        lat=lat,
+        lon=lon,
+    )
 
 
 # =====================================================
@@ -535,23 +783,32 @@ class AdaptiveTessellation:
 class FrontendFormatter:
     """Format data for MapLibre visualization"""
     
+    # (threshold, class, color) - first class whose threshold is exceeded
+    RISK_CLASSES = [
+        (0.7, 'KRITISCH', '#ff0000'),
+        (0.4, 'HOCH', '#ff8800'),
+        (0.2, 'MITTEL', '#ffff00'),
+        (float('-inf'), 'NIEDRIG', '#00ff88'),
+    ]
+    
+    @staticmethod
+    def risk_class(risk: float) -> Tuple[str, str]:
+        """Risk class name and fill color for a risk score"""
+        for threshold, name, color in FrontendFormatter.RISK_CLASSES:
+            if risk > threshold:
+                return name, color
+        return FrontendFormatter.RISK_CLASSES[-1][1:]
+    
     @staticmethod
     def cell_to_feature(state: CellState) -> dict:
         """Convert CellState to GeoJSON Feature"""
         
-        # Get boundary (h3 v3.x API)
-        boundary = h3.h3_to_geo_boundary(state.h3_index, geo_json=True)
+        # Get boundary
+        boundary = h3_compat.cell_to_boundary_lnglat(state.h3_index)
         
         # Risk-based color
         risk = state.risk_score
-        if risk > 0.7:
-            fill_color = '#ff0000'
-        elif risk > 0.4:
-            fill_color = '#ff8800'
-        elif risk > 0.2:
-            fill_color = '#ffff00'
-        else:
-            fill_color = '#00ff88'
+        _, fill_color = FrontendFormatter.risk_class(risk)
         
         # Height from risk
         height = 50 + risk * 450
@@ -578,6 +835,53 @@ class FrontendFormatter:
             }
         }
     
+    @staticmethod
+    def risk_class_index(risk: np.ndarray) -> np.ndarray:
+        """Index in RISK_CLASSES pro Risiko-Wert (vektorisiert risk_class)"""
+        klassen = FrontendFormatter.RISK_CLASSES
+        return np.select(
+            [risk > threshold for threshold, _, _ in klassen[:-1]],
+            list(range(len(klassen) - 1)),
+            default=len(klassen) - 1,
+        )
+    
+    @staticmethod
+    def states_to_features(states: CellStates) -> List[dict]:
+        """GeoJSON Features direkt aus den Arrays (gleiche Properties wie cell_to_feature)"""
+        farben = [color for _, _, color in FrontendFormatter.RISK_CLASSES]
+        fill = FrontendFormatter.risk_class_index(states.risk_score)
+        height = (50 + states.risk_score * 450).tolist()
+        spalten = zip(
+            states.h3_index, states.lat.tolist(), states.lon.tolist(), fill.tolist(), height,
+            states.risk_score.tolist(), states.temperature_c.tolist(), states.ndvi.tolist(),
+            states.soil_moisture.tolist(), states.net_radiation.tolist(), states.gpp.tolist(),
+            states.evapotranspiration.tolist(),
+        )
+        return [
+            {
+                "type": "Feature",
+                "geometry": {
+                    "type": "Polygon",
+                    "coordinates": [h3_compat.cell_to_boundary_lnglat(h3_index)]
+                },
+                "properties": {
+                    "h3_index": h3_index,
+                    "lat": lat,
+                    "lon": lon,
+                    "fill_color": farben[klasse],
+                    "height": hoehe,
+                    "risk_score": risk,
+                    "temperature": temp,
+                    "ndvi": ndvi,
+                    "soil_moisture": soil,
+                    "net_radiation": rn,
+                    "gpp": gpp,
+                    "et": et,
+                }
+            }
+            for h3_index, lat, lon, klasse, hoehe, risk, temp, ndvi, soil, rn, gpp, et in spalten
+        ]
+    
     @staticmethod
     def cells_to_feature_collection(states: List[CellState]) -> dict:
         """Convert list of CellStates to GeoJSON FeatureCollection"""
@@ -586,3 +890,39 @@ class FrontendFormatter:
             "type": "FeatureCollection",
             "features": features
         }
+    
+    @staticmethod
+    def cells_to_columnar(states: List[CellState], meta: Optional[dict] = None) -> bytes:
+        """Compact binary columns: h3 uint64 + risk class uint8 + risk float16"""
+        from services import h3_columnar
+        
+        labels = {
+            name: {'fill_color': color, 'min_risk': max(threshold, 0.0)}
+            for threshold, name, color in FrontendFormatter.RISK_CLASSES
+        }
+        return h3_columnar.encode(
+            [s.h3_index for s in states],
+            [FrontendFormatter.risk_class(s.risk_score)[0] for s in states],
+            [s.risk_score for s in states],
+            labels=labels,
+            meta=meta,
+        )
+    
+    @staticmethod
+    def states_to_columnar(states: CellStates, meta: Optional[dict] = None) -> bytes:
+        """Wie cells_to_columnar, direkt aus den Arrays"""
+        from services import h3_columnar
+        
+        klassen = FrontendFormatter.RISK_CLASSES
+        labels = {
+            name: {'fill_color': color, 'min_risk': max(threshold, 0.0)}
+            for threshold, name, color in klassen
+        }
+        namen = np.array([name for _, name, _ in klassen], dtype=object)
+        return h3_columnar.encode(
+            states.h3_index,
+            namen[FrontendFormatter.risk_class_index(states.risk_score)].tolist(),
+            states.risk_score,
+            labels=labels,
+            meta=meta,
+        )
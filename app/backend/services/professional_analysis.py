@@ -12,9 +12,11 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 import random
-import httpx
 from loguru import logger
 
+from services.seismic_catalog import CatalogNotReady, get_seismic_catalog
+from services.http_clients import pooled_client
+
 # Firecrawl API
 FIRECRAWL_API_KEY = os.environ.get('FIRECRAWL_API_KEY', 'fc-a0b3b8aa31244c10b0f15b4f2d570ac7')
 FIRECRAWL_AGENT_URL = "https://api.firecrawl.dev/v1/agent"
@@ -88,7 +90,7 @@ class ProfessionalAnalysisEngine:
     """
     
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=120.0)
+        self.client = pooled_client(timeout=120.0)
         self.firecrawl_key = FIRECRAWL_API_KEY
         
     async def analyze_professional(
@@ -240,7 +242,18 @@ class ProfessionalAnalysisEngine:
     async def _calculate_seismic_uncertainty(
         self, lat: float, lon: float
     ) -> UncertaintyBand:
-        """Seismisches Risiko mit USGS-Daten"""
+        """Seismisches Risiko mit USGS-Daten (lokaler Katalog, sonst direkte Abfrage)"""
+        
+        try:
+            # Letzte 30 Tage, 300km Radius, max. 100 Beben M≥4.0 (wie FDSN-Default)
+            stats = await get_seismic_catalog().query(
+                lat, lon, 300, days=30, min_magnitude=4.0, limit=100
+            )
+            return self._seismic_band(stats.count, stats.max_magnitude)
+        except CatalogNotReady:
+            pass
+        except Exception as e:
+            logger.warning(f"Seismic catalog error: {e}")
         
         try:
             # USGS API für echte Daten
@@ -254,33 +267,8 @@ class ProfessionalAnalysisEngine:
             if response.status_code == 200:
                 data = response.json()
                 quakes = data.get('features', [])
-                
-                if not quakes:
-                    return UncertaintyBand(
-                        mean=0.05, std=0.03,
-                        ci_lower=0.0, ci_upper=0.11,
-                        confidence=0.90
-                    )
-                
-                # Risiko basierend auf Magnitude und Häufigkeit
                 magnitudes = [q['properties'].get('mag', 0) or 0 for q in quakes]
-                max_mag = max(magnitudes) if magnitudes else 0
-                count = len(quakes)
-                
-                # Monte Carlo Simulation für Unsicherheit
-                mean = min(1.0, (max_mag / 10) + (count / 200))
-                std = mean * 0.2  # 20% relative Unsicherheit
-                
-                ci_lower = max(0, mean - 1.96 * std)
-                ci_upper = min(1, mean + 1.96 * std)
-                
-                return UncertaintyBand(
-                    mean=mean,
-                    std=std,
-                    ci_lower=ci_lower,
-                    ci_upper=ci_upper,
-                    confidence=0.85  # USGS ist zuverlässig
-                )
+                return self._seismic_band(len(quakes), max(magnitudes) if magnitudes else 0)
                 
         except Exception as e:
             logger.warning(f"USGS API error: {e}")
@@ -292,6 +280,30 @@ class ProfessionalAnalysisEngine:
             confidence=0.50
         )
     
+    def _seismic_band(self, count: int, max_mag: float) -> UncertaintyBand:
+        """Risiko basierend auf Magnitude und Häufigkeit"""
+        if not count:
+            return UncertaintyBand(
+                mean=0.05, std=0.03,
+                ci_lower=0.0, ci_upper=0.11,
+                confidence=0.90
+            )
+        
+        # Monte Carlo Simulation für Unsicherheit
+        mean = min(1.0, (max_mag / 10) + (count / 200))
+        std = mean * 0.2  # 20% relative Unsicherheit
+        
+        ci_lower = max(0, mean - 1.96 * std)
+        ci_upper = min(1, mean + 1.96 * std)
+        
+        return UncertaintyBand(
+            mean=mean,
+            std=std,
+            ci_lower=ci_lower,
+            ci_upper=ci_upper,
+            confidence=0.85  # USGS ist zuverlässig
+        )
+    
     def _combine_risks(
         self, risks: List[Tuple[UncertaintyBand, float]]
     ) -> UncertaintyBand:
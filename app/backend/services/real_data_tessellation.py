@@ -17,12 +17,19 @@ Datenquellen:
 
 import h3
 import math
-import httpx
-from typing import List, Dict, Tuple, Optional
+import json
+import hashlib
+import numpy as np
+from typing import AsyncIterator, List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from datetime import datetime
 import asyncio
 
+from services import h3_compat, h3_cover
+from services.batch_tessellation import DEM_ZOOM, BatchZellenAnalyse, ZellenBatch
+from services.cell_state_cache import ZellZustandCache, get_zell_zustand_cache
+from services.risk_tile_cache import VERWORFEN, RiskTileCache, get_risk_tile_cache
+from services.tessellation_executor import TessellationExecutor, get_tessellation_executor
 from services.topography_service import TopographyService
 
 # =====================================================
@@ -97,6 +104,14 @@ RISIKO_KATEGORIEN = {
     },
 }
 
+# Bei Änderungen an _berechne_risiko, batch_tessellation.risiko_regeln,
+# _schnelle_hoehe_schaetzung, der Höhenquelle oder _zelle_zu_feature erhöhen:
+# ändert den Fingerprint und invalidiert damit den Risiko-Kachel-Cache
+SCORING_VERSION = 2
+
+# Zellen pro Teilstück der Generator-Varianten (Streaming-Antworten)
+STREAM_CHUNK_ZELLEN = 512
+
 
 @dataclass
 class ZellenDaten:
@@ -127,12 +142,35 @@ class ZellenDaten:
     risiko_gruende: List[str] = None
 
 
+def features_fuer_batch(batch: ZellenBatch) -> Dict[str, Optional[dict]]:
+    """GeoJSON-Feature pro Zelle eines ZellenBatch (VERWORFEN = offshore)"""
+    features = dict.fromkeys(batch.h3_index, VERWORFEN)
+    for zelle in EchteDatenTessellation._batch_zu_zellen(batch):
+        features[zelle.h3_index] = EchteDatenTessellation._zelle_zu_feature(zelle)
+    return features
+
+
 class EchteDatenTessellation:
     """Enterprise-Grade Tessellation mit echten Daten"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        tile_cache: Optional[RiskTileCache] = None,
+        executor: Optional[TessellationExecutor] = None,
+        zell_cache: Optional[ZellZustandCache] = None,
+        use_processes: bool = True,
+    ):
         self.cache = {}
         self.topo = TopographyService()
+        self.batch = BatchZellenAnalyse(self.topo)
+        self.tile_cache = tile_cache or get_risk_tile_cache()
+        # Ortsfeste Zelleingaben über Anfragen hinweg (Pan/Zoom, Eltern -> Kinder)
+        self.zell_cache = zell_cache or get_zell_zustand_cache()
+        # Zellanalyse im Prozess-Pool (Standard: prozessweiter Executor);
+        # use_processes=False -> im eigenen Prozess rechnen
+        self.executor: Optional[TessellationExecutor] = None
+        if use_processes:
+            self.executor = executor or get_tessellation_executor()
         
     async def generiere_risikokarte(
         self,
@@ -144,6 +182,24 @@ class EchteDatenTessellation:
         llm_forecast: dict = None,
     ) -> List[dict]:
         """Generiert Risikokarte mit echten Daten"""
+        features = []
+        async for teil in self.iter_risikokarte(
+            lat, lon, stadt_typ, aufloesung, radius_km, llm_forecast
+        ):
+            features.extend(teil)
+        return features
+
+    async def iter_risikokarte(
+        self,
+        lat: float,
+        lon: float,
+        stadt_typ: str,
+        aufloesung: int = 10,
+        radius_km: float = 15.0,
+        llm_forecast: dict = None,
+        chunk: int = STREAM_CHUNK_ZELLEN,
+    ) -> AsyncIterator[List[dict]]:
+        """Generator-Variante von generiere_risikokarte: liefert Features in Teilstücken"""
         
         # Berechne Bounding Box
         lat_delta = radius_km / 111.0
@@ -159,17 +215,103 @@ class EchteDatenTessellation:
         # LLM-Forecast für Risiko-Anpassung speichern
         self._llm_forecast = llm_forecast or {}
         
-        # Analysiere jede Zelle mit echten Daten
-        features = []
-        
-        for h3_index in hexagons:
-            zelle = await self._analysiere_zelle(h3_index, lat, lon, stadt_typ)
-            if zelle is None:
-                continue
-            feature = self._zelle_zu_feature(zelle)
-            features.append(feature)
-        
-        return features
+        # Analysiere fehlende Zellen teilstückweise im Batch
+        async for teil in self._iter_features(hexagons, chunk, lat, lon, stadt_typ, self._llm_forecast):
+            yield teil
+
+    def _fingerprint(
+        self, stadt_typ: str, stadt_lat: float, stadt_lon: float, llm_forecast: dict
+    ) -> str:
+        """Fingerprint aller Eingaben, von denen ein Zell-Feature abhängt"""
+        payload = json.dumps({
+            'version': SCORING_VERSION,
+            'kategorien': RISIKO_KATEGORIEN,
+            'stadt_typ': stadt_typ,
+            'zentrum': [stadt_lat, stadt_lon],
+            'llm': llm_forecast or {},
+        }, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    async def _features_mit_cache(
+        self,
+        hexagons: List[str],
+        stadt_lat: float,
+        stadt_lon: float,
+        stadt_typ: str,
+        llm_forecast: dict = None,
+    ) -> List[dict]:
+        """Features in Eingabereihenfolge; berechnet nur Zellen, die nicht im Kachel-Cache liegen"""
+        # Zentrum auf ~1 m runden: gleiche Stadt -> gleicher Fingerprint
+        stadt_lat, stadt_lon = round(stadt_lat, 5), round(stadt_lon, 5)
+        fingerprint = self._fingerprint(stadt_typ, stadt_lat, stadt_lon, llm_forecast)
+
+        bekannt = self.tile_cache.get_many(fingerprint, hexagons)
+        fehlend = [h for h in hexagons if h not in bekannt]
+        if fehlend:
+            # Land/Meer, Küstendistanz, echte DEM-Höhen: aus dem Zellzustands-Cache
+            # bzw. von Eltern-/Kindzellen abgeleitet, nur der Rest wird berechnet
+            geo = await self.zell_cache.geografie(fehlend, self.batch, DEM_ZOOM)
+            json_texte = None
+            if self.executor is not None and len(fehlend) >= self.executor.min_shard:
+                neu, json_texte = await self.executor.features(
+                    fehlend, geo, stadt_lat, stadt_lon, stadt_typ, llm_forecast,
+                )
+            else:
+                neu = features_fuer_batch(self.batch.analysiere(
+                    fehlend, stadt_lat, stadt_lon, stadt_typ, llm_forecast, geografie=geo,
+                ))
+            self.tile_cache.put_many(fingerprint, neu, json_texte)
+            bekannt.update(neu)
+
+        return [bekannt[h] for h in hexagons if bekannt[h] is not VERWORFEN]
+
+    async def _iter_features(
+        self,
+        hexagons: List[str],
+        chunk: int,
+        stadt_lat: float,
+        stadt_lon: float,
+        stadt_typ: str,
+        llm_forecast: dict = None,
+    ) -> AsyncIterator[List[dict]]:
+        """_features_mit_cache für alle Teilstücke gleichzeitig, Ausgabe in Reihenfolge
+
+        Die Teilstücke rechnen parallel im Prozess-Pool; das erste kann
+        gestreamt werden, während die übrigen noch laufen.
+        """
+        tasks = [
+            asyncio.ensure_future(self._features_mit_cache(
+                hexagons[start:start + chunk], stadt_lat, stadt_lon, stadt_typ, llm_forecast
+            ))
+            for start in range(0, len(hexagons), chunk)
+        ]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @staticmethod
+    def _batch_zu_zellen(batch: ZellenBatch) -> List[ZellenDaten]:
+        """Konvertiert ein ZellenBatch zu ZellenDaten (offshore verworfen)"""
+        zellen = []
+        for i in np.flatnonzero(batch.behalten):
+            ist_wasser = bool(batch.ist_wasser[i])
+            zellen.append(ZellenDaten(
+                h3_index=batch.h3_index[i],
+                lat=float(batch.lat[i]),
+                lon=float(batch.lon[i]),
+                ist_wasser=ist_wasser,
+                ist_land=not ist_wasser,
+                hoehe_meter=float(batch.hoehe_meter[i]),
+                kuestenentfernung_km=abs(float(batch.kuestenentfernung_km[i])),
+                ist_urban=bool(batch.ist_urban[i]),
+                risiko_kategorie=batch.risiko_kategorie(i),
+                risiko_wert=float(batch.risiko_wert[i]),
+                risiko_gruende=batch.risiko_gruende(i),
+            ))
+        return zellen
     
     async def _analysiere_zelle(
         self,
@@ -181,14 +323,7 @@ class EchteDatenTessellation:
         """Analysiert eine Zelle mit echten geografischen Daten"""
         
         # Zellenzentrum
-        if hasattr(h3, 'cell_to_latlng'):
-            latlng = h3.cell_to_latlng(h3_index)
-            if isinstance(latlng, (tuple, list)) and len(latlng) >= 2:
-                zellen_lat, zellen_lon = latlng[0], latlng[1]
-            else:
-                zellen_lat, zellen_lon = latlng.lat, latlng.lng
-        else:
-            zellen_lat, zellen_lon = h3.h3_to_geo(h3_index)
+        zellen_lat, zellen_lon = h3_compat.cell_to_latlng(h3_index)
         
         # Entfernung vom Stadtzentrum
         entfernung_km = self._berechne_entfernung(
@@ -198,7 +333,7 @@ class EchteDatenTessellation:
         # Land/Meer + DEM Höhe (Terrarium)
         is_ocean = self.topo.is_ocean(zellen_lat, zellen_lon)
 
-        # Küsten-Distanz (approx) via H3-Rings: wie weit bis zur nächsten Land/Meer-Grenze
+        # Küsten-Distanz via Raster-Index: wie weit bis zur nächsten Land/Meer-Grenze
         # positiv = inland (Land bis Wasser), negativ = offshore (Wasser bis Land)
         kuestenentfernung = self._approx_coast_distance_km(h3_index, is_ocean)
 
@@ -418,7 +553,8 @@ class EchteDatenTessellation:
                 gruende.append('Gemäßigtes Klima - gute Resilienz')
                 return 'NIEDRIG_RISIKO', 0.22, gruende
     
-    def _zelle_zu_feature(self, zelle: ZellenDaten) -> dict:
+    @staticmethod
+    def _zelle_zu_feature(zelle: ZellenDaten) -> dict:
         """Konvertiert ZellenDaten zu GeoJSON Feature"""
         
         kategorie = RISIKO_KATEGORIEN.get(
@@ -495,40 +631,8 @@ class EchteDatenTessellation:
         max_lon: float,
         aufloesung: int
     ) -> List[str]:
-        """Füllt Bounding Box mit H3-Hexagonen"""
-        
-        geojson = {
-            'type': 'Polygon',
-            'coordinates': [[
-                [min_lon, min_lat],
-                [max_lon, min_lat],
-                [max_lon, max_lat],
-                [min_lon, max_lat],
-                [min_lon, min_lat],
-            ]]
-        }
-        
-        # Use grid sampling approach (more reliable)
-        hexagons = []
-        lat_step = (max_lat - min_lat) / 60
-        lon_step = (max_lon - min_lon) / 60
-        for i in range(60):
-            for j in range(60):
-                cell_lat = min_lat + i * lat_step
-                cell_lon = min_lon + j * lon_step
-                try:
-                    if hasattr(h3, 'latlng_to_cell'):
-                        h3_index = h3.latlng_to_cell(cell_lat, cell_lon, aufloesung)
-                    elif hasattr(h3, 'lat_lng_to_cell'):
-                        h3_index = h3.lat_lng_to_cell(cell_lat, cell_lon, aufloesung)
-                    else:
-                        h3_index = h3.geo_to_h3(cell_lat, cell_lon, aufloesung)
-                    if h3_index not in hexagons:
-                        hexagons.append(h3_index)
-                except Exception:
-                    continue
-        
-        return hexagons
+        """Füllt Bounding Box mit H3-Hexagonen (native Polyfill, sortiert)"""
+        return h3_cover.bbox_cells(min_lat, min_lon, max_lat, max_lon, aufloesung)
 
 
     def _resolution_for_zoom(self, zoom: int) -> int:
@@ -557,13 +661,10 @@ class EchteDatenTessellation:
         res = self._resolution_for_zoom(zoom)
         res = max(min_res, min(max_res, res))
 
-        while res >= min_res:
-            cells = self._fulle_bbox(min_lat, min_lon, max_lat, max_lon, res)
-            if len(cells) <= max_cells:
-                return res
-            res -= 1
-
-        return min_res
+        # Analytische Zellanzahl statt wiederholtem Füllen der Box
+        return h3_cover.fit_resolution(
+            min_lat, min_lon, max_lat, max_lon, max_cells, res, min_res
+        )
 
     async def generiere_viewport_karte(
         self,
@@ -577,102 +678,84 @@ class EchteDatenTessellation:
         refine_top_k: int = 250,
     ) -> list:
         """Viewport-basierte Karte: stabil + fein, ohne zehntausende Zellen."""
+        features = []
+        async for teil in self.iter_viewport_karte(
+            min_lat, min_lon, max_lat, max_lon, zoom, stadt_typ, max_cells, refine_top_k
+        ):
+            features.extend(teil)
+        return features
+
+    async def iter_viewport_karte(
+        self,
+        min_lat: float,
+        min_lon: float,
+        max_lat: float,
+        max_lon: float,
+        zoom: int,
+        stadt_typ: str,
+        max_cells: int = 3000,
+        refine_top_k: int = 250,
+        chunk: int = STREAM_CHUNK_ZELLEN,
+    ) -> AsyncIterator[List[dict]]:
+        """Generator-Variante von generiere_viewport_karte.
+
+        Die Basiszellen müssen komplett bewertet sein, bevor feststeht, welche
+        verfeinert werden; danach folgen die nicht verfeinerten Basiszellen
+        und die Kindzellen teilstückweise.
+
+        Bewertet wird gegen das exakte Viewport-Zentrum (Entfernung, Urban).
+        Ortsfeste Eingaben (Land/Meer, Küstendistanz, DEM-Höhe) kommen bei
+        Pan/Zoom aus dem Zellzustands-Cache bzw. von Eltern-/Kindzellen;
+        der Kachel-Cache trifft nur bei unverändertem Zentrum.
+        """
         base_res = self._fit_resolution_to_max_cells(min_lat, min_lon, max_lat, max_lon, zoom, max_cells)
         base_cells = self._fulle_bbox(min_lat, min_lon, max_lat, max_lon, base_res)
 
-        scored = []
         center_lat = (min_lat + max_lat) / 2
         center_lon = (min_lon + max_lon) / 2
-
-        for h3_index in base_cells:
-            z = await self._analysiere_zelle(h3_index, center_lat, center_lon, stadt_typ)
-            if z is None:
-                continue
-            scored.append((z.risiko_wert, z))
-
+        llm_forecast = getattr(self, '_llm_forecast', None)
+
+        base_features = []
+        async for teil in self._iter_features(
+            base_cells, chunk, center_lat, center_lon, stadt_typ, llm_forecast
+        ):
+            base_features.extend(teil)
+        scored = [(f['properties']['intensity'], f) for f in base_features]
         scored.sort(key=lambda x: x[0], reverse=True)
 
         refined = set()
         if base_res < 10 and refine_top_k > 0:
-            for _, z in scored[:refine_top_k]:
+            for _, f in scored[:refine_top_k]:
                 try:
-                    if hasattr(h3, 'cell_to_children'):
-                        children = h3.cell_to_children(z.h3_index, base_res + 1)
-                    else:
-                        children = h3.h3_to_children(z.h3_index, base_res + 1)
+                    children = h3_compat.cell_to_children(f['properties']['h3'], base_res + 1)
                 except Exception:
                     children = []
-                for c in children:
-                    refined.add(c)
+                refined.update(children)
 
-        refined_parents = set(z.h3_index for _, z in scored[:refine_top_k])
+        refined_parents = set(f['properties']['h3'] for _, f in scored[:refine_top_k])
 
-        features = []
-        for _, z in scored:
-            if z.h3_index in refined_parents:
-                continue
-            features.append(self._zelle_zu_feature(z))
+        basis = [f for _, f in scored if f['properties']['h3'] not in refined_parents]
+        for start in range(0, len(basis), chunk):
+            yield basis[start:start + chunk]
 
         if refined:
-            refined_list = list(refined)
+            refined_list = sorted(refined)
             if len(refined_list) > max_cells:
                 refined_list = refined_list[:max_cells]
 
-            for c in refined_list:
-                zc = await self._analysiere_zelle(c, center_lat, center_lon, stadt_typ)
-                if zc is None:
-                    continue
-                features.append(self._zelle_zu_feature(zc))
-
-        return features
-
+            async for teil in self._iter_features(
+                refined_list, chunk, center_lat, center_lon, stadt_typ, llm_forecast
+            ):
+                yield teil
 
     def _approx_coast_distance_km(self, h3_index: str, is_ocean: bool) -> float:
-        """Approx. Distanz zur Küste in km.
+        """Distanz zur Küste in km (vorberechneter Küstendistanz-Index).
 
-        Ring-Suche über Nachbarzellen bis Land<->Meer Wechsel gefunden wird.
         positiv = Landzelle -> km bis Meer
         negativ = Wasserzelle -> -km bis Land
         """
-        try:
-            if hasattr(h3, 'get_resolution'):
-                res = h3.get_resolution(h3_index)
-            else:
-                res = h3.h3_get_resolution(h3_index)
-        except Exception:
-            res = 8
-
-        edge_km = 1.0
-        try:
-            edge_km = float(h3.edge_length(res, unit='km'))
-        except Exception:
-            edge_km = 1.0
-
-        max_k = 4  # Optimiert: weniger Ringe
-        for k in range(1, max_k + 1):
-            try:
-                ring = h3.k_ring(h3_index, k)
-            except Exception:
-                ring = []
-
-            for nbr in ring:
-                try:
-                    if hasattr(h3, 'cell_to_latlng'):
-                        latlng = h3.cell_to_latlng(nbr)
-                        if isinstance(latlng, (tuple, list)) and len(latlng) >= 2:
-                            lat, lon = latlng[0], latlng[1]
-                        else:
-                            lat, lon = latlng.lat, latlng.lng
-                    else:
-                        lat, lon = h3.h3_to_geo(nbr)
-                except Exception:
-                    continue
-                nbr_ocean = self.topo.is_ocean(lat, lon)
-                if nbr_ocean != is_ocean:
-                    dist = k * edge_km
-                    return -dist if is_ocean else dist
-
-        dist = max_k * edge_km
+        lat, lon = h3_compat.cell_to_latlng(h3_index)
+        dist = abs(self.topo.coast_distance_km(lat, lon))
         return -dist if is_ocean else dist
 
     def _schnelle_hoehe_schaetzung(self, lat: float, kuestenentfernung: float, is_ocean: bool) -> float:
@@ -16,12 +16,15 @@ Jede Zahl hat:
 - Validierungsstatus
 """
 
-import httpx
 import math
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
 import asyncio
+from loguru import logger
+
+from services.seismic_catalog import CatalogNotReady, get_seismic_catalog
+from services.http_clients import pooled_client
 
 # ============================================================
 # DATENQUELLEN MIT VOLLSTÄNDIGER TRANSPARENZ
@@ -148,7 +151,7 @@ class RealRiskEngine:
     """
     
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = pooled_client(timeout=30.0)
         self.cache = {}
         
     # ============================================================
@@ -161,6 +164,7 @@ class RealRiskEngine:
         
         Methodik (wissenschaftlich fundiert):
         - Abfrage aller Erdbeben M≥4.0 in den letzten 10 Jahren
+          (lokaler Katalog, direkte USGS-Abfrage nur solange er noch lädt)
         - HÄUFIGKEITSBASIERTER Score (robuster als Energiemethoden)
         - Kalibrierung gegen globale Daten:
           * Stabile Region (z.B. Deutschland): ~2 M≥4.0 pro Jahr → 10%
@@ -169,9 +173,22 @@ class RealRiskEngine:
           * Sehr aktiv (Japan, Indonesien): 30-50 pro Jahr → 60-80%
           * Extrem (Feuerring-Hotspots): >50 pro Jahr → 80%+
         """
+        years = 10
+        try:
+            stats = await get_seismic_catalog().query(
+                lat, lon, radius_km, days=365 * years, min_magnitude=4.0
+            )
+            return self._seismic_variable(
+                stats.count, years, stats.max_magnitude, stats.start, stats.end
+            )
+        except CatalogNotReady:
+            pass  # Initialer Katalog-Load läuft noch -> direkte USGS-Abfrage
+        except Exception as e:
+            logger.warning(f"Seismic catalog error: {e}")
+        
         try:
             end_date = datetime.utcnow()
-            start_date = end_date - timedelta(days=365*10)
+            start_date = end_date - timedelta(days=365*years)
             
             url = (
                 f"https://earthquake.usgs.gov/fdsnws/event/1/query"
@@ -187,38 +204,12 @@ class RealRiskEngine:
             if resp.status_code == 200:
                 data = resp.json()
                 earthquakes = data.get('features', [])
-                n_earthquakes = len(earthquakes)
-                years = 10
-                annual_rate = n_earthquakes / years
-                
-                # Häufigkeitsbasierter Score (wissenschaftlich kalibriert)
-                if annual_rate > 50:
-                    normalized = 0.80
-                elif annual_rate > 30:
-                    normalized = 0.60
-                elif annual_rate > 15:
-                    normalized = 0.40
-                elif annual_rate > 5:
-                    normalized = 0.20
-                elif annual_rate > 1:
-                    normalized = 0.10
-                else:
-                    normalized = 0.05
                 
                 # Berechne auch max Magnitude für Kontext
                 max_mag = max((eq['properties'].get('mag', 0) for eq in earthquakes), default=0)
                 
-                return RiskVariable(
-                    name='Seismische Aktivität',
-                    value=normalized,
-                    unit='0-1 normalisiert',
-                    source='USGS Earthquake Catalog',
-                    measurement_date=f'{start_date.strftime("%Y-%m-%d")} bis {end_date.strftime("%Y-%m-%d")}',
-                    uncertainty=0.08,
-                    weight=0.25,
-                    formula=f'{n_earthquakes} Erdbeben M≥4.0 in {years}J = {annual_rate:.1f}/Jahr (max M{max_mag:.1f})',
-                    ipcc_reference='AR6 WG2 Chapter 15.3',
-                    confidence_level='very_high' if n_earthquakes > 100 else 'high' if n_earthquakes > 20 else 'medium'
+                return self._seismic_variable(
+                    len(earthquakes), years, max_mag, start_date, end_date
                 )
             
         except Exception as e:
@@ -237,6 +228,39 @@ class RealRiskEngine:
             confidence_level='low'
         )
 
+    def _seismic_variable(
+        self, n_earthquakes: int, years: int, max_mag: float, start_date: datetime, end_date: datetime
+    ) -> RiskVariable:
+        """Häufigkeitsbasierter Score aus Anzahl M≥4.0-Beben im Zeitraum"""
+        annual_rate = n_earthquakes / years
+        
+        # Häufigkeitsbasierter Score (wissenschaftlich kalibriert)
+        if annual_rate > 50:
+            normalized = 0.80
+        elif annual_rate > 30:
+            normalized = 0.60
+        elif annual_rate > 15:
+            normalized = 0.40
+        elif annual_rate > 5:
+            normalized = 0.20
+        elif annual_rate > 1:
+            normalized = 0.10
+        else:
+            normalized = 0.05
+        
+        return RiskVariable(
+            name='Seismische Aktivität',
+            value=normalized,
+            unit='0-1 normalisiert',
+            source='USGS Earthquake Catalog',
+            measurement_date=f'{start_date.strftime("%Y-%m-%d")} bis {end_date.strftime("%Y-%m-%d")}',
+            uncertainty=0.08,
+            weight=0.25,
+            formula=f'{n_earthquakes} Erdbeben M≥4.0 in {years}J = {annual_rate:.1f}/Jahr (max M{max_mag:.1f})',
+            ipcc_reference='AR6 WG2 Chapter 15.3',
+            confidence_level='very_high' if n_earthquakes > 100 else 'high' if n_earthquakes > 20 else 'medium'
+        )
+
     async def get_flood_risk(self, lat: float, lon: float, elevation_m: float, coast_dist_km: float) -> RiskVariable:
         """
         Überschwemmungsrisiko basierend auf:
@@ -2,17 +2,19 @@
 TERA Realtime Intelligence Service
 Firecrawl + Ollama Integration für aktuelle Datenanalyse
 """
-import httpx
 import asyncio
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from loguru import logger
+from services.http_clients import pooled_client
+from services.ollama_client import OllamaClient
 
 
 class RealtimeIntelligenceService:
     def __init__(self, ollama_url: str = "http://localhost:11434"):
         self.ollama_url = ollama_url
         self.ollama_model = "llama3.1:8b"
+        self.llm = OllamaClient(base_url=ollama_url, model=self.ollama_model)
     
     async def get_realtime_context(
         self,
@@ -54,7 +56,7 @@ class RealtimeIntelligenceService:
         
         # Wikipedia aktuelle Ereignisse (immer verfügbar)
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
+            async with pooled_client(timeout=10) as client:
                 resp = await client.get(
                     'https://en.wikipedia.org/api/rest_v1/page/summary/' + location.replace(' ', '_')
                 )
@@ -71,7 +73,7 @@ class RealtimeIntelligenceService:
         # USGS für seismische Gebiete
         if risk_type == 'seismic':
             try:
-                async with httpx.AsyncClient(timeout=10) as client:
+                async with pooled_client(timeout=10) as client:
                     resp = await client.get('https://earthquake.usgs.gov/earthquakes/feed/v1.0/summary/significant_week.geojson')
                     if resp.status_code == 200:
                         for eq in resp.json().get('features', [])[:3]:
@@ -86,7 +88,7 @@ class RealtimeIntelligenceService:
         
         # OpenWeatherMap für Wetter (kostenlos)
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
+            async with pooled_client(timeout=10) as client:
                 resp = await client.get(
                     f'https://wttr.in/{location}?format=j1'
                 )
@@ -103,7 +105,7 @@ class RealtimeIntelligenceService:
         
         # Newsdata.io (kostenlose News API mit Limit)
         try:
-            async with httpx.AsyncClient(timeout=10) as client:
+            async with pooled_client(timeout=10) as client:
                 resp = await client.get(
                     'https://newsdata.io/api/1/news',
                     params={
@@ -137,34 +139,27 @@ class RealtimeIntelligenceService:
 Gib eine kurze Risikoeinschätzung (1-2 Sätze) und sage ob der Trend "steigend", "stabil" oder "fallend" ist."""
         
         try:
-            async with httpx.AsyncClient(timeout=45) as client:
-                resp = await client.post(
-                    f"{self.ollama_url}/api/generate",
-                    json={'model': self.ollama_model, 'prompt': prompt, 'stream': False, 'options': {'temperature': 0.3}}
-                )
-                
-                if resp.status_code == 200:
-                    response_text = resp.json().get('response', '')
-                    
-                    trend = 'stabil'
-                    response_lower = response_text.lower()
-                    if any(w in response_lower for w in ['steigend', 'erhöht', 'zunehmend', 'verschlechtert', 'kritisch']):
-                        trend = 'steigend'
-                    elif any(w in response_lower for w in ['fallend', 'sinkt', 'verbessert', 'beruhigt']):
-                        trend = 'fallend'
-                    
-                    risk_adj = 0.05 if trend == 'steigend' else (-0.03 if trend == 'fallend' else 0.0)
-                    
-                    return {
-                        'realtime_assessment': response_text[:600],
-                        'trend': trend,
-                        'risk_adjustment': risk_adj,
-                        'current_events': [d.get('title', '')[:80] for d in data[:3]],
-                        'recommendation': 'Erhöhte Wachsamkeit' if trend == 'steigend' else 'Situation beobachten',
-                        'sources': list(set(d.get('source', '') for d in data)),
-                        'llm_model': self.ollama_model,
-                        'timestamp': datetime.utcnow().isoformat()
-                    }
+            response_text = await self.llm.generate(prompt, options={'temperature': 0.3}, timeout=45)
+            
+            trend = 'stabil'
+            response_lower = response_text.lower()
+            if any(w in response_lower for w in ['steigend', 'erhöht', 'zunehmend', 'verschlechtert', 'kritisch']):
+                trend = 'steigend'
+            elif any(w in response_lower for w in ['fallend', 'sinkt', 'verbessert', 'beruhigt']):
+                trend = 'fallend'
+            
+            risk_adj = 0.05 if trend == 'steigend' else (-0.03 if trend == 'fallend' else 0.0)
+            
+            return {
+                'realtime_assessment': response_text[:600],
+                'trend': trend,
+                'risk_adjustment': risk_adj,
+                'current_events': [d.get('title', '')[:80] for d in data[:3]],
+                'recommendation': 'Erhöhte Wachsamkeit' if trend == 'steigend' else 'Situation beobachten',
+                'sources': list(set(d.get('source', '') for d in data)),
+                'llm_model': self.ollama_model,
+                'timestamp': datetime.utcnow().isoformat()
+            }
         except Exception as e:
             logger.error(f"Ollama error: {e}")
         
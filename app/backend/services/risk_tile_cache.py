@@ -0,0 +1,235 @@
+"""
+TERA Risiko-Kachel-Cache
+========================
+Zweistufiger Cache für berechnete Hexagon-Features:
+- Prozess-LRU (OrderedDict)
+- SQLite auf Disk (WAL), geteilt zwischen Workern und Neustarts
+
+Schlüssel: (Fingerprint, H3-Zelle). Der Fingerprint fasst alle Eingaben
+zusammen, von denen das Ergebnis abhängt (Stadttyp, Zentrum, LLM-Forecast,
+Scoring-Version). Ändern sich Regeln oder Kategorien, ändert sich der
+Fingerprint; alte Einträge laufen über die TTL aus.
+
+Warm-up für die größten Städte:
+    python -m services.risk_tile_cache --top 50 --resolution 8
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+
+# Marker für "Zelle berechnet, aber verworfen" (z.B. offshore)
+VERWORFEN = None
+
+_FEHLT = object()
+
+
+class RiskTileCache:
+    """In-Process-LRU vor einem SQLite-Store, pro (Fingerprint, H3-Zelle)"""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        mem_max: int = 200_000,
+        ttl_s: float = 7 * 24 * 3600,
+    ):
+        if db_path is None:
+            db_path = os.path.join(os.path.expanduser("~"), ".tera_cache", "risk_tiles.sqlite")
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_s = ttl_s
+        self._mem_max = mem_max
+        self._mem: "OrderedDict[tuple, Optional[dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {'mem_hits': 0, 'disk_hits': 0, 'misses': 0, 'writes': 0}
+        self._init_db()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS risk_tiles (
+                fingerprint TEXT NOT NULL,
+                h3_index TEXT NOT NULL,
+                feature TEXT,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (fingerprint, h3_index)
+            ) WITHOUT ROWID
+        """)
+        conn.commit()
+
+    def get_many(self, fingerprint: str, cells: Iterable[str]) -> Dict[str, Optional[dict]]:
+        """Liefert nur Treffer; Wert None = Zelle verworfen (ebenfalls gecacht)."""
+        result: Dict[str, Optional[dict]] = {}
+        offen: List[str] = []
+        with self._lock:
+            for cell in cells:
+                value = self._mem.get((fingerprint, cell), _FEHLT)
+                if value is _FEHLT:
+                    offen.append(cell)
+                else:
+                    self._mem.move_to_end((fingerprint, cell))
+                    result[cell] = value
+            self.stats['mem_hits'] += len(result)
+
+        if offen:
+            disk = self._disk_get(fingerprint, offen)
+            with self._lock:
+                for cell, value in disk.items():
+                    self._mem_put((fingerprint, cell), value)
+                self.stats['disk_hits'] += len(disk)
+                self.stats['misses'] += len(offen) - len(disk)
+            result.update(disk)
+        return result
+
+    def put_many(
+        self,
+        fingerprint: str,
+        items: Dict[str, Optional[dict]],
+        json_texte: Optional[Dict[str, Optional[str]]] = None,
+    ) -> None:
+        """json_texte: bereits serialisierte Features (z.B. aus dem Tessellation-Pool)"""
+        if not items:
+            return
+        now = time.time()
+        if json_texte is None:
+            json_texte = {
+                cell: None if value is VERWORFEN else json.dumps(value)
+                for cell, value in items.items()
+            }
+        rows = [(fingerprint, cell, json_texte[cell], now) for cell in items]
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO risk_tiles (fingerprint, h3_index, feature, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        with self._lock:
+            for cell, value in items.items():
+                self._mem_put((fingerprint, cell), value)
+            self.stats['writes'] += len(rows)
+
+    def purge_expired(self) -> int:
+        """Löscht abgelaufene Einträge auf Disk."""
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                "DELETE FROM risk_tiles WHERE created_at < ?", (time.time() - self.ttl_s,)
+            )
+        return cur.rowcount
+
+    def clear(self) -> None:
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM risk_tiles")
+        with self._lock:
+            self._mem.clear()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            stats['mem_entries'] = len(self._mem)
+        lookups = stats['mem_hits'] + stats['disk_hits'] + stats['misses']
+        stats['hit_rate'] = round((lookups - stats['misses']) / lookups, 4) if lookups else 0.0
+        return stats
+
+    def _mem_put(self, key: tuple, value: Optional[dict]) -> None:
+        self._mem[key] = value
+        self._mem.move_to_end(key)
+        while len(self._mem) > self._mem_max:
+            self._mem.popitem(last=False)
+
+    def _disk_get(self, fingerprint: str, cells: List[str]) -> Dict[str, Optional[dict]]:
+        conn = self._conn()
+        min_created = time.time() - self.ttl_s
+        result: Dict[str, Optional[dict]] = {}
+        # SQLite-Parameterlimit beachten
+        for start in range(0, len(cells), 900):
+            chunk = cells[start:start + 900]
+            placeholders = ','.join('?' * len(chunk))
+            rows = conn.execute(
+                f"SELECT h3_index, feature FROM risk_tiles "
+                f"WHERE fingerprint = ? AND created_at >= ? AND h3_index IN ({placeholders})",
+                [fingerprint, min_created, *chunk],
+            )
+            for cell, feature in rows:
+                result[cell] = VERWORFEN if feature is None else json.loads(feature)
+        return result
+
+
+_cache: Optional[RiskTileCache] = None
+
+
+def get_risk_tile_cache() -> RiskTileCache:
+    """Prozessweit geteilte Instanz."""
+    global _cache
+    if _cache is None:
+        _cache = RiskTileCache()
+    return _cache
+
+
+async def warm_up(top_n: int, resolution: int, radius_km: float = 15.0) -> None:
+    """Berechnet /risk-map für die top_n bevölkerungsreichsten Städte vor."""
+    from data.geonames_loader import load_cities
+    from api.routes.analysis import geocode_city, determine_risk_type
+    from services.real_data_tessellation import EchteDatenTessellation
+
+    cities = sorted(await load_cities(), key=lambda c: c.population, reverse=True)[:top_n]
+    tessellation = EchteDatenTessellation()
+    cache = tessellation.tile_cache
+
+    for i, city in enumerate(cities, 1):
+        # Gleiche Geokodierung wie /risk-map, damit der Fingerprint passt
+        # (Nominatim-Limit regelt der Geocoder selbst)
+        geo = await geocode_city(city.name)
+        if not geo:
+            logger.warning(f"Warm-up: {city.name} nicht gefunden")
+            continue
+        risk_type = determine_risk_type(geo['lat'], geo['lon'], geo['country'], city.name)
+        start = time.perf_counter()
+        features = await tessellation.generiere_risikokarte(
+            lat=geo['lat'],
+            lon=geo['lon'],
+            stadt_typ=risk_type,
+            aufloesung=resolution,
+            radius_km=radius_km,
+        )
+        logger.info(
+            f"Warm-up {i}/{len(cities)} {city.name}: {len(features)} Zellen "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+
+    logger.info(f"Warm-up fertig: {cache.get_stats()}")
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="TERA Risiko-Kachel-Cache Warm-up")
+    parser.add_argument("--top", type=int, default=50, help="Anzahl Städte (nach Einwohnern)")
+    parser.add_argument("--resolution", type=int, default=8, help="H3-Auflösung wie /risk-map")
+    parser.add_argument("--purge", action="store_true", help="Abgelaufene Einträge vorher löschen")
+    args = parser.parse_args()
+
+    if args.purge:
+        logger.info(f"{get_risk_tile_cache().purge_expired()} abgelaufene Einträge gelöscht")
+    asyncio.run(warm_up(args.top, args.resolution))
@@ -0,0 +1,369 @@
+"""TERA Seismischer Katalog
+
+Lokaler Spiegel des globalen USGS-Erdbebenkatalogs (M >= 4.0):
+- inkrementeller Bulk-Load über die FDSN-API in Zeitfenstern (CSV),
+  gedrosselt auf 1 Anfrage/s, mit Backoff bei 429/503
+- Ablage spaltenweise als .npz (Zeit, Lat, Lon, Tiefe, Magnitude)
+- räumlicher Index: KD-Baum auf Einheitsvektoren, Radiusabfragen
+  sind ein Baum-Lookup statt einer HTTP-Anfrage pro Analyse
+
+Vorab laden (sonst startet der erste Zugriff den Load im Hintergrund):
+    python -m services.seismic_catalog --years 11
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import math
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import httpx
+import numpy as np
+from loguru import logger
+from scipy.spatial import cKDTree
+
+from services.http_clients import pooled_client
+
+
+USGS_FDSN_URL = "https://earthquake.usgs.gov/fdsnws/event/1/query"
+
+MIN_MAGNITUDE = 4.0
+
+# Historie beim ersten Load (10 Jahre Jahresrate + Puffer)
+HISTORIE_JAHRE = 11
+
+# Abfragefenster; bei Überschreiten des FDSN-Limits wird halbiert
+FENSTER_TAGE = 30
+FDSN_LIMIT = 20000
+
+# Zuletzt geladene Tage werden bei jedem Update neu geholt (Magnituden-Revisionen)
+UEBERLAPPUNG_TAGE = 7
+
+# Katalog gilt als veraltet nach ...
+MAX_ALTER_S = 6 * 3600
+
+# Mindestabstand zwischen zwei USGS-Anfragen
+MIN_ABSTAND_S = 1.0
+
+ERDRADIUS_KM = 6371.0
+_MS_PRO_TAG = 86_400_000
+
+
+class CatalogNotReady(RuntimeError):
+    """Katalog noch nicht geladen (initialer Load läuft im Hintergrund)"""
+
+
+@dataclass
+class SeismicStats:
+    """Ergebnis einer Radiusabfrage (Magnituden zeitlich absteigend)"""
+    count: int
+    annual_rate: float
+    max_magnitude: float
+    magnitudes: np.ndarray
+    start: datetime
+    end: datetime
+
+
+def _einheitsvektoren(lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+    lat_r = np.radians(lat)
+    lon_r = np.radians(lon)
+    cos_lat = np.cos(lat_r)
+    return np.column_stack((cos_lat * np.cos(lon_r), cos_lat * np.sin(lon_r), np.sin(lat_r)))
+
+
+def _jetzt_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _ms_zu_datetime(ms: int) -> datetime:
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+class SeismicCatalog:
+    """Spaltenbasierter Erdbebenkatalog mit KD-Baum-Index"""
+
+    def __init__(self, data_dir: Optional[str] = None, min_magnitude: float = MIN_MAGNITUDE):
+        if data_dir is None:
+            data_dir = os.path.join(os.path.expanduser("~"), ".tera_cache", "seismic")
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.min_magnitude = min_magnitude
+        self.path = self.data_dir / f"usgs_m{min_magnitude:.1f}.npz"
+
+        self._lock = threading.Lock()
+        self._update_task: Optional[asyncio.Task] = None
+        self._letzte_anfrage = 0.0
+        self._setze_daten(*self._lade())
+
+    # ------------------------------------------------------------------
+    # Speicher
+    # ------------------------------------------------------------------
+
+    def _lade(self):
+        leer = (
+            np.empty(0, np.int64), np.empty(0, np.float32), np.empty(0, np.float32),
+            np.empty(0, np.float32), np.empty(0, np.float32), 0, 0,
+        )
+        if not self.path.exists():
+            return leer
+        try:
+            with np.load(self.path) as d:
+                return (
+                    d['time_ms'], d['lat'], d['lon'], d['depth'], d['mag'],
+                    int(d['start_ms']), int(d['loaded_until_ms']),
+                )
+        except Exception as e:
+            logger.warning(f"Seismischer Katalog unlesbar, wird neu geladen: {e}")
+            return leer
+
+    def _speichere(self):
+        # Eigene Temp-Datei pro Aufruf: mehrere Worker-Prozesse können
+        # gleichzeitig updaten, os.replace ist atomar (der letzte gewinnt)
+        with tempfile.NamedTemporaryFile(
+            dir=self.data_dir, prefix=f"{self.path.stem}.", suffix='.tmp.npz', delete=False
+        ) as f:
+            tmp = f.name
+            try:
+                np.savez(
+                    f,
+                    time_ms=self.time_ms, lat=self.lat, lon=self.lon, depth=self.depth, mag=self.mag,
+                    start_ms=np.int64(self.start_ms), loaded_until_ms=np.int64(self.loaded_until_ms),
+                )
+            except BaseException:
+                f.close()
+                os.unlink(tmp)
+                raise
+        os.replace(tmp, self.path)
+
+    def _setze_daten(self, time_ms, lat, lon, depth, mag, start_ms, loaded_until_ms):
+        order = np.argsort(time_ms, kind='stable')
+        tree = cKDTree(_einheitsvektoren(lat[order], lon[order])) if len(order) else None
+        with self._lock:
+            self.time_ms = time_ms[order]
+            self.lat = lat[order]
+            self.lon = lon[order]
+            self.depth = depth[order]
+            self.mag = mag[order]
+            self.start_ms = start_ms
+            self.loaded_until_ms = loaded_until_ms
+            self._tree = tree
+
+    def __len__(self) -> int:
+        return len(self.time_ms)
+
+    @property
+    def is_ready(self) -> bool:
+        """Initialer Load abgeschlossen und Daten höchstens UEBERLAPPUNG_TAGE alt"""
+        return self.loaded_until_ms >= _jetzt_ms() - UEBERLAPPUNG_TAGE * _MS_PRO_TAG
+
+    @property
+    def is_stale(self) -> bool:
+        return self.loaded_until_ms < _jetzt_ms() - MAX_ALTER_S * 1000
+
+    # ------------------------------------------------------------------
+    # Abfragen
+    # ------------------------------------------------------------------
+
+    def radius_stats(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        days: float,
+        min_magnitude: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> SeismicStats:
+        """Ereignisse im Umkreis innerhalb der letzten `days` Tage.
+
+        limit begrenzt wie bei FDSN auf die jüngsten Ereignisse.
+        """
+        ende_ms = self.loaded_until_ms or _jetzt_ms()
+        start_ms = max(ende_ms - int(days * _MS_PRO_TAG), self.start_ms)
+
+        with self._lock:
+            tree, time_ms, mag = self._tree, self.time_ms, self.mag
+
+        if tree is not None:
+            sehne = 2.0 * math.sin(min(radius_km / ERDRADIUS_KM, math.pi) / 2.0)
+            idx = np.asarray(tree.query_ball_point(_einheitsvektoren(
+                np.array([lat]), np.array([lon]))[0], sehne), dtype=np.int64)
+            idx = idx[time_ms[idx] >= start_ms]
+            if min_magnitude is not None:
+                idx = idx[mag[idx] >= min_magnitude]
+            idx = np.sort(idx)[::-1]  # zeitlich absteigend (Daten sind nach Zeit sortiert)
+            if limit is not None:
+                idx = idx[:limit]
+            magnitudes = mag[idx]
+        else:
+            magnitudes = np.empty(0, np.float32)
+
+        jahre = max((ende_ms - start_ms) / (365.0 * _MS_PRO_TAG), 1e-9)
+        return SeismicStats(
+            count=int(len(magnitudes)),
+            annual_rate=len(magnitudes) / jahre,
+            max_magnitude=float(magnitudes.max()) if len(magnitudes) else 0.0,
+            magnitudes=magnitudes,
+            start=_ms_zu_datetime(start_ms),
+            end=_ms_zu_datetime(ende_ms),
+        )
+
+    async def query(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        days: float,
+        min_magnitude: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> SeismicStats:
+        """Wie radius_stats; stößt bei veraltetem Katalog ein Update im Hintergrund an."""
+        self.ensure_fresh()
+        if not self.is_ready:
+            raise CatalogNotReady(
+                f"Seismischer Katalog geladen bis {_ms_zu_datetime(self.loaded_until_ms):%Y-%m-%d}"
+            )
+        return self.radius_stats(lat, lon, radius_km, days, min_magnitude, limit)
+
+    # ------------------------------------------------------------------
+    # Laden
+    # ------------------------------------------------------------------
+
+    def ensure_fresh(self) -> None:
+        """Startet ein Hintergrund-Update, falls veraltet und keines läuft."""
+        if not self.is_stale:
+            return
+        if self._update_task is not None and not self._update_task.done():
+            return
+        try:
+            self._update_task = asyncio.get_running_loop().create_task(self.update())
+        except RuntimeError:
+            pass
+
+    async def update(
+        self, years: float = HISTORIE_JAHRE, client: Optional[httpx.AsyncClient] = None
+    ) -> int:
+        """Lädt fehlende Zeitfenster nach; liefert die Anzahl neuer Ereignisse."""
+        if client is None:
+            async with pooled_client(timeout=60.0) as client:
+                return await self.update(years, client)
+
+        jetzt = _jetzt_ms()
+        if self.loaded_until_ms:
+            von = self.loaded_until_ms - UEBERLAPPUNG_TAGE * _MS_PRO_TAG
+            start_ms = self.start_ms
+        else:
+            von = start_ms = jetzt - int(years * 365.25 * _MS_PRO_TAG)
+
+        behalten = self.time_ms < von
+        teile = [(
+            self.time_ms[behalten], self.lat[behalten], self.lon[behalten],
+            self.depth[behalten], self.mag[behalten],
+        )]
+        neu = 0
+        fenster = FENSTER_TAGE * _MS_PRO_TAG
+        t0 = von
+        while t0 < jetzt:
+            t1 = min(t0 + fenster, jetzt)
+            spalten = await self._hole_fenster(client, t0, t1)
+            if spalten is None:
+                # Fenster zu groß für das FDSN-Limit
+                fenster = max(_MS_PRO_TAG, fenster // 2)
+                continue
+            teile.append(spalten)
+            neu += len(spalten[0])
+            t0 = t1
+
+            # Zwischenstand sichern, damit ein abgebrochener Load fortgesetzt wird
+            if len(teile) % 12 == 0 or t0 >= jetzt:
+                self._setze_daten(
+                    *(np.concatenate(s) for s in zip(*teile)), start_ms, t0
+                )
+                self._speichere()
+                logger.info(
+                    f"Seismischer Katalog: {len(self)} Ereignisse bis "
+                    f"{_ms_zu_datetime(t0):%Y-%m-%d}"
+                )
+        return neu
+
+    async def _hole_fenster(self, client: httpx.AsyncClient, t0_ms: int, t1_ms: int):
+        params = {
+            'format': 'csv',
+            'starttime': _ms_zu_datetime(t0_ms).strftime('%Y-%m-%dT%H:%M:%S'),
+            'endtime': _ms_zu_datetime(t1_ms).strftime('%Y-%m-%dT%H:%M:%S'),
+            'minmagnitude': self.min_magnitude,
+            'orderby': 'time-asc',
+            'limit': FDSN_LIMIT,
+        }
+        for versuch in range(6):
+            warten = self._letzte_anfrage + MIN_ABSTAND_S - time.monotonic()
+            if warten > 0:
+                await asyncio.sleep(warten)
+            self._letzte_anfrage = time.monotonic()
+
+            resp = await client.get(USGS_FDSN_URL, params=params)
+            if resp.status_code in (429, 503):
+                retry_after = resp.headers.get('Retry-After', '')
+                pause = float(retry_after) if retry_after.isdigit() else 2.0 ** versuch
+                logger.warning(f"USGS {resp.status_code}, warte {pause:.0f}s")
+                await asyncio.sleep(pause)
+                continue
+            if resp.status_code == 400 and 'limit' in resp.text.lower():
+                return None
+            resp.raise_for_status()
+
+            spalten = self._parse_csv(resp.text)
+            if len(spalten[0]) >= FDSN_LIMIT:
+                return None
+            return spalten
+        raise RuntimeError("USGS FDSN: zu viele Wiederholungen")
+
+    @staticmethod
+    def _parse_csv(text: str):
+        zeiten, lats, lons, tiefen, mags = [], [], [], [], []
+        for row in csv.DictReader(io.StringIO(text)):
+            if not row.get('mag'):
+                continue
+            zeiten.append(row['time'].rstrip('Z'))
+            lats.append(float(row['latitude']))
+            lons.append(float(row['longitude']))
+            tiefen.append(float(row['depth'] or 0.0))
+            mags.append(float(row['mag']))
+        return (
+            np.array(zeiten, dtype='datetime64[ms]').astype(np.int64),
+            np.array(lats, dtype=np.float32),
+            np.array(lons, dtype=np.float32),
+            np.array(tiefen, dtype=np.float32),
+            np.array(mags, dtype=np.float32),
+        )
+
+
+_catalog: Optional[SeismicCatalog] = None
+
+
+def get_seismic_catalog() -> SeismicCatalog:
+    """Prozessweit geteilter Katalog."""
+    global _catalog
+    if _catalog is None:
+        _catalog = SeismicCatalog()
+    return _catalog
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="TERA seismischer Katalog (USGS M>=4)")
+    parser.add_argument("--years", type=float, default=HISTORIE_JAHRE, help="Historie beim ersten Load")
+    args = parser.parse_args()
+
+    catalog = get_seismic_catalog()
+    neu = asyncio.run(catalog.update(years=args.years))
+    logger.info(f"{neu} Ereignisse geladen, gesamt {len(catalog)}")
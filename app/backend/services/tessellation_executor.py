@@ -0,0 +1,244 @@
+"""
+TERA Tessellation-Executor
+==========================
+Die Tessellation (Zellanalyse + GeoJSON-Features, Erdzyklen-Zustände) ist
+reines CPU-Python. Statt auf dem Event-Loop läuft sie hier in Shards auf
+einem ProcessPoolExecutor:
+
+- Worker werden einmal vorgeladen (Land/Meer-Maske, Küsten-Index,
+  Risikotabellen, Erdmodell); pro Shard gehen nur Zellen + Parameter hin
+- Shards einer Anfrage laufen parallel auf allen Kernen, das Ergebnis wird
+  in Eingabereihenfolge zusammengesetzt
+- der Event-Loop wartet nur auf Futures und bedient andere Requests
+- Anfragen unter min_shard Zellen laufen direkt im API-Prozess (der
+  Prozesswechsel wäre teurer als die Rechnung)
+
+Netzwerk und Caches (DEM-Kacheln, Risiko-Kachel-Cache) bleiben im
+API-Prozess; die Worker bekommen die ortsfesten Zelleingaben
+(ZellGeografie: Zentren, Land/Meer, Küstendistanz, DEM-Höhen) und
+liefern die Features zusätzlich als JSON-Text für den Kachel-Cache
+(json.dumps ist teurer als die Zellanalyse selbst).
+
+Start/Stop im FastAPI-lifespan (main.py), Anzahl Worker über
+settings.tessellation_workers (0 = Anzahl CPU-Kerne).
+"""
+
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from loguru import logger
+
+
+# Kleinere Shards lohnen den Prozesswechsel (Pickling) nicht
+MIN_SHARD_ZELLEN = 256
+
+
+# ---------------------------------------------------------------------------
+# Worker-Seite (läuft im Kindprozess)
+# ---------------------------------------------------------------------------
+
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker() -> None:
+    """Lädt einmal pro Prozess alles, was jede Zellanalyse braucht."""
+    from services import real_data_tessellation  # noqa: F401  (Risikotabellen, h3)
+    from services.batch_tessellation import BatchZellenAnalyse
+    from services.topography_service import TopographyService
+
+    topo = TopographyService()
+    topo.is_ocean_many(np.zeros(1), np.zeros(1))  # Land/Meer-Maske laden
+    _worker['batch'] = BatchZellenAnalyse(topo)
+
+
+def _bereit() -> int:
+    return os.getpid()
+
+
+def _analyse() -> Any:
+    if 'batch' not in _worker:
+        _init_worker()
+    return _worker['batch']
+
+
+def _features_shard(
+    hexagons: List[str],
+    geografie: Any,
+    stadt_lat: float,
+    stadt_lon: float,
+    stadt_typ: str,
+    llm_forecast: Optional[dict],
+) -> List[Tuple[Optional[dict], Optional[str]]]:
+    """(Feature, JSON-Text) in Eingabereihenfolge (None = offshore verworfen)"""
+    from services.real_data_tessellation import features_fuer_batch
+
+    batch = _analyse().analysiere(
+        hexagons, stadt_lat, stadt_lon, stadt_typ, llm_forecast, geografie=geografie,
+    )
+    features = features_fuer_batch(batch)
+    return [
+        (features[h], None if features[h] is None else json.dumps(features[h]))
+        for h in hexagons
+    ]
+
+
+def _earth_cycles_shard(cells: List[str], now: datetime, als_feature: bool) -> Any:
+    """GeoJSON-Features bzw. CellStates (Arrays, billig zu übertragen)"""
+    from services.physical_earth_model import FrontendFormatter, viewport_states
+
+    states = viewport_states(cells, now)
+    if als_feature:
+        return FrontendFormatter.states_to_features(states)
+    return states
+
+
+# ---------------------------------------------------------------------------
+# API-Seite
+# ---------------------------------------------------------------------------
+
+class TessellationExecutor:
+    """Verteilt Zell-Batches auf einen Prozess-Pool (async API)."""
+
+    def __init__(self, workers: int = 0, min_shard: int = MIN_SHARD_ZELLEN):
+        self.workers = workers or os.cpu_count() or 1
+        self.min_shard = min_shard
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.stats = {'aufrufe': 0, 'shards': 0, 'zellen': 0, 'inline': 0, 'neustarts': 0, 'rechenzeit_ms': 0.0}
+
+    def _pool_holen(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: kein fork eines Prozesses mit Event-Loop, Threads und offenen SQLite-Handles
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+            )
+        return self._pool
+
+    async def start(self) -> None:
+        """Startet alle Worker vorab (Vorladen fällt nicht in den ersten Request)."""
+        loop = asyncio.get_running_loop()
+        pool = self._pool_holen()
+        await asyncio.gather(*(loop.run_in_executor(pool, _bereit) for _ in range(self.workers)))
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def shards(self, n: int) -> List[slice]:
+        """Gleich große Abschnitte: ein Shard pro Worker, mindestens min_shard Zellen"""
+        if n == 0:
+            return []
+        anzahl = max(1, min(self.workers, n // self.min_shard))
+        groesse = math.ceil(n / anzahl)
+        return [slice(start, min(start + groesse, n)) for start in range(0, n, groesse)]
+
+    async def _verteile(
+        self,
+        fn: Callable,
+        n: int,
+        args_fuer: Callable[[slice], Tuple],
+        zusammenfuegen: Optional[Callable[[List[Any]], Any]] = None,
+    ) -> Any:
+        """Führt fn pro Shard im Pool aus und fügt die Teilergebnisse in
+        Reihenfolge zusammen (Standard: Listen aneinanderhängen)."""
+        shards = self.shards(n)
+        if not shards:
+            return []
+        start = time.perf_counter()
+        if n < self.min_shard:
+            # Ein kleiner Shard: direkt rechnen statt Pickling + Prozesswechsel
+            teile = [fn(*args_fuer(shards[0]))]
+            self.stats['inline'] += 1
+            self.stats['rechenzeit_ms'] += (time.perf_counter() - start) * 1000
+            return zusammenfuegen(teile) if zusammenfuegen is not None else teile[0]
+        loop = asyncio.get_running_loop()
+        for versuch in range(2):
+            pool = self._pool_holen()
+            try:
+                teile = await asyncio.gather(*(
+                    loop.run_in_executor(pool, fn, *args_fuer(s)) for s in shards
+                ))
+                break
+            except BrokenProcessPool:
+                # Worker abgestürzt (z.B. OOM-Kill): Pool einmal neu aufsetzen
+                logger.warning("Tessellation-Pool defekt, starte neu")
+                self._pool = None
+                self.stats['neustarts'] += 1
+                if versuch:
+                    raise
+
+        self.stats['aufrufe'] += 1
+        self.stats['shards'] += len(shards)
+        self.stats['zellen'] += n
+        self.stats['rechenzeit_ms'] += (time.perf_counter() - start) * 1000
+        if zusammenfuegen is not None:
+            return zusammenfuegen(teile)
+        return [x for teil in teile for x in teil]
+
+    async def features(
+        self,
+        hexagons: Sequence[str],
+        geografie: Any,
+        stadt_lat: float,
+        stadt_lon: float,
+        stadt_typ: str,
+        llm_forecast: Optional[dict] = None,
+    ) -> Tuple[Dict[str, Optional[dict]], Dict[str, Optional[str]]]:
+        """Risiko-Features pro Zelle (None = verworfen) wie features_fuer_batch,
+        dazu dieselben Features als JSON-Text (RiskTileCache.put_many).
+
+        geografie: ZellGeografie der Zellen (cell_state_cache)
+        """
+        hexagons = list(hexagons)
+
+        def args(s: slice) -> Tuple:
+            return (hexagons[s], geografie.teil(s), stadt_lat, stadt_lon, stadt_typ, llm_forecast)
+
+        ergebnis = await self._verteile(_features_shard, len(hexagons), args)
+        features = {h: feature for h, (feature, _) in zip(hexagons, ergebnis)}
+        json_texte = {h: text for h, (_, text) in zip(hexagons, ergebnis)}
+        return features, json_texte
+
+    async def earth_cycle_states(self, cells: Sequence[str], now: Optional[datetime] = None) -> Any:
+        """CellStates der Viewport-Zellen (physical_earth_model.viewport_states)"""
+        from services.physical_earth_model import CellStates, viewport_states
+
+        cells = list(cells)
+        now = now or datetime.now(timezone.utc)
+        if not cells:
+            return viewport_states(cells, now)
+        return await self._verteile(
+            _earth_cycles_shard, len(cells), lambda s: (cells[s], now, False), CellStates.concat
+        )
+
+    async def earth_cycle_features(self, cells: Sequence[str], now: Optional[datetime] = None) -> List[dict]:
+        """Wie earth_cycle_states, direkt als GeoJSON-Features"""
+        cells = list(cells)
+        now = now or datetime.now(timezone.utc)
+        return await self._verteile(_earth_cycles_shard, len(cells), lambda s: (cells[s], now, True))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'workers': self.workers, 'aktiv': self._pool is not None}
+
+
+_executor: Optional[TessellationExecutor] = None
+
+
+def get_tessellation_executor() -> TessellationExecutor:
+    """Prozessweiter Executor (Start/Stop im FastAPI-lifespan)."""
+    global _executor
+    if _executor is None:
+        from config.settings import settings
+        _executor = TessellationExecutor(workers=settings.tessellation_workers)
+    return _executor
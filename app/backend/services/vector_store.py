@@ -2,7 +2,13 @@
 ChromaDB Vector Store for Context Embeddings
 Stores and retrieves context data with semantic search
 
-Note: chromadb is optional. If not installed, VectorStore will be a no-op.
+Note: chromadb is optional. Without it (or without a reachable server)
+VectorStore falls back to the in-process LocalVectorIndex
+(services.local_vector_index), persisted under ~/.tera_cache/vector_index.
+
+Embeddings (Ollama) are generated in batches: texts are deduplicated by
+hash, looked up in the persistent float16 cache (services.embedding_cache)
+and only misses go to the model, in bounded concurrent /api/embed batches.
 """
 try:
     import chromadb
@@ -12,11 +18,23 @@ except ImportError:
     CHROMADB_AVAILABLE = False
     chromadb = None
 
-import httpx
+import asyncio
 import json
+import numpy as np
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from loguru import logger
+from services.embedding_cache import EmbeddingCache, get_embedding_cache, text_key, to_float16
+from services.http_clients import pooled_client
+from services.h3_compat import grid_disk
+from services.local_vector_index import LocalVectorIndex
+
+
+# Texts per /api/embed request and concurrent requests per embed_texts call
+EMBED_BATCH_SIZE = 32
+EMBED_CONCURRENCY = 4
+# Documents per collection.upsert (ChromaDB caps a batch at ~5k records)
+ADD_CHUNK_SIZE = 4000
 
 
 @dataclass
@@ -31,25 +49,42 @@ class ContextDocument:
 class VectorStore:
     """ChromaDB-based vector store for location contexts
     
-    If chromadb is not installed, all methods become no-ops.
+    If chromadb is not installed or the server is unreachable, collections
+    are LocalVectorIndex instances (same interface, embeddings required:
+    add_context/add_contexts_batch skip documents without one).
     """
     
-    def __init__(self, host: str = "localhost", port: int = 8000):
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 8000,
+        ollama_url: str = "http://localhost:11434",
+        embedding_model: str = "llama3.1:8b",
+        embedding_cache: Optional[EmbeddingCache] = None,
+        local_index_dir: Optional[str] = None,
+    ):
         self.client = None
         self.collection = None
-        self.ollama_url = "http://localhost:11434"
+        self.ollama_url = ollama_url
+        self.embedding_model = embedding_model
+        self._embedding_cache = embedding_cache
+        self._legacy_embed_api = False
+        self.local_index_dir = local_index_dir
         
         if CHROMADB_AVAILABLE:
             try:
                 self.client = chromadb.HttpClient(host=host, port=port)
             except Exception as e:
-                logger.warning(f"ChromaDB not available: {e}")
+                logger.warning(f"ChromaDB not available: {e} - using local vector index")
         else:
-            logger.info("ChromaDB not installed - vector store disabled")
+            logger.info("ChromaDB not installed - using local vector index")
     
     def init_collection(self, name: str = "tera_contexts"):
         """Initialize or get collection"""
         if not self.client:
+            path = f"{self.local_index_dir}/{name}" if self.local_index_dir else None
+            self.collection = LocalVectorIndex(name=name, path=path)
+            logger.info(f"Local index '{name}' loaded with {self.collection.count()} documents")
             return
             
         try:
@@ -61,112 +96,249 @@ class VectorStore:
         except Exception as e:
             logger.error(f"Failed to init collection: {e}")
     
+    def _get_collection(self):
+        if not self.collection:
+            self.init_collection()
+        return self.collection
+    
+    @property
+    def is_local(self) -> bool:
+        return isinstance(self.collection, LocalVectorIndex)
+    
+    def persist(self):
+        """Write the local index to disk (ChromaDB persists server-side)"""
+        if self.is_local:
+            self.collection.persist()
+    
+    @property
+    def embedding_cache(self) -> EmbeddingCache:
+        if self._embedding_cache is None:
+            self._embedding_cache = get_embedding_cache()
+        return self._embedding_cache
+    
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding using Ollama"""
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{self.ollama_url}/api/embeddings",
-                json={
-                    "model": "llama3.1:8b",
-                    "prompt": text
-                }
+        return (await self.embed_texts([text]))[0].tolist()
+    
+    async def embed_texts(
+        self,
+        texts: List[str],
+        batch_size: int = EMBED_BATCH_SIZE,
+        concurrency: int = EMBED_CONCURRENCY,
+    ) -> np.ndarray:
+        """Embeddings for many texts, one float32 row per input text
+        
+        Identical texts are embedded once; cached texts not at all.
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        keys = [text_key(self.embedding_model, t) for t in texts]
+        unique = dict(zip(keys, texts))
+        vectors = self.embedding_cache.get_many(list(unique))
+        
+        misses = [(k, t) for k, t in unique.items() if k not in vectors]
+        if misses:
+            semaphore = asyncio.Semaphore(concurrency)
+            
+            async def embed_batch(batch):
+                async with semaphore:
+                    result = await self._embed_upstream([t for _, t in batch])
+                self.embedding_cache.put_many(self.embedding_model, zip([k for k, _ in batch], result))
+                return batch, result
+            
+            batches = [misses[i:i + batch_size] for i in range(0, len(misses), batch_size)]
+            for batch, result in await asyncio.gather(*(embed_batch(b) for b in batches)):
+                for (key, _), vec in zip(batch, result):
+                    # Same values as a later cache hit (float16 round trip)
+                    vectors[key] = to_float16(vec).astype(np.float32)
+            logger.debug(f"Embedded {len(misses)} of {len(unique)} unique texts ({len(batches)} requests)")
+        
+        return np.stack([vectors[k] for k in keys])
+    
+    async def _embed_upstream(self, texts: List[str]) -> List[List[float]]:
+        """One Ollama batch request (/api/embed); older servers only have
+        /api/embeddings with one text per request"""
+        async with pooled_client(timeout=120.0) as client:
+            if not self._legacy_embed_api:
+                response = await client.post(
+                    f"{self.ollama_url}/api/embed",
+                    json={"model": self.embedding_model, "input": texts}
+                )
+                if response.status_code != 404:
+                    response.raise_for_status()
+                    return response.json()["embeddings"]
+                self._legacy_embed_api = True
+                logger.info("Ollama without /api/embed - falling back to /api/embeddings")
+            
+            embeddings = []
+            for text in texts:
+                response = await client.post(
+                    f"{self.ollama_url}/api/embeddings",
+                    json={"model": self.embedding_model, "prompt": text}
+                )
+                response.raise_for_status()
+                embeddings.append(response.json().get("embedding", []))
+            return embeddings
+    
+    async def index_contexts(self, docs: List[ContextDocument], chunk_size: int = ADD_CHUNK_SIZE) -> int:
+        """Embeds documents (batched, cached) and upserts them in large chunks
+        
+        Collections indexed this way must be queried with query_embedding
+        (semantic_search), not with ChromaDB's default embedding function.
+        """
+        if not docs:
+            return 0
+        embeddings = await self.embed_texts([d.content for d in docs])
+        for doc, vec in zip(docs, embeddings):
+            doc.embedding = vec.tolist()
+        
+        collection = self._get_collection()
+        if not collection:
+            return len(docs)
+        
+        for start in range(0, len(docs), chunk_size):
+            chunk = docs[start:start + chunk_size]
+            collection.upsert(
+                ids=[d.id for d in chunk],
+                documents=[d.content for d in chunk],
+                embeddings=embeddings[start:start + chunk_size],
+                metadatas=[{"h3_index": d.h3_index, **d.metadata} for d in chunk]
             )
-            response.raise_for_status()
-            data = response.json()
-            return data.get("embedding", [])
+        self.persist()
+        logger.info(f"Indexed {len(docs)} documents ({-(-len(docs) // chunk_size)} upserts)")
+        return len(docs)
+    
+    def _embedded_only(self, docs: List[ContextDocument]) -> List[ContextDocument]:
+        """The local index cannot embed documents itself: skip those without
+        an embedding (index_contexts embeds them first)"""
+        if not self.is_local:
+            return docs
+        embedded = [d for d in docs if d.embedding is not None]
+        if len(embedded) < len(docs):
+            logger.warning(
+                f"Local vector index: skipped {len(docs) - len(embedded)} documents "
+                f"without embedding (use index_contexts)"
+            )
+        return embedded
     
     def add_context(self, doc: ContextDocument) -> str:
         """Add a context document to the collection"""
-        if not self.client:
-            return doc.id
-            
-        if not self.collection:
-            self.init_collection()
-        
-        if self.collection:
-            self.collection.add(
+        collection = self._get_collection()
+        if collection and self._embedded_only([doc]):
+            collection.add(
                 ids=[doc.id],
                 documents=[doc.content],
                 metadatas=[{
                     "h3_index": doc.h3_index,
                     **doc.metadata
-                }]
+                }],
+                **({"embeddings": [doc.embedding]} if doc.embedding is not None else {})
             )
         return doc.id
     
     def add_contexts_batch(self, docs: List[ContextDocument]):
         """Add multiple context documents"""
-        if not self.client:
-            return
-            
-        if not self.collection:
-            self.init_collection()
-        
-        if self.collection:
-            self.collection.add(
+        collection = self._get_collection()
+        if collection:
+            docs = self._embedded_only(docs)
+            if not docs:
+                return
+            embedded = all(d.embedding is not None for d in docs)
+            collection.add(
                 ids=[d.id for d in docs],
                 documents=[d.content for d in docs],
-                metadatas=[{"h3_index": d.h3_index, **d.metadata} for d in docs]
+                metadatas=[{"h3_index": d.h3_index, **d.metadata} for d in docs],
+                **({"embeddings": [d.embedding for d in docs]} if embedded else {})
             )
             logger.info(f"Added {len(docs)} documents to vector store")
     
     def search_by_h3(self, h3_index: str, limit: int = 10) -> List[Dict]:
         """Get all contexts for a specific H3 cell"""
-        if not self.client:
+        collection = self._get_collection()
+        if not collection:
             return []
-            
-        if not self.collection:
-            self.init_collection()
         
-        if not self.collection:
-            return []
-        
-        results = self.collection.get(
+        results = collection.get(
             where={"h3_index": h3_index},
             limit=limit
         )
         
         return self._format_results(results)
     
-    def semantic_search(self, query: str, limit: int = 10, h3_filter: str = None) -> List[Dict]:
-        """Semantic search across all contexts"""
-        if not self.client:
-            return []
-            
-        if not self.collection:
-            self.init_collection()
-        
-        if not self.collection:
+    def semantic_search(
+        self,
+        query: str,
+        limit: int = 10,
+        h3_filter: str = None,
+        query_embedding: Optional[List[float]] = None,
+        where: Optional[Dict] = None,
+    ) -> List[Dict]:
+        """Semantic search across all contexts (query_embedding: from
+        embed_texts, for collections built with index_contexts; where:
+        additional metadata filter)"""
+        collection = self._get_collection()
+        if not collection:
             return []
         
-        where = {"h3_index": h3_filter} if h3_filter else None
+        filters = ([{"h3_index": h3_filter}] if h3_filter else []) + ([where] if where else [])
+        where = filters[0] if len(filters) == 1 else ({"$and": filters} if filters else None)
         
-        results = self.collection.query(
-            query_texts=[query],
-            n_results=limit,
-            where=where
-        )
+        if query_embedding is not None:
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=limit,
+                where=where
+            )
+        elif self.is_local:
+            logger.warning("Local vector index needs a query_embedding (see embed_texts)")
+            return []
+        else:
+            results = collection.query(
+                query_texts=[query],
+                n_results=limit,
+                where=where
+            )
         
         return self._format_query_results(results)
     
-    def search_nearby_cells(self, h3_indexes: List[str], limit: int = 20) -> List[Dict]:
-        """Search contexts in multiple H3 cells"""
-        if not self.client:
+    def search_nearby_cells(
+        self,
+        h3_indexes: List[str],
+        limit: int = 20,
+        query_embedding: Optional[List[float]] = None,
+    ) -> List[Dict]:
+        """Search contexts in multiple H3 cells (ranked by similarity
+        if query_embedding is given)"""
+        collection = self._get_collection()
+        if not collection:
             return []
-            
-        if not self.collection:
-            self.init_collection()
         
-        if not self.collection:
-            return []
+        where = {"h3_index": {"$in": list(h3_indexes)}}
+        if query_embedding is not None:
+            results = collection.query(
+                query_embeddings=[query_embedding],
+                n_results=limit,
+                where=where
+            )
+            return self._format_query_results(results)
         
-        results = self.collection.get(
-            where={"h3_index": {"$in": h3_indexes}},
+        results = collection.get(
+            where=where,
             limit=limit
         )
         
         return self._format_results(results)
     
+    def search_k_ring(
+        self,
+        h3_index: str,
+        k: int = 1,
+        limit: int = 20,
+        query_embedding: Optional[List[float]] = None,
+    ) -> List[Dict]:
+        """Contexts in the cell and its k-ring neighbours, one query"""
+        return self.search_nearby_cells(grid_disk(h3_index, k), limit=limit, query_embedding=query_embedding)
+    
     def _format_results(self, results) -> List[Dict]:
         """Format ChromaDB results"""
         docs = []
@@ -194,16 +366,12 @@ class VectorStore:
     
     def get_stats(self) -> Dict:
         """Get collection statistics"""
-        if not self.client:
-            return {"name": "disabled", "count": 0}
-            
-        if not self.collection:
-            self.init_collection()
-        
-        if not self.collection:
+        collection = self._get_collection()
+        if not collection:
             return {"name": "unavailable", "count": 0}
         
         return {
-            "name": self.collection.name,
-            "count": self.collection.count()
+            "name": collection.name,
+            "count": collection.count(),
+            "backend": "local" if self.is_local else "chromadb"
         }
@@ -37,8 +37,7 @@ def fetch_nasa_events():
             events = await scraper.fetch_all_categories()
             total = sum(len(e) for e in events.values())
             
-            for category, cat_events in events.items():
-                await scraper.store_events(cat_events)
+            await scraper.store_events([e for cat_events in events.values() for e in cat_events])
             
             logger.info(f"Fetched and stored {total} NASA events")
         
@@ -76,7 +75,7 @@ def analyze_region(lat: float, lon: float, name: str, scenario: str = "SSP2-4.5"
     from services.vector_store import VectorStore
     
     async def run():
-        vector_store = VectorStore()
+        vector_store = VectorStore(ollama_url=settings.ollama_url)
         vector_store.init_collection()
         
         service = ContextService(
@@ -0,0 +1 @@
+# Mining Benchmarks
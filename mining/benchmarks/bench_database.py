@@ -0,0 +1,76 @@
+"""Benchmark: insert_record-Schleife vs. Batch-Pfad (Records/s)
+
+Beide Pfade schreiben dieselben synthetischen PageRecords in eine frische
+SQLite-Datenbank; danach wird derselbe Batch erneut geschrieben (Updates).
+
+Aufruf (aus mining):
+    python -m benchmarks.bench_database [anzahl]
+"""
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, '.')
+
+from database import DatabaseManager
+from schemas import NASARecord, PageRecord, UNPressRecord, WFPRecord, WorldBankRecord
+
+ANZAHL = 10_000
+
+
+def synthetische_records(n: int) -> list:
+    basis = datetime(2025, 1, 1)
+    klassen = [PageRecord, NASARecord, UNPressRecord, WFPRecord, WorldBankRecord]
+    records = []
+    for i in range(n):
+        cls = klassen[i % len(klassen)]
+        extra = {
+            NASARecord: {'environmental_indicators': ['NDVI', 'temperature'], 'satellite_source': 'MODIS'},
+            UNPressRecord: {'meeting_coverage': True, 'speakers': ['A', 'B']},
+            WFPRecord: {'crisis_type': 'drought', 'affected_population': '1.2 million'},
+            WorldBankRecord: {'country': 'Kenya', 'sector': 'climate', 'project_id': f'P{i:06d}'},
+        }.get(cls, {})
+        records.append(cls(
+            url=f"https://example.org/{cls.__name__.lower()}/{i}",
+            source_domain='example.org',
+            source_name=cls.__name__.replace('Record', '') or 'Page',
+            fetched_at=basis + timedelta(minutes=i),
+            title=f"Record {i}",
+            summary='Drought and conflict in East Africa. ' * 5,
+            region='East Africa',
+            topics=['drought', 'conflict', f"topic-{i % 50}"],
+            links=[f"https://example.org/link/{i}/{j}" for j in range(5)],
+            image_urls=[f"https://example.org/img/{i}.jpg"],
+            **extra,
+        ))
+    return records
+
+
+def einzeln(db: DatabaseManager, records: list):
+    for record in records:
+        db.insert_record(record)
+
+
+def messe(name: str, fn, records: list) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_path=str(Path(tmp) / 'bench.db'))
+        for durchlauf in ('insert', 'update'):
+            start = time.perf_counter()
+            fn(db, records)
+            dauer = time.perf_counter() - start
+            print(f"{name:<22} {durchlauf:<7} {dauer:>9.2f} {len(records) / dauer:>12,.0f}")
+
+
+def main():
+    anzahl = int(sys.argv[1]) if len(sys.argv) > 1 else ANZAHL
+    records = synthetische_records(anzahl)
+    print(f"{anzahl} Records")
+    print(f"{'Pfad':<22} {'Lauf':<7} {'s':>9} {'Records/s':>12}")
+    messe('insert_record-Schleife', einzeln, records)
+    messe('insert_records_batch', DatabaseManager.insert_records_batch, records)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark: RiskScorer, eine Regex-Suche pro Indikator vs. KeywordAutomaton (Docs/s)
+
+Synthetischer Korpus (Titel, Summary, Volltext mit eingestreuten
+Indikatoren, auch als Wortteil: 'flooding', 'warfare'). Verglichen wird
+- Regex: bisheriger Pfad, re.findall(r'\\b...\\b') pro Indikator und
+  Teilstring-Suche pro Indikator für die Indikatorliste
+- Automat: RiskScorer.calculate_risk (ein Durchlauf pro Record)
+
+Beide Pfade liefern identische Scores (wird geprüft).
+
+Aufruf (aus mining):
+    python -m benchmarks.bench_keyword_matcher [anzahl]
+"""
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from risk_scoring import RiskScorer
+
+ANZAHL = 2_000
+LAENGEN = [('kurz', 60), ('mittel', 400), ('lang', 3000)]
+FUELLWOERTER = (
+    "the region people water food aid government report said local news "
+    "flooding warfare awarded severe-drought Crisis, WAR. officials"
+).split()
+
+
+def korpus(scorer: RiskScorer, n: int, woerter: int, seed: int = 1) -> list:
+    rnd = random.Random(seed)
+    indikatoren = list(scorer.climate_indicators) + list(scorer.conflict_indicators) + list(scorer.urgency_indicators)
+    records = []
+    for i in range(n):
+        text = [
+            rnd.choice(indikatoren) if rnd.random() < 0.03 else rnd.choice(FUELLWOERTER)
+            for _ in range(rnd.randint(woerter // 2, woerter * 3 // 2))
+        ]
+        records.append({
+            'id': i,
+            'title': ' '.join(text[:10]),
+            'summary': ' '.join(text[10:40]),
+            'full_text': ' '.join(text[40:]),
+        })
+    return records
+
+
+def regex_score(text: str, indicators: dict) -> float:
+    """Bisheriger RiskScorer._calculate_indicator_score"""
+    if not text:
+        return 0.0
+    scores = []
+    for indicator, weight in indicators.items():
+        pattern = r'\b' + re.escape(indicator) + r'\b'
+        matches = len(re.findall(pattern, text, re.IGNORECASE))
+        if matches > 0:
+            scores.append(min(matches * weight / 3.0, weight))
+    if not scores:
+        return 0.0
+    return min(sum(scores) / len(scores), 1.0)
+
+
+def regex_risk(scorer: RiskScorer, record: dict) -> tuple:
+    """Bisheriger RiskScorer.calculate_risk (ohne RiskScore-Objekt)"""
+    text = ' '.join(filter(None, [record.get('title', ''), record.get('summary', ''), record.get('full_text', '')])).lower()
+    climate = regex_score(text, scorer.climate_indicators)
+    conflict = regex_score(text, scorer.conflict_indicators)
+    urgency = regex_score(text, scorer.urgency_indicators)
+    indicators = []
+    for indicator in scorer.climate_indicators:
+        if indicator in text:
+            indicators.append(indicator)
+    for indicator in scorer.conflict_indicators:
+        if indicator in text and indicator not in indicators:
+            indicators.append(indicator)
+    return climate, conflict, urgency, indicators, climate * 0.4 + conflict * 0.4 + urgency * 0.2
+
+
+def automat_risk(scorer: RiskScorer, record: dict) -> tuple:
+    r = scorer.calculate_risk(record)
+    return r.climate_risk, r.conflict_risk, r.urgency, r.indicators, r.score
+
+
+def messe(fn, scorer, records) -> tuple:
+    start = time.perf_counter()
+    ergebnis = [fn(scorer, r) for r in records]
+    return ergebnis, len(records) / (time.perf_counter() - start)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else ANZAHL
+    scorer = RiskScorer()
+    print(f"{'Texte':<7} {'Wörter':>7} | {'Regex Docs/s':>12} {'Automat Docs/s':>14} {'Speedup':>8}")
+    for name, woerter in LAENGEN:
+        records = korpus(scorer, n, woerter)
+        alt, docs_alt = messe(regex_risk, scorer, records)
+        neu, docs_neu = messe(automat_risk, scorer, records)
+        assert alt == neu
+        print(f"{name:<7} {woerter:>7} | {docs_alt:>12.0f} {docs_neu:>14.0f} {docs_neu / docs_alt:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
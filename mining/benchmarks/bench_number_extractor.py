@@ -0,0 +1,155 @@
+"""Benchmark: NumberExtractor, ein re.findall pro Muster vs. ein Durchlauf (MB/s)
+
+Synthetische Nachrichtenseiten (10 KB, 100 KB, 1 MB) aus Sätzen mit
+Temperaturen, Niederschlag, Personen- und Geldbeträgen, Prozenten und
+Datumsangaben. Verglichen wird
+- findall: bisheriger Pfad, ~25 re.findall/re.search über den ganzen Text,
+  Multiplikator per text.lower() über den ganzen Text pro Treffer
+- Scan: NumberExtractor.extract_all (Text einmal kleingeschrieben, ein
+  Durchlauf, Multiplikator aus dem Fenster hinter der Zahl)
+
+Temperaturen, Niederschlag, Prozente, Datumsangaben und Orte müssen
+identisch sein (wird geprüft). Die multiplikatorabhängigen Felder weichen
+ab, weil der bisherige Pfad den ersten Multiplikator irgendwo im Text auf
+jede Zahl anwendet.
+
+Der bisherige Pfad wächst quadratisch mit der Seitengröße (1 MB: mehrere
+Minuten) und wird daher standardmäßig nur bis 100 KB gemessen.
+
+Aufruf (aus mining):
+    python -m benchmarks.bench_number_extractor [--alles]
+"""
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from data_extraction import NumberExtractor
+
+GROESSEN = [10_000, 100_000, 1_000_000]
+MAX_ALT = 100_000
+WIEDERHOLUNGEN = 3
+IDENTISCH = ['temperatures', 'precipitation', 'percentages', 'dates', 'locations']
+
+SAETZE = [
+    "The temperature in East Africa reached {t}°C last week, with precipitation of only {p}mm.",
+    "Over {n} million people are affected by the drought in Somalia.",
+    "The UN has allocated ${f} million USD in funding to address the crisis.",
+    "The situation has worsened by {q}% compared to last year, and {q} percent of wells are dry.",
+    "The event occurred on January {d}, 2025 and was updated on 2025-01-{d}.",
+    "The region has a population of {gross} residents according to the census of Kenya.",
+    "Officials said the flooding displaced families and damaged roads in the province.",
+    "Rainfall: {p} was recorded at the station, temperature: {t} at noon.",
+]
+
+
+def seite(groesse: int, rnd: random.Random) -> str:
+    teile, laenge = [], 0
+    while laenge < groesse:
+        satz = rnd.choice(SAETZE).format(
+            t=rnd.randint(10, 45), p=rnd.randint(1, 400), n=rnd.randint(1, 9), f=rnd.randint(1, 900),
+            q=rnd.randint(1, 99), d=rnd.randint(10, 28), gross=f"{rnd.randint(1, 999)},{rnd.randint(0, 999):03d},000",
+        )
+        teile.append(satz)
+        laenge += len(satz) + 1
+    return " ".join(teile)
+
+
+def findall_extract(extractor: NumberExtractor, text: str) -> dict:
+    """Bisheriger NumberExtractor.extract_all (ohne ExtractedNumbers-Objekt)"""
+
+    def multiplikator(woerter):
+        for wort, faktor in woerter:
+            if wort in text.lower():
+                return faktor
+        return 1
+
+    personen = [('million', 1_000_000), ('billion', 1_000_000_000), ('thousand', 1_000)]
+    geld = [('billion', 1_000_000_000), ('million', 1_000_000), ('thousand', 1_000), ('trillion', 1_000_000_000_000)]
+
+    temperatures = []
+    for pattern in extractor.temperature_patterns:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            temp = float(match)
+            if 'f' in text.lower() and temp > 50:
+                temp = (temp - 32) * 5/9
+            temperatures.append(round(temp, 2))
+    precipitation = []
+    for pattern in extractor.precipitation_patterns:
+        for match in re.findall(pattern, text, re.IGNORECASE):
+            value = float(match.replace(',', ''))
+            if 'inch' in text.lower():
+                value = value * 25.4
+            precipitation.append(round(value, 2))
+    population = [
+        int(float(match.replace(',', '')) * multiplikator(personen))
+        for pattern in extractor.population_patterns for match in re.findall(pattern, text, re.IGNORECASE)
+    ]
+    amounts = [
+        round(float(match.replace(',', '')) * multiplikator(geld), 2)
+        for pattern in extractor.financial_patterns for match in re.findall(pattern, text, re.IGNORECASE)
+    ]
+    percentages = [
+        round(float(match), 2)
+        for pattern in extractor.percentage_patterns for match in re.findall(pattern, text, re.IGNORECASE)
+        if 0 <= float(match) <= 100
+    ]
+    dates = [match for pattern in extractor.date_patterns for match in re.findall(pattern, text, re.IGNORECASE)]
+    affected = funding = None
+    for pattern in extractor.affected_people_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            affected = int(float(match.group(1).replace(',', '')) * multiplikator(personen))
+            break
+    for pattern in extractor.funding_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            funding = round(float(match.group(1).replace(',', '')) * multiplikator(geld[:3]), 2)
+            break
+    locations = [loc for pattern in extractor.location_patterns for loc in re.findall(pattern, text)]
+    false_positives = {'The', 'This', 'That', 'These', 'Those', 'A', 'An'}
+    return {
+        'temperatures': list(set(temperatures)),
+        'precipitation': list(set(precipitation)),
+        'population_numbers': list(set(population)),
+        'financial_amounts': list(set(amounts)),
+        'percentages': list(set(percentages)),
+        'dates': list(set(dates)),
+        'affected_people': affected,
+        'funding_amount': funding,
+        'locations': list(set(loc for loc in locations if loc not in false_positives)),
+    }
+
+
+def scan_extract(extractor: NumberExtractor, text: str) -> dict:
+    return vars(extractor.extract_all(text))
+
+
+def messe(fn, extractor, text, wiederholungen: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(wiederholungen):
+        ergebnis = fn(extractor, text)
+    return ergebnis, (time.perf_counter() - start) / wiederholungen
+
+
+def main():
+    max_alt = GROESSEN[-1] if '--alles' in sys.argv else MAX_ALT
+    extractor = NumberExtractor()
+    rnd = random.Random(1)
+    print(f"{'Seite':>9} | {'findall s':>9} {'Scan s':>8} {'Scan MB/s':>9} {'Speedup':>8}")
+    for groesse in GROESSEN:
+        text = seite(groesse, rnd)
+        neu, t_neu = messe(scan_extract, extractor, text, WIEDERHOLUNGEN)
+        if groesse <= max_alt:
+            alt, t_alt = messe(findall_extract, extractor, text, 1)
+            assert all(alt[feld] == neu[feld] for feld in IDENTISCH)
+            spalten = f"{t_alt:>9.2f} {t_neu:>8.3f} {len(text) / t_neu / 1e6:>9.1f} {t_alt / t_neu:>8.0f}"
+        else:
+            spalten = f"{'-':>9} {t_neu:>8.3f} {len(text) / t_neu / 1e6:>9.1f} {'-':>8}"
+        print(f"{len(text):>9} | {spalten}")
+
+
+if __name__ == '__main__':
+    main()
@@ -36,8 +36,35 @@ class ExtractedNumbers:
             self.locations = []
 
 
+# Wörter, an denen die Muster mit Schlüsselwort bzw. Monatsnamen beginnen
+_SCHLUESSELWOERTER = ('temperature', 'precipitation', 'rainfall', 'population', 'funding')
+_MONATE = ('january', 'february', 'march', 'april', 'may', 'june', 'july',
+           'august', 'september', 'october', 'november', 'december')
+
+# Ein Durchlauf findet alle Stellen, an denen ein Muster beginnen kann:
+# Zahlen (mit Minus) und - überlappend, daher als Lookahead - Wörter
+_SCANNER = re.compile(
+    r'(?P<zahl>-?\d+)'
+    r'|(?=(?P<wort>' + '|'.join(_SCHLUESSELWOERTER) + r')'
+    r'|(?P<monat>' + '|'.join(_MONATE) + r'))'
+)
+
+# Multiplikator direkt hinter der Zahl ("2 million", "$1.5 billion")
+_MULTIPLIKATOR = re.compile(r'\s*(thousand|million|billion|trillion)')
+_FAKTOREN = {'thousand': 1_000, 'million': 1_000_000, 'billion': 1_000_000_000,
+             'trillion': 1_000_000_000_000}
+_ASCII_KLEIN = str.maketrans('ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
 class NumberExtractor:
-    """Extrahiert numerische Daten aus Text"""
+    """Extrahiert numerische Daten aus Text
+    
+    Alle Muster werden einmal kompiliert und in einem Durchlauf über den
+    kleingeschriebenen Text ausgewertet: der Scanner liefert die möglichen
+    Startpositionen, dort wird jedes Muster verankert geprüft (gleiche
+    Treffer wie re.findall/re.search pro Muster). Multiplikatoren
+    (million, billion, ...) gelten nur für die Zahl, hinter der sie stehen.
+    """
     
     def __init__(self):
         # Patterns für verschiedene Datentypen
@@ -76,6 +103,74 @@ class NumberExtractor:
             r'\b(\d{4}[/-]\d{1,2}[/-]\d{1,2})\b',  # "2025-01-15"
             r'\b(January|February|March|April|May|June|July|August|September|October|November|December)\s+\d{1,2},?\s+\d{4}\b',  # "January 15, 2025"
         ]
+        
+        self.affected_people_patterns = [
+            r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(?:people|individuals|persons)\s*(?:affected|displaced|in\s+need)',
+            r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(?:million|billion|thousand)\s*(?:people|individuals|persons)\s*(?:affected|displaced|in\s+need)?',
+        ]
+        
+        self.funding_patterns = [
+            r'funding[:\s]+\$?\s*(\d{1,3}(?:,\d{3})*(?:\.\d+)?)',
+            r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(?:million|billion|thousand)\s*(?:USD|dollars?)\s*(?:in\s+funding|funding)',
+        ]
+        
+        # Pattern für Länder/Regionen (kann erweitert werden)
+        self.location_patterns = [
+            r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:region|country|province|state|area)',
+            r'in\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+            r'of\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
+        ]
+        
+        self._compile()
+    
+    def _compile(self):
+        """Kompiliert alle Muster einmal, gruppiert nach Art der Startposition"""
+        gruppen = [
+            ('temperatures', self.temperature_patterns),
+            ('precipitation', self.precipitation_patterns),
+            ('population_numbers', self.population_patterns),
+            ('financial_amounts', self.financial_patterns),
+            ('percentages', self.percentage_patterns),
+            ('dates', self.date_patterns),
+            ('affected_people', self.affected_people_patterns),
+            ('funding_amount', self.funding_patterns),
+        ]
+        # Muster-Nummer -> Kategorie; Treffer werden pro Muster gesammelt,
+        # damit die Reihenfolge der von findall entspricht
+        self._kategorien: List[str] = []
+        self._einzeln: List[re.Pattern] = []
+        zahl, monat, wort = [], [], {}
+        for kategorie, patterns in gruppen:
+            for pattern in patterns:
+                nummer = len(self._kategorien)
+                self._kategorien.append(kategorie)
+                self._einzeln.append(re.compile(pattern, re.IGNORECASE))
+                schluessel = next((w for w in _SCHLUESSELWOERTER if pattern.startswith(w)), None)
+                if schluessel:
+                    wort.setdefault(schluessel, []).append((nummer, pattern))
+                elif pattern.startswith(r'\b(January'):
+                    monat.append((nummer, pattern))
+                else:
+                    zahl.append((nummer, pattern))
+        # Pro Startposition ein Aufruf: jedes Muster als optionaler Lookahead.
+        # Am Minus können nur Muster mit "-?" treffen, mitten in einer
+        # Ziffernfolge nur die mit \d{1,3} (siehe _scan)
+        self._zahl_muster = self._kombiniere(zahl)
+        self._minus_muster = self._kombiniere([m for m in zahl if m[1].startswith('(-?')])
+        self._ziffern_muster = self._kombiniere([m for m in zahl if r'\d{1,3}' in m[1]])
+        self._monat_muster = self._kombiniere(monat)
+        self._wort_muster = {w: self._kombiniere(m) for w, m in wort.items()}
+        self._location_regexes = [re.compile(p) for p in self.location_patterns]
+    
+    @staticmethod
+    def _kombiniere(muster: List[tuple]) -> tuple:
+        """(Regex, [(Nummer, Gruppe Treffer, Gruppe Zahl)]) für eine Liste (Nummer, Pattern)"""
+        teile, gruppen, index = [], [], 1
+        for nummer, pattern in muster:
+            teile.append(f'(?:(?=({pattern})))?')
+            gruppen.append((nummer, index, index + 1))
+            index += 1 + re.compile(pattern).groups
+        return re.compile(''.join(teile), re.IGNORECASE), gruppen
     
     def extract_all(self, text: str) -> ExtractedNumbers:
         """Extrahiere alle numerischen Daten aus Text"""
@@ -89,210 +184,155 @@ class NumberExtractor:
                 dates=[]
             )
         
+        werte = self._scan(text)
+        
+        return ExtractedNumbers(
+            temperatures=werte['temperatures'],
+            precipitation=werte['precipitation'],
+            population_numbers=werte['population_numbers'],
+            financial_amounts=werte['financial_amounts'],
+            percentages=werte['percentages'],
+            dates=werte['dates'],
+            affected_people=werte['affected_people'],
+            funding_amount=werte['funding_amount'],
+            locations=self._extract_locations(text)
+        )
+    
+    def _scan(self, text: str) -> Dict[str, Any]:
+        """Ein Durchlauf: alle typisierten Zahlen des Textes"""
         text_lower = text.lower()
+        # Positionen müssen zum Original passen (z.B. Monatsnamen)
+        scan_text = text_lower if len(text_lower) == len(text) else text.translate(_ASCII_KLEIN)
         
-        # Extrahiere Temperaturen
-        temperatures = self._extract_temperatures(text)
+        n = len(scan_text)
+        # (Start, Ende) der Zahl-Gruppe pro Treffer und Muster
+        treffer: List[List[tuple]] = [[] for _ in self._kategorien]
+        # Ende des letzten Treffers pro Muster: Treffer überlappen nicht (wie findall)
+        ende = [0] * len(self._kategorien)
         
-        # Extrahiere Niederschlag
-        precipitation = self._extract_precipitation(text)
+        def pruefe(muster, pos):
+            kombi, gruppen = muster
+            regs = kombi.match(scan_text, pos).regs
+            for nummer, gruppe, zahl_gruppe in gruppen:
+                e = regs[gruppe][1]
+                if e < 0 or pos < ende[nummer]:
+                    continue
+                treffer[nummer].append(regs[zahl_gruppe])
+                # Endet der Treffer mitten in einer Ziffernfolge, beginnt dort der nächste Versuch
+                while e < n and scan_text[e].isdigit() and scan_text[e - 1].isdigit():
+                    m = self._einzeln[nummer].match(scan_text, e)
+                    if not m:
+                        break
+                    treffer[nummer].append(m.span(1))
+                    e = m.end()
+                ende[nummer] = e
         
-        # Extrahiere Bevölkerungszahlen
-        population_numbers = self._extract_population(text)
+        for token in _SCANNER.finditer(scan_text):
+            if token.lastgroup == 'zahl':
+                start, stop = token.span()
+                if scan_text[start] == '-':
+                    pruefe(self._minus_muster, start)
+                    start += 1
+                pruefe(self._zahl_muster, start)
+                # Scheitert ein Muster mit \d{1,3} am Anfang einer längeren
+                # Ziffernfolge, kann es nur noch auf deren letzte drei Ziffern passen
+                if stop - start > 3:
+                    pruefe(self._ziffern_muster, stop - 3)
+            elif token.group('wort'):
+                pruefe(self._wort_muster[token.group('wort')], token.start())
+            else:
+                pruefe(self._monat_muster, token.start())
         
-        # Extrahiere Finanzbeträge
-        financial_amounts = self._extract_financial(text)
+        pro_kategorie: Dict[str, List] = {}
+        for nummer, kategorie in enumerate(self._kategorien):
+            pro_kategorie.setdefault(kategorie, []).extend(treffer[nummer])
         
-        # Extrahiere Prozentsätze
-        percentages = self._extract_percentages(text)
+        fahrenheit = 'f' in text_lower
+        inch = 'inch' in text_lower
         
-        # Extrahiere Datumsangaben
-        dates = self._extract_dates(text)
+        def zahl(span, faktoren=('thousand', 'million', 'billion', 'trillion')):
+            wert = float(scan_text[span[0]:span[1]].replace(',', ''))
+            mult = _MULTIPLIKATOR.match(scan_text, span[1])
+            if mult and mult.group(1) in faktoren:
+                wert *= _FAKTOREN[mult.group(1)]
+            return wert
         
-        # Extrahiere spezifische Metriken
-        affected_people = self._extract_affected_people(text)
-        funding_amount = self._extract_funding_amount(text)
+        temperatures = []
+        for start, stop in pro_kategorie['temperatures']:
+            temp = float(scan_text[start:stop])
+            # Konvertiere Fahrenheit zu Celsius wenn nötig
+            if fahrenheit and temp > 50:  # Heuristik: F > 50
+                temp = (temp - 32) * 5/9
+            temperatures.append(round(temp, 2))
         
-        # Extrahiere Orte
-        locations = self._extract_locations(text)
+        precipitation = []
+        for start, stop in pro_kategorie['precipitation']:
+            value = float(scan_text[start:stop].replace(',', ''))
+            # Konvertiere inches zu mm wenn nötig
+            if inch:
+                value = value * 25.4
+            precipitation.append(round(value, 2))
         
-        return ExtractedNumbers(
-            temperatures=temperatures,
-            precipitation=precipitation,
-            population_numbers=population_numbers,
-            financial_amounts=financial_amounts,
-            percentages=percentages,
-            dates=dates,
-            affected_people=affected_people,
-            funding_amount=funding_amount,
-            locations=locations
-        )
+        personen = ('thousand', 'million', 'billion')
+        population = [int(zahl(span, personen)) for span in pro_kategorie['population_numbers']]
+        amounts = [round(zahl(span), 2) for span in pro_kategorie['financial_amounts']]
+        percentages = [
+            round(v, 2) for v in (float(scan_text[a:b]) for a, b in pro_kategorie['percentages']) if 0 <= v <= 100
+        ]
+        dates = [text[start:stop] for start, stop in pro_kategorie['dates']]
+        
+        # Einzelwerte: erster Treffer des ersten passenden Musters (wie re.search)
+        affected = next(iter(pro_kategorie['affected_people']), None)
+        funding = next(iter(pro_kategorie['funding_amount']), None)
+        
+        return {
+            'temperatures': list(set(temperatures)),  # Entferne Duplikate
+            'precipitation': list(set(precipitation)),
+            'population_numbers': list(set(population)),
+            'financial_amounts': list(set(amounts)),
+            'percentages': list(set(percentages)),
+            'dates': list(set(dates)),
+            'affected_people': int(zahl(affected, personen)) if affected else None,
+            'funding_amount': round(zahl(funding, personen), 2) if funding else None,
+        }
     
     def _extract_temperatures(self, text: str) -> List[float]:
         """Extrahiere Temperaturen"""
-        temperatures = []
-        for pattern in self.temperature_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    temp = float(match)
-                    # Konvertiere Fahrenheit zu Celsius wenn nötig
-                    if 'f' in text.lower() and temp > 50:  # Heuristik: F > 50
-                        temp = (temp - 32) * 5/9
-                    temperatures.append(round(temp, 2))
-                except ValueError:
-                    continue
-        return list(set(temperatures))  # Entferne Duplikate
+        return self._scan(text)['temperatures'] if text else []
     
     def _extract_precipitation(self, text: str) -> List[float]:
         """Extrahiere Niederschlagsmengen"""
-        precipitation = []
-        for pattern in self.precipitation_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    value = float(match.replace(',', ''))
-                    # Konvertiere inches zu mm wenn nötig
-                    if 'inch' in text.lower():
-                        value = value * 25.4
-                    precipitation.append(round(value, 2))
-                except ValueError:
-                    continue
-        return list(set(precipitation))
+        return self._scan(text)['precipitation'] if text else []
     
     def _extract_population(self, text: str) -> List[int]:
         """Extrahiere Bevölkerungszahlen"""
-        population = []
-        for pattern in self.population_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    # Handle Millionen, Milliarden, etc.
-                    num_str = match.replace(',', '')
-                    multiplier = 1
-                    
-                    if 'million' in text.lower():
-                        multiplier = 1_000_000
-                    elif 'billion' in text.lower():
-                        multiplier = 1_000_000_000
-                    elif 'thousand' in text.lower():
-                        multiplier = 1_000
-                    
-                    value = int(float(num_str) * multiplier)
-                    population.append(value)
-                except ValueError:
-                    continue
-        return list(set(population))
+        return self._scan(text)['population_numbers'] if text else []
     
     def _extract_financial(self, text: str) -> List[float]:
         """Extrahiere Finanzbeträge"""
-        amounts = []
-        for pattern in self.financial_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    num_str = match.replace(',', '')
-                    multiplier = 1
-                    
-                    # Handle Millionen, Milliarden, etc.
-                    if 'billion' in text.lower():
-                        multiplier = 1_000_000_000
-                    elif 'million' in text.lower():
-                        multiplier = 1_000_000
-                    elif 'thousand' in text.lower():
-                        multiplier = 1_000
-                    elif 'trillion' in text.lower():
-                        multiplier = 1_000_000_000_000
-                    
-                    value = float(num_str) * multiplier
-                    amounts.append(round(value, 2))
-                except ValueError:
-                    continue
-        return list(set(amounts))
+        return self._scan(text)['financial_amounts'] if text else []
     
     def _extract_percentages(self, text: str) -> List[float]:
         """Extrahiere Prozentsätze"""
-        percentages = []
-        for pattern in self.percentage_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                try:
-                    value = float(match)
-                    if 0 <= value <= 100:  # Validiere Bereich
-                        percentages.append(round(value, 2))
-                except ValueError:
-                    continue
-        return list(set(percentages))
+        return self._scan(text)['percentages'] if text else []
     
     def _extract_dates(self, text: str) -> List[str]:
         """Extrahiere Datumsangaben"""
-        dates = []
-        for pattern in self.date_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            dates.extend(matches)
-        return list(set(dates))
+        return self._scan(text)['dates'] if text else []
     
     def _extract_affected_people(self, text: str) -> Optional[int]:
         """Extrahiere Anzahl betroffener Personen"""
-        patterns = [
-            r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(?:people|individuals|persons)\s*(?:affected|displaced|in\s+need)',
-            r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(?:million|billion|thousand)\s*(?:people|individuals|persons)\s*(?:affected|displaced|in\s+need)?',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    num_str = match.group(1).replace(',', '')
-                    multiplier = 1
-                    if 'million' in text.lower():
-                        multiplier = 1_000_000
-                    elif 'billion' in text.lower():
-                        multiplier = 1_000_000_000
-                    elif 'thousand' in text.lower():
-                        multiplier = 1_000
-                    return int(float(num_str) * multiplier)
-                except ValueError:
-                    continue
-        return None
+        return self._scan(text)['affected_people'] if text else None
     
     def _extract_funding_amount(self, text: str) -> Optional[float]:
         """Extrahiere Finanzierungsbetrag"""
-        patterns = [
-            r'funding[:\s]+\$?\s*(\d{1,3}(?:,\d{3})*(?:\.\d+)?)',
-            r'(\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s*(?:million|billion|thousand)\s*(?:USD|dollars?)\s*(?:in\s+funding|funding)',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                try:
-                    num_str = match.group(1).replace(',', '')
-                    multiplier = 1
-                    if 'billion' in text.lower():
-                        multiplier = 1_000_000_000
-                    elif 'million' in text.lower():
-                        multiplier = 1_000_000
-                    elif 'thousand' in text.lower():
-                        multiplier = 1_000
-                    return round(float(num_str) * multiplier, 2)
-                except ValueError:
-                    continue
-        return None
+        return self._scan(text)['funding_amount'] if text else None
     
     def _extract_locations(self, text: str) -> List[str]:
         """Extrahiere erwähnte Orte (einfache Heuristik)"""
-        # Pattern für Länder/Regionen (kann erweitert werden)
-        location_patterns = [
-            r'\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)\s+(?:region|country|province|state|area)',
-            r'in\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-            r'of\s+([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)',
-        ]
-        
         locations = []
-        for pattern in location_patterns:
-            matches = re.findall(pattern, text)
-            locations.extend(matches)
+        for regex in self._location_regexes:
+            locations.extend(regex.findall(text))
         
         # Entferne häufige False Positives
         false_positives = {'The', 'This', 'That', 'These', 'Those', 'A', 'An'}
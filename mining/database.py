@@ -2,7 +2,7 @@
 import sqlite3
 import json
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from datetime import datetime
 from contextlib import contextmanager
 import structlog
@@ -12,6 +12,44 @@ from schemas import PageRecord, NASARecord, UNPressRecord, WFPRecord, WorldBankR
 
 logger = structlog.get_logger(__name__)
 
+# SQLite-Parameterlimit für IN (...)-Abfragen
+IN_CHUNK = 900
+
+# Upsert für den Batch-Pfad; bestehende URLs behalten source/fetched_at (wie insert_record)
+UPSERT_RECORD_SQL = """
+    INSERT INTO records (
+        url, source_domain, source_name, fetched_at,
+        title, summary, publish_date, region,
+        content_type, language, full_text
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(url) DO UPDATE SET
+        title = excluded.title,
+        summary = excluded.summary,
+        publish_date = excluded.publish_date,
+        region = excluded.region,
+        content_type = excluded.content_type,
+        language = excluded.language,
+        full_text = excluded.full_text,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+
+# Quellspezifische Tabellen: source_name -> (Tabelle, Schlüssel im Record-Dict, JSON-Spalten)
+SOURCE_TABLES = {
+    'NASA': ('nasa_records', 'nasa_data', ('environmental_indicators',)),
+    'UN Press': ('un_press_records', 'un_data', ('speakers',)),
+    'WFP': ('wfp_records', 'wfp_data', ()),
+    'World Bank': ('worldbank_records', 'worldbank_data', ()),
+}
+
+# Seitengröße für iter_records
+ITER_PAGE_SIZE = 500
+
+
+def _chunks(items: List[Any], size: int = IN_CHUNK):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 
 class DatabaseManager:
     """Zentrale Datenbank-Verwaltung für alle Datenquellen"""
@@ -24,8 +62,13 @@ class DatabaseManager:
     @contextmanager
     def get_connection(self):
         """Context manager für Datenbankverbindungen"""
-        conn = sqlite3.connect(str(self.db_path))
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
         conn.row_factory = sqlite3.Row
+        # WAL (persistent, siehe init_database): synchronous=NORMAL ist sicher
+        # und spart den fsync pro Commit
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-64000")
         try:
             yield conn
             conn.commit()
@@ -40,6 +83,7 @@ class DatabaseManager:
         """Initialisiere Datenbank-Schema"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
             
             # Haupttabelle für alle Records
             cursor.execute("""
@@ -276,6 +320,7 @@ class DatabaseManager:
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_records_publish_date ON records(publish_date)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_records_region ON records(region)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_records_fetched_at ON records(fetched_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_records_source_fetched_at ON records(source_name, fetched_at)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_records_country_code ON records(primary_country_code)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_records_coordinates ON records(primary_latitude, primary_longitude)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_crawl_jobs_status ON crawl_jobs(status)")
@@ -413,17 +458,120 @@ class DatabaseManager:
             return (record_id, is_new)
     
     def insert_records_batch(self, records: List[PageRecord]) -> Dict[str, int]:
-        """Füge mehrere Records in einem Batch ein"""
+        """Füge mehrere Records in einem Batch ein (eine Verbindung, eine Transaktion)"""
         stats = {'new': 0, 'updated': 0, 'total': len(records)}
+        if not records:
+            return stats
         
-        for record in records:
-            result = self.insert_record(record)
-            if result:
-                record_id, is_new = result
-                if is_new:
-                    stats['new'] += 1
-                else:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            urls = [record.url for record in records]
+            
+            # Bereits vorhandene URLs (für new/updated-Statistik)
+            existing = set()
+            for chunk in _chunks(list(set(urls))):
+                cursor.execute(
+                    f"SELECT url FROM records WHERE url IN ({','.join('?' * len(chunk))})", chunk
+                )
+                existing.update(row['url'] for row in cursor.fetchall())
+            
+            seen = set()
+            for url in urls:
+                if url in existing or url in seen:
                     stats['updated'] += 1
+                else:
+                    stats['new'] += 1
+                seen.add(url)
+            
+            cursor.executemany(UPSERT_RECORD_SQL, [
+                (
+                    record.url,
+                    record.source_domain,
+                    record.source_name,
+                    record.fetched_at,
+                    record.title,
+                    record.summary,
+                    record.publish_date,
+                    record.region,
+                    record.content_type,
+                    record.language,
+                    getattr(record, 'full_text', None)
+                )
+                for record in records
+            ])
+            
+            ids = {}
+            for chunk in _chunks(list(seen)):
+                cursor.execute(
+                    f"SELECT id, url FROM records WHERE url IN ({','.join('?' * len(chunk))})", chunk
+                )
+                ids.update((row['url'], row['id']) for row in cursor.fetchall())
+            
+            # Pro URL zählt der letzte Record im Batch (wie bei sequentiellem insert_record)
+            latest = {record.url: record for record in records}
+            record_ids = list(ids.values())
+            
+            # Kindtabellen: alte Einträge gesammelt löschen, neue per executemany
+            for table in ('record_topics', 'record_links', 'record_images'):
+                for chunk in _chunks(record_ids):
+                    cursor.execute(
+                        f"DELETE FROM {table} WHERE record_id IN ({','.join('?' * len(chunk))})", chunk
+                    )
+            
+            topics, links, images = [], [], []
+            nasa, un_press, wfp, worldbank = [], [], [], []
+            for url, record in latest.items():
+                record_id = ids[url]
+                unique_topics = list(set(record.topics)) if record.topics else []  # Entferne Duplikate
+                topics.extend((record_id, topic) for topic in unique_topics if topic)
+                links.extend((record_id, link) for link in record.links)
+                images.extend((record_id, image_url) for image_url in record.image_urls)
+                
+                if isinstance(record, NASARecord):
+                    nasa.append((
+                        record_id,
+                        json.dumps(record.environmental_indicators),
+                        record.satellite_source
+                    ))
+                elif isinstance(record, UNPressRecord):
+                    un_press.append((
+                        record_id,
+                        1 if record.meeting_coverage else 0,
+                        1 if record.security_council else 0,
+                        json.dumps(record.speakers)
+                    ))
+                elif isinstance(record, WFPRecord):
+                    wfp.append((record_id, record.crisis_type, record.affected_population))
+                elif isinstance(record, WorldBankRecord):
+                    worldbank.append((record_id, record.country, record.sector, record.project_id))
+            
+            cursor.executemany(
+                "INSERT OR IGNORE INTO record_topics (record_id, topic) VALUES (?, ?)", topics
+            )
+            cursor.executemany(
+                "INSERT INTO record_links (record_id, link_url) VALUES (?, ?)", links
+            )
+            cursor.executemany(
+                "INSERT INTO record_images (record_id, image_url) VALUES (?, ?)", images
+            )
+            
+            # Quellspezifische Tabellen haben record_id als PK -> REPLACE = delete + insert
+            cursor.executemany("""
+                INSERT OR REPLACE INTO nasa_records (record_id, environmental_indicators, satellite_source)
+                VALUES (?, ?, ?)
+            """, nasa)
+            cursor.executemany("""
+                INSERT OR REPLACE INTO un_press_records (record_id, meeting_coverage, security_council, speakers)
+                VALUES (?, ?, ?, ?)
+            """, un_press)
+            cursor.executemany("""
+                INSERT OR REPLACE INTO wfp_records (record_id, crisis_type, affected_population)
+                VALUES (?, ?, ?)
+            """, wfp)
+            cursor.executemany("""
+                INSERT OR REPLACE INTO worldbank_records (record_id, country, sector, project_id)
+                VALUES (?, ?, ?, ?)
+            """, worldbank)
         
         return stats
     
@@ -454,58 +602,108 @@ class DatabaseManager:
             cursor.execute(query, params)
             rows = cursor.fetchall()
             
-            # Convert to dicts and enrich with related data
-            records = []
-            for row in rows:
-                record = dict(row)
-                
-                # Get topics
-                cursor.execute("SELECT topic FROM record_topics WHERE record_id = ?", (row['id'],))
-                record['topics'] = [r['topic'] for r in cursor.fetchall()]
-                
-                # Get links
-                cursor.execute("SELECT link_url FROM record_links WHERE record_id = ?", (row['id'],))
-                record['links'] = [r['link_url'] for r in cursor.fetchall()]
-                
-                # Get images
-                cursor.execute("SELECT image_url FROM record_images WHERE record_id = ?", (row['id'],))
-                record['image_urls'] = [r['image_url'] for r in cursor.fetchall()]
-                
-                # Get source-specific data
-                if row['source_name'] == 'NASA':
-                    cursor.execute("SELECT * FROM nasa_records WHERE record_id = ?", (row['id'],))
-                    nasa_data = cursor.fetchone()
-                    if nasa_data:
-                        record['nasa_data'] = dict(nasa_data)
-                        if record['nasa_data'].get('environmental_indicators'):
-                            record['nasa_data']['environmental_indicators'] = json.loads(
-                                record['nasa_data']['environmental_indicators']
-                            )
-                
-                elif row['source_name'] == 'UN Press':
-                    cursor.execute("SELECT * FROM un_press_records WHERE record_id = ?", (row['id'],))
-                    un_data = cursor.fetchone()
-                    if un_data:
-                        record['un_data'] = dict(un_data)
-                        if record['un_data'].get('speakers'):
-                            record['un_data']['speakers'] = json.loads(record['un_data']['speakers'])
-                
-                elif row['source_name'] == 'WFP':
-                    cursor.execute("SELECT * FROM wfp_records WHERE record_id = ?", (row['id'],))
-                    wfp_data = cursor.fetchone()
-                    if wfp_data:
-                        record['wfp_data'] = dict(wfp_data)
-                
-                elif row['source_name'] == 'World Bank':
-                    cursor.execute("SELECT * FROM worldbank_records WHERE record_id = ?", (row['id'],))
-                    wb_data = cursor.fetchone()
-                    if wb_data:
-                        record['worldbank_data'] = dict(wb_data)
-                
-                records.append(record)
-            
+            records = [dict(row) for row in rows]
+            self._attach_related(cursor, records)
             return records
     
+    def get_records_page(
+        self,
+        source_name: Optional[str] = None,
+        limit: int = 100,
+        after: Optional[Tuple[str, int]] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, int]]]:
+        """Hole eine Seite Records (fetched_at DESC, id DESC) per Keyset-Pagination.
+        
+        after ist der Cursor der vorherigen Seite. Returns (records, next_cursor);
+        next_cursor ist None auf der letzten Seite.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            
+            query = "SELECT * FROM records WHERE 1=1"
+            params: List[Any] = []
+            
+            if source_name:
+                query += " AND source_name = ?"
+                params.append(source_name)
+            
+            if after is not None:
+                query += " AND (fetched_at, id) < (?, ?)"
+                params.extend(after)
+            
+            query += " ORDER BY fetched_at DESC, id DESC LIMIT ?"
+            params.append(limit + 1)  # eine Zeile mehr: gibt es eine weitere Seite?
+            
+            cursor.execute(query, params)
+            records = [dict(row) for row in cursor.fetchall()]
+            has_more = len(records) > limit
+            records = records[:limit]
+            self._attach_related(cursor, records)
+        
+        next_cursor = None
+        if has_more:
+            next_cursor = (records[-1]['fetched_at'], records[-1]['id'])
+        return records, next_cursor
+    
+    def iter_records(
+        self,
+        source_name: Optional[str] = None,
+        page_size: int = ITER_PAGE_SIZE
+    ) -> Iterator[Dict[str, Any]]:
+        """Iteriere über alle Records seitenweise (konstanter Speicher, z.B. für Exporte)"""
+        after = None
+        while True:
+            records, after = self.get_records_page(source_name, limit=page_size, after=after)
+            yield from records
+            if after is None:
+                return
+    
+    def _attach_related(self, cursor: sqlite3.Cursor, records: List[Dict[str, Any]]):
+        """Ergänze Topics, Links, Bilder und quellspezifische Daten für eine ganze Seite
+        (eine Abfrage pro Tabelle statt pro Record)"""
+        if not records:
+            return
+        
+        ids = [record['id'] for record in records]
+        for key, table, column in (
+            ('topics', 'record_topics', 'topic'),
+            ('links', 'record_links', 'link_url'),
+            ('image_urls', 'record_images', 'image_url'),
+        ):
+            grouped: Dict[int, List[str]] = {record_id: [] for record_id in ids}
+            for chunk in _chunks(ids):
+                cursor.execute(
+                    f"SELECT record_id, {column} FROM {table} "
+                    f"WHERE record_id IN ({','.join('?' * len(chunk))}) ORDER BY id",
+                    chunk
+                )
+                for row in cursor.fetchall():
+                    grouped[row['record_id']].append(row[column])
+            for record in records:
+                record[key] = grouped[record['id']]
+        
+        for source_name, (table, key, json_columns) in SOURCE_TABLES.items():
+            source_ids = [record['id'] for record in records if record['source_name'] == source_name]
+            if not source_ids:
+                continue
+            
+            source_data: Dict[int, Dict[str, Any]] = {}
+            for chunk in _chunks(source_ids):
+                cursor.execute(
+                    f"SELECT * FROM {table} WHERE record_id IN ({','.join('?' * len(chunk))})",
+                    chunk
+                )
+                for row in cursor.fetchall():
+                    data = dict(row)
+                    for column in json_columns:
+                        if data.get(column):
+                            data[column] = json.loads(data[column])
+                    source_data[data['record_id']] = data
+            
+            for record in records:
+                if record['id'] in source_data:
+                    record[key] = source_data[record['id']]
+    
     def create_crawl_job(self, source_name: str, urls_count: int) -> int:
         """Erstelle einen neuen Crawl-Job"""
         with self.get_connection() as conn:
@@ -1,6 +1,8 @@
 # geocoding.py - Geocoding-Service für geospatial Daten
 import asyncio
 import aiohttp
+import sqlite3
+import threading
 import time
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
@@ -10,6 +12,41 @@ from dataclasses import dataclass
 
 logger = structlog.get_logger(__name__)
 
+# Negative Ergebnisse ("nicht gefunden") werden kürzer gecacht
+NEGATIVE_TTL_S = 24 * 3600
+
+
+class TokenBucket:
+    """Async Token-Bucket (rate Tokens/s, Burst = capacity)"""
+
+    def __init__(self, rate: float = 1.0, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last = time.monotonic()
+        self._guard = threading.Lock()
+
+    def _take(self) -> float:
+        with self._guard:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    async def acquire(self):
+        while True:
+            wait = self._take()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+
+# Nominatim Limit: 1 Request pro Sekunde - gilt für alle GeocodingService-Instanzen
+nominatim_bucket = TokenBucket(rate=1.0, capacity=1.0)
+
 
 @dataclass
 class GeoLocation:
@@ -28,12 +65,13 @@ class GeoLocation:
 class GeocodingService:
     """Geocoding-Service mit Nominatim (OpenStreetMap) - kostenlos"""
     
-    def __init__(self, cache_file: str = "./data/geocoding_cache.json"):
+    def __init__(self, cache_file: str = "./data/geocoding_cache.sqlite"):
         self.base_url = "https://nominatim.openstreetmap.org/search"
         self.cache_file = Path(cache_file)
-        self.cache = self._load_cache()
-        self.rate_limit_delay = 1.0  # 1 Request pro Sekunde (Nominatim Limit)
-        self.last_request_time = 0.0
+        self._local = threading.local()
+        self._init_cache()
+        self.bucket = nominatim_bucket
+        self._inflight: Dict[str, asyncio.Task] = {}
         
         # Region-Mapping für Standardisierung
         self.region_mapping = {
@@ -60,40 +98,89 @@ class GeocodingService:
             "Antarctic": []
         }
     
-    def _load_cache(self) -> Dict:
-        """Lade Geocoding-Cache"""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r') as f:
-                    return json.load(f)
-            except:
-                return {}
-        return {}
-    
-    def _save_cache(self):
-        """Speichere Geocoding-Cache"""
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.cache_file, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def _init_cache(self):
+        """Lege Geocoding-Cache an (SQLite; alter JSON-Cache wird einmalig übernommen)"""
         self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.cache_file, 'w') as f:
-            json.dump(self.cache, f, indent=2)
-    
-    async def _rate_limit(self):
-        """Rate Limiting für Nominatim API"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.rate_limit_delay:
-            await asyncio.sleep(self.rate_limit_delay - time_since_last)
-        self.last_request_time = time.time()
-    
+        conn = self._conn()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS geocoding_cache (
+                cache_key TEXT PRIMARY KEY,
+                data TEXT,
+                cached_at REAL NOT NULL
+            )
+        """)
+        conn.commit()
+
+        json_cache = self.cache_file.with_suffix(".json")
+        if json_cache.exists():
+            try:
+                with open(json_cache, 'r') as f:
+                    alt = json.load(f)
+                now = time.time()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO geocoding_cache (cache_key, data, cached_at) VALUES (?, ?, ?)",
+                        [(k, json.dumps(v), now) for k, v in alt.items()]
+                    )
+                json_cache.rename(json_cache.with_suffix(".json.migrated"))
+            except Exception as e:
+                logger.warning(f"Geocoding-Cache Migration fehlgeschlagen: {e}")
+
+    def _cache_get(self, cache_key: str) -> Tuple[bool, Optional[GeoLocation]]:
+        """(Treffer, GeoLocation); GeoLocation None = gecachtes negatives Ergebnis"""
+        row = self._conn().execute(
+            "SELECT data, cached_at FROM geocoding_cache WHERE cache_key = ?", (cache_key,)
+        ).fetchone()
+        if row is None:
+            return False, None
+        data, cached_at = row
+        if data is None:
+            if time.time() - cached_at > NEGATIVE_TTL_S:
+                return False, None
+            return True, None
+        return True, GeoLocation(**json.loads(data))
+
+    def _cache_put(self, cache_key: str, data: Optional[Dict]):
+        """Speichere einen Eintrag (eine Zeile statt Neuschreiben der ganzen Datei)"""
+        conn = self._conn()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO geocoding_cache (cache_key, data, cached_at) VALUES (?, ?, ?)",
+                (cache_key, json.dumps(data) if data is not None else None, time.time())
+            )
+
     async def geocode(self, location_text: str, location_type: str = "region") -> Optional[GeoLocation]:
         """Geocode einen Ort"""
         # Prüfe Cache
         cache_key = f"{location_text}_{location_type}"
-        if cache_key in self.cache:
-            cached_data = self.cache[cache_key]
-            return GeoLocation(**cached_data)
-        
+        hit, cached = self._cache_get(cache_key)
+        if hit:
+            return cached
+
+        # Gleichzeitige identische Anfragen teilen sich einen Request
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(cache_key)
+        if task is None or task.get_loop() is not loop:
+            task = loop.create_task(self._nominatim(location_text, location_type, cache_key))
+            self._inflight[cache_key] = task
+            task.add_done_callback(
+                lambda t: self._inflight.pop(cache_key) if self._inflight.get(cache_key) is t else None
+            )
+        geo_location = await asyncio.shield(task)
+        # Jeder Aufrufer bekommt eine eigene Kopie (Aufrufer ändern name/location_type)
+        return GeoLocation(**geo_location.__dict__) if geo_location else None
+
+    async def _nominatim(self, location_text: str, location_type: str, cache_key: str) -> Optional[GeoLocation]:
         # Rate Limiting
-        await self._rate_limit()
+        await self.bucket.acquire()
         
         try:
             async with aiohttp.ClientSession() as session:
@@ -134,17 +221,19 @@ class GeocodingService:
                             )
                             
                             # Cache speichern
-                            self.cache[cache_key] = {
+                            self._cache_put(cache_key, {
                                 "name": geo_location.name,
                                 "location_type": geo_location.location_type,
                                 "country_code": geo_location.country_code,
                                 "latitude": geo_location.latitude,
                                 "longitude": geo_location.longitude,
                                 "confidence": geo_location.confidence
-                            }
-                            self._save_cache()
+                            })
                             
                             return geo_location
+                        
+                        # Nicht gefunden -> negativ cachen
+                        self._cache_put(cache_key, None)
         except Exception as e:
             logger.error(f"Geocoding error for {location_text}: {e}")
             return None
@@ -220,10 +309,9 @@ class GeocodingService:
             country_name = country_code
         
         # Prüfe Cache
-        cache_key = f"{country_name}_country"
-        if cache_key in self.cache:
-            cached_data = self.cache[cache_key]
-            return GeoLocation(**cached_data)
+        hit, cached = self._cache_get(f"{country_name}_country")
+        if hit:
+            return cached
         
         # Synchroner Geocode - nutze Thread für async execution
         import concurrent.futures
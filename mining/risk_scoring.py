@@ -1,9 +1,10 @@
 # risk_scoring.py - Risiko-Scoring für Klimagefährdung
 from typing import Dict, List, Optional
 from datetime import datetime
-import re
 from dataclasses import dataclass
 
+from keyword_matcher import KeywordAutomaton, Treffer
+
 @dataclass
 class RiskScore:
     """Risiko-Score für einen Record"""
@@ -67,6 +68,11 @@ class RiskScorer:
             'escalating': 0.8,
             'crisis': 0.85
         }
+        
+        # Alle Indikatoren in einem Automaten (ein Durchlauf pro Record)
+        self._automaton = KeywordAutomaton(
+            list(self.climate_indicators) + list(self.conflict_indicators) + list(self.urgency_indicators)
+        )
     
     def calculate_risk(self, record: Dict) -> RiskScore:
         """Berechne Risiko-Score für einen Record"""
@@ -77,24 +83,20 @@ class RiskScorer:
             record.get('full_text', '')
         ]
         combined_text = ' '.join(filter(None, text_fields)).lower()
+        treffer = self._automaton.scan(combined_text)
         
         # Berechne Climate Risk
-        climate_risk = self._calculate_indicator_score(combined_text, self.climate_indicators)
+        climate_risk = self._calculate_indicator_score(combined_text, self.climate_indicators, treffer)
         
         # Berechne Conflict Risk
-        conflict_risk = self._calculate_indicator_score(combined_text, self.conflict_indicators)
+        conflict_risk = self._calculate_indicator_score(combined_text, self.conflict_indicators, treffer)
         
         # Berechne Urgency
-        urgency = self._calculate_indicator_score(combined_text, self.urgency_indicators)
+        urgency = self._calculate_indicator_score(combined_text, self.urgency_indicators, treffer)
         
-        # Sammle gefundene Indikatoren
-        indicators = []
-        for indicator in self.climate_indicators.keys():
-            if indicator in combined_text:
-                indicators.append(indicator)
-        for indicator in self.conflict_indicators.keys():
-            if indicator in combined_text and indicator not in indicators:
-                indicators.append(indicator)
+        # Sammle gefundene Indikatoren (auch als Wortteil, z.B. 'flood' in 'flooding')
+        indicators = [i for i in self.climate_indicators if i in treffer]
+        indicators += [i for i in self.conflict_indicators if i in treffer and i not in indicators]
         
         # Gesamt-Score (gewichteter Durchschnitt)
         # Climate Risk: 40%, Conflict Risk: 40%, Urgency: 20%
@@ -113,16 +115,22 @@ class RiskScorer:
             score=total_score
         )
     
-    def _calculate_indicator_score(self, text: str, indicators: Dict[str, float]) -> float:
-        """Berechne Score basierend auf Indikatoren"""
+    def _calculate_indicator_score(
+        self,
+        text: str,
+        indicators: Dict[str, float],
+        treffer: Optional[Dict[str, Treffer]] = None,
+    ) -> float:
+        """Berechne Score basierend auf Indikatoren (treffer: KeywordAutomaton.scan des Texts)"""
         if not text:
             return 0.0
+        if treffer is None:
+            treffer = KeywordAutomaton(indicators).scan(text)
         
         scores = []
         for indicator, weight in indicators.items():
-            # Suche nach Indicator im Text
-            pattern = r'\b' + re.escape(indicator) + r'\b'
-            matches = len(re.findall(pattern, text, re.IGNORECASE))
+            # Vorkommen als ganzes Wort
+            matches = treffer[indicator].ganze_woerter if indicator in treffer else 0
             if matches > 0:
                 # Score basierend auf Häufigkeit (capped)
                 indicator_score = min(matches * weight / 3.0, weight)
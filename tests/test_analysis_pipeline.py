@@ -0,0 +1,152 @@
+"""
+Tests for app/backend/services/analysis_pipeline.py - DAG-Ausführung für
+/analyze (Abhängigkeiten, Deadlines, Fallbacks, Abbruch)
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.analysis_pipeline import (
+    STATUS_ERROR,
+    STATUS_OK,
+    STATUS_TIMEOUT,
+    Stage,
+    iter_stages,
+    run_stages,
+)
+
+
+def stufe(name, wert=None, delay=0.0, deps=(), deadline_s=1.0, fehler=None, fallback=lambda _: "fallback", log=None):
+    async def run(eingaben):
+        if log is not None:
+            log.append(("start", name, time.perf_counter(), dict(eingaben)))
+        await asyncio.sleep(delay)
+        if fehler is not None:
+            raise fehler
+        if log is not None:
+            log.append(("ende", name, time.perf_counter(), None))
+        return wert if not callable(wert) else wert(eingaben)
+
+    return Stage(name, run, deadline_s, fallback, deps=tuple(deps))
+
+
+class TestDag:
+    def test_dependencies_run_first_and_pass_values(self):
+        log = []
+        stages = [
+            stufe("a", 1, delay=0.05, log=log),
+            stufe("b", 2, delay=0.02, log=log),
+            stufe("c", lambda e: e["a"] + e["b"], deps=("a", "b"), log=log),
+        ]
+        ergebnisse = asyncio.run(run_stages(stages))
+
+        assert {n: r.value for n, r in ergebnisse.items()} == {"a": 1, "b": 2, "c": 3}
+        zeit = {(art, name): t for art, name, t, _ in log}
+        assert zeit[("start", "c")] >= max(zeit[("ende", "a")], zeit[("ende", "b")])
+        assert [e for art, name, _, e in log if (art, name) == ("start", "c")] == [{"a": 1, "b": 2}]
+
+    def test_independent_stages_run_concurrently(self):
+        stages = [stufe(n, n, delay=0.1) for n in "abcd"]
+        start = time.perf_counter()
+        asyncio.run(run_stages(stages))
+        assert time.perf_counter() - start < 0.3
+
+    def test_results_in_completion_order(self):
+        async def run():
+            stages = [stufe("langsam", 1, delay=0.1), stufe("schnell", 2, delay=0.01)]
+            return [r.name async for r in iter_stages(stages)]
+
+        assert asyncio.run(run()) == ["schnell", "langsam"]
+
+    @pytest.mark.parametrize("stages", [
+        [stufe("a"), stufe("a")],
+        [stufe("b", deps=("a",)), stufe("a")],
+        [stufe("a", deps=("x",))],
+    ])
+    def test_invalid_dag(self, stages):
+        with pytest.raises(ValueError):
+            asyncio.run(run_stages(stages))
+
+
+class TestFallbacks:
+    def test_deadline_uses_fallback(self):
+        stages = [
+            stufe("llm", "zu spät", delay=1.0, deadline_s=0.05, fallback=lambda _: {"statisch": True}),
+            stufe("danach", lambda e: e["llm"], deps=("llm",)),
+        ]
+        start = time.perf_counter()
+        ergebnisse = asyncio.run(run_stages(stages))
+
+        assert time.perf_counter() - start < 0.5
+        llm = ergebnisse["llm"]
+        assert (llm.status, llm.fallback, llm.value) == (STATUS_TIMEOUT, True, {"statisch": True})
+        assert llm.report()["error"].startswith("Deadline")
+        assert ergebnisse["danach"].value == {"statisch": True}
+        assert ergebnisse["danach"].status == STATUS_OK
+
+    def test_failing_stage_does_not_block_siblings(self):
+        stages = [
+            stufe("kaputt", fehler=RuntimeError("upstream 500"), fallback=lambda _: 0),
+            stufe("geschwister", "ok", delay=0.05),
+            stufe("abhaengig", lambda e: e["kaputt"] + 1, deps=("kaputt",)),
+        ]
+        ergebnisse = asyncio.run(run_stages(stages))
+
+        assert (ergebnisse["kaputt"].status, ergebnisse["kaputt"].value) == (STATUS_ERROR, 0)
+        assert ergebnisse["kaputt"].error == "upstream 500"
+        assert (ergebnisse["geschwister"].status, ergebnisse["geschwister"].value) == (STATUS_OK, "ok")
+        assert ergebnisse["abhaengig"].value == 1
+
+    def test_failing_fallback_resolves_stage_with_none(self):
+        def kaputter_fallback(_):
+            raise KeyError("risk_type")
+
+        stages = [
+            stufe("a", fehler=ValueError("boom"), fallback=kaputter_fallback),
+            stufe("geschwister", "ok", delay=0.05),
+            stufe("abhaengig", lambda e: e["a"] is None, deps=("a",)),
+        ]
+        ergebnisse = asyncio.run(run_stages(stages))
+
+        a = ergebnisse["a"]
+        assert (a.status, a.value, a.fallback) == (STATUS_ERROR, None, True)
+        assert "boom" in a.error and "risk_type" in a.error
+        assert ergebnisse["geschwister"].value == "ok"
+        assert ergebnisse["abhaengig"].value is True
+
+
+class TestCancellation:
+    def test_consumer_stop_cancels_running_stages(self):
+        abgebrochen = []
+
+        async def langsam(_):
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                abgebrochen.append("langsam")
+                raise
+
+        async def run():
+            stages = [
+                stufe("schnell", 1),
+                Stage("langsam", langsam, 10.0, lambda _: None),
+                stufe("abhaengig", 2, deps=("langsam",)),
+            ]
+            gen = iter_stages(stages)
+            erstes = await gen.__anext__()
+            await gen.aclose()
+            return erstes, [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+
+        start = time.perf_counter()
+        erstes, offen = asyncio.run(run())
+        assert erstes.name == "schnell"
+        assert abgebrochen == ["langsam"]
+        assert offen == []
+        assert time.perf_counter() - start < 1.0
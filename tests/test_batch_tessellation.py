@@ -0,0 +1,66 @@
+"""
+Tests for app/backend/services/batch_tessellation.py - Batch-Analyse liefert
+dieselben Features wie die Einzelzell-Analyse (_analysiere_zelle)
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.real_data_tessellation import EchteDatenTessellation
+from services.risk_tile_cache import RiskTileCache
+
+STAEDTE = [
+    ('Miami', 25.77, -80.19, 'coastal'),
+    ('Kairo', 30.04, 31.24, 'arid'),
+    ('Berlin', 52.52, 13.40, 'temperate'),
+    ('Jakarta', -6.20, 106.80, 'tropical'),
+    ('Khartum', 15.50, 32.56, 'conflict'),
+]
+LLM_FORECAST = {
+    'temperature_change': {'expected': 1.6},
+    'sea_level_rise': {'expected': 4.2},
+    'trend_2024_2026': 'steigend',
+}
+
+
+@pytest.fixture(scope="module")
+def tessellation():
+    return EchteDatenTessellation(
+        tile_cache=RiskTileCache(db_path=tempfile.mktemp(suffix='.sqlite')),
+        use_processes=False,
+    )
+
+
+def einzelzellen(t: EchteDatenTessellation, hexagons, lat, lon, typ, llm_forecast):
+    t._llm_forecast = llm_forecast
+
+    async def run():
+        features = []
+        for h in hexagons:
+            zelle = await t._analysiere_zelle(h, lat, lon, typ)
+            if zelle is not None:
+                features.append(t._zelle_zu_feature(zelle))
+        return features
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("llm_forecast", [{}, LLM_FORECAST], ids=["ohne_llm", "mit_llm"])
+@pytest.mark.parametrize("name,lat,lon,typ", STAEDTE, ids=[s[0] for s in STAEDTE])
+def test_batch_matches_single_cell(tessellation, name, lat, lon, typ, llm_forecast):
+    t = tessellation
+    hexagons = t._fulle_bbox(lat - 0.06, lon - 0.06, lat + 0.06, lon + 0.06, 8)
+    assert len(hexagons) > 50
+
+    referenz = einzelzellen(t, hexagons, lat, lon, typ, llm_forecast)
+    batch = t.batch.analysiere(hexagons, lat, lon, typ, llm_forecast)
+    features = [t._zelle_zu_feature(z) for z in t._batch_zu_zellen(batch)]
+
+    assert features == referenz
@@ -0,0 +1,127 @@
+"""
+Tests for app/backend/db/bulk_ingest.py - Summieren der Zell-Beiträge,
+Staging-Zeilen und WKT, sowie die Ring-Faktoren des EONET-Scrapers
+(ohne Datenbank)
+"""
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import h3
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from agents.scraper.nasa_eonet import EVENT_CATEGORIES, RING_FACTORS, NASAEvent, add_event_deltas
+from db.bulk_ingest import CELL_COLUMNS, CellDeltas, _event_records, polygon_wkt
+
+BERLIN = h3.latlng_to_cell(52.52, 13.405, 7)
+MIAMI = h3.latlng_to_cell(25.76, -80.19, 7)
+
+
+def _event(event_id: str = "EONET_1", category: str = "floods", title: str = "Flood") -> NASAEvent:
+    return NASAEvent(
+        id=event_id, title=title, category=category, lat=52.52, lon=13.405,
+        date=datetime(2026, 7, 1), source_url="https://eonet.gsfc.nasa.gov/", magnitude=None,
+    )
+
+
+class TestCellDeltas:
+    def test_duplicates_are_summed(self):
+        deltas = CellDeltas()
+        deltas.add(BERLIN, climate=10.0, conflict=2.0)
+        deltas.add(BERLIN, climate=5.0, risk=3.0)
+        assert len(deltas) == 1
+        assert BERLIN in deltas
+        assert deltas[BERLIN].climate == pytest.approx(15.0)
+        assert deltas[BERLIN].conflict == pytest.approx(2.0)
+        assert deltas[BERLIN].risk == pytest.approx(3.0)
+
+    def test_metadata_keeps_last_value(self):
+        deltas = CellDeltas()
+        deltas.add(BERLIN, country_code="DEU", geom_wkt="POLYGON((0 0, 1 0, 0 0))")
+        deltas.add(BERLIN, climate=1.0)
+        assert deltas[BERLIN].country_code == "DEU"
+        assert deltas[BERLIN].geom_wkt == "POLYGON((0 0, 1 0, 0 0))"
+        deltas.add(BERLIN, country_code="DE")
+        assert deltas[BERLIN].country_code == "DE"
+
+    def test_records_sorted_by_h3_index(self):
+        deltas = CellDeltas()
+        cells = h3.grid_disk(BERLIN, 1) + [MIAMI]
+        for cell in reversed(sorted(cells)):
+            deltas.add(cell, risk=1.0)
+        records = deltas.records()
+        assert [r[0] for r in records] == sorted(cells)
+
+    def test_record_columns(self):
+        deltas = CellDeltas()
+        deltas.add(BERLIN, climate=1.0, conflict=2.0, risk=3.0, country_code="DEU")
+        (record,) = deltas.records()
+        assert len(record) == len(CELL_COLUMNS)
+        row = dict(zip(CELL_COLUMNS, record))
+        lat, lon = h3.cell_to_latlng(BERLIN)
+        assert row['h3_index'] == BERLIN
+        assert row['resolution'] == 7
+        assert row['center_lat'] == pytest.approx(lat)
+        assert row['center_lon'] == pytest.approx(lon)
+        assert (row['climate_delta'], row['conflict_delta'], row['risk_delta']) == (1.0, 2.0, 3.0)
+        assert row['country_code'] == "DEU"
+        assert row['geom_wkt'] is None
+
+    def test_empty(self):
+        assert CellDeltas().records() == []
+
+
+class TestPolygonWkt:
+    def test_lon_lat_order_and_closed_ring(self):
+        wkt = polygon_wkt([(10.0, 20.0), (11.0, 21.0), (12.0, 20.5)])
+        assert wkt == "POLYGON((20.0 10.0, 21.0 11.0, 20.5 12.0, 20.0 10.0))"
+
+    def test_h3_boundary(self):
+        boundary = h3.cell_to_boundary(BERLIN)
+        wkt = polygon_wkt(boundary)
+        punkte = wkt[len("POLYGON(("):-len("))")].split(", ")
+        assert len(punkte) == len(boundary) + 1
+        assert punkte[0] == punkte[-1]
+
+
+class TestEventRecords:
+    def test_last_event_per_id_wins(self):
+        records = _event_records([_event(title="alt"), _event("EONET_2"), _event(title="neu")])
+        assert len(records) == 2
+        assert {r[0]: r[1] for r in records}["EONET_1"] == "neu"
+
+
+class TestAddEventDeltas:
+    def test_ring_factors_by_grid_distance(self):
+        deltas = CellDeltas()
+        event = _event(category="floods")
+        add_event_deltas(deltas, event)
+        center = h3.latlng_to_cell(event.lat, event.lon, 7)
+        faktoren = EVENT_CATEGORIES["floods"]
+
+        assert len(deltas) == len(h3.grid_disk(center, len(RING_FACTORS) - 1))
+        for cell in h3.grid_disk(center, len(RING_FACTORS) - 1):
+            factor = RING_FACTORS[h3.grid_distance(center, cell)]
+            assert deltas[cell].climate == pytest.approx(faktoren["climate_risk"] * factor * 20)
+            assert deltas[cell].conflict == pytest.approx(faktoren["conflict_risk"] * factor * 20)
+            assert deltas[cell].risk == 0.0
+
+    def test_unknown_category_uses_default(self):
+        deltas = CellDeltas()
+        event = _event(category="unbekannt")
+        add_event_deltas(deltas, event)
+        center = h3.latlng_to_cell(event.lat, event.lon, 7)
+        assert deltas[center].climate == pytest.approx(0.5 * 20)
+        assert deltas[center].conflict == pytest.approx(0.2 * 20)
+
+    def test_overlapping_events_accumulate(self):
+        deltas = CellDeltas()
+        add_event_deltas(deltas, _event("EONET_1", "wildfires"))
+        add_event_deltas(deltas, _event("EONET_2", "wildfires"))
+        center = h3.latlng_to_cell(52.52, 13.405, 7)
+        assert len(deltas) == 19
+        assert deltas[center].climate == pytest.approx(2 * EVENT_CATEGORIES["wildfires"]["climate_risk"] * 20)
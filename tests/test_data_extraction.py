@@ -177,3 +177,32 @@ class TestNumberExtractor:
         temps = extractor._extract_temperatures(text)
         # Should only have one instance of 25.0
         assert temps.count(25.0) <= 1 or len(set(temps)) == len(temps)
+    
+    def test_multiplier_applies_to_its_own_number(self):
+        """Multiplikator gilt nur für die Zahl, hinter der er steht"""
+        extractor = NumberExtractor()
+        text = "The region has a population of 1,500,000 residents. About 3.5 billion people live in vulnerable areas."
+        population = extractor._extract_population(text)
+        assert 1500000 in population
+        assert 3500000000 in population
+        amounts = extractor._extract_financial("$250 thousand for 12 wells and 1.5 billion dollars")
+        assert 250000 in amounts and 1500000000 in amounts and 12 in amounts
+    
+    def test_matches_findall_per_pattern(self):
+        """Ein Durchlauf liefert dieselben Treffer wie re.findall pro Muster"""
+        import random
+        import re
+        extractor = NumberExtractor()
+        stuecke = ["1234567", "1,234", "12,3456", "3.5", "-5", "2025-01-17", "01/15/2025", "$", "77", "people",
+                   "population:", "Temperature", "rainfall:", "%", "per cent", "°C", "F", "mm", "inches", "USD",
+                   "January", "May", "15,", " ", ".", ",", "-", "/", "x", "in", "of Kenya"]
+        rnd = random.Random(0)
+        for _ in range(300):
+            text = " ".join(rnd.choice(stuecke) for _ in range(rnd.randint(1, 20)))
+            for feld, patterns in [('percentages', extractor.percentage_patterns), ('dates', extractor.date_patterns)]:
+                erwartet = set()
+                for pattern in patterns:
+                    erwartet.update(re.findall(pattern, text, re.IGNORECASE))
+                if feld == 'percentages':
+                    erwartet = {round(float(v), 2) for v in erwartet if 0 <= float(v) <= 100}
+                assert set(getattr(extractor.extract_all(text), feld)) == erwartet
@@ -0,0 +1,199 @@
+"""
+Tests for mining/database.py - DatabaseManager insert paths
+"""
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add mining directory to path
+mining_path = Path(__file__).parent.parent / "mining"
+sys.path.insert(0, str(mining_path))
+
+from database import DatabaseManager
+from schemas import NASARecord, PageRecord, UNPressRecord, WFPRecord, WorldBankRecord
+
+
+CHILD_TABLES = {
+    'record_topics': 'topic',
+    'record_links': 'link_url',
+    'record_images': 'image_url',
+}
+SOURCE_TABLES = ['nasa_records', 'un_press_records', 'wfp_records', 'worldbank_records']
+
+
+def make_records(offset=0, title='Title'):
+    base = datetime(2025, 1, 1)
+    return [
+        PageRecord(
+            url="https://example.org/page/1", source_domain="example.org", source_name="UN",
+            fetched_at=base, title=f"{title} page", topics=["drought", "drought", ""],
+            links=["https://example.org/a", "https://example.org/b"],
+        ),
+        NASARecord(
+            url="https://example.org/nasa/1", source_domain="example.org", source_name="NASA",
+            fetched_at=base + timedelta(minutes=1 + offset), title=f"{title} nasa",
+            environmental_indicators=["NDVI"], satellite_source="MODIS",
+            image_urls=["https://example.org/img.jpg"],
+        ),
+        UNPressRecord(
+            url="https://example.org/un/1", source_domain="example.org", source_name="UN Press",
+            fetched_at=base + timedelta(minutes=2), title=f"{title} un",
+            security_council=True, speakers=["Guterres"], topics=["conflict"],
+        ),
+        WFPRecord(
+            url="https://example.org/wfp/1", source_domain="example.org", source_name="WFP",
+            fetched_at=base + timedelta(minutes=3), crisis_type="drought",
+            affected_population="2 million",
+        ),
+        WorldBankRecord(
+            url="https://example.org/wb/1", source_domain="example.org", source_name="World Bank",
+            fetched_at=base + timedelta(minutes=4), country="Kenya", sector="climate",
+            project_id="P123",
+        ),
+    ]
+
+
+def snapshot(db_path):
+    """DB contents keyed by url (independent of autoincrement ids)"""
+    conn = sqlite3.connect(db_path)
+    urls = dict(conn.execute("SELECT id, url FROM records"))
+    data = {
+        'records': sorted(conn.execute(
+            "SELECT url, source_domain, source_name, fetched_at, title, summary, "
+            "publish_date, region, content_type, language, full_text FROM records"
+        )),
+    }
+    for table, column in CHILD_TABLES.items():
+        data[table] = sorted(
+            (urls[rid], value)
+            for rid, value in conn.execute(f"SELECT record_id, {column} FROM {table}")
+        )
+    for table in SOURCE_TABLES:
+        data[table] = sorted(
+            (urls[row[0]],) + tuple(row[1:])
+            for row in conn.execute(f"SELECT * FROM {table}")
+        )
+    conn.close()
+    return data
+
+
+@pytest.fixture
+def db_pair(tmp_path):
+    return (
+        DatabaseManager(db_path=str(tmp_path / "single.db")),
+        DatabaseManager(db_path=str(tmp_path / "batch.db")),
+    )
+
+
+class TestInsertRecordsBatch:
+    """The batch path must produce the same rows as the insert_record loop"""
+
+    def test_batch_matches_single_inserts(self, db_pair):
+        single, batch = db_pair
+        for record in make_records():
+            single.insert_record(record)
+        stats = batch.insert_records_batch(make_records())
+
+        assert stats == {'new': 5, 'updated': 0, 'total': 5}
+        assert snapshot(single.db_path) == snapshot(batch.db_path)
+
+    def test_batch_updates_existing_records(self, db_pair):
+        single, batch = db_pair
+        for record in make_records() + make_records(offset=10, title='Updated'):
+            single.insert_record(record)
+        batch.insert_records_batch(make_records())
+        stats = batch.insert_records_batch(make_records(offset=10, title='Updated'))
+
+        assert stats == {'new': 0, 'updated': 5, 'total': 5}
+        assert snapshot(single.db_path) == snapshot(batch.db_path)
+        # fetched_at bleibt beim Update unverändert
+        titles = {row[0]: (row[3], row[4]) for row in snapshot(batch.db_path)['records']}
+        assert titles["https://example.org/nasa/1"][1] == "Updated nasa"
+        assert titles["https://example.org/nasa/1"][0].startswith("2025-01-01 00:01")
+
+    def test_duplicate_urls_in_batch(self, db_pair):
+        single, batch = db_pair
+        records = make_records()[:2] + make_records(title='Second')[:2]
+        for record in records:
+            single.insert_record(record)
+        stats = batch.insert_records_batch(records)
+
+        assert stats == {'new': 2, 'updated': 2, 'total': 4}
+        assert snapshot(single.db_path) == snapshot(batch.db_path)
+
+    def test_empty_batch(self, db_pair):
+        _, batch = db_pair
+        assert batch.insert_records_batch([]) == {'new': 0, 'updated': 0, 'total': 0}
+
+    def test_wal_mode_enabled(self, db_pair):
+        _, batch = db_pair
+        conn = sqlite3.connect(batch.db_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        conn.close()
+
+
+class TestGetRecords:
+    """Set-based retrieval, keyset pagination and iterator"""
+
+    @pytest.fixture
+    def db(self, tmp_path):
+        db = DatabaseManager(db_path=str(tmp_path / "records.db"))
+        db.insert_records_batch(make_records())
+        return db
+
+    def test_related_data_attached(self, db):
+        records = {r['url']: r for r in db.get_records()}
+
+        page = records["https://example.org/page/1"]
+        assert page['topics'] == ["drought"]
+        assert page['links'] == ["https://example.org/a", "https://example.org/b"]
+        assert page['image_urls'] == []
+
+        nasa = records["https://example.org/nasa/1"]
+        assert nasa['image_urls'] == ["https://example.org/img.jpg"]
+        assert nasa['nasa_data']['environmental_indicators'] == ["NDVI"]
+        assert nasa['nasa_data']['satellite_source'] == "MODIS"
+
+        un = records["https://example.org/un/1"]
+        assert un['topics'] == ["conflict"]
+        assert un['un_data']['speakers'] == ["Guterres"]
+        assert un['un_data']['security_council'] == 1
+
+        assert records["https://example.org/wfp/1"]['wfp_data']['crisis_type'] == "drought"
+        assert records["https://example.org/wb/1"]['worldbank_data']['project_id'] == "P123"
+
+    def test_get_records_filter_and_limit(self, db):
+        assert [r['url'] for r in db.get_records(source_name="WFP")] == ["https://example.org/wfp/1"]
+        newest = db.get_records(limit=2)
+        assert [r['url'] for r in newest] == ["https://example.org/wb/1", "https://example.org/wfp/1"]
+
+    def test_keyset_pagination(self, db):
+        # Gleiches fetched_at: die id entscheidet die Reihenfolge
+        db.insert_records_batch([
+            PageRecord(
+                url=f"https://example.org/same/{i}", source_domain="example.org",
+                source_name="UN", fetched_at=datetime(2025, 1, 1, 0, 2),
+            )
+            for i in range(3)
+        ])
+
+        urls, after, pages = [], None, 0
+        while True:
+            records, after = db.get_records_page(limit=2, after=after)
+            urls.extend(r['url'] for r in records)
+            pages += 1
+            if after is None:
+                break
+
+        expected = [r['url'] for r in db.get_records(order_by='fetched_at DESC, id DESC')]
+        assert urls == expected
+        assert len(urls) == 8
+        assert pages == 4
+
+    def test_iter_records(self, db):
+        expected = db.get_records(order_by='fetched_at DESC, id DESC')
+        assert list(db.iter_records(page_size=2)) == expected
+        assert [r['url'] for r in db.iter_records(source_name="NASA")] == ["https://example.org/nasa/1"]
@@ -0,0 +1,183 @@
+"""
+Tests for app/backend/services/dem_tile_store.py - Terrarium-Dekodierung,
+Pixelindizes, Übernahme alter PNG-Kacheln und deduplizierte Downloads
+gegen einen Kachel-Stub
+"""
+import asyncio
+import io
+import math
+import sys
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pytest
+from PIL import Image
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services import dem_tile_store
+from services.dem_tile_store import DemTileStore, decode_terrarium_array, tile_pixel_indices
+
+ZOOM = 12
+BERLIN = (52.52, 13.405)
+
+
+def zufalls_rgb(seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).integers(0, 256, (256, 256, 3), dtype=np.uint8)
+
+
+def png_bytes(rgb: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    Image.fromarray(rgb, "RGB").save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def alter_index(lat: float, lon: float, zoom: int):
+    """Vorherige Skalar-Formel aus TopographyService.elevation_m"""
+    n = 2.0 ** zoom
+    x = (lon + 180.0) / 360.0 * n
+    y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+    xt, yt = int(x), int(y)
+    return xt, yt, max(0, min(255, int((x - xt) * 256))), max(0, min(255, int((y - yt) * 256)))
+
+
+def punkte_in_kachel(key, n: int = 200, seed: int = 1):
+    """Zufällige Punkte innerhalb der Kachel (z, x, y)"""
+    z, x, y = key
+    rng = np.random.default_rng(seed)
+    fx, fy = x + rng.uniform(0.001, 0.999, n), y + rng.uniform(0.001, 0.999, n)
+    lons = fx / 2 ** z * 360.0 - 180.0
+    lats = np.degrees(np.arctan(np.sinh(math.pi * (1 - 2 * fy / 2 ** z))))
+    return lats, lons
+
+
+def kachel(lat: float, lon: float, zoom: int = ZOOM):
+    xt, yt, _, _ = tile_pixel_indices([lat], [lon], zoom)
+    return zoom, int(xt[0]), int(yt[0])
+
+
+class KachelStub:
+    """Ersetzt pooled_client: liefert PNG-Bytes pro URL, zählt Anfragen"""
+
+    def __init__(self, kacheln=None, delay: float = 0.02):
+        self.kacheln = kacheln or {}
+        self.delay = delay
+        self.anfragen = []
+
+    def __call__(self, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def get(self, url):
+        self.anfragen.append(url)
+        await asyncio.sleep(self.delay)
+        request = httpx.Request("GET", url)
+        if url not in self.kacheln:
+            return httpx.Response(404, request=request)
+        return httpx.Response(200, content=self.kacheln[url], request=request)
+
+
+def url(key) -> str:
+    z, x, y = key
+    return dem_tile_store.TERRARIUM_URL.format(z=z, x=x, y=y)
+
+
+class TestDecode:
+    @pytest.mark.parametrize("rgb,hoehe", [
+        ((128, 0, 0), 0.0),
+        ((0, 0, 0), -32768.0),
+        ((128, 100, 128), 100.5),
+        ((127, 255, 0), -1.0),
+        ((138, 39, 0), 2599.0),  # 10*256 + 39
+        ((255, 255, 255), 32767.0 + 255 / 256),
+    ])
+    def test_known_pixels(self, rgb, hoehe):
+        out = decode_terrarium_array(np.array([[rgb]], dtype=np.uint8))
+        assert out.dtype == np.float32
+        assert out[0, 0] == pytest.approx(hoehe, abs=1e-3)
+
+    def test_png_matches_getpixel(self):
+        rgb = zufalls_rgb()
+        raster = DemTileStore._dekodiere(png_bytes(rgb))
+        img = Image.open(io.BytesIO(png_bytes(rgb))).convert("RGB")
+        for px, py in [(0, 0), (255, 0), (0, 255), (255, 255), (17, 200), (128, 64)]:
+            r, g, b = img.getpixel((px, py))
+            assert raster[py, px] == pytest.approx((r * 256.0 + g + b / 256.0) - 32768.0, abs=1e-3)
+
+
+class TestPixelIndices:
+    @pytest.mark.parametrize("zoom", [0, 8, 12, 15])
+    def test_matches_scalar_formula(self, zoom):
+        rng = np.random.default_rng(zoom)
+        lats, lons = rng.uniform(-84, 84, 500), rng.uniform(-179.9, 179.9, 500)
+        xt, yt, px, py = tile_pixel_indices(lats, lons, zoom)
+        assert list(zip(xt.tolist(), yt.tolist(), px.tolist(), py.tolist())) == [
+            alter_index(lat, lon, zoom) for lat, lon in zip(lats, lons)
+        ]
+
+    def test_clipped_at_world_edges(self):
+        xt, yt, px, py = tile_pixel_indices([89.9, -89.9, 0.0], [-180.0, 180.0, 180.0], 3)
+        assert xt.tolist() == [0, 7, 7] and yt.tolist() == [0, 7, 4]
+        assert px.max() <= 255 and py.max() <= 255
+
+
+class TestDemTileStore:
+    def test_legacy_png_is_converted_once(self, tmp_path):
+        key = kachel(*BERLIN)
+        rgb = zufalls_rgb()
+        (tmp_path / f"terrarium_z{key[0]}_x{key[1]}_y{key[2]}.png").write_bytes(png_bytes(rgb))
+        lats, lons = punkte_in_kachel(key)
+
+        store = DemTileStore(str(tmp_path))
+        hoehen = asyncio.run(store.elevations_m(lats, lons, ZOOM))
+
+        img = Image.fromarray(rgb, "RGB")
+        erwartet = []
+        for lat, lon in zip(lats, lons):
+            _, _, px, py = alter_index(lat, lon, ZOOM)
+            r, g, b = img.getpixel((px, py))
+            erwartet.append((r * 256.0 + g + b / 256.0) - 32768.0)
+        np.testing.assert_allclose(hoehen, erwartet, atol=1e-3)
+        assert (tmp_path / f"{store._name(key)}.npy").exists()
+        assert store.get_stats()["disk_hits"] == 1
+
+        # Neuer Prozess: .npy memory-mapped, kein PNG-Dekodieren mehr
+        (tmp_path / f"{store._name(key)}.png").unlink()
+        neu = DemTileStore(str(tmp_path))
+        np.testing.assert_array_equal(asyncio.run(neu.elevations_m(lats, lons, ZOOM)), hoehen)
+
+    def test_download_shared_and_missing_tiles_nan(self, tmp_path, monkeypatch):
+        vorhanden = kachel(*BERLIN)
+        fehlt = kachel(48.14, 11.58)
+        stub = KachelStub({url(vorhanden): png_bytes(zufalls_rgb())})
+        monkeypatch.setattr(dem_tile_store, "pooled_client", stub)
+        store = DemTileStore(str(tmp_path))
+
+        lats, lons = punkte_in_kachel(vorhanden, n=20)
+
+        async def run():
+            return await asyncio.gather(*(
+                store.elevations_m(np.r_[lats, 48.14], np.r_[lons, 11.58], ZOOM) for _ in range(5)
+            ))
+
+        ergebnisse = asyncio.run(run())
+        assert sorted(stub.anfragen) == sorted([url(vorhanden), url(fehlt)])
+        for hoehen in ergebnisse:
+            assert np.isfinite(hoehen[:-1]).all() and np.isnan(hoehen[-1])
+            np.testing.assert_array_equal(hoehen, ergebnisse[0])
+
+        # Fehlgeschlagene Kachel wird innerhalb von FEHLER_TTL_S nicht erneut angefragt
+        assert asyncio.run(store.elevation_m(48.14, 11.58, ZOOM)) is None
+        assert len(stub.anfragen) == 2
+        assert store.get_stats()["downloads"] == 1
+
+    def test_empty(self, tmp_path):
+        assert asyncio.run(DemTileStore(str(tmp_path)).elevations_m([], [], ZOOM)).shape == (0,)
@@ -0,0 +1,183 @@
+"""
+Tests for app/backend/services/dynamic_earth_state.py - Batch-Abrufe
+(fetch_many) der Provider und get_states_batch
+"""
+import asyncio
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import h3
+import httpx
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services import dynamic_earth_state
+from services.dynamic_earth_state import (
+    CacheConfig,
+    DataProvider,
+    DynamicEarthStateService,
+    FIRMSProvider,
+    InMemoryCache,
+    PlanetaryComputerProvider,
+    group_cells,
+)
+
+TIMESTAMP = datetime(2026, 7, 1, 12, 30)
+
+# Zellen um Athen (res 7), Feuerpunkte im Umkreis
+ZELLEN = list(h3.grid_disk(h3.latlng_to_cell(38.0, 23.7, 7), 4))
+FEUER = [(38.0 + 0.07 * i, 23.7 + 0.11 * j) for i in range(-12, 13) for j in range(-12, 13) if (i * j) % 3 == 0]
+
+
+class FakeUpstream:
+    """Ersatz für pooled_client: FIRMS-Bbox-CSV und STAC-Suche"""
+
+    def __init__(self):
+        self.requests = []
+
+    def __call__(self, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def get(self, url, **kwargs):
+        self.requests.append(url)
+        west, south, east, north = map(float, url.split("/")[-2].split(","))
+        zeilen = ["latitude,longitude,bright_ti4"] + [
+            f"{lat},{lon},330.1" for lat, lon in FEUER
+            if south <= lat <= north and west <= lon <= east
+        ]
+        return httpx.Response(200, text="\n".join(zeilen))
+
+    async def post(self, url, json=None, **kwargs):
+        self.requests.append(json["bbox"])
+        west, south, east, north = json["bbox"]
+        # Zwei "Kacheln": westlich und östlich von 23.7°
+        szenen = [
+            {"bbox": [22.0, 37.0, 23.7, 39.0], "properties": {"datetime": "2026-06-28", "eo:cloud_cover": 3.0}},
+            {"bbox": [23.7, 37.0, 25.0, 39.0], "properties": {"datetime": "2026-06-25", "eo:cloud_cover": 12.0}},
+        ]
+        treffer = [s for s in szenen if s["bbox"][0] <= east and s["bbox"][2] >= west][:json["limit"]]
+        return httpx.Response(200, json={"features": treffer})
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    fake = FakeUpstream()
+    monkeypatch.setattr(dynamic_earth_state, "pooled_client", fake)
+    return fake
+
+
+class TestGroupCells:
+
+    def test_groups_by_parent(self):
+        gruppen = group_cells(ZELLEN, 5)
+        assert sorted(h for g in gruppen.values() for h in g) == sorted(ZELLEN)
+        for eltern, zellen in gruppen.items():
+            assert all(h3.cell_to_parent(h, 5) == eltern for h in zellen)
+
+    def test_coarser_cells_are_own_group(self):
+        grob = h3.latlng_to_cell(38.0, 23.7, 3)
+        assert group_cells([grob], 5) == {grob: [grob]}
+
+
+class TestFIRMSBatch:
+
+    def test_one_request_per_group_same_counts(self, upstream):
+        provider = FIRMSProvider()
+
+        async def run():
+            einzeln = {h: await provider.fetch(h, TIMESTAMP) for h in ZELLEN}
+            n_einzeln = len(upstream.requests)
+            batch = await provider.fetch_many(ZELLEN, TIMESTAMP)
+            return einzeln, n_einzeln, batch
+
+        einzeln, n_einzeln, batch = asyncio.run(run())
+        assert n_einzeln == len(ZELLEN)
+        assert len(upstream.requests) - n_einzeln == len(group_cells(ZELLEN, provider.group_resolution))
+        assert batch == einzeln
+        assert any(d["active_fires_nearby"] > 0 for d in batch.values())
+
+
+class TestPlanetaryComputerBatch:
+
+    def test_one_search_per_footprint(self, upstream):
+        provider = PlanetaryComputerProvider()
+        batch = asyncio.run(provider.fetch_many(ZELLEN, TIMESTAMP))
+        assert len(upstream.requests) == len(group_cells(ZELLEN, provider.group_resolution))
+        assert set(batch) == set(ZELLEN)
+        for h, daten in batch.items():
+            lons = [p[1] for p in h3.cell_to_boundary(h)]
+            if max(lons) < 23.7:
+                assert (daten["scene_date"], daten["scenes_available"]) == ("2026-06-28", 1)
+            elif min(lons) > 23.7:
+                assert (daten["scene_date"], daten["scenes_available"]) == ("2026-06-25", 1)
+            else:
+                assert daten["scenes_available"] == 2
+
+
+class SlowProvider(DataProvider):
+    """Provider ohne eigenes fetch_many, misst gleichzeitige Abrufe"""
+
+    max_concurrency = 3
+
+    def __init__(self):
+        self.aktiv = 0
+        self.max_aktiv = 0
+        self.calls = 0
+        self.batches = []
+
+    @property
+    def name(self) -> str:
+        return "Slow"
+
+    @property
+    def cache_ttl(self) -> int:
+        return 60
+
+    async def fetch(self, h3_index, timestamp):
+        self.calls += 1
+        self.aktiv += 1
+        self.max_aktiv = max(self.max_aktiv, self.aktiv)
+        await asyncio.sleep(0.01)
+        self.aktiv -= 1
+        return {"temperature_c": 20.0}
+
+    async def fetch_many(self, h3_indices, timestamp):
+        self.batches.append(len(h3_indices))
+        return await super().fetch_many(h3_indices, timestamp)
+
+
+class TestServiceBatch:
+
+    def test_concurrency_limit(self):
+        provider = SlowProvider()
+        daten = asyncio.run(provider.fetch_many(ZELLEN, TIMESTAMP))
+        assert len(daten) == len(ZELLEN)
+        assert provider.max_aktiv == provider.max_concurrency
+
+    def test_batch_fetches_once_per_provider(self, upstream):
+        slow = SlowProvider()
+        service = DynamicEarthStateService(cache_config=CacheConfig(redis_url=None), cache=InMemoryCache())
+        service.providers = [slow, FIRMSProvider()]
+
+        async def run():
+            erste = await service.get_states_batch(ZELLEN, TIMESTAMP)
+            n = len(upstream.requests)
+            zweite = await service.get_states_batch(ZELLEN[:10], TIMESTAMP)
+            return erste, n, zweite
+
+        erste, n, zweite = asyncio.run(run())
+        assert slow.batches == [len(ZELLEN)]
+        assert n == len(group_cells(ZELLEN, FIRMSProvider.group_resolution))
+        assert len(upstream.requests) == n  # zweiter Aufruf komplett aus dem Cache
+        assert all(s.data_sources == ["Slow", "NASA_FIRMS"] for s in erste.values())
+        assert all(zweite[h] == erste[h] for h in zweite)
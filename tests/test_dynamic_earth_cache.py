@@ -0,0 +1,243 @@
+"""
+Tests for app/backend/services/dynamic_earth_state.py - Cache-Backends und
+Single-Flight des DynamicEarthStateService (Redis über fakeredis)
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import h3
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from services.dynamic_earth_state import (
+    CacheConfig,
+    DataProvider,
+    DynamicEarthStateService,
+    EarthState,
+    InMemoryCache,
+    RedisCache,
+    TieredCache,
+)
+
+H3_CELL = "871fb4662ffffff"
+TIMESTAMP = datetime(2026, 7, 1, 12, 30)
+
+
+class CountingProvider(DataProvider):
+    """Provider mit Abrufzähler und künstlicher Latenz"""
+
+    def __init__(self, name: str, ttl: float, data: dict, delay: float = 0.05):
+        self._name = name
+        self._ttl = ttl
+        self.data = data
+        self.delay = delay
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def cache_ttl(self) -> float:
+        return self._ttl
+
+    async def fetch(self, h3_index, timestamp):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return dict(self.data)
+
+
+def make_service(cache, providers, **config):
+    service = DynamicEarthStateService(
+        cache_config=CacheConfig(redis_url=None, **config), cache=cache
+    )
+    service.providers = providers
+    return service
+
+
+def make_worker(server, providers, **config):
+    """Ein 'Worker-Prozess': eigener LRU, gemeinsames Redis"""
+    redis = RedisCache(fakeredis.aioredis.FakeRedis(server=server))
+    return make_service(TieredCache(InMemoryCache(), redis), providers, **config)
+
+
+class TestEarthStateSerialization:
+    """msgpack-Roundtrip des EarthState"""
+
+    def test_roundtrip(self):
+        state = EarthState(
+            h3_index=H3_CELL,
+            timestamp=TIMESTAMP,
+            temperature_c=21.5,
+            fire_risk=0.2,
+            data_sources=["ERA5", "NASA_FIRMS"],
+            quality_score=0.5,
+        )
+        assert EarthState.from_msgpack(state.to_msgpack()) == state
+
+
+class TestInMemoryCache:
+    """Begrenzter LRU mit TTL und Stale-Fenster"""
+
+    def test_lru_bound(self):
+        async def run():
+            cache = InMemoryCache(max_entries=3)
+            for i in range(5):
+                await cache.set(f"k{i}", b"x", ttl_seconds=60)
+            await cache.get("k2")  # zuletzt benutzt
+            await cache.set("k5", b"x", ttl_seconds=60)
+            return cache, [k for k in ("k0", "k1", "k2", "k3", "k4", "k5") if await cache.get(k)]
+
+        cache, keys = asyncio.run(run())
+        assert keys == ["k2", "k4", "k5"]
+        assert cache.stats()["evictions"] == 3
+
+    def test_stale_then_expired(self):
+        async def run():
+            cache = InMemoryCache()
+            await cache.set("k", b"v", ttl_seconds=0.05, stale_seconds=0.1)
+            fresh = await cache.get("k")
+            fresh_flag = fresh.frisch
+            await asyncio.sleep(0.08)
+            stale = await cache.get("k")
+            stale_flag = stale is not None and stale.frisch
+            await asyncio.sleep(0.1)
+            gone = await cache.get("k")
+            return fresh, fresh_flag, stale, stale_flag, gone
+
+        fresh, fresh_flag, stale, stale_flag, gone = asyncio.run(run())
+        assert fresh_flag and fresh.wert == b"v"
+        assert stale is not None and not stale_flag
+        assert gone is None
+
+    def test_lock_is_exclusive(self):
+        async def run():
+            cache = InMemoryCache()
+            token = await cache.acquire_lock("k", 10)
+            second = await cache.acquire_lock("k", 10)
+            await cache.release_lock("k", token)
+            third = await cache.acquire_lock("k", 10)
+            return token, second, third
+
+        token, second, third = asyncio.run(run())
+        assert token and third
+        assert second is None
+
+
+class TestRedisCache:
+    """Redis-Backend auf fakeredis"""
+
+    def test_entries_shared_between_workers(self):
+        async def run():
+            server = fakeredis.FakeServer()
+            a = RedisCache(fakeredis.aioredis.FakeRedis(server=server))
+            b = RedisCache(fakeredis.aioredis.FakeRedis(server=server))
+            await a.set("k", b"v", ttl_seconds=60, stale_seconds=60)
+            return await b.get("k")
+
+        eintrag = asyncio.run(run())
+        assert eintrag.wert == b"v" and eintrag.frisch
+
+    def test_lock_release_only_by_owner(self):
+        async def run():
+            server = fakeredis.FakeServer()
+            a = RedisCache(fakeredis.aioredis.FakeRedis(server=server))
+            b = RedisCache(fakeredis.aioredis.FakeRedis(server=server))
+            token = await a.acquire_lock("k", 10)
+            blocked = await b.acquire_lock("k", 10)
+            await b.release_lock("k", "fremd")
+            still_blocked = await b.acquire_lock("k", 10)
+            await a.release_lock("k", token)
+            free = await b.acquire_lock("k", 10)
+            return token, blocked, still_blocked, free
+
+        token, blocked, still_blocked, free = asyncio.run(run())
+        assert token and free
+        assert blocked is None and still_blocked is None
+
+    def test_redis_down_degrades_to_local(self):
+        async def run():
+            server = fakeredis.FakeServer()
+            server.connected = False
+            provider = CountingProvider("ERA5", 60, {"temperature_c": 20.0}, delay=0)
+            service = make_worker(server, [provider])
+            first = await service.get_state(H3_CELL, TIMESTAMP)
+            second = await service.get_state(H3_CELL, TIMESTAMP)
+            return service, provider, first, second
+
+        service, provider, first, second = asyncio.run(run())
+        assert first == second
+        assert provider.calls == 1  # zweiter Abruf aus dem LRU
+        assert service.cache_stats()["redis"]["errors"] >= 1
+
+
+class TestDynamicEarthStateCache:
+    """Single-Flight, Provider-TTLs und stale-while-revalidate"""
+
+    def test_single_flight_across_workers(self):
+        async def run():
+            server = fakeredis.FakeServer()
+            era5 = CountingProvider("ERA5", 60, {"temperature_c": 20.0})
+            firms = CountingProvider("NASA_FIRMS", 60, {"fire_risk": 0.1})
+            workers = [make_worker(server, [era5, firms]) for _ in range(4)]
+            states = await asyncio.gather(*(
+                w.get_state(H3_CELL, TIMESTAMP) for w in workers for _ in range(5)
+            ))
+            return workers, era5, firms, states
+
+        workers, era5, firms, states = asyncio.run(run())
+        assert era5.calls == 1 and firms.calls == 1
+        assert all(s == states[0] for s in states)
+        assert states[0].temperature_c == 20.0 and states[0].fire_risk == 0.1
+        assert sum(w.stats["deduplicated"] for w in workers) == 16
+        assert sum(w.stats["lock_waits"] for w in workers) == 3
+
+    def test_stale_while_revalidate_per_provider_ttl(self):
+        async def run():
+            fast = CountingProvider("KNMI", 0.1, {"precipitation_mm": 1.0}, delay=0.05)
+            slow = CountingProvider("ERA5", 60, {"temperature_c": 20.0}, delay=0.05)
+            service = make_service(InMemoryCache(), [fast, slow], stale_seconds=60)
+            await service.get_state(H3_CELL, TIMESTAMP)
+            await asyncio.sleep(0.15)  # KNMI und Zustand veraltet, ERA5 frisch
+
+            fast.data = {"precipitation_mm": 2.0}
+            start = time.perf_counter()
+            stale = await service.get_state(H3_CELL, TIMESTAMP)
+            stale_ms = (time.perf_counter() - start) * 1000
+            await service.aclose()  # wartet auf die Erneuerung
+            fresh = await service.get_state(H3_CELL, TIMESTAMP)
+            return service, fast, slow, stale, stale_ms, fresh
+
+        service, fast, slow, stale, stale_ms, fresh = asyncio.run(run())
+        assert stale.precipitation_mm == 1.0
+        assert stale_ms < 40  # kein Warten auf den Provider
+        assert fresh.precipitation_mm == 2.0
+        assert fast.calls == 2
+        assert slow.calls == 1
+        assert service.stats["stale_hits"] == 1
+
+    def test_batch_single_flight_across_workers(self):
+        async def run():
+            server = fakeredis.FakeServer()
+            era5 = CountingProvider("ERA5", 60, {"temperature_c": 20.0})
+            workers = [make_worker(server, [era5]) for _ in range(3)]
+            zellen = sorted(h3.grid_disk(H3_CELL, 1))
+            # Überlappende Batches: jede Zelle genau einmal upstream
+            ergebnisse = await asyncio.gather(
+                workers[0].get_states_batch(zellen[:5], TIMESTAMP),
+                workers[1].get_states_batch(zellen[2:], TIMESTAMP),
+                workers[2].get_states_batch(zellen, TIMESTAMP),
+            )
+            return era5, zellen, ergebnisse
+
+        era5, zellen, ergebnisse = asyncio.run(run())
+        assert era5.calls == len(zellen)
+        assert all(s.temperature_c == 20.0 for r in ergebnisse for s in r.values())
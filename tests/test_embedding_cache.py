@@ -0,0 +1,151 @@
+"""
+Tests for app/backend/services/embedding_cache.py und VectorStore.embed_texts -
+Batch-Embeddings, Deduplizierung und persistenter Cache gegen einen Ollama-Stub
+"""
+import asyncio
+import hashlib
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.embedding_cache import EmbeddingCache, text_key
+from services.vector_store import ContextDocument, VectorStore
+
+DIM = 8
+
+
+def fake_embedding(text: str) -> list:
+    """Deterministischer Vektor pro Text"""
+    digest = hashlib.sha256(text.encode()).digest()
+    return [b / 255.0 - 0.5 for b in digest[:DIM]]
+
+
+class EmbedStub:
+    """Lokaler HTTP-Server mit /api/embed (Batch) und /api/embeddings (einzeln)"""
+
+    def __init__(self, legacy: bool = False):
+        self.legacy = legacy
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests.append((self.path, body))
+                if self.path == "/api/embed" and not stub.legacy:
+                    self._send(200, {"embeddings": [fake_embedding(t) for t in body["input"]]})
+                elif self.path == "/api/embeddings":
+                    self._send(200, {"embedding": fake_embedding(body["prompt"])})
+                else:
+                    self._send(404, {"error": "not found"})
+
+            def _send(self, status, data):
+                payload = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = EmbedStub()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return EmbeddingCache(str(tmp_path / "embeddings.sqlite"))
+
+
+def make_store(stub, cache):
+    # Ohne chromadb landet index_contexts im lokalen Index neben dem Cache
+    return VectorStore(ollama_url=stub.url, embedding_model="stub", embedding_cache=cache,
+                       local_index_dir=str(cache.db_path.parent / "vector_index"))
+
+
+class TestEmbeddingCache:
+
+    def test_roundtrip_float16(self, cache):
+        vec = np.linspace(-1, 1, DIM, dtype=np.float32)
+        cache.put_many("m", [(text_key("m", "a"), vec)])
+        gefunden = cache.get_many([text_key("m", "a"), text_key("m", "b")])
+        assert list(gefunden) == [text_key("m", "a")]
+        assert gefunden[text_key("m", "a")].dtype == np.float32
+        assert np.allclose(gefunden[text_key("m", "a")], vec, atol=1e-3)
+        assert cache.stats == {"hits": 1, "misses": 1, "writes": 1}
+
+    def test_key_depends_on_model(self):
+        assert text_key("a", "text") != text_key("b", "text")
+
+    def test_many_keys(self, cache):
+        eintraege = [(text_key("m", str(i)), np.full(DIM, i % 7, dtype=np.float32)) for i in range(2500)]
+        cache.put_many("m", eintraege)
+        assert len(cache) == 2500
+        assert len(cache.get_many([k for k, _ in eintraege])) == 2500
+
+
+class TestEmbedTexts:
+
+    def test_batches_and_dedupe(self, stub, cache):
+        store = make_store(stub, cache)
+        texte = [f"Bericht {i % 50}" for i in range(100)]
+        vektoren = asyncio.run(store.embed_texts(texte, batch_size=16))
+        assert vektoren.shape == (100, DIM)
+        assert np.allclose(vektoren[0], fake_embedding("Bericht 0"), atol=1e-3)
+        assert np.array_equal(vektoren[0], vektoren[50])
+        # 50 eindeutige Texte in Batches zu 16
+        assert sorted(len(body["input"]) for _, body in stub.requests) == [2, 16, 16, 16]
+
+    def test_cache_persists(self, stub, tmp_path):
+        pfad = str(tmp_path / "embeddings.sqlite")
+        texte = ["Flut in Jakarta", "Dürre in Somalia"]
+        erste = asyncio.run(make_store(stub, EmbeddingCache(pfad)).embed_texts(texte))
+        zweite = asyncio.run(make_store(stub, EmbeddingCache(pfad)).embed_texts(texte + ["Neu"]))
+        assert np.array_equal(erste, zweite[:2])
+        assert [body["input"] for _, body in stub.requests] == [texte, ["Neu"]]
+
+    def test_generate_embedding(self, stub, cache):
+        vec = asyncio.run(make_store(stub, cache).generate_embedding("Sturm"))
+        assert isinstance(vec, list) and len(vec) == DIM
+
+    def test_legacy_endpoint(self, cache):
+        stub = EmbedStub(legacy=True)
+        try:
+            vektoren = asyncio.run(make_store(stub, cache).embed_texts(["a", "b", "c"]))
+        finally:
+            stub.close()
+        assert vektoren.shape == (3, DIM)
+        assert [pfad for pfad, _ in stub.requests] == ["/api/embed"] + ["/api/embeddings"] * 3
+
+    def test_index_contexts_sets_embeddings(self, stub, cache):
+        docs = [ContextDocument(id=f"d{i}", h3_index="872a1072bffffff", content=f"Text {i}", metadata={}) for i in range(5)]
+        assert asyncio.run(make_store(stub, cache).index_contexts(docs)) == 5
+        assert all(len(d.embedding) == DIM for d in docs)
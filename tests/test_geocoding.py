@@ -0,0 +1,190 @@
+"""
+Tests for app/backend/services/geocoding.py - SQLite-Cache (inkl. negativer
+Ergebnisse und TTL), GeoNames-Preload, Single-Flight und Token-Bucket
+gegen einen Nominatim-Stub
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from data import geonames_loader
+from services import geocoding
+from services.geocoding import GeoCache, GeocodingService, TokenBucket, normalize_query
+
+BERLIN = [{
+    "lat": "52.5170365", "lon": "13.3888599", "display_name": "Berlin, Deutschland",
+    "address": {"country": "Deutschland", "country_code": "de"},
+    "boundingbox": ["52.3", "52.7", "13.1", "13.8"],
+}]
+
+
+class NominatimStub:
+    """Ersetzt pooled_client: zählt Anfragen, Antwort pro Suchbegriff"""
+
+    def __init__(self, antworten=None, delay: float = 0.05):
+        self.antworten = antworten or {}
+        self.delay = delay
+        self.anfragen = []
+
+    def __call__(self, **kwargs):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    async def get(self, url, params=None, headers=None):
+        self.anfragen.append(params["q"])
+        await asyncio.sleep(self.delay)
+        return httpx.Response(200, json=self.antworten.get(params["q"], []))
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    stub = NominatimStub({"Berlin": BERLIN, "berlin": BERLIN})
+    monkeypatch.setattr(geocoding, "pooled_client", stub)
+    return stub
+
+
+@pytest.fixture
+def geocoder(tmp_path):
+    # Eigener Bucket ohne Drosselung; der Token-Bucket wird separat getestet
+    return GeocodingService(
+        cache=GeoCache(db_path=str(tmp_path / "geo.sqlite")),
+        bucket=TokenBucket(rate=1000.0, capacity=1000.0),
+    )
+
+
+def stadt_zeile(name="berlin", display="Berlin", lat=52.52, lon=13.405, population=3_600_000):
+    return (name, display, lat, lon, "Germany", "DE", population)
+
+
+class TestGeocodingService:
+    def test_result_is_cached(self, geocoder, stub):
+        erstes = asyncio.run(geocoder.geocode("Berlin"))
+        assert erstes["country_code"] == "DE"
+        assert erstes["bbox"] == [52.3, 52.7, 13.1, 13.8]
+        assert asyncio.run(geocoder.geocode("  BERLIN ")) == erstes
+        assert stub.anfragen == ["Berlin"]
+
+    def test_single_flight(self, geocoder, stub):
+        async def run():
+            return await asyncio.gather(*(geocoder.geocode(q) for q in ["Berlin", "berlin", " Berlin"] * 5))
+
+        ergebnisse = asyncio.run(run())
+        assert len(stub.anfragen) == 1
+        assert all(e == ergebnisse[0] for e in ergebnisse)
+        assert geocoder._inflight == {}
+
+    def test_negative_result_cached_with_ttl(self, geocoder, stub, monkeypatch):
+        assert asyncio.run(geocoder.geocode("Atlantis")) is None
+        assert asyncio.run(geocoder.geocode("atlantis")) is None
+        assert stub.anfragen == ["Atlantis"]
+
+        # Nach NEGATIVE_TTL_S erneut fragen, positive Einträge bleiben gültig
+        asyncio.run(geocoder.geocode("Berlin"))
+        spaeter = time.time() + geocoding.NEGATIVE_TTL_S + 1
+        monkeypatch.setattr(time, "time", lambda: spaeter)
+        assert asyncio.run(geocoder.geocode("Atlantis")) is None
+        asyncio.run(geocoder.geocode("Berlin"))
+        assert stub.anfragen == ["Atlantis", "Berlin", "Atlantis"]
+
+    def test_transient_errors_not_cached(self, geocoder, stub, monkeypatch):
+        async def kaputt(url, params=None, headers=None):
+            stub.anfragen.append(params["q"])
+            return httpx.Response(503)
+
+        monkeypatch.setattr(stub, "get", kaputt)
+        assert asyncio.run(geocoder.geocode("Berlin")) is None
+        assert geocoder.cache.get("berlin") == (False, None)
+
+    def test_geonames_city_without_network(self, geocoder, stub):
+        geocoder.cache.load_cities([stadt_zeile()])
+        city = asyncio.run(geocoder.geocode("Berlin"))
+        assert (city["lat"], city["lon"], city["country_code"]) == (52.52, 13.405, "DE")
+        assert stub.anfragen == []
+
+    def test_geonames_beats_earlier_negative_result(self, geocoder, stub):
+        assert asyncio.run(geocoder.geocode("Gotham")) is None
+        geocoder.cache.load_cities([stadt_zeile("gotham", "Gotham", 40.7, -74.0, 100_000)])
+        assert asyncio.run(geocoder.geocode("Gotham"))["name"] == "Gotham, Germany"
+        assert stub.anfragen == ["Gotham"]
+
+    def test_most_populous_city_wins(self, geocoder):
+        cache = geocoder.cache
+        assert cache.load_cities([stadt_zeile("frankfurt", "Frankfurt am Main", 50.11, 8.68, 750_000)]) == 1
+        cache.load_cities([stadt_zeile("frankfurt", "Frankfurt (Oder)", 52.34, 14.55, 57_000)])
+        assert cache.city("frankfurt")["lat"] == 50.11
+
+    def test_preload_geonames(self, geocoder, stub, monkeypatch):
+        async def cities():
+            return [
+                geonames_loader.City(1, "München", 48.14, 11.58, "DE", 1_500_000, "Europe/Berlin", "Muenchen"),
+                geonames_loader.City(2, "Wien", 48.21, 16.37, "AT", 1_900_000, "Europe/Vienna", "Wien"),
+            ]
+
+        async def countries():
+            return [
+                geonames_loader.Country("DE", "Germany", "Berlin", 83_000_000, "EU"),
+                geonames_loader.Country("AT", "Austria", "Vienna", 9_000_000, "EU"),
+            ]
+
+        monkeypatch.setattr(geonames_loader, "load_cities", cities)
+        monkeypatch.setattr(geonames_loader, "load_countries", countries)
+        assert asyncio.run(geocoder.preload_geonames()) == 3  # münchen, muenchen, wien
+        assert asyncio.run(geocoder.geocode("Muenchen"))["name"] == "München, Germany"
+        assert asyncio.run(geocoder.geocode("WIEN"))["country"] == "Austria"
+        assert stub.anfragen == []
+
+
+class TestTokenBucket:
+    def test_rate_limit(self):
+        bucket = TokenBucket(rate=20.0, capacity=1.0)
+
+        async def run():
+            start = time.monotonic()
+            for _ in range(5):
+                await bucket.acquire()
+            return time.monotonic() - start
+
+        # erstes Token sofort, danach 4 x 50 ms
+        assert 0.18 <= asyncio.run(run()) < 0.5
+
+    def test_burst_capacity(self):
+        bucket = TokenBucket(rate=1.0, capacity=3.0)
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*(bucket.acquire() for _ in range(3)))
+            return time.monotonic() - start
+
+        assert asyncio.run(run()) < 0.05
+
+    def test_shared_between_concurrent_callers(self):
+        bucket = TokenBucket(rate=50.0, capacity=1.0)
+        zeiten = []
+
+        async def einer():
+            await bucket.acquire()
+            zeiten.append(time.monotonic())
+
+        async def run():
+            await asyncio.gather(*(einer() for _ in range(6)))
+
+        asyncio.run(run())
+        zeiten.sort()
+        assert zeiten[-1] - zeiten[0] >= 5 / 50.0 * 0.9
+
+
+def test_normalize_query():
+    assert normalize_query("  New   York\tCity ") == "new york city"
@@ -0,0 +1,96 @@
+"""
+Tests for app/backend/services/h3_columnar.py - Binärformat (Ausrichtung,
+float16-Spalte, Kategorie-Wörterbuch, uint8-Grenze)
+"""
+import struct
+import sys
+from pathlib import Path
+
+import h3
+import numpy as np
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services import h3_columnar
+
+ZELLEN = h3.grid_disk(h3.latlng_to_cell(52.52, 13.405, 8), 2)
+
+
+def spalten(n: int = len(ZELLEN)):
+    kategorien = [("HOCH", "MITTEL", "NIEDRIG")[i % 3] for i in range(n)]
+    intensitaet = [i / max(n, 1) for i in range(n)]
+    return ZELLEN[:n], kategorien, intensitaet
+
+
+def h3_offset(data: bytes) -> int:
+    (header_len,) = struct.unpack_from('<I', data, 4)
+    offset = 8 + header_len
+    return offset + (-offset % 8)
+
+
+class TestRoundTrip:
+    def test_columns(self):
+        ids, kategorien, intensitaet = spalten()
+        labels = {"HOCH": {"farbe": "#f00"}, "UNBENUTZT": {"farbe": "#000"}}
+        data = h3_columnar.encode(ids, kategorien, intensitaet, labels=labels, meta={"zoom": 12})
+        out = h3_columnar.decode(data)
+
+        assert h3_columnar.h3_strings(out['h3']) == ids
+        assert out['kategorien'] == ["HOCH", "MITTEL", "NIEDRIG"]
+        assert [out['kategorien'][k] for k in out['kategorie']] == kategorien
+        assert out['intensitaet'].dtype == np.float16
+        np.testing.assert_allclose(out['intensitaet'], intensitaet, atol=1e-3)
+        assert out['labels'] == {"HOCH": {"farbe": "#f00"}}
+        assert out['meta'] == {"zoom": 12}
+        assert len(data) == h3_offset(data) + len(ids) * (8 + 2 + 1)
+
+    @pytest.mark.parametrize("meta_len", range(8))
+    def test_columns_are_aligned(self, meta_len):
+        ids, kategorien, intensitaet = spalten()
+        data = h3_columnar.encode(ids, kategorien, intensitaet, meta={"x": "y" * meta_len})
+        (header_len,) = struct.unpack_from('<I', data, 4)
+        offset = h3_offset(data)
+        assert offset % 8 == 0
+        assert 0 <= offset - (8 + header_len) < 8
+        assert data[8 + header_len:offset] == b'\0' * (offset - 8 - header_len)
+        # Spalten wie im Browser über denselben Puffer lesen
+        assert np.frombuffer(data, dtype='<u8', count=len(ids), offset=offset).tolist() == [int(h, 16) for h in ids]
+        assert (offset + 8 * len(ids)) % 2 == 0
+        assert h3_columnar.h3_strings(h3_columnar.decode(data)['h3']) == ids
+
+    def test_empty(self):
+        data = h3_columnar.encode([], [], [])
+        assert len(data) == h3_offset(data)
+        out = h3_columnar.decode(data)
+        assert len(out['h3']) == len(out['intensitaet']) == len(out['kategorie']) == 0
+        assert out['kategorien'] == []
+
+    def test_features_to_columnar(self):
+        ids, kategorien, intensitaet = spalten()
+        features = [
+            {"type": "Feature", "properties": {"h3": h, "zone": k, "intensity": w}}
+            for h, k, w in zip(ids, kategorien, intensitaet)
+        ]
+        out = h3_columnar.decode(h3_columnar.features_to_columnar(features))
+        assert h3_columnar.h3_strings(out['h3']) == ids
+
+
+class TestLimits:
+    def test_256_categories_fit(self):
+        n = 256
+        ids = h3.grid_disk(ZELLEN[0], 10)[:n]
+        out = h3_columnar.decode(h3_columnar.encode(ids, [f"k{i}" for i in range(n)], [0.5] * n))
+        assert out['kategorie'].tolist() == list(range(n))
+
+    def test_more_than_256_categories(self):
+        n = 257
+        ids = h3.grid_disk(ZELLEN[0], 10)[:n]
+        with pytest.raises(ValueError):
+            h3_columnar.encode(ids, [f"k{i}" for i in range(n)], [0.5] * n)
+
+    def test_bad_magic(self):
+        with pytest.raises(ValueError):
+            h3_columnar.decode(b'XXXX' + b'\0' * 12)
@@ -0,0 +1,66 @@
+"""
+Tests for app/backend/services/h3_cover.py - Zellanzahl-Schätzung und
+Auflösungswahl vor dem Polyfill (u.a. /api/earth-cycles/cells)
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.h3_cover import bbox_cells, estimate_bbox_cells, fit_resolution
+
+BOXEN = [
+    (52.3, 13.1, 52.7, 13.7),    # Berlin
+    (25.4, -80.6, 26.1, -80.0),  # Miami
+    (-6.5, 106.5, -5.9, 107.1),  # Jakarta
+]
+
+
+class TestEstimate:
+    @pytest.mark.parametrize("box", BOXEN)
+    @pytest.mark.parametrize("res", [6, 7, 8])
+    def test_estimate_close_to_polyfill(self, box, res):
+        echt = len(bbox_cells(*box, res))
+        assert estimate_bbox_cells(*box, res) == pytest.approx(echt, rel=0.05)
+
+    def test_empty_box(self):
+        assert estimate_bbox_cells(10.0, 10.0, 10.0, 11.0, 7) == 0
+
+
+class TestFitResolution:
+    def test_coarsens_until_estimate_fits(self):
+        box = (40.0, -10.0, 60.0, 30.0)
+        res = fit_resolution(*box, 10000, 9)
+        assert res < 9
+        assert estimate_bbox_cells(*box, res) <= 10000
+        assert estimate_bbox_cells(*box, res + 1) > 10000
+
+    def test_keeps_start_res_when_small(self):
+        assert fit_resolution(*BOXEN[0], 10000, 7) == 7
+
+
+class TestEarthCyclesRoute:
+    """Die Auflösung wird vor dem Polyfill gewählt, nicht die Liste gekürzt"""
+
+    @pytest.fixture(autouse=True)
+    def route(self):
+        pytest.importorskip("fastapi")
+        from api.routes import earth_cycles
+        return earth_cycles
+
+    @pytest.mark.parametrize("box,zoom", [
+        ((40.0, -10.0, 60.0, 30.0), 20),
+        ((-80.0, -179.0, 80.0, 179.0), 20),
+        (BOXEN[0], 20),
+    ])
+    def test_wide_bbox_is_coarsened(self, route, box, zoom):
+        res = route.fit_grid_resolution(*box, zoom)
+        assert res <= route.get_resolution_for_zoom(zoom)
+        assert len(route.generate_grid_cells(*box, res)) <= route.MAX_CELLS * 1.05
+
+    def test_small_bbox_keeps_zoom_resolution(self, route):
+        assert route.fit_grid_resolution(*BOXEN[0], 14) == route.get_resolution_for_zoom(14)
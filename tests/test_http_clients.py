@@ -0,0 +1,55 @@
+"""
+Tests for app/backend/services/http_clients.py - Pools und Policies pro
+(scheme, host, port)
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.http_clients import HOST_POLICIES, HttpClientRegistry, pool_key, pool_label
+
+
+class TestPoolKey:
+    def test_default_ports_are_explicit(self):
+        assert pool_key("https://api.gdeltproject.org/api/v2/doc") == ("https", "api.gdeltproject.org", 443)
+        assert pool_key("http://example.org/x") == ("http", "example.org", 80)
+
+    def test_port_distinguishes_local_services(self):
+        assert pool_key("http://localhost:11434/api/generate") != pool_key("http://localhost:8000/api/v1")
+
+    def test_label(self):
+        assert pool_label(pool_key("http://127.0.0.1:11434/api/tags")) == "http://127.0.0.1:11434"
+
+
+class TestHttpClientRegistry:
+    def test_policy_prefers_host_port(self):
+        registry = HttpClientRegistry()
+        ollama = registry.policy_for(pool_key("http://localhost:11434/api/generate"))
+        chroma = registry.policy_for(pool_key("http://localhost:8000/api/v1/heartbeat"))
+        assert ollama is HOST_POLICIES['localhost:11434']
+        assert chroma is HOST_POLICIES['localhost']
+        assert ollama.max_retries == 0
+        assert chroma.max_retries > 0
+
+    def test_policy_default(self):
+        registry = HttpClientRegistry()
+        assert registry.policy_for(pool_key("https://unknown.example/")) is registry.default
+
+    def test_separate_pools_and_stats_per_port(self):
+        async def run():
+            registry = HttpClientRegistry()
+            ollama = registry.client_for("http://localhost:11434/api/generate")
+            chroma = registry.client_for("http://localhost:8000/api/v1/heartbeat")
+            again = registry.client_for("http://localhost:11434/api/tags")
+            stats = registry.get_stats()
+            await registry.aclose()
+            return ollama, chroma, again, stats
+
+        ollama, chroma, again, stats = asyncio.run(run())
+        assert ollama is again
+        assert ollama is not chroma
+        assert set(stats['hosts']) == {"http://localhost:11434", "http://localhost:8000"}
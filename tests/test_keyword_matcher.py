@@ -0,0 +1,78 @@
+"""
+Tests for mining/keyword_matcher.py - KeywordAutomaton (Aho-Corasick)
+"""
+import ast
+import random
+import re
+import sys
+from pathlib import Path
+
+# Add mining directory to path
+mining_path = Path(__file__).parent.parent / "mining"
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(mining_path))
+
+from keyword_matcher import KeywordAutomaton, Treffer
+
+
+class TestKeywordAutomaton:
+    """Ein Durchlauf liefert dieselben Treffer wie eine Suche pro Keyword"""
+
+    def test_overlapping_keywords(self):
+        automat = KeywordAutomaton(["he", "she", "his", "hers"])
+        treffer = automat.scan("ushers")
+        assert treffer == {"he": Treffer(1, 0), "she": Treffer(1, 0), "hers": Treffer(1, 0)}
+
+    def test_whole_words(self):
+        automat = KeywordAutomaton(["war", "heat_wave", "water shortage"])
+        text = "War, warfare and an award; heat_wave and heat_waves. Water shortage!"
+        assert automat.find(text) == {"war", "heat_wave", "water shortage"}
+        assert automat.scan(text)["war"] == Treffer(3, 1)
+        assert automat.scan(text)["heat_wave"] == Treffer(2, 1)
+
+    def test_unicode_word_boundaries(self):
+        automat = KeywordAutomaton(["dürre", "rom"])
+        assert automat.find("Die Dürre in Rom") == {"dürre", "rom"}
+        assert automat.find("Dürreperiode from Bromberg") == set()
+
+    def test_matches_regex_per_keyword(self):
+        keywords = ["a", "ab", "bab", "b b", "-x", "x_"]
+        automat = KeywordAutomaton(keywords)
+        rnd = random.Random(0)
+        for _ in range(500):
+            text = "".join(rnd.choice("abx -_.") for _ in range(rnd.randint(0, 30)))
+            treffer = automat.scan(text)
+            for keyword in keywords:
+                alle = sum(text.startswith(keyword, i) for i in range(len(text)))
+                ganze = len(re.findall(r"\b" + re.escape(keyword) + r"\b", text))
+                erwartet = Treffer(alle, ganze) if alle else None
+                if keyword == "b b" and alle:
+                    # findall zählt nicht überlappend, der Automat jedes Vorkommen
+                    assert treffer[keyword].ganze_woerter >= ganze
+                    continue
+                assert treffer.get(keyword) == erwartet
+
+    def test_empty(self):
+        automat = KeywordAutomaton([])
+        assert len(automat) == 0
+        assert automat.scan("drought") == {}
+
+
+def _code_ohne_docstring(pfad: Path) -> str:
+    """AST eines Moduls ohne Modul-Docstring (Kommentare fallen ohnehin weg)"""
+    modul = ast.parse(pfad.read_text(encoding="utf-8"))
+    if modul.body and isinstance(modul.body[0], ast.Expr) and isinstance(modul.body[0].value, ast.Constant):
+        modul.body = modul.body[1:]
+    return ast.dump(modul)
+
+
+class TestBackendCopy:
+    """Das Backend-Image enthält nur app/backend/, daher liegt dort eine Kopie"""
+
+    def test_backend_copy_is_identical(self):
+        mining = _code_ohne_docstring(mining_path / "keyword_matcher.py")
+        backend = _code_ohne_docstring(backend_path / "services" / "keyword_matcher.py")
+        assert mining == backend, (
+            "mining/keyword_matcher.py und app/backend/services/keyword_matcher.py "
+            "sind auseinandergelaufen - Änderungen in beide Dateien übernehmen"
+        )
@@ -0,0 +1,137 @@
+"""
+Tests for app/backend/agents/extraction/llm_extractor.py - parallele
+Batch-Extraktion gegen ein Fake-LLM mit einstellbarer Latenz
+"""
+import asyncio
+import importlib.util
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+# Modul direkt laden: agents/__init__ zieht Scraper und RiskCalculator (asyncpg) nach
+_spec = importlib.util.spec_from_file_location(
+    "llm_extractor", backend_path / "agents" / "extraction" / "llm_extractor.py"
+)
+llm_extractor = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(llm_extractor)
+
+ExtractionJob = llm_extractor.ExtractionJob
+LLMExtractor = llm_extractor.LLMExtractor
+cap_text = llm_extractor.cap_text
+
+
+class FakeLLM:
+    """Ersatz für OllamaClient.generate: feste Latenz, begrenzte Server-Parallelität"""
+
+    def __init__(self, latency: float = 0.05, server_parallel: int = 4, slow_latency: float = 1.0):
+        self.latency = latency
+        self.slow_latency = slow_latency
+        self.server_parallel = server_parallel
+        self.prompts = []
+        self.active = 0
+        self.max_active = 0
+        self._server = None
+
+    async def generate(self, prompt, options=None, **kwargs):
+        if self._server is None:
+            self._server = asyncio.Semaphore(self.server_parallel)
+        self.prompts.append(prompt)
+        async with self._server:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+            try:
+                await asyncio.sleep(self.slow_latency if "SLOW" in prompt else self.latency)
+            finally:
+                self.active -= 1
+        if "FAIL" in prompt:
+            raise RuntimeError("Ollama error 500")
+        ort = prompt.split("Text to analyze:\n", 1)[1].split()[0]
+        return "Sure: " + json.dumps({"location": ort, "event_type": "flood", "severity": 7, "summary": "s"})
+
+
+def artikel(n: int):
+    basis = datetime(2026, 7, 1)
+    return [ExtractionJob(text=f"Ort{i} flooding report", published=basis + timedelta(hours=i), id=i) for i in range(n)]
+
+
+def laufzeit(concurrency: int, n: int = 16, latency: float = 0.05) -> float:
+    extractor = LLMExtractor(concurrency=concurrency, llm=FakeLLM(latency=latency))
+    start = time.perf_counter()
+    entities = asyncio.run(extractor.batch_extract(artikel(n)))
+    assert len(entities) == n
+    return time.perf_counter() - start
+
+
+class TestCapText:
+
+    def test_cuts_at_word_boundary(self):
+        assert cap_text("kurz", 10) == "kurz"
+        assert cap_text("eins zwei drei vier", 12) == "eins zwei"
+        assert len(cap_text("x" * 5000)) == 3000
+
+    def test_prompt_contains_capped_text(self):
+        extractor = LLMExtractor(max_chars=20, llm=FakeLLM())
+        prompt = extractor.build_prompt("Jakarta " * 100)
+        assert prompt.endswith("Jakarta Jakarta\n\nJSON Output:")
+        assert '"location": "City/Region name"' in prompt
+
+
+class TestBatchExtract:
+
+    def test_near_linear_speedup_up_to_limit(self):
+        t1 = laufzeit(1)
+        t2 = laufzeit(2)
+        t4 = laufzeit(4)
+        t8 = laufzeit(8)  # Fake-Server rechnet höchstens 4 parallel
+        assert t1 / t2 > 1.7
+        assert t1 / t4 > 3.0
+        assert t1 / t8 < 4.6
+
+    def test_newest_first(self):
+        llm = FakeLLM(latency=0.001)
+        extractor = LLMExtractor(concurrency=1, llm=llm)
+
+        async def run():
+            return [r.job.id async for r in extractor.extract_stream(artikel(5))]
+
+        assert asyncio.run(run()) == [4, 3, 2, 1, 0]
+
+    def test_timeouts_and_errors_with_metrics(self):
+        jobs = artikel(6) + [ExtractionJob(text="SLOW article"), ExtractionJob(text="FAIL article")]
+        extractor = LLMExtractor(concurrency=4, item_timeout=0.2, llm=FakeLLM(latency=0.01))
+        fortschritt = []
+
+        async def run():
+            return [r async for r in extractor.extract_stream(jobs, on_progress=lambda m: fortschritt.append(m.done))]
+
+        ergebnisse = asyncio.run(run())
+        assert len(ergebnisse) == 8
+        assert sorted(r.error for r in ergebnisse if r.error) == ["Ollama error 500", "timeout"]
+        assert sum(1 for r in ergebnisse if r.entity) == 6
+        metrics = extractor.metrics.as_dict()
+        assert metrics["done"] == 8 and metrics["timeouts"] == 1 and metrics["failed"] == 1
+        assert metrics["progress"] == 1.0 and metrics["throughput_per_min"] > 0
+        assert fortschritt == list(range(1, 9))
+
+    def test_backpressure(self):
+        llm = FakeLLM(latency=0.001, server_parallel=8)
+        extractor = LLMExtractor(concurrency=2, llm=llm)
+
+        async def run():
+            stream = extractor.extract_stream(artikel(20))
+            await stream.__anext__()
+            await asyncio.sleep(0.1)  # Konsument hängt
+            gestartet = len(llm.prompts)
+            await stream.aclose()
+            return gestartet
+
+        # 1 abgeholt + 2 im Ergebnis-Puffer + 2 Worker, die auf den Puffer warten
+        assert asyncio.run(run()) <= 5
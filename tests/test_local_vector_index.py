@@ -0,0 +1,121 @@
+"""
+Tests for app/backend/services/local_vector_index.py - lokaler Vektorindex
+als ChromaDB-Ersatz in VectorStore (Filter, k-Ring, Persistenz)
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services import h3_compat
+from services.local_vector_index import LocalVectorIndex
+from services.vector_store import ContextDocument, VectorStore
+
+ZENTRUM = h3_compat.latlng_to_cell(-6.2, 106.8, 7)  # Jakarta
+DIM = 16
+
+
+def befuellen(index: LocalVectorIndex, n: int = 200, seed: int = 0):
+    rnd = np.random.default_rng(seed)
+    zellen = h3_compat.grid_disk(ZENTRUM, 2)
+    vektoren = rnd.normal(size=(n, DIM)).astype(np.float32)
+    index.add(
+        ids=[f"d{i}" for i in range(n)],
+        embeddings=vektoren,
+        documents=[f"Dokument {i}" for i in range(n)],
+        metadatas=[{"h3_index": zellen[i % len(zellen)], "severity": i % 10, "typ": "flood" if i % 2 else "drought"}
+                   for i in range(n)],
+    )
+    return vektoren, zellen
+
+
+def brute_force(vektoren, anfrage, zeilen):
+    normiert = vektoren / np.linalg.norm(vektoren, axis=1, keepdims=True)
+    scores = normiert[zeilen] @ (anfrage / np.linalg.norm(anfrage))
+    return [f"d{zeilen[i]}" for i in np.argsort(-scores)]
+
+
+@pytest.fixture
+def index(tmp_path):
+    return LocalVectorIndex(path=str(tmp_path / "idx"))
+
+
+class TestLocalVectorIndex:
+
+    def test_query_matches_brute_force(self, index):
+        vektoren, _ = befuellen(index)
+        anfrage = vektoren[7] + 0.1
+        ergebnis = index.query(query_embeddings=[anfrage], n_results=5)
+        assert ergebnis["ids"][0] == brute_force(vektoren, anfrage, np.arange(200))[:5]
+        assert ergebnis["ids"][0][0] == "d7"
+        assert ergebnis["distances"][0] == sorted(ergebnis["distances"][0])
+
+    def test_where_filters(self, index):
+        vektoren, zellen = befuellen(index)
+        where = {"$and": [{"h3_index": {"$in": zellen[:3]}}, {"severity": {"$gte": 5}}, {"typ": "flood"}]}
+        zeilen = np.array([i for i in range(200) if i % len(zellen) < 3 and i % 10 >= 5 and i % 2])
+        ergebnis = index.query(query_embeddings=[vektoren[0]], n_results=500, where=where)
+        assert ergebnis["ids"][0] == brute_force(vektoren, vektoren[0], zeilen)
+        assert index.get(where={"$or": [{"severity": 0}, {"severity": {"$gt": 8}}]}, limit=3)["ids"] == ["d0", "d9", "d10"]
+        assert index.get(where={"typ": {"$nin": ["flood"]}, "severity": {"$ne": 0}})["ids"][:2] == ["d2", "d4"]
+        assert index.query(query_embeddings=[vektoren[0]], where={"h3_index": "leer"})["ids"] == [[]]
+
+    def test_upsert_moves_row_between_cells(self, index):
+        _, zellen = befuellen(index)
+        index.upsert(ids=["d0"], embeddings=[np.ones(DIM)], metadatas=[{"h3_index": zellen[5]}])
+        assert index.count() == 200
+        assert "d0" not in index.get(where={"h3_index": zellen[0]})["ids"]
+        assert index.get(where={"h3_index": zellen[5]})["ids"][0] == "d0"
+        with pytest.raises(ValueError):
+            index.add(ids=["d1"], embeddings=[np.ones(DIM)])
+
+    def test_persist_and_memmap_reload(self, index):
+        vektoren, zellen = befuellen(index)
+        index.persist()
+        geladen = LocalVectorIndex(path=str(index.path))
+        assert isinstance(geladen._vectors, np.memmap)
+        assert geladen.count() == 200
+        anfrage = vektoren[3]
+        assert geladen.query(query_embeddings=[anfrage], n_results=10) == index.query(query_embeddings=[anfrage], n_results=10)
+        # Schreiben nach dem Laden kopiert die Matrix, die Datei bleibt unverändert
+        geladen.add(ids=["neu"], embeddings=[np.ones(DIM)], metadatas=[{"h3_index": zellen[0]}])
+        assert not isinstance(geladen._vectors, np.memmap)
+        assert LocalVectorIndex(path=str(index.path)).count() == 200
+
+
+class TestVectorStoreLocalBackend:
+
+    def test_k_ring_search(self, tmp_path):
+        store = VectorStore(local_index_dir=str(tmp_path))
+        store.init_collection()
+        if not store.is_local:
+            pytest.skip("ChromaDB server reachable")
+        vektoren, _ = befuellen(store.collection)
+        ring = h3_compat.grid_disk(ZENTRUM, 1)
+        treffer = store.search_k_ring(ZENTRUM, k=1, limit=200, query_embedding=vektoren[0].tolist())
+        assert treffer and all(t["metadata"]["h3_index"] in ring for t in treffer)
+        assert len(treffer) == len(store.search_nearby_cells(ring, limit=200))
+        assert store.semantic_search("ignored", limit=3, query_embedding=vektoren[1].tolist(),
+                                     where={"severity": 1})[0]["id"] == "d1"
+        assert store.semantic_search("ohne Embedding") == []
+        assert store.get_stats() == {"name": "tera_contexts", "count": 200, "backend": "local"}
+
+    def test_add_skips_documents_without_embedding(self, tmp_path):
+        store = VectorStore(local_index_dir=str(tmp_path))
+        store.init_collection()
+        if not store.is_local:
+            pytest.skip("ChromaDB server reachable")
+        ohne = ContextDocument(id="ohne", h3_index=ZENTRUM, content="kein Embedding", metadata={})
+        mit = ContextDocument(id="mit", h3_index=ZENTRUM, content="mit Embedding", metadata={},
+                              embedding=np.ones(DIM).tolist())
+        assert store.add_context(ohne) == "ohne"
+        assert store.collection.count() == 0
+        store.add_contexts_batch([ohne])
+        assert store.collection.count() == 0
+        store.add_contexts_batch([ohne, mit])
+        assert store.collection.get(where={"h3_index": ZENTRUM})["ids"] == ["mit"]
@@ -0,0 +1,184 @@
+"""
+Tests for app/backend/services/ollama_client.py - Streaming, Antwort-Cache,
+Single-Flight und In-Flight-Limit gegen einen lokalen Ollama-Stub
+"""
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.ollama_client import OllamaClient, OllamaError, ResponseCache
+
+
+class OllamaStub:
+    """Lokaler HTTP-Server mit /api/generate (NDJSON-Stream wie Ollama)"""
+
+    def __init__(self, tokens: int = 5, token_delay: float = 0.02):
+        self.tokens = tokens
+        self.token_delay = token_delay
+        self.requests = []
+        self.active = 0
+        self.max_active = 0
+        self.status = 200
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub._lock:
+                    stub.requests.append(body)
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                try:
+                    if stub.status != 200:
+                        fehler = b'{"error": "model not found"}'
+                        self.send_response(stub.status)
+                        self.send_header("Content-Length", str(len(fehler)))
+                        self.end_headers()
+                        self.wfile.write(fehler)
+                        return
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/x-ndjson")
+                    self.send_header("Transfer-Encoding", "chunked")
+                    self.end_headers()
+                    for i in range(stub.tokens):
+                        time.sleep(stub.token_delay)
+                        self._chunk({"response": f"t{i} ", "done": False})
+                    self._chunk({"response": "", "done": True})
+                    self.wfile.write(b"0\r\n\r\n")
+                finally:
+                    with stub._lock:
+                        stub.active -= 1
+
+            def _chunk(self, data):
+                zeile = json.dumps(data).encode() + b"\n"
+                self.wfile.write(f"{len(zeile):x}\r\n".encode() + zeile + b"\r\n")
+                self.wfile.flush()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = OllamaStub()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "ollama.sqlite"))
+
+
+EXPECTED = "t0 t1 t2 t3 t4 "
+
+
+def make_client(stub, cache, max_in_flight=4):
+    # Alle Werte explizit: config.settings wird nicht gebraucht
+    return OllamaClient(base_url=stub.url, model="stub", timeout=10, max_in_flight=max_in_flight, cache=cache)
+
+
+class TestOllamaStreaming:
+
+    def test_stream_yields_tokens_before_completion(self, stub, cache):
+        client = make_client(stub, cache)
+
+        async def run():
+            start = time.perf_counter()
+            chunks, zeiten = [], []
+            async for chunk in client.stream("Wie ist das Risiko in Jakarta?"):
+                chunks.append(chunk)
+                zeiten.append(time.perf_counter() - start)
+            return chunks, zeiten
+
+        chunks, zeiten = asyncio.run(run())
+        assert "".join(chunks) == EXPECTED
+        assert len(chunks) == stub.tokens
+        # Tokens kommen einzeln an, nicht gesammelt am Ende
+        assert zeiten[-1] - zeiten[0] >= 0.8 * (stub.tokens - 1) * stub.token_delay
+        stats = client.get_stats()
+        assert stats["generations"] == 1
+        assert 0 < stats["ttft_ms_avg"] < zeiten[-1] * 1000
+
+    def test_upstream_error(self, stub, cache):
+        stub.status = 404
+        client = make_client(stub, cache)
+        with pytest.raises(OllamaError):
+            asyncio.run(client.generate("prompt"))
+        assert len(cache) == 0
+        assert client.get_stats()["errors"] == 1
+
+
+class TestOllamaCache:
+
+    def test_hits_keyed_by_model_prompt_options(self, stub, cache):
+        client = make_client(stub, cache)
+
+        async def run():
+            a = await client.generate("Analyse Berlin", options={"temperature": 0.2})
+            b = await client.generate("Analyse Berlin", options={"temperature": 0.2})
+            c = await client.generate("Analyse Berlin", options={"temperature": 0.3})
+            d = await client.generate("Analyse Berlin", options={"temperature": 0.2}, model="anderes")
+            gestreamt = [x async for x in client.stream("Analyse Berlin", options={"temperature": 0.2})]
+            return a, b, c, d, gestreamt
+
+        a, b, c, d, gestreamt = asyncio.run(run())
+        assert a == b == c == d == EXPECTED
+        assert gestreamt == [EXPECTED]
+        assert len(stub.requests) == 3
+        assert client.get_stats()["hit_rate"] == 0.4
+
+    def test_cache_persists(self, stub, tmp_path):
+        pfad = str(tmp_path / "ollama.sqlite")
+        asyncio.run(make_client(stub, ResponseCache(pfad)).generate("prompt"))
+        zweiter = make_client(stub, ResponseCache(pfad))
+        assert asyncio.run(zweiter.generate("prompt")) == EXPECTED
+        assert len(stub.requests) == 1
+
+    def test_single_flight(self, stub, cache):
+        client = make_client(stub, cache)
+
+        async def run():
+            return await asyncio.gather(*(client.generate("Analyse Lagos") for _ in range(5)))
+
+        antworten = asyncio.run(run())
+        assert antworten == [EXPECTED] * 5
+        assert len(stub.requests) == 1
+        assert client.get_stats()["deduplicated"] == 4
+
+
+class TestOllamaConcurrency:
+
+    def test_in_flight_cap(self, stub, cache):
+        client = make_client(stub, cache, max_in_flight=2)
+
+        async def run():
+            return await asyncio.gather(*(client.generate(f"Stadt {i}") for i in range(6)))
+
+        antworten = asyncio.run(run())
+        assert len(antworten) == 6 and len(stub.requests) == 6
+        assert stub.max_active == 2
+        stats = client.get_stats()
+        assert stats["in_flight"] == 0 and stats["waiting"] == 0
@@ -0,0 +1,102 @@
+"""
+Tests for app/backend/services/physical_earth_model.py - vektorisierter
+Viewport-Pfad (viewport_states + states_to_features/-columnar) liefert
+dieselben Features wie calculate_cell_state + cell_to_feature pro Zelle
+"""
+import math
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import h3
+import numpy as np
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.physical_earth_model import CellStates, FrontendFormatter, PhysicalEarthModel, viewport_states
+
+ZEITPUNKTE = [
+    datetime(2026, 7, 1, 12, tzinfo=timezone.utc),
+    datetime(2026, 1, 15, 3, 30, tzinfo=timezone.utc),  # Nacht in Europa, Winter Nordhalbkugel
+    datetime(2026, 12, 21, 18, 45, tzinfo=timezone.utc),
+]
+# (lat, lon, Auflösung, Ringe): Tropen, Sahara, Arktis, Südhalbkugel, Datumsgrenze
+VIEWPORTS = [
+    (25.77, -80.19, 7, 4),
+    (23.0, 10.0, 5, 3),
+    (78.2, 15.6, 6, 3),
+    (-33.9, 151.2, 8, 4),
+    (-17.7, 179.9, 6, 2),
+]
+
+
+def zellen(lat, lon, res, ringe):
+    return h3.grid_disk(h3.latlng_to_cell(lat, lon, res), ringe)
+
+
+def einzeln(cells, now):
+    """Bisheriger Pfad: ein CellState pro Zelle mit denselben Eingaben wie viewport_states"""
+    model = PhysicalEarthModel(now=now)
+    states = []
+    for cell in cells:
+        try:
+            lat, lon = h3.cell_to_latlng(cell)
+        except Exception:
+            continue
+        states.append(model.calculate_cell_state(
+            cell,
+            precipitation_mm=max(0, 2 + math.sin(lat * 0.1) * 3),
+            ndvi=0.3 + abs(math.cos(lon * 0.1)) * 0.4,
+            soil_moisture_pct=40 + abs(math.sin(lat * 0.05 + lon * 0.03)) * 40,
+        ))
+    return states
+
+
+@pytest.mark.parametrize("now", ZEITPUNKTE)
+@pytest.mark.parametrize("viewport", VIEWPORTS)
+class TestViewportStates:
+    def test_features_match_per_cell_path(self, viewport, now):
+        cells = zellen(*viewport)
+        erwartet = [FrontendFormatter.cell_to_feature(s) for s in einzeln(cells, now)]
+        assert FrontendFormatter.states_to_features(viewport_states(cells, now)) == erwartet
+
+    def test_states_match_per_cell_path(self, viewport, now):
+        cells = zellen(*viewport)
+        assert viewport_states(cells, now).states() == einzeln(cells, now)
+
+    def test_columnar_matches_per_cell_path(self, viewport, now):
+        cells = zellen(*viewport)
+        assert FrontendFormatter.states_to_columnar(viewport_states(cells, now), meta={"zoom": 9}) == \
+            FrontendFormatter.cells_to_columnar(einzeln(cells, now), meta={"zoom": 9})
+
+
+class TestEdgeCases:
+    NOW = ZEITPUNKTE[0]
+
+    def test_invalid_cells_skipped(self):
+        cells = zellen(*VIEWPORTS[0])
+        gemischt = cells[:3] + ["kein-h3"] + cells[3:6]
+        states = viewport_states(gemischt, self.NOW)
+        assert states.h3_index == cells[:6]
+        assert FrontendFormatter.states_to_features(states) == \
+            [FrontendFormatter.cell_to_feature(s) for s in einzeln(gemischt, self.NOW)]
+
+    def test_empty(self):
+        states = viewport_states([], self.NOW)
+        assert len(states) == 0
+        assert FrontendFormatter.states_to_features(states) == []
+
+    def test_concat_of_shards(self):
+        cells = zellen(*VIEWPORTS[0])
+        teile = [viewport_states(cells[s:s + 20], self.NOW) for s in range(0, len(cells), 20)]
+        assert FrontendFormatter.states_to_features(CellStates.concat(teile)) == \
+            FrontendFormatter.states_to_features(viewport_states(cells, self.NOW))
+
+    def test_risk_classes_at_thresholds(self):
+        for threshold, _, _ in FrontendFormatter.RISK_CLASSES[:-1]:
+            for risk in (threshold, math.nextafter(threshold, 1.0)):
+                index = int(FrontendFormatter.risk_class_index(np.array([risk]))[0])
+                assert FrontendFormatter.RISK_CLASSES[index][1:] == FrontendFormatter.risk_class(risk)
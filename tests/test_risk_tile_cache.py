@@ -0,0 +1,109 @@
+"""
+Tests for app/backend/services/risk_tile_cache.py - Fingerprint/Version,
+TTL, VERWORFEN-Einträge und LRU im Prozess-Speicher
+"""
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services import real_data_tessellation
+from services.real_data_tessellation import EchteDatenTessellation
+from services.risk_tile_cache import VERWORFEN, RiskTileCache
+
+FEATURE = {"type": "Feature", "properties": {"risk_score": 0.42, "risk_type": "HOCH_HITZE"}}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RiskTileCache(db_path=str(tmp_path / "tiles.sqlite"))
+
+
+def frisch(cache: RiskTileCache, **kwargs) -> RiskTileCache:
+    """Zweite Instanz auf derselben Datei (leerer Prozess-LRU)"""
+    return RiskTileCache(db_path=str(cache.db_path), **kwargs)
+
+
+class TestRiskTileCache:
+    def test_round_trip_memory_and_disk(self, cache):
+        cache.put_many("fp", {"a": FEATURE, "b": VERWORFEN})
+        assert cache.get_many("fp", ["a", "b", "c"]) == {"a": FEATURE, "b": VERWORFEN}
+
+        disk = frisch(cache)
+        assert disk.get_many("fp", ["a", "b", "c"]) == {"a": FEATURE, "b": VERWORFEN}
+        stats = disk.get_stats()
+        assert (stats["disk_hits"], stats["misses"]) == (2, 1)
+
+    def test_verworfen_is_a_hit(self, cache):
+        cache.put_many("fp", {"offshore": VERWORFEN})
+        treffer = frisch(cache).get_many("fp", ["offshore"])
+        assert "offshore" in treffer and treffer["offshore"] is VERWORFEN
+
+    def test_prebuilt_json_texts(self, cache):
+        cache.put_many("fp", {"a": FEATURE, "b": VERWORFEN}, {"a": '{"x": 1}', "b": None})
+        assert frisch(cache).get_many("fp", ["a", "b"]) == {"a": {"x": 1}, "b": VERWORFEN}
+
+    def test_fingerprints_are_separate(self, cache):
+        cache.put_many("fp1", {"a": FEATURE})
+        assert cache.get_many("fp2", ["a"]) == {}
+        assert frisch(cache).get_many("fp2", ["a"]) == {}
+
+    def test_ttl_expiry(self, cache, monkeypatch):
+        cache.put_many("fp", {"a": FEATURE})
+        spaeter = time.time() + 10
+        monkeypatch.setattr(time, "time", lambda: spaeter)
+        assert frisch(cache, ttl_s=5).get_many("fp", ["a"]) == {}
+        assert frisch(cache, ttl_s=60).get_many("fp", ["a"]) == {"a": FEATURE}
+        assert frisch(cache, ttl_s=5).purge_expired() == 1
+        assert frisch(cache, ttl_s=60).get_many("fp", ["a"]) == {}
+
+    def test_lru_eviction(self, tmp_path):
+        cache = RiskTileCache(db_path=str(tmp_path / "lru.sqlite"), mem_max=2)
+        cache.put_many("fp", {"a": FEATURE, "b": FEATURE})
+        cache.get_many("fp", ["a"])           # a zuletzt benutzt
+        cache.put_many("fp", {"c": FEATURE})  # verdrängt b
+        assert cache.get_stats()["mem_entries"] == 2
+        vorher = cache.get_stats()
+        assert cache.get_many("fp", ["a", "b", "c"]) == {"a": FEATURE, "b": FEATURE, "c": FEATURE}
+        nachher = cache.get_stats()
+        assert nachher["mem_hits"] - vorher["mem_hits"] == 2
+        assert nachher["disk_hits"] - vorher["disk_hits"] == 1
+
+
+class TestFingerprint:
+    @pytest.fixture
+    def tessellation(self, cache):
+        return EchteDatenTessellation(tile_cache=cache, use_processes=False)
+
+    def test_depends_on_all_inputs(self, tessellation):
+        basis = tessellation._fingerprint("coastal", 25.77, -80.19, {})
+        assert basis == tessellation._fingerprint("coastal", 25.77, -80.19, None)
+        assert basis != tessellation._fingerprint("arid", 25.77, -80.19, {})
+        assert basis != tessellation._fingerprint("coastal", 25.78, -80.19, {})
+        assert basis != tessellation._fingerprint("coastal", 25.77, -80.19, {"trend_2024_2026": "steigend"})
+
+    def test_scoring_version_invalidates(self, tessellation, monkeypatch):
+        alt = tessellation._fingerprint("coastal", 25.77, -80.19, {})
+        monkeypatch.setattr(real_data_tessellation, "SCORING_VERSION", real_data_tessellation.SCORING_VERSION + 1)
+        assert tessellation._fingerprint("coastal", 25.77, -80.19, {}) != alt
+
+    def test_risk_map_served_from_cache(self, tessellation, cache, monkeypatch):
+        async def karte():
+            return await tessellation.generiere_risikokarte(25.77, -80.19, "coastal", aufloesung=8, radius_km=3.0)
+
+        erste = asyncio.run(karte())
+        geschrieben = cache.get_stats()["writes"]
+        assert erste and geschrieben > 0
+        assert asyncio.run(karte()) == erste
+        assert cache.get_stats()["writes"] == geschrieben
+
+        # Neue Scoring-Version -> neuer Fingerprint -> alle Zellen neu berechnet
+        monkeypatch.setattr(real_data_tessellation, "SCORING_VERSION", real_data_tessellation.SCORING_VERSION + 1)
+        assert asyncio.run(karte()) == erste
+        assert cache.get_stats()["writes"] == 2 * geschrieben
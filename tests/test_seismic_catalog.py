@@ -0,0 +1,192 @@
+"""
+Tests for app/backend/services/seismic_catalog.py - CSV-Parser,
+Radiusabfragen (Radius, Zeitfenster, limit) und inkrementelles Update
+gegen einen FDSN-Stub
+"""
+import asyncio
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlencode
+
+import httpx
+import numpy as np
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services import seismic_catalog
+from services.seismic_catalog import SeismicCatalog
+
+TAG_MS = 86_400_000
+KM_PRO_GRAD = 6371.0 * np.pi / 180.0
+
+CSV_KOPF = "time,latitude,longitude,depth,mag,magType,id\n"
+
+
+def csv_zeile(ms: int, lat: float, lon: float, mag, depth: float = 10.0, id: str = "x") -> str:
+    zeit = datetime.fromtimestamp(ms / 1000, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+    return f"{zeit},{lat},{lon},{depth},{'' if mag is None else mag},mb,{id}\n"
+
+
+class FdsnStub:
+    """Beantwortet FDSN-Anfragen aus einer Ereignisliste [(ms, lat, lon, mag, id)]"""
+
+    def __init__(self, events):
+        self.events = list(events)
+        self.fenster = []
+
+    async def get(self, url, params=None):
+        t0 = datetime.strptime(params['starttime'], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
+        t1 = datetime.strptime(params['endtime'], '%Y-%m-%dT%H:%M:%S').replace(tzinfo=timezone.utc)
+        t0_ms, t1_ms = int(t0.timestamp() * 1000), int(t1.timestamp() * 1000)
+        self.fenster.append((t0_ms, t1_ms))
+        text = CSV_KOPF + "".join(
+            csv_zeile(ms, lat, lon, mag, id=id)
+            for ms, lat, lon, mag, id in sorted(self.events)
+            if t0_ms <= ms < t1_ms and mag >= params['minmagnitude']
+        )
+        return httpx.Response(200, text=text, request=httpx.Request('GET', f"{url}?{urlencode(params)}"))
+
+
+@pytest.fixture(autouse=True)
+def ohne_drossel(monkeypatch):
+    monkeypatch.setattr(seismic_catalog, 'MIN_ABSTAND_S', 0.0)
+
+
+@pytest.fixture
+def katalog(tmp_path):
+    return SeismicCatalog(data_dir=str(tmp_path))
+
+
+def befuellen(katalog: SeismicCatalog, events, ende_ms: int, start_ms: int = 0):
+    """events: [(ms, lat, lon, mag)]"""
+    ms, lat, lon, mag = (np.array(s) for s in zip(*events))
+    katalog._setze_daten(
+        ms.astype(np.int64), lat.astype(np.float32), lon.astype(np.float32),
+        np.zeros(len(ms), np.float32), mag.astype(np.float32), start_ms, ende_ms,
+    )
+
+
+class TestParseCsv:
+    def test_columns_and_empty_magnitude(self):
+        ms = 1_700_000_000_123
+        text = CSV_KOPF + csv_zeile(ms, 35.5, 139.7, 5.1) + csv_zeile(ms + 1000, 1.0, 2.0, None) \
+            + "2023-11-14T22:13:21.000Z,-20.25,-70.5,,4.4,mb,y\n"
+        zeit, lat, lon, tiefe, mag = SeismicCatalog._parse_csv(text)
+        assert zeit.tolist() == [ms, 1_700_000_001_000]
+        assert lat.tolist() == pytest.approx([35.5, -20.25])
+        assert lon.tolist() == pytest.approx([139.7, -70.5])
+        assert tiefe.tolist() == [10.0, 0.0]
+        assert mag.tolist() == pytest.approx([5.1, 4.4])
+        assert zeit.dtype == np.int64 and mag.dtype == np.float32
+
+    def test_empty(self):
+        spalten = SeismicCatalog._parse_csv(CSV_KOPF)
+        assert all(len(s) == 0 for s in spalten)
+
+
+class TestRadiusStats:
+    ENDE = 2_000 * TAG_MS
+
+    def events(self):
+        # (ms, lat, lon, mag): Abstände 0/50/150/400 km nördlich von (0, 0)
+        return [
+            (self.ENDE - 1 * TAG_MS, 0.0, 0.0, 6.0),
+            (self.ENDE - 2 * TAG_MS, 50 / KM_PRO_GRAD, 0.0, 4.5),
+            (self.ENDE - 3 * TAG_MS, 150 / KM_PRO_GRAD, 0.0, 5.0),
+            (self.ENDE - 4 * TAG_MS, 400 / KM_PRO_GRAD, 0.0, 7.0),
+            (self.ENDE - 40 * TAG_MS, 10 / KM_PRO_GRAD, 0.0, 4.2),
+            (self.ENDE - 400 * TAG_MS, 0.0, 10 / KM_PRO_GRAD, 4.8),
+        ]
+
+    def test_radius(self, katalog):
+        befuellen(katalog, self.events(), self.ENDE)
+        assert katalog.radius_stats(0, 0, 100, days=30).count == 2
+        assert katalog.radius_stats(0, 0, 200, days=30).count == 3
+        stats = katalog.radius_stats(0, 0, 500, days=30)
+        assert stats.count == 4
+        assert stats.max_magnitude == pytest.approx(7.0)
+
+    def test_time_window_and_rate(self, katalog):
+        befuellen(katalog, self.events(), self.ENDE)
+        assert katalog.radius_stats(0, 0, 100, days=30).count == 2
+        assert katalog.radius_stats(0, 0, 100, days=60).count == 3
+        stats = katalog.radius_stats(0, 0, 100, days=365 * 2)
+        assert stats.count == 4
+        assert stats.annual_rate == pytest.approx(2.0)
+        assert stats.end == datetime.fromtimestamp(self.ENDE / 1000, tz=timezone.utc)
+
+    def test_start_of_catalog_limits_window(self, katalog):
+        befuellen(katalog, self.events(), self.ENDE, start_ms=self.ENDE - 100 * TAG_MS)
+        stats = katalog.radius_stats(0, 0, 100, days=365 * 2)
+        assert stats.count == 3
+        assert stats.start == datetime.fromtimestamp((self.ENDE - 100 * TAG_MS) / 1000, tz=timezone.utc)
+
+    def test_min_magnitude_and_limit(self, katalog):
+        befuellen(katalog, self.events(), self.ENDE)
+        assert katalog.radius_stats(0, 0, 500, days=30, min_magnitude=5.0).count == 3
+        # limit: die jüngsten Ereignisse, zeitlich absteigend
+        stats = katalog.radius_stats(0, 0, 500, days=30, limit=2)
+        assert stats.magnitudes.tolist() == pytest.approx([6.0, 4.5])
+
+    def test_empty_catalog(self, katalog):
+        stats = katalog.radius_stats(0, 0, 500, days=30)
+        assert stats.count == 0 and stats.max_magnitude == 0.0
+
+
+class TestUpdate:
+    def test_initial_load_then_incremental_overlap(self, katalog, tmp_path):
+        jetzt = seismic_catalog._jetzt_ms()
+        alt = (jetzt - 50 * TAG_MS, 10.0, 20.0, 5.0, "alt")
+        revidiert = (jetzt - 2 * TAG_MS, 11.0, 21.0, 4.5, "rev")
+        stub = FdsnStub([alt, revidiert, (jetzt - 70 * TAG_MS, 0.0, 0.0, 3.0, "klein")])
+
+        assert asyncio.run(katalog.update(years=0.2, client=stub)) == 2
+        assert len(katalog) == 2
+        assert katalog.is_ready
+        assert len(stub.fenster) == 3  # 73 Tage in 30-Tage-Fenstern
+
+        # Magnitude revidiert, neues Ereignis: nur die letzten UEBERLAPPUNG_TAGE neu laden
+        geladen_bis = katalog.loaded_until_ms
+        stub.events = [alt, (revidiert[0], 11.0, 21.0, 4.9, "rev"), (jetzt - TAG_MS // 2, 12.0, 22.0, 6.1, "neu")]
+        stub.fenster.clear()
+        asyncio.run(katalog.update(client=stub))
+
+        assert stub.fenster[0][0] // 1000 == (geladen_bis - seismic_catalog.UEBERLAPPUNG_TAGE * TAG_MS) // 1000
+        assert len(katalog) == 3
+        assert sorted(katalog.mag.tolist()) == pytest.approx([4.9, 5.0, 6.1])
+
+        # Persistenz: ein neuer Prozess liest denselben Stand, keine Temp-Dateien bleiben liegen
+        neu = SeismicCatalog(data_dir=str(tmp_path))
+        assert neu.time_ms.tolist() == katalog.time_ms.tolist()
+        assert neu.loaded_until_ms == katalog.loaded_until_ms
+        assert [p.name for p in tmp_path.iterdir()] == [katalog.path.name]
+
+    def test_concurrent_saves_do_not_share_a_temp_file(self, tmp_path):
+        """Mehrere Worker-Prozesse speichern denselben Katalog gleichzeitig"""
+        kataloge = [SeismicCatalog(data_dir=str(tmp_path)) for _ in range(4)]
+        for i, k in enumerate(kataloge):
+            befuellen(k, [(TAG_MS * (j + 1), 0.0, 0.0, 4.0 + i) for j in range(1000)], 2000 * TAG_MS)
+        fehler = []
+
+        def speichern(k):
+            try:
+                for _ in range(20):
+                    k._speichere()
+            except Exception as e:  # pragma: no cover - nur im Fehlerfall
+                fehler.append(e)
+
+        threads = [threading.Thread(target=speichern, args=(k,)) for k in kataloge]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert fehler == []
+        geladen = SeismicCatalog(data_dir=str(tmp_path))
+        assert len(geladen) == 1000
+        assert [p.name for p in tmp_path.iterdir()] == [geladen.path.name]
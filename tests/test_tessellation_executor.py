@@ -0,0 +1,76 @@
+"""
+Tests for app/backend/services/tessellation_executor.py - kleine Anfragen
+laufen direkt im API-Prozess, große in Shards auf dem Prozess-Pool
+"""
+import asyncio
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import h3
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.physical_earth_model import FrontendFormatter, viewport_states
+from services.real_data_tessellation import EchteDatenTessellation
+from services.risk_tile_cache import RiskTileCache
+from services.tessellation_executor import TessellationExecutor
+
+JETZT = datetime(2026, 3, 1, 12, tzinfo=timezone.utc)
+ZELLEN = h3.grid_disk(h3.latlng_to_cell(52.52, 13.405, 7), 3)  # 37 Zellen
+
+
+class OhnePool(TessellationExecutor):
+    """Schlägt fehl, sobald Zellen den Prozess-Pool erreichen würden"""
+
+    def _pool_holen(self):
+        raise AssertionError("Prozess-Pool für kleine Anfrage benutzt")
+
+    async def features(self, *args, **kwargs):
+        raise AssertionError("Executor für kleine Anfrage benutzt")
+
+
+class TestInline:
+    def test_small_request_skips_pool(self):
+        executor = OhnePool(workers=4)
+        features = asyncio.run(executor.earth_cycle_features(ZELLEN, JETZT))
+        assert features == FrontendFormatter.states_to_features(viewport_states(ZELLEN, JETZT))
+
+        states = asyncio.run(executor.earth_cycle_states(ZELLEN, JETZT))
+        assert FrontendFormatter.states_to_features(states) == features
+        assert executor.get_stats()['inline'] == 2
+        assert executor.get_stats()['aktiv'] is False
+
+    def test_shards_respect_min_shard(self):
+        executor = TessellationExecutor(workers=4, min_shard=10)
+        assert executor.shards(9) == [slice(0, 9)]
+        assert executor.shards(37) == [slice(0, 13), slice(13, 26), slice(26, 37)]
+        assert executor.shards(1000) == [slice(0, 250), slice(250, 500), slice(500, 750), slice(750, 1000)]
+
+    def test_small_risk_map_computed_in_process(self):
+        t = EchteDatenTessellation(
+            tile_cache=RiskTileCache(db_path=tempfile.mktemp(suffix='.sqlite')),
+            executor=OhnePool(workers=4),
+        )
+        features = asyncio.run(t.generiere_risikokarte(52.52, 13.405, "temperate", aufloesung=7, radius_km=3.0))
+        assert 0 < len(features) < t.executor.min_shard
+
+
+class TestPool:
+    def test_pool_matches_inline(self):
+        executor = TessellationExecutor(workers=2, min_shard=8)
+
+        async def run():
+            await executor.start()
+            try:
+                return await executor.earth_cycle_features(ZELLEN, JETZT)
+            finally:
+                executor.shutdown()
+
+        assert asyncio.run(run()) == asyncio.run(TessellationExecutor(workers=2).earth_cycle_features(ZELLEN, JETZT))
+        stats = executor.get_stats()
+        assert (stats['aufrufe'], stats['shards'], stats['inline']) == (1, 2, 0)
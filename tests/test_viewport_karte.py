@@ -0,0 +1,88 @@
+"""
+Tests for app/backend/services/real_data_tessellation.py - Viewport-Karte:
+Pans mit geteilten Caches liefern dieselben Zonen wie eine frische
+Berechnung gegen das exakte Viewport-Zentrum
+"""
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add backend directory to path
+backend_path = Path(__file__).parent.parent / "app" / "backend"
+sys.path.insert(0, str(backend_path))
+
+from services.cell_state_cache import ZellZustandCache
+from services.real_data_tessellation import EchteDatenTessellation, features_fuer_batch
+from services.risk_tile_cache import RiskTileCache
+from services.topography_service import TopographyService
+
+# min_lat, min_lon, max_lat, max_lon: Küste von Miami
+START = (25.70, -80.30, 25.90, -80.05)
+ZOOM = 12
+
+
+class OhneDem(TopographyService):
+    async def elevations_m(self, lats, lons, zoom: int = 12):
+        return np.full(np.shape(lats), np.nan)
+
+
+def tessellation() -> EchteDatenTessellation:
+    t = EchteDatenTessellation(
+        tile_cache=RiskTileCache(db_path=tempfile.mktemp(suffix='.sqlite')),
+        zell_cache=ZellZustandCache(),
+        use_processes=False,
+    )
+    t.topo = t.batch.topo = OhneDem()
+    return t
+
+
+def verschoben(bbox, d_lat: float, d_lon: float):
+    min_lat, min_lon, max_lat, max_lon = bbox
+    return min_lat + d_lat, min_lon + d_lon, max_lat + d_lat, max_lon + d_lon
+
+
+def karte(t: EchteDatenTessellation, bbox, zoom: int = ZOOM):
+    features = asyncio.run(t.generiere_viewport_karte(*bbox, zoom=zoom, stadt_typ='coastal', max_cells=1500))
+    return {f['properties']['h3']: f for f in features}
+
+
+@pytest.fixture(scope="module")
+def sitzung():
+    """Eine Kartensitzung: Start, dann drei Pans mit geteilten Caches"""
+    t = tessellation()
+    bbox = START
+    schritte = [(bbox, karte(t, bbox))]
+    for d_lat, d_lon in [(0.0, 0.004), (0.013, 0.0), (-0.021, -0.037)]:
+        bbox = verschoben(bbox, d_lat, d_lon)
+        schritte.append((bbox, karte(t, bbox)))
+    return t, schritte
+
+
+class TestViewportPan:
+    def test_pan_matches_fresh_computation(self, sitzung):
+        t, schritte = sitzung
+        assert t.zell_cache.get_stats()['treffer'] > 0
+        for bbox, features in schritte[1:]:
+            assert features == karte(tessellation(), bbox)
+
+    def test_scored_against_exact_centre(self, sitzung):
+        _, schritte = sitzung
+        ref = tessellation()
+        for (min_lat, min_lon, max_lat, max_lon), features in schritte:
+            zellen = sorted(features)
+            erwartet = features_fuer_batch(ref.batch.analysiere(
+                zellen, round((min_lat + max_lat) / 2, 5), round((min_lon + max_lon) / 2, 5), 'coastal',
+            ))
+            assert features == erwartet
+
+    def test_urban_zone_follows_centre(self, sitzung):
+        """Schon ein Pan um ~400 m verschiebt den Urban-Radius (8 km) mit"""
+        _, schritte = sitzung
+        urban = [{h for h, f in features.items() if f['properties']['ist_urban']}
+                 for _, features in schritte[:2]]
+        gemeinsam = set(schritte[0][1]) & set(schritte[1][1])
+        assert urban[0] & gemeinsam != urban[1] & gemeinsam